@@ -14,9 +14,18 @@ from app.core.database import Base
 from app.models.project import Project  # noqa: F401
 from app.models.test_suite import TestSuite  # noqa: F401
 from app.models.test_case import TestCase, TestCaseVersion, ApprovalRecord  # noqa: F401
-from app.models.evaluation_run import EvaluationRunRecord, RunResultRecord  # noqa: F401
+from app.models.evaluation_run import EvaluationRunRecord, EvaluationRunShard, RunResultRecord  # noqa: F401
 from app.models.user import User  # noqa: F401
 from app.models.audit_log import AuditLog  # noqa: F401
+from app.models.llm_call import LLMCallRecord  # noqa: F401
+from app.models.analysis import AnalysisCacheEntry, RunAnalysisSummary  # noqa: F401
+from app.models.ingestion import IngestionJob, IngestionDocument  # noqa: F401
+from app.models.dashboard import DashboardSummaryCache  # noqa: F401
+from app.models.rollup import EvaluationRollup, SecurityRollup  # noqa: F401
+from app.models.outcome import TestCaseOutcome, TestCaseStability  # noqa: F401
+from app.models.schedule import EvaluationSchedule, SchedulerLease  # noqa: F401
+from app.models.webhook import WebhookSubscription, WebhookDelivery, WebhookDeadLetter  # noqa: F401
+from app.models.security_testing import SecurityTestRun, SecurityTestResult, PromptHistory  # noqa: F401
 
 config = context.config
 if config.config_file_name is not None:
@@ -0,0 +1,25 @@
+"""latency sketch of security test runs
+
+Revision ID: 0b9e4d7c2a56
+Revises: f2c8a4e6b130
+Create Date: 2026-10-20 11:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0b9e4d7c2a56"
+down_revision: Union[str, None] = "f2c8a4e6b130"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing runs get their sketch rebuilt from results by the reconcile loop
+    inspector = sa.inspect(op.get_bind())
+    if "latency_sketch" not in {c["name"] for c in inspector.get_columns("security_test_runs")}:
+        op.add_column("security_test_runs", sa.Column("latency_sketch", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("security_test_runs", "latency_sketch")
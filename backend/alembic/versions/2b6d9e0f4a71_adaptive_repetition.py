@@ -0,0 +1,24 @@
+"""adaptive repetition of evaluation runs
+
+Revision ID: 2b6d9e0f4a71
+Revises: e4f7a2c9b613
+Create Date: 2026-10-19 20:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "2b6d9e0f4a71"
+down_revision: Union[str, None] = "e4f7a2c9b613"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "repetition" not in {c["name"] for c in inspector.get_columns("evaluation_runs")}:
+        op.add_column("evaluation_runs", sa.Column("repetition", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("evaluation_runs", "repetition")
@@ -0,0 +1,64 @@
+"""add hot path indexes
+
+Revision ID: 3f9d2c71a0b4
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "3f9d2c71a0b4"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns, partial-index predicates per dialect)
+INDEXES = [
+    ("ix_test_suites_project_id", "test_suites", ["project_id"], None),
+    ("ix_test_cases_suite_created", "test_cases", ["test_suite_id", "created_at"], None),
+    ("ix_test_cases_suite_status", "test_cases", ["test_suite_id", "status"], None),
+    ("ix_test_cases_status_created", "test_cases", ["status", "created_at"], None),
+    ("ix_test_case_versions_case_version", "test_case_versions", ["test_case_id", "version_number"], None),
+    ("ix_approval_records_case_timestamp", "approval_records", ["test_case_id", "timestamp"], None),
+    ("ix_evaluation_runs_suite_state_created", "evaluation_runs", ["test_suite_id", "state", "created_at"], None),
+    ("ix_evaluation_runs_suite_created", "evaluation_runs", ["test_suite_id", "created_at"], None),
+    ("ix_evaluation_runs_state_created", "evaluation_runs", ["state", "created_at"], None),
+    ("ix_run_results_run_created", "run_results", ["evaluation_run_id", "created_at"], None),
+    ("ix_security_test_runs_project_created", "security_test_runs", ["project_id", "created_at"], None),
+    ("ix_security_test_runs_project_dataset", "security_test_runs", ["project_id", "dataset_source"], None),
+    ("ix_security_test_results_run_created", "security_test_results", ["security_test_run_id", "created_at"], None),
+    ("ix_security_test_results_run_confidence", "security_test_results", ["security_test_run_id", "confidence_score"], None),
+    (
+        "ix_security_test_results_run_attacks",
+        "security_test_results",
+        ["security_test_run_id", "created_at"],
+        {
+            "postgresql_where": sa.text("is_attack_successful"),
+            "sqlite_where": sa.text("is_attack_successful = 1"),
+        },
+    ),
+    ("ix_ingestion_documents_job_position", "ingestion_documents", ["job_id", "position"], None),
+]
+
+
+def upgrade() -> None:
+    # Build concurrently on PostgreSQL so large tables stay writable; that
+    # cannot run inside a transaction. Tables created by init_db may already
+    # have these indexes, hence if_not_exists.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                **(where or {}),
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
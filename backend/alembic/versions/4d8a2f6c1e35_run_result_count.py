@@ -0,0 +1,28 @@
+"""stored result count of evaluation runs
+
+Revision ID: 4d8a2f6c1e35
+Revises: 6a3f1c8e2d97
+Create Date: 2026-10-21 09:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "4d8a2f6c1e35"
+down_revision: Union[str, None] = "6a3f1c8e2d97"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "result_count" not in {c["name"] for c in inspector.get_columns("evaluation_runs")}:
+        op.add_column("evaluation_runs", sa.Column("result_count", sa.Integer(), nullable=True))
+    op.execute(
+        "UPDATE evaluation_runs SET result_count = ("
+        "SELECT count(*) FROM run_results WHERE run_results.evaluation_run_id = evaluation_runs.id)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("evaluation_runs", "result_count")
@@ -0,0 +1,80 @@
+"""daily trend rollups
+
+Revision ID: 5e2b8f4c7a19
+Revises: c1a7e5f09d3b
+Create Date: 2026-10-19 17:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "5e2b8f4c7a19"
+down_revision: Union[str, None] = "c1a7e5f09d3b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+RUN_TABLES = [
+    ("evaluation_runs", "ix_evaluation_runs_state_rollup"),
+    ("security_test_runs", "ix_security_test_runs_state_rollup"),
+]
+
+
+def upgrade() -> None:
+    # Runs completed before this revision have rolled_up_at NULL and are
+    # folded in by roll_up_pending_runs on the first trend reads.
+    inspector = sa.inspect(op.get_bind())
+    for table, _ in RUN_TABLES:
+        if "rolled_up_at" not in {c["name"] for c in inspector.get_columns(table)}:
+            op.add_column(table, sa.Column("rolled_up_at", sa.DateTime(timezone=True), nullable=True))
+
+    if not inspector.has_table("evaluation_rollups"):
+        op.create_table(
+            "evaluation_rollups",
+            sa.Column("id", sa.String(36), primary_key=True),
+            sa.Column("test_suite_id", sa.String(36), sa.ForeignKey("test_suites.id"), nullable=False),
+            sa.Column("day", sa.Date(), nullable=False),
+            sa.Column("run_count", sa.Integer(), nullable=True),
+            sa.Column("total_count", sa.Integer(), nullable=True),
+            sa.Column("passed_count", sa.Integer(), nullable=True),
+            sa.Column("failed_count", sa.Integer(), nullable=True),
+            sa.Column("error_count", sa.Integer(), nullable=True),
+        )
+        op.create_index(
+            "ux_evaluation_rollups_suite_day", "evaluation_rollups",
+            ["test_suite_id", "day"], unique=True,
+        )
+
+    if not inspector.has_table("security_rollups"):
+        op.create_table(
+            "security_rollups",
+            sa.Column("id", sa.String(36), primary_key=True),
+            sa.Column("project_id", sa.String(36), sa.ForeignKey("projects.id"), nullable=False),
+            sa.Column("category", sa.String(100), nullable=False),
+            sa.Column("day", sa.Date(), nullable=False),
+            sa.Column("run_count", sa.Integer(), nullable=True),
+            sa.Column("attempts", sa.Integer(), nullable=True),
+            sa.Column("successes", sa.Integer(), nullable=True),
+            sa.Column("latency_histogram", sa.JSON(), nullable=True),
+        )
+        op.create_index(
+            "ux_security_rollups_project_category_day", "security_rollups",
+            ["project_id", "category", "day"], unique=True,
+        )
+        op.create_index("ix_security_rollups_project_day", "security_rollups", ["project_id", "day"])
+
+    with op.get_context().autocommit_block():
+        for table, index in RUN_TABLES:
+            op.create_index(
+                index, table, ["state", "rolled_up_at"],
+                if_not_exists=True, postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table, index in RUN_TABLES:
+            op.drop_index(index, table_name=table, if_exists=True, postgresql_concurrently=True)
+    op.drop_table("security_rollups")
+    op.drop_table("evaluation_rollups")
+    for table, _ in RUN_TABLES:
+        op.drop_column(table, "rolled_up_at")
@@ -0,0 +1,82 @@
+"""webhook subscriptions, delivery queue and dead letters
+
+Revision ID: 6a3f1c8e2d97
+Revises: 0b9e4d7c2a56
+Create Date: 2026-10-20 14:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "6a3f1c8e2d97"
+down_revision: Union[str, None] = "0b9e4d7c2a56"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table("webhook_subscriptions"):
+        op.create_table(
+            "webhook_subscriptions",
+            sa.Column("id", sa.String(36), primary_key=True),
+            sa.Column("project_id", sa.String(36), sa.ForeignKey("projects.id"), nullable=False),
+            sa.Column("url", sa.String(2048), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("events", sa.JSON(), nullable=True),
+            sa.Column("secret_encrypted", sa.Text(), nullable=False),
+            sa.Column("max_concurrency", sa.Integer(), nullable=True),
+            sa.Column("enabled", sa.Boolean(), nullable=True),
+            sa.Column("created_by", sa.String(36), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index("ix_webhook_subscriptions_project", "webhook_subscriptions", ["project_id"])
+
+    if not inspector.has_table("webhook_deliveries"):
+        op.create_table(
+            "webhook_deliveries",
+            sa.Column("id", sa.String(36), primary_key=True),
+            sa.Column(
+                "subscription_id", sa.String(36),
+                sa.ForeignKey("webhook_subscriptions.id"), nullable=False,
+            ),
+            sa.Column("event", sa.String(50), nullable=False),
+            sa.Column("payload", sa.JSON(), nullable=False),
+            sa.Column("attempts", sa.Integer(), nullable=True),
+            sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("last_status_code", sa.Integer(), nullable=True),
+            sa.Column("last_error", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index(
+            "ix_webhook_deliveries_subscription_next_attempt", "webhook_deliveries",
+            ["subscription_id", "next_attempt_at"],
+        )
+
+    if not inspector.has_table("webhook_dead_letters"):
+        op.create_table(
+            "webhook_dead_letters",
+            sa.Column("id", sa.String(36), primary_key=True),
+            sa.Column(
+                "subscription_id", sa.String(36),
+                sa.ForeignKey("webhook_subscriptions.id"), nullable=False,
+            ),
+            sa.Column("event", sa.String(50), nullable=False),
+            sa.Column("payload", sa.JSON(), nullable=False),
+            sa.Column("attempts", sa.Integer(), nullable=True),
+            sa.Column("last_status_code", sa.Integer(), nullable=True),
+            sa.Column("last_error", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("failed_at", sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index(
+            "ix_webhook_dead_letters_subscription_failed", "webhook_dead_letters",
+            ["subscription_id", "failed_at"],
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("webhook_dead_letters")
+    op.drop_table("webhook_deliveries")
+    op.drop_table("webhook_subscriptions")
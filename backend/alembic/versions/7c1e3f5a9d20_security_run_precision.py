@@ -0,0 +1,28 @@
+"""security run sequential sampling precision
+
+Revision ID: 7c1e3f5a9d20
+Revises: 2b6d9e0f4a71
+Create Date: 2026-10-19 21:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "7c1e3f5a9d20"
+down_revision: Union[str, None] = "2b6d9e0f4a71"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    columns = {c["name"] for c in inspector.get_columns("security_test_runs")}
+    if "achieved_precision" not in columns:
+        op.add_column("security_test_runs", sa.Column("achieved_precision", sa.Float(), nullable=True))
+    if "precision_report" not in columns:
+        op.add_column("security_test_runs", sa.Column("precision_report", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("security_test_runs", "precision_report")
+    op.drop_column("security_test_runs", "achieved_precision")
@@ -0,0 +1,99 @@
+"""keyset pagination indexes and cached security result counts
+
+Revision ID: 8b4e1d6a2c57
+Revises: 3f9d2c71a0b4
+Create Date: 2026-10-19 12:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "8b4e1d6a2c57"
+down_revision: Union[str, None] = "3f9d2c71a0b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_ATTACKS_WHERE = {
+    "postgresql_where": sa.text("is_attack_successful"),
+    "sqlite_where": sa.text("is_attack_successful = 1"),
+}
+
+# (new index, replaced index, table, columns, partial-index predicates)
+INDEXES = [
+    ("ix_run_results_run_keyset", "ix_run_results_run_created", "run_results",
+     ["evaluation_run_id", "created_at", "id"], None),
+    ("ix_evaluation_runs_suite_keyset", "ix_evaluation_runs_suite_created", "evaluation_runs",
+     ["test_suite_id", "created_at", "id"], None),
+    ("ix_evaluation_runs_keyset", None, "evaluation_runs", ["created_at", "id"], None),
+    ("ix_security_test_runs_project_keyset", "ix_security_test_runs_project_created",
+     "security_test_runs", ["project_id", "created_at", "id"], None),
+    ("ix_security_test_results_run_keyset", "ix_security_test_results_run_created",
+     "security_test_results", ["security_test_run_id", "created_at", "id"], None),
+    ("ix_security_test_results_run_attacks_keyset", "ix_security_test_results_run_attacks",
+     "security_test_results", ["security_test_run_id", "created_at", "id"], _ATTACKS_WHERE),
+]
+
+COUNT_COLUMNS = ["blocked_count", "low_confidence_count"]
+
+
+def upgrade() -> None:
+    existing = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("security_test_runs")}
+    for name in COUNT_COLUMNS:
+        if name not in existing:
+            op.add_column(
+                "security_test_runs",
+                sa.Column(name, sa.Integer(), nullable=True, server_default="0"),
+            )
+
+    runs = sa.table(
+        "security_test_runs",
+        sa.column("id"), sa.column("blocked_count"), sa.column("low_confidence_count"),
+    )
+    results = sa.table(
+        "security_test_results",
+        sa.column("security_test_run_id"),
+        sa.column("is_attack_successful", sa.Boolean()),
+        sa.column("confidence_score"),
+    )
+
+    def count_where(*conditions):
+        return (
+            sa.select(sa.func.count())
+            .where(results.c.security_test_run_id == runs.c.id, *conditions)
+            .scalar_subquery()
+        )
+
+    op.execute(
+        runs.update().values(
+            blocked_count=count_where(
+                results.c.is_attack_successful == sa.false(),
+                results.c.confidence_score >= 0.7,
+            ),
+            low_confidence_count=count_where(results.c.confidence_score < 0.7),
+        )
+    )
+
+    with op.get_context().autocommit_block():
+        for name, replaced, table, columns, where in INDEXES:
+            op.create_index(
+                name, table, columns,
+                if_not_exists=True, postgresql_concurrently=True, **(where or {}),
+            )
+            if replaced:
+                op.drop_index(
+                    replaced, table_name=table, if_exists=True, postgresql_concurrently=True
+                )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, replaced, table, columns, where in reversed(INDEXES):
+            if replaced:
+                op.create_index(
+                    replaced, table, columns[:-1],
+                    if_not_exists=True, postgresql_concurrently=True, **(where or {}),
+                )
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+
+    for name in reversed(COUNT_COLUMNS):
+        op.drop_column("security_test_runs", name)
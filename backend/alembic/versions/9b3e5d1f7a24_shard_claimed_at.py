@@ -0,0 +1,27 @@
+"""claim time of evaluation run shard attempts
+
+Revision ID: 9b3e5d1f7a24
+Revises: 4d8a2f6c1e35
+Create Date: 2026-10-22 09:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "9b3e5d1f7a24"
+down_revision: Union[str, None] = "4d8a2f6c1e35"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "claimed_at" not in {c["name"] for c in inspector.get_columns("evaluation_run_shards")}:
+        op.add_column(
+            "evaluation_run_shards",
+            sa.Column("claimed_at", sa.DateTime(timezone=True), nullable=True),
+        )
+
+
+def downgrade() -> None:
+    op.drop_column("evaluation_run_shards", "claimed_at")
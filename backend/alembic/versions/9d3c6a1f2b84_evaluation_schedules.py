@@ -0,0 +1,73 @@
+"""evaluation schedules and scheduler lease
+
+Revision ID: 9d3c6a1f2b84
+Revises: 5e2b8f4c7a19
+Create Date: 2026-10-19 18:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "9d3c6a1f2b84"
+down_revision: Union[str, None] = "5e2b8f4c7a19"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table("evaluation_schedules"):
+        op.create_table(
+            "evaluation_schedules",
+            sa.Column("id", sa.String(36), primary_key=True),
+            sa.Column("project_id", sa.String(36), sa.ForeignKey("projects.id"), nullable=False),
+            sa.Column("display_name", sa.String(255), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("cron_expression", sa.String(100), nullable=False),
+            sa.Column("timezone", sa.String(64), nullable=True),
+            sa.Column("test_suite_ids", sa.JSON(), nullable=True),
+            sa.Column("run_count", sa.Integer(), nullable=True),
+            sa.Column("generate_latency_report", sa.Boolean(), nullable=True),
+            sa.Column("jitter_seconds", sa.Integer(), nullable=True),
+            sa.Column(
+                "missed_run_policy",
+                sa.Enum("SKIP", "RUN_ONCE", name="missedrunpolicy"),
+                nullable=True,
+            ),
+            sa.Column("enabled", sa.Boolean(), nullable=True),
+            sa.Column("next_run_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("last_run_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("created_by", sa.String(36), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index(
+            "ix_evaluation_schedules_enabled_next_run", "evaluation_schedules",
+            ["enabled", "next_run_at"],
+        )
+        op.create_index("ix_evaluation_schedules_project", "evaluation_schedules", ["project_id"])
+
+    if not inspector.has_table("scheduler_leases"):
+        op.create_table(
+            "scheduler_leases",
+            sa.Column("name", sa.String(100), primary_key=True),
+            sa.Column("holder", sa.String(255), nullable=False),
+            sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        )
+
+    if "schedule_id" not in {c["name"] for c in inspector.get_columns("evaluation_runs")}:
+        with op.batch_alter_table("evaluation_runs") as batch:
+            batch.add_column(sa.Column("schedule_id", sa.String(36), nullable=True))
+            batch.create_foreign_key(
+                "fk_evaluation_runs_schedule_id", "evaluation_schedules",
+                ["schedule_id"], ["id"],
+            )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("evaluation_runs") as batch:
+        batch.drop_constraint("fk_evaluation_runs_schedule_id", type_="foreignkey")
+        batch.drop_column("schedule_id")
+    op.drop_table("scheduler_leases")
+    op.drop_table("evaluation_schedules")
+    sa.Enum(name="missedrunpolicy").drop(op.get_bind(), checkfirst=True)
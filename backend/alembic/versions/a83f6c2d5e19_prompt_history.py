@@ -0,0 +1,52 @@
+"""prompt history and security run app versions
+
+Revision ID: a83f6c2d5e19
+Revises: 7c1e3f5a9d20
+Create Date: 2026-10-19 22:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "a83f6c2d5e19"
+down_revision: Union[str, None] = "7c1e3f5a9d20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table("prompt_history"):
+        op.create_table(
+            "prompt_history",
+            sa.Column("id", sa.String(36), primary_key=True),
+            sa.Column("project_id", sa.String(36), sa.ForeignKey("projects.id"), nullable=False),
+            sa.Column("prompt_hash", sa.String(64), nullable=False),
+            sa.Column("app_version", sa.String(500), nullable=False),
+            sa.Column("prompt_category", sa.String(100), nullable=True),
+            sa.Column("attempts", sa.Integer(), nullable=True),
+            sa.Column("successes", sa.Integer(), nullable=True),
+            sa.Column("last_successful", sa.Boolean(), nullable=True),
+            sa.Column("last_run_id", sa.String(36), nullable=True),
+            sa.Column("last_tested_at", sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index(
+            "ux_prompt_history_project_hash_version", "prompt_history",
+            ["project_id", "prompt_hash", "app_version"], unique=True,
+        )
+
+    columns = {c["name"] for c in inspector.get_columns("security_test_runs")}
+    if "app_version" not in columns:
+        op.add_column("security_test_runs", sa.Column("app_version", sa.String(500), nullable=True))
+    if "skipped_prompts" not in columns:
+        op.add_column(
+            "security_test_runs",
+            sa.Column("skipped_prompts", sa.Integer(), nullable=True, server_default="0"),
+        )
+
+
+def downgrade() -> None:
+    op.drop_column("security_test_runs", "skipped_prompts")
+    op.drop_column("security_test_runs", "app_version")
+    op.drop_table("prompt_history")
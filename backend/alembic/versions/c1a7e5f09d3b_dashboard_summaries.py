@@ -0,0 +1,38 @@
+"""dashboard summary cache
+
+Revision ID: c1a7e5f09d3b
+Revises: 8b4e1d6a2c57
+Create Date: 2026-10-19 15:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "c1a7e5f09d3b"
+down_revision: Union[str, None] = "8b4e1d6a2c57"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # init_db may already have created the table; rows are filled on first read
+    if sa.inspect(op.get_bind()).has_table("dashboard_summaries"):
+        return
+    op.create_table(
+        "dashboard_summaries",
+        sa.Column("scope", sa.String(36), primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("computed_version", sa.Integer(), nullable=False, server_default="-1"),
+        sa.Column("total_test_cases", sa.Integer(), nullable=True),
+        sa.Column("approved_count", sa.Integer(), nullable=True),
+        sa.Column("pending_count", sa.Integer(), nullable=True),
+        sa.Column("total_runs", sa.Integer(), nullable=True),
+        sa.Column("total_passed", sa.Integer(), nullable=True),
+        sa.Column("total_failed", sa.Integer(), nullable=True),
+        sa.Column("last_run_pass_rate", sa.Float(), nullable=True),
+        sa.Column("computed_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("dashboard_summaries")
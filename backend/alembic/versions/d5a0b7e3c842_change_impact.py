@@ -0,0 +1,28 @@
+"""app snapshots and change impact of evaluation runs
+
+Revision ID: d5a0b7e3c842
+Revises: a83f6c2d5e19
+Create Date: 2026-10-19 23:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "d5a0b7e3c842"
+down_revision: Union[str, None] = "a83f6c2d5e19"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    columns = {c["name"] for c in inspector.get_columns("evaluation_runs")}
+    if "app_snapshot" not in columns:
+        op.add_column("evaluation_runs", sa.Column("app_snapshot", sa.JSON(), nullable=True))
+    if "change_impact" not in columns:
+        op.add_column("evaluation_runs", sa.Column("change_impact", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("evaluation_runs", "change_impact")
+    op.drop_column("evaluation_runs", "app_snapshot")
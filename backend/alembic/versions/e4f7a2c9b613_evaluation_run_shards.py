@@ -0,0 +1,73 @@
+"""evaluation run shards
+
+Revision ID: e4f7a2c9b613
+Revises: 9d3c6a1f2b84
+Create Date: 2026-10-19 19:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "e4f7a2c9b613"
+down_revision: Union[str, None] = "9d3c6a1f2b84"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table("evaluation_run_shards"):
+        op.create_table(
+            "evaluation_run_shards",
+            sa.Column("id", sa.String(36), primary_key=True),
+            sa.Column(
+                "evaluation_run_id", sa.String(36),
+                sa.ForeignKey("evaluation_runs.id"), nullable=False,
+            ),
+            sa.Column("shard_index", sa.Integer(), nullable=False),
+            sa.Column("run_config", sa.JSON(), nullable=False),
+            sa.Column(
+                "state",
+                # The type already exists for evaluation_runs.state
+                postgresql.ENUM(
+                    "PENDING", "RUNNING", "COMPLETED", "ERROR", "CANCELLED",
+                    name="runstate", create_type=False,
+                ),
+                nullable=True,
+            ),
+            sa.Column("attempts", sa.Integer(), nullable=True),
+            sa.Column("ces_operation_id", sa.String(500), nullable=True),
+            sa.Column("ces_run_id", sa.String(500), nullable=True),
+            sa.Column("total_count", sa.Integer(), nullable=True),
+            sa.Column("passed_count", sa.Integer(), nullable=True),
+            sa.Column("failed_count", sa.Integer(), nullable=True),
+            sa.Column("error_count", sa.Integer(), nullable=True),
+            sa.Column("last_error", sa.Text(), nullable=True),
+            sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index(
+            "ux_evaluation_run_shards_run_index", "evaluation_run_shards",
+            ["evaluation_run_id", "shard_index"], unique=True,
+        )
+
+    if "shard_count" not in {c["name"] for c in inspector.get_columns("evaluation_runs")}:
+        op.add_column("evaluation_runs", sa.Column("shard_count", sa.Integer(), nullable=True))
+
+    if "shard_id" not in {c["name"] for c in inspector.get_columns("run_results")}:
+        with op.batch_alter_table("run_results") as batch:
+            batch.add_column(sa.Column("shard_id", sa.String(36), nullable=True))
+            batch.create_foreign_key(
+                "fk_run_results_shard_id", "evaluation_run_shards",
+                ["shard_id"], ["id"],
+            )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("run_results") as batch:
+        batch.drop_constraint("fk_run_results_shard_id", type_="foreignkey")
+        batch.drop_column("shard_id")
+    op.drop_column("evaluation_runs", "shard_count")
+    op.drop_table("evaluation_run_shards")
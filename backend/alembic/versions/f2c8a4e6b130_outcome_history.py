@@ -0,0 +1,88 @@
+"""test case outcome history and stability
+
+Revision ID: f2c8a4e6b130
+Revises: d5a0b7e3c842
+Create Date: 2026-10-20 09:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "f2c8a4e6b130"
+down_revision: Union[str, None] = "d5a0b7e3c842"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+RUN_TABLES = [
+    ("evaluation_runs", "ix_evaluation_runs_state_rollup"),
+    ("security_test_runs", "ix_security_test_runs_state_rollup"),
+]
+
+
+def _rebuild_rollup_indexes(columns) -> None:
+    with op.get_context().autocommit_block():
+        for table, index in RUN_TABLES:
+            op.drop_index(index, table_name=table, if_exists=True, postgresql_concurrently=True)
+            op.create_index(index, table, columns, postgresql_concurrently=True)
+
+
+def upgrade() -> None:
+    # History starts with the runs completed after this revision; runs
+    # rolled up before it are not replayed.
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("test_case_outcomes"):
+        op.create_table(
+            "test_case_outcomes",
+            sa.Column("id", sa.String(36), primary_key=True),
+            sa.Column("test_case_id", sa.String(36), sa.ForeignKey("test_cases.id"), nullable=False),
+            sa.Column(
+                "evaluation_run_id", sa.String(36), sa.ForeignKey("evaluation_runs.id"), nullable=False
+            ),
+            sa.Column("test_suite_id", sa.String(36), sa.ForeignKey("test_suites.id"), nullable=False),
+            sa.Column("run_completed_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("passed_count", sa.Integer(), nullable=True),
+            sa.Column("failed_count", sa.Integer(), nullable=True),
+            sa.Column("error_count", sa.Integer(), nullable=True),
+            sa.Column("outcome", sa.String(20), nullable=False),
+            sa.Column("transition", sa.String(20), nullable=True),
+        )
+        op.create_index(
+            "ux_test_case_outcomes_case_run", "test_case_outcomes",
+            ["test_case_id", "evaluation_run_id"], unique=True,
+        )
+        op.create_index(
+            "ix_test_case_outcomes_case_completed", "test_case_outcomes",
+            ["test_case_id", "run_completed_at"],
+        )
+        op.create_index(
+            "ix_test_case_outcomes_run_transition", "test_case_outcomes",
+            ["evaluation_run_id", "transition"],
+        )
+
+    if not inspector.has_table("test_case_stability"):
+        op.create_table(
+            "test_case_stability",
+            sa.Column("test_case_id", sa.String(36), sa.ForeignKey("test_cases.id"), primary_key=True),
+            sa.Column("test_suite_id", sa.String(36), sa.ForeignKey("test_suites.id"), nullable=False),
+            sa.Column("run_count", sa.Integer(), nullable=True),
+            sa.Column("flip_count", sa.Integer(), nullable=True),
+            sa.Column("mixed_count", sa.Integer(), nullable=True),
+            sa.Column("flakiness", sa.Float(), nullable=True),
+            sa.Column("last_outcome", sa.String(20), nullable=True),
+            sa.Column("last_run_id", sa.String(36), nullable=True),
+            sa.Column("last_run_completed_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index(
+            "ix_test_case_stability_suite_flakiness", "test_case_stability",
+            ["test_suite_id", "flakiness"],
+        )
+
+    # roll_up_pending_runs now takes runs oldest first
+    _rebuild_rollup_indexes(["state", "rolled_up_at", "completed_at"])
+
+
+def downgrade() -> None:
+    _rebuild_rollup_indexes(["state", "rolled_up_at"])
+    op.drop_table("test_case_stability")
+    op.drop_table("test_case_outcomes")
@@ -1,97 +1,124 @@
 """Evaluation execution routes."""
 
-import asyncio
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.auth import get_current_user
-from app.core.database import get_db
-from app.models.evaluation_run import EvaluationRunRecord, RunResultRecord, RunState
-from app.models.test_case import TestCase, ApprovalStatus
+from app.core.database import AsyncSessionLocal, get_db
+from app.models.evaluation_run import (
+    EvaluationRunRecord,
+    EvaluationRunShard,
+    RunResultRecord,
+    RunState,
+)
+from app.models.test_suite import TestSuite
 from app.schemas.schemas import (
     RunEvaluationRequest,
     EvaluationRunResponse,
+    EvaluationRunShardResponse,
+    RunChangesResponse,
+    FlakyTestCaseResponse,
+    RunResultSummary,
     RunResultResponse,
     AIAnalysisRequest,
     AIAnalysisResponse,
+    TrendAnalysisRequest,
+    TrendAnalysisResponse,
+)
+from app.services.analysis_cache import (
+    combine_digests,
+    compact_run_summary,
+    delete_run_analyses,
+    get_cached_analysis,
+    get_or_build_run_summary,
+    results_digest,
+    store_analysis,
 )
-from app.services.ces_client import get_ces_client
 from app.services.gemini_service import get_gemini_service
+from app.services.outcome_history import delete_run_outcomes, flaky_test_cases, run_changes
+from app.services.rollups import remove_evaluation_run
+from app.services.run_events import evaluation_topic, run_events
+from app.services.llm_usage import llm_call_scope
+from app.services.change_impact import select_impacted
+from app.services.evaluation_runs import (
+    build_run_config,
+    capture_app_snapshot,
+    submit_adaptive_run,
+    submit_run,
+    submit_sharded_run,
+    submitted_evaluation_ids,
+    suite_app_id,
+)
+from app.utils.pagination import keyset_paginate, set_next_cursor, split_page
+from app.utils.projection import project, summary_columns
+from app.utils.sse import sse_event, sse_response
 
 router = APIRouter(prefix="/evaluations", tags=["Evaluations"])
 
 
-async def poll_operation(ces, operation_id: str, timeout: int = 600):
-    """Poll operation until completion."""
-    import time
-
-    start_time = time.time()
-
-    while time.time() - start_time < timeout:
-        operation = await ces.get_operation(operation_id)
-
-        if operation.get("done"):
-            if operation.get("error"):
-                raise Exception(f"Operation failed: {operation.get('error')}")
-            return operation.get("result", {})
-
-        await asyncio.sleep(5)
-
-    raise TimeoutError("Operation timed out")
-
-
 @router.post(
     "/run", response_model=EvaluationRunResponse, status_code=status.HTTP_201_CREATED
 )
 async def run_evaluation(
     request: RunEvaluationRequest,
     test_suite_id: UUID,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     user=Depends(get_current_user),
 ):
-    """Run evaluation(s) against a CES app."""
-    ces = get_ces_client()
-
-    result = await db.execute(
-        select(TestCase).where(
-            TestCase.test_suite_id == test_suite_id,
-            TestCase.status == ApprovalStatus.SUBMITTED,
-            TestCase.ces_evaluation_id.isnot(None),
-        )
-    )
-    test_cases = result.scalars().all()
-
-    if not test_cases:
+    """Run evaluation(s) against a CES app.
+
+    With ``shard_count`` the evaluations are split into that many CES
+    operations run concurrently; see app.services.sharding. With ``adaptive``
+    scenarios are repeated in rounds, up to ``run_count`` times, only until
+    their pass rate is settled; see app.services.adaptive_runs. With
+    ``impact_analysis`` only evaluations touched by agent or tool changes since
+    the suite's last passing run are submitted; see app.services.change_impact.
+    """
+    evaluation_ids = await submitted_evaluation_ids(db, str(test_suite_id))
+
+    if not evaluation_ids:
         raise HTTPException(
             status_code=400, detail="No submitted test cases found in this test suite"
         )
 
-    evaluation_ids = [tc.ces_evaluation_id for tc in test_cases]
-
     if request.evaluation_ids:
         evaluation_ids = request.evaluation_ids
 
-    run_config = {
-        "evaluationIds": evaluation_ids,
-        "runCount": request.run_count,
-    }
-
-    if request.app_version:
-        run_config["appVersion"] = request.app_version
+    if request.adaptive and request.shard_count:
+        raise HTTPException(
+            status_code=400, detail="Adaptive repetition cannot be combined with shard_count"
+        )
 
-    if request.generate_latency_report:
-        run_config["generateLatencyReport"] = True
+    app_id = await suite_app_id(db, str(test_suite_id))
+    snapshot = change_impact = None
+    if request.impact_analysis:
+        # Only impact-analysis runs (and scheduled runs, their usual baseline)
+        # pay for listing the app's agents and tools
+        snapshot = await capture_app_snapshot(app_id)
+        evaluation_ids, change_impact = await select_impacted(
+            db, str(test_suite_id), evaluation_ids, snapshot
+        )
+        if not evaluation_ids:
+            raise HTTPException(
+                status_code=400, detail="No agent or tool changed since the last passing run"
+            )
+
+    run_config = build_run_config(
+        evaluation_ids,
+        run_count=request.run_count,
+        app_version=request.app_version,
+        generate_latency_report=request.generate_latency_report,
+    )
 
     if request.use_dataset:
         pass
 
     eval_run = EvaluationRunRecord(
-        test_suite_id=test_suite_id,
+        test_suite_id=str(test_suite_id),
         ces_run_id=None,
         state=RunState.PENDING,
         evaluation_type="golden" if request.run_count == 1 else "scenario",
@@ -99,31 +126,25 @@ async def run_evaluation(
         passed_count=0,
         failed_count=0,
         error_count=0,
+        app_snapshot=snapshot,
+        change_impact=change_impact,
     )
     db.add(eval_run)
     await db.commit()
     await db.refresh(eval_run)
 
-    try:
-        app_id = "placeholder"
-        operation = await ces.run_evaluation(app_id, run_config)
-        operation_id = operation.get("name", "").split("/")[-1]
-
-        eval_run.ces_run_id = operation_id
-        eval_run.state = RunState.RUNNING
-        await db.commit()
-
-        background_tasks.add_task(
-            poll_and_store_results,
-            eval_run.id,
-            operation_id,
-            app_id,
-            db,
+    if request.adaptive:
+        await submit_adaptive_run(
+            db, eval_run, run_config, app_id, **request.adaptive.model_dump()
         )
+        return eval_run
+    if request.shard_count and len(evaluation_ids) > 1:
+        await submit_sharded_run(db, eval_run, run_config, app_id, request.shard_count)
+        return eval_run
 
+    try:
+        await submit_run(db, eval_run, run_config, app_id)
     except Exception as e:
-        eval_run.state = RunState.ERROR
-        await db.commit()
         raise HTTPException(
             status_code=500, detail=f"Failed to start evaluation: {str(e)}"
         )
@@ -131,82 +152,34 @@ async def run_evaluation(
     return eval_run
 
 
-async def poll_and_store_results(
-    run_id: UUID,
-    operation_id: str,
-    app_id: str,
-    db: AsyncSession,
-):
-    """Poll for operation completion and store results."""
-    ces = get_ces_client()
-
-    try:
-        result = await poll_operation(ces, operation_id)
-
-        run_details = await ces.get_evaluation_run(
-            app_id, result.get("evaluationRun", {}).get("name", "").split("/")[-1]
-        )
-
-        result_db = await db.execute(
-            select(EvaluationRunRecord).where(EvaluationRunRecord.id == run_id)
-        )
-        eval_run = result_db.scalar_one_or_none()
-
-        if eval_run:
-            eval_run.state = RunState.COMPLETED
-            eval_run.total_count = run_details.get("totalCount", 0)
-            eval_run.passed_count = run_details.get("passedCount", 0)
-            eval_run.failed_count = run_details.get("failedCount", 0)
-            eval_run.error_count = run_details.get("errorCount", 0)
-
-            if eval_run.total_count > 0:
-                eval_run.pass_rate = (
-                    eval_run.passed_count / eval_run.total_count
-                ) * 100
-
-            if "latencyReport" in run_details:
-                eval_run.latency_report = run_details["latencyReport"]
-
-            results = await ces.get_evaluation_run_results(app_id, eval_run.ces_run_id)
-
-            for res in results.get("results", []):
-                run_result = RunResultRecord(
-                    evaluation_run_id=run_id,
-                    ces_result_id=res.get("name"),
-                    passed=res.get("passed"),
-                    score=res.get("score"),
-                    failure_reason=res.get("failureReason"),
-                    diagnostics=res.get("diagnosticInfo"),
-                    conversation_log=res.get("sessionOutput"),
-                )
-                db.add(run_result)
-
-            await db.commit()
-
-    except Exception as e:
-        result_db = await db.execute(
-            select(EvaluationRunRecord).where(EvaluationRunRecord.id == run_id)
-        )
-        eval_run = result_db.scalar_one_or_none()
-        if eval_run:
-            eval_run.state = RunState.ERROR
-            await db.commit()
-
-
 @router.get("/runs", response_model=List[EvaluationRunResponse])
 async def list_evaluation_runs(
+    response: Response,
     test_suite_id: Optional[UUID] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
     db: AsyncSession = Depends(get_db),
     user=Depends(get_current_user),
 ):
-    """List evaluation runs."""
+    """List evaluation runs, newest first.
+
+    When more runs follow, the X-Next-Cursor header holds the ``cursor`` for
+    the next page.
+    """
     query = select(EvaluationRunRecord)
 
     if test_suite_id:
-        query = query.where(EvaluationRunRecord.test_suite_id == test_suite_id)
+        query = query.where(EvaluationRunRecord.test_suite_id == str(test_suite_id))
 
-    result = await db.execute(query.order_by(EvaluationRunRecord.created_at.desc()))
-    return result.scalars().all()
+    result = await db.execute(
+        keyset_paginate(
+            query, EvaluationRunRecord.created_at, EvaluationRunRecord.id,
+            cursor, limit, descending=True,
+        )
+    )
+    runs, next_cursor = split_page(result.scalars().all(), limit)
+    set_next_cursor(response, next_cursor)
+    return runs
 
 
 @router.get("/runs/{run_id}", response_model=EvaluationRunResponse)
@@ -217,7 +190,7 @@ async def get_evaluation_run(
 ):
     """Get a specific evaluation run."""
     result = await db.execute(
-        select(EvaluationRunRecord).where(EvaluationRunRecord.id == run_id)
+        select(EvaluationRunRecord).where(EvaluationRunRecord.id == str(run_id))
     )
     run = result.scalar_one_or_none()
 
@@ -227,19 +200,157 @@ async def get_evaluation_run(
     return run
 
 
-@router.get("/runs/{run_id}/results", response_model=List[RunResultResponse])
+@router.get("/runs/{run_id}/events")
+async def stream_evaluation_run_events(
+    run_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Live progress of an evaluation run as server-sent events.
+
+    Starts with a ``snapshot`` of the run, then pushes ``progress`` counters,
+    each page of newly stored ``results`` and ``state`` changes; the stream
+    ends with the run's final state.
+    """
+    topic = evaluation_topic(str(run_id))
+    queue = run_events.subscribe(topic)
+    run = await db.get(EvaluationRunRecord, str(run_id))
+    if not run:
+        run_events.unsubscribe(topic, queue)
+        raise HTTPException(status_code=404, detail="Evaluation run not found")
+    snapshot = EvaluationRunResponse.model_validate(run).model_dump()
+
+    async def reload():
+        # The request's session is closed once streaming starts
+        async with AsyncSessionLocal() as session:
+            current = await session.get(EvaluationRunRecord, str(run_id))
+            return EvaluationRunResponse.model_validate(current).model_dump() if current else None
+
+    return sse_response(run_events.stream(topic, queue, snapshot, reload))
+
+
+@router.get("/runs/{run_id}/shards", response_model=List[EvaluationRunShardResponse])
+async def list_run_shards(
+    run_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Shards of a sharded evaluation run; empty for unsharded runs."""
+    if not await db.get(EvaluationRunRecord, str(run_id)):
+        raise HTTPException(status_code=404, detail="Evaluation run not found")
+    result = await db.scalars(
+        select(EvaluationRunShard)
+        .where(EvaluationRunShard.evaluation_run_id == str(run_id))
+        .order_by(EvaluationRunShard.shard_index)
+    )
+    return result.all()
+
+
+@router.get("/runs/{run_id}/changes", response_model=RunChangesResponse)
+async def get_run_changes(
+    run_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Test cases that newly failed, got fixed or were flaky in a run, compared with their previous run.
+
+    ``counts`` has the number of test cases per transition, including
+    ``still_failing``, ``still_passing`` and ``error``.
+    """
+    run = await db.get(EvaluationRunRecord, str(run_id))
+    if not run:
+        raise HTTPException(status_code=404, detail="Evaluation run not found")
+    if run.state != RunState.COMPLETED:
+        raise HTTPException(status_code=409, detail="Evaluation run has not completed")
+    if run.rolled_up_at is None:
+        # Not yet in the outcome history; the background catch-up adds it
+        raise HTTPException(status_code=409, detail="Evaluation run changes are not available yet")
+    return await run_changes(db, run.id)
+
+
+@router.get("/flaky", response_model=List[FlakyTestCaseResponse])
+async def list_flaky_test_cases(
+    test_suite_id: UUID,
+    min_flakiness: float = Query(0.1, ge=0, le=1),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """A suite's flakiest test cases, by their recency-weighted rate of flipping outcomes."""
+    return await flaky_test_cases(db, str(test_suite_id), min_flakiness, limit)
+
+
+RUN_RESULT_FIELDS = {
+    "diagnostics": RunResultRecord.diagnostics,
+    "conversation_log": RunResultRecord.conversation_log,
+}
+
+
+@router.get(
+    "/runs/{run_id}/results",
+    response_model=List[RunResultResponse],
+    response_model_exclude_unset=True,
+)
 async def get_run_results(
     run_id: UUID,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated extra fields: diagnostics, conversation_log"
+    ),
     db: AsyncSession = Depends(get_db),
     user=Depends(get_current_user),
 ):
-    """Get results for an evaluation run."""
+    """Get results for an evaluation run.
+
+    Rows carry the summary fields only unless ``fields`` asks for the
+    diagnostics or conversation log; /results/{result_id} returns both.
+    The first page's X-Total-Count is the run's stored ``result_count``,
+    which exceeds its ``total_count`` when evaluations were repeated (one
+    row per repetition); later pages omit it. X-Next-Cursor, when present,
+    is the ``cursor`` for the next page.
+    """
+    run = await db.get(EvaluationRunRecord, str(run_id))
+    if not run:
+        raise HTTPException(status_code=404, detail="Evaluation run not found")
+
+    columns = project(
+        summary_columns(RunResultRecord, RunResultSummary), RUN_RESULT_FIELDS, fields
+    )
     result = await db.execute(
-        select(RunResultRecord)
-        .where(RunResultRecord.evaluation_run_id == run_id)
-        .order_by(RunResultRecord.created_at)
+        keyset_paginate(
+            select(*columns).where(RunResultRecord.evaluation_run_id == run.id),
+            RunResultRecord.created_at,
+            RunResultRecord.id,
+            cursor,
+            limit,
+        )
     )
-    return result.scalars().all()
+    rows, next_cursor = split_page(result.all(), limit)
+    if cursor is None:
+        response.headers["X-Total-Count"] = str(run.result_count or 0)
+    set_next_cursor(response, next_cursor)
+    return [RunResultResponse.model_validate(row) for row in rows]
+
+
+@router.get("/runs/{run_id}/results/{result_id}", response_model=RunResultResponse)
+async def get_run_result(
+    run_id: UUID,
+    result_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Get one run result with its diagnostics and conversation log."""
+    result = await db.scalar(
+        select(RunResultRecord).where(
+            RunResultRecord.id == str(result_id),
+            RunResultRecord.evaluation_run_id == str(run_id),
+        )
+    )
+    if not result:
+        raise HTTPException(status_code=404, detail="Run result not found")
+    return result
 
 
 @router.post("/runs/{run_id}/analyze", response_model=AIAnalysisResponse)
@@ -251,31 +362,35 @@ async def analyze_run_results(
 ):
     """Analyze evaluation run results using Gemini."""
     run_result = await db.execute(
-        select(EvaluationRunRecord).where(EvaluationRunRecord.id == run_id)
+        select(EvaluationRunRecord).where(EvaluationRunRecord.id == str(run_id))
     )
     run = run_result.scalar_one_or_none()
 
     if not run:
         raise HTTPException(status_code=404, detail="Evaluation run not found")
 
-    results_result = await db.execute(
-        select(RunResultRecord).where(RunResultRecord.evaluation_run_id == run_id)
-    )
-    results = results_result.scalars().all()
-
-    results_data = [
-        {
-            "passed": r.passed,
-            "score": r.score,
-            "failure_reason": r.failure_reason,
-            "diagnostics": r.diagnostics,
-        }
-        for r in results
-    ]
-
     gemini = get_gemini_service()
-    analysis = await gemini.analyze_results(results_data, request.question)
+    subject = f"run:{run.id}"
+    digest = await results_digest(db, run.id)
+
+    if not request.refresh:
+        cached = await get_cached_analysis(
+            db, subject, digest, request.question, gemini.model_name
+        )
+        if cached:
+            return AIAnalysisResponse(analysis=cached.analysis, run_id=run_id, cached=True)
 
+    summary = await get_or_build_run_summary(db, run.id, digest)
+
+    project_id = await db.scalar(
+        select(TestSuite.project_id).where(TestSuite.id == run.test_suite_id)
+    )
+    with llm_call_scope(project_id, "evaluations.analyze"):
+        analysis = await gemini.analyze_failure_clusters(
+            summary["overview"], summary["clusters"], request.question
+        )
+
+    await store_analysis(db, subject, digest, request.question, gemini.model_name, analysis)
     run.ai_analysis = analysis
     await db.commit()
 
@@ -285,6 +400,147 @@ async def analyze_run_results(
     )
 
 
+@router.post("/runs/{run_id}/analyze/stream")
+async def analyze_run_results_stream(
+    run_id: UUID,
+    request: AIAnalysisRequest,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Server-sent-event variant of /analyze.
+
+    Emits ``stage`` events while the run is summarized and the clusters are
+    analysed, ``token`` events for the final analysis text, then a ``result``
+    event with the same AIAnalysisResponse as /analyze.
+    """
+    run = await db.scalar(
+        select(EvaluationRunRecord).where(EvaluationRunRecord.id == str(run_id))
+    )
+    if not run:
+        raise HTTPException(status_code=404, detail="Evaluation run not found")
+    project_id = await db.scalar(
+        select(TestSuite.project_id).where(TestSuite.id == run.test_suite_id)
+    )
+
+    async def events():
+        gemini = get_gemini_service()
+        subject = f"run:{run_id}"
+        try:
+            # The request-scoped session is not usable once the response is
+            # streaming; each session below is closed before Gemini is called
+            async with AsyncSessionLocal() as session:
+                yield sse_event("stage", {"stage": "checking_cache"})
+                digest = await results_digest(session, str(run_id))
+                if not request.refresh:
+                    cached = await get_cached_analysis(
+                        session, subject, digest, request.question, gemini.model_name
+                    )
+                    if cached:
+                        yield sse_event("result", AIAnalysisResponse(
+                            analysis=cached.analysis, run_id=run_id, cached=True
+                        ))
+                        return
+
+                yield sse_event("stage", {"stage": "summarizing"})
+                summary = await get_or_build_run_summary(session, str(run_id), digest)
+                await session.commit()
+
+            yield sse_event("stage", {"stage": "analyzing"})
+            analysis = ""
+            with llm_call_scope(project_id, "evaluations.analyze"):
+                async for kind, value in gemini.analyze_failure_clusters_stream(
+                    summary["overview"], summary["clusters"], request.question
+                ):
+                    if kind == "token":
+                        yield sse_event("token", {"text": value})
+                    elif kind == "stage":
+                        yield sse_event("stage", {"stage": value})
+                    else:
+                        analysis = value
+
+            yield sse_event("stage", {"stage": "saving"})
+            async with AsyncSessionLocal() as session:
+                await store_analysis(
+                    session, subject, digest, request.question, gemini.model_name, analysis
+                )
+                run = await session.get(EvaluationRunRecord, str(run_id))
+                if run:
+                    run.ai_analysis = analysis
+                await session.commit()
+            yield sse_event("result", AIAnalysisResponse(analysis=analysis, run_id=run_id))
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+
+    return sse_response(events())
+
+
+@router.post("/trends/analyze", response_model=TrendAnalysisResponse)
+async def analyze_run_trends(
+    request: TrendAnalysisRequest,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Analyze trends across the latest completed runs of a test suite.
+
+    Each run contributes its stored clustered summary, built once per run, so
+    raw results are never re-sent for runs that were already summarized.
+    """
+    suite_id = str(request.test_suite_id)
+    result = await db.execute(
+        select(EvaluationRunRecord)
+        .where(
+            EvaluationRunRecord.test_suite_id == suite_id,
+            EvaluationRunRecord.state == RunState.COMPLETED,
+        )
+        .order_by(EvaluationRunRecord.created_at.desc())
+        .limit(request.run_limit)
+    )
+    runs = list(reversed(result.scalars().all()))
+
+    if len(runs) < 2:
+        raise HTTPException(
+            status_code=400, detail="At least two completed runs are needed for trend analysis"
+        )
+
+    run_digests = [await results_digest(db, run.id) for run in runs]
+    gemini = get_gemini_service()
+    subject = f"suite:{suite_id}"
+    digest = combine_digests(run_digests)
+    run_ids = [run.id for run in runs]
+
+    if not request.refresh:
+        cached = await get_cached_analysis(
+            db, subject, digest, request.question, gemini.model_name
+        )
+        if cached:
+            return TrendAnalysisResponse(
+                analysis=cached.analysis,
+                test_suite_id=request.test_suite_id,
+                run_ids=run_ids,
+                cached=True,
+            )
+
+    run_summaries = [
+        compact_run_summary(run, await get_or_build_run_summary(db, run.id, run_digest))
+        for run, run_digest in zip(runs, run_digests)
+    ]
+
+    project_id = await db.scalar(
+        select(TestSuite.project_id).where(TestSuite.id == suite_id)
+    )
+    with llm_call_scope(project_id, "evaluations.trends"):
+        analysis = await gemini.analyze_trends(run_summaries, request.question)
+
+    await store_analysis(db, subject, digest, request.question, gemini.model_name, analysis)
+    await db.commit()
+
+    return TrendAnalysisResponse(
+        analysis=analysis,
+        test_suite_id=request.test_suite_id,
+        run_ids=run_ids,
+    )
+
+
 @router.delete("/runs/{run_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_evaluation_run(
     run_id: UUID,
@@ -293,7 +549,7 @@ async def delete_evaluation_run(
 ):
     """Delete an evaluation run and its results."""
     result = await db.execute(
-        select(EvaluationRunRecord).where(EvaluationRunRecord.id == run_id)
+        select(EvaluationRunRecord).where(EvaluationRunRecord.id == str(run_id))
     )
     run = result.scalar_one_or_none()
 
@@ -301,8 +557,11 @@ async def delete_evaluation_run(
         raise HTTPException(status_code=404, detail="Evaluation run not found")
 
     await db.execute(
-        select(RunResultRecord).where(RunResultRecord.evaluation_run_id == run_id)
+        select(RunResultRecord).where(RunResultRecord.evaluation_run_id == str(run_id))
     )
 
+    await delete_run_analyses(db, run.id)
+    await delete_run_outcomes(db, run.id)
+    await remove_evaluation_run(db, run)
     await db.delete(run)
     await db.commit()
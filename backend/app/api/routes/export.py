@@ -1,8 +1,9 @@
-"""CSV/JSON export endpoints for evaluation results."""
+"""CSV, NDJSON and Parquet export endpoints for evaluation and security runs."""
 
-import csv
-import io
-from fastapi import APIRouter, Depends
+from typing import List
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -10,51 +11,110 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.auth import get_current_user
 from app.core.database import get_db
 from app.models.evaluation_run import EvaluationRunRecord, RunResultRecord as RunResult
+from app.models.security_testing import SecurityTestResult, SecurityTestRun
+from app.services.export_writers import (
+    MEDIA_TYPES,
+    ExportColumn,
+    ExportFormat,
+    export_stream,
+)
 
 router = APIRouter(prefix="/export", tags=["Export"])
 
+EVALUATION_COLUMNS = [
+    ExportColumn("test_case_name", "Test Case", RunResult.test_case_name),
+    ExportColumn("passed", "Passed", RunResult.passed, "bool"),
+    ExportColumn("score", "Score", RunResult.score, "float"),
+    ExportColumn("failure_reason", "Failure Reason", RunResult.failure_reason),
+    ExportColumn("ces_result_id", "CES Result ID", RunResult.ces_result_id),
+    ExportColumn("created_at", "Created At", RunResult.created_at, "timestamp"),
+]
+EVALUATION_CONVERSATION = ExportColumn(
+    "conversation_log", "Conversation Log", RunResult.conversation_log, "json"
+)
+
+SECURITY_COLUMNS = [
+    ExportColumn("prompt_text", "Prompt", SecurityTestResult.prompt_text),
+    ExportColumn("prompt_category", "Category", SecurityTestResult.prompt_category),
+    ExportColumn("is_attack_successful", "Attack Successful", SecurityTestResult.is_attack_successful, "bool"),
+    ExportColumn("detection_method", "Detection Method", SecurityTestResult.detection_method),
+    ExportColumn("confidence_score", "Confidence", SecurityTestResult.confidence_score, "float"),
+    ExportColumn("latency_ms", "Latency (ms)", SecurityTestResult.latency_ms, "float"),
+    ExportColumn("created_at", "Created At", SecurityTestResult.created_at, "timestamp"),
+]
+SECURITY_CONVERSATION = ExportColumn(
+    "agent_response", "Agent Response", SecurityTestResult.agent_response
+)
+
+FORMAT = Query(ExportFormat.CSV, description="csv, ndjson or parquet")
+INCLUDE_CONVERSATIONS = Query(
+    False, description="Add the conversation log (evaluations) or agent response (security)"
+)
+
+
+def export_response(
+    columns: List[ExportColumn], parent_column, sort_columns, parent_id: str,
+    export_format: ExportFormat, filename: str,
+) -> StreamingResponse:
+    query = (
+        select(*[c.column for c in columns])
+        .where(parent_column == parent_id)
+        .order_by(*sort_columns)
+    )
+    return StreamingResponse(
+        export_stream(query, columns, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}.{export_format.value}"
+        },
+    )
+
+
+@router.get("/runs/{run_id}")
+async def export_evaluation_run(
+    run_id: UUID,
+    format: ExportFormat = FORMAT,
+    include_conversations: bool = INCLUDE_CONVERSATIONS,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Stream evaluation run results as CSV, NDJSON or Parquet."""
+    if not await db.get(EvaluationRunRecord, str(run_id)):
+        raise HTTPException(status_code=404, detail="Evaluation run not found")
+
+    columns = EVALUATION_COLUMNS + ([EVALUATION_CONVERSATION] if include_conversations else [])
+    return export_response(
+        columns, RunResult.evaluation_run_id, [RunResult.created_at, RunResult.id],
+        str(run_id), format, f"evaluation_run_{run_id}",
+    )
+
 
 @router.get("/runs/{run_id}/csv")
 async def export_run_csv(
-    run_id: str,
+    run_id: UUID,
+    include_conversations: bool = INCLUDE_CONVERSATIONS,
     db: AsyncSession = Depends(get_db),
     user=Depends(get_current_user),
 ):
     """Export evaluation run results as CSV."""
-    # Fetch run
-    run_result = await db.execute(
-        select(EvaluationRunRecord).where(EvaluationRunRecord.id == run_id)
-    )
-    run = run_result.scalar_one_or_none()
-    if not run:
-        return {"error": "Run not found"}
+    return await export_evaluation_run(run_id, ExportFormat.CSV, include_conversations, db, user)
 
-    # Fetch results
-    results_q = await db.execute(
-        select(RunResult).where(RunResult.evaluation_run_id == run_id)
-    )
-    results = results_q.scalars().all()
-
-    # Build CSV
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow([
-        "Test Case", "Passed", "Score", "Failure Reason", "CES Result ID"
-    ])
-    for r in results:
-        writer.writerow([
-            r.test_case_name or "N/A",
-            "Yes" if r.passed else "No",
-            r.score or "",
-            r.failure_reason or "",
-            r.ces_result_id or "",
-        ])
-
-    output.seek(0)
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={
-            "Content-Disposition": f"attachment; filename=evaluation_run_{run_id}.csv"
-        },
+
+@router.get("/security-runs/{run_id}")
+async def export_security_run(
+    run_id: UUID,
+    format: ExportFormat = FORMAT,
+    include_conversations: bool = INCLUDE_CONVERSATIONS,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Stream security test results as CSV, NDJSON or Parquet."""
+    if not await db.get(SecurityTestRun, str(run_id)):
+        raise HTTPException(status_code=404, detail="Security test run not found")
+
+    columns = SECURITY_COLUMNS + ([SECURITY_CONVERSATION] if include_conversations else [])
+    return export_response(
+        columns, SecurityTestResult.security_test_run_id,
+        [SecurityTestResult.created_at, SecurityTestResult.id],
+        str(run_id), format, f"security_run_{run_id}",
     )
@@ -0,0 +1,86 @@
+"""LLM token and latency accounting routes."""
+
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.auth import get_current_user
+from app.core.config import settings
+from app.core.database import get_db
+from app.models.llm_call import LLMCallRecord
+from app.schemas.schemas import LLMUsageBucket, LLMUsageSummary, LLMBudgetStatus
+
+router = APIRouter(prefix="/llm-usage", tags=["LLM Usage"])
+
+_GROUP_COLUMNS = {
+    "project": LLMCallRecord.project_id,
+    "endpoint": LLMCallRecord.endpoint,
+    "operation": LLMCallRecord.operation,
+    "model": LLMCallRecord.model,
+}
+
+
+@router.get("/summary", response_model=LLMUsageSummary)
+async def get_llm_usage_summary(
+    group_by: str = Query("endpoint", pattern="^(project|endpoint|operation|model)$"),
+    project_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Aggregate token usage and latency, most expensive first."""
+    since = since or datetime.now(timezone.utc) - timedelta(days=7)
+    key = _GROUP_COLUMNS[group_by]
+    total_tokens = func.coalesce(func.sum(LLMCallRecord.total_tokens), 0)
+
+    query = (
+        select(
+            key.label("key"),
+            func.count(LLMCallRecord.id).label("calls"),
+            func.coalesce(func.sum(case((LLMCallRecord.success == False, 1), else_=0)), 0).label("failed_calls"),  # noqa: E712
+            func.coalesce(func.sum(LLMCallRecord.prompt_tokens), 0).label("prompt_tokens"),
+            func.coalesce(func.sum(LLMCallRecord.response_tokens), 0).label("response_tokens"),
+            func.coalesce(func.sum(LLMCallRecord.cached_tokens), 0).label("cached_tokens"),
+            total_tokens.label("total_tokens"),
+            func.avg(LLMCallRecord.latency_ms).label("avg_latency_ms"),
+            func.max(LLMCallRecord.latency_ms).label("max_latency_ms"),
+        )
+        .where(LLMCallRecord.created_at >= since)
+        .group_by(key)
+        .order_by(total_tokens.desc())
+    )
+    if project_id:
+        query = query.where(LLMCallRecord.project_id == project_id)
+
+    rows = (await db.execute(query)).mappings().all()
+    return LLMUsageSummary(
+        group_by=group_by,
+        since=since,
+        buckets=[LLMUsageBucket(**row) for row in rows],
+    )
+
+
+@router.get("/projects/{project_id}/budget", response_model=LLMBudgetStatus)
+async def get_llm_budget_status(
+    project_id: str,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Tokens used by a project in the rolling 24h budget window."""
+    since = datetime.now(timezone.utc) - timedelta(days=1)
+    used = await db.scalar(
+        select(func.coalesce(func.sum(LLMCallRecord.total_tokens), 0)).where(
+            LLMCallRecord.project_id == project_id,
+            LLMCallRecord.created_at >= since,
+        )
+    ) or 0
+    budget = settings.LLM_PROJECT_DAILY_TOKEN_BUDGET or None
+    return LLMBudgetStatus(
+        project_id=project_id,
+        budget=budget,
+        used_last_24h=used,
+        remaining=max(budget - used, 0) if budget else None,
+    )
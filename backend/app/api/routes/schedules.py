@@ -0,0 +1,155 @@
+"""Evaluation schedule routes; the schedules are run by app.services.scheduler."""
+
+import uuid
+from datetime import datetime, timezone
+from typing import List, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.auth import get_current_user
+from app.core.database import get_db
+from app.models.evaluation_run import EvaluationRunRecord, RunState
+from app.models.project import Project
+from app.models.schedule import EvaluationSchedule
+from app.models.test_suite import TestSuite
+from app.models.webhook import WebhookEvent
+from app.schemas.schemas import (
+    EvaluationScheduleCreate,
+    EvaluationScheduleResponse,
+    EvaluationScheduleUpdate,
+)
+from app.services.dashboard_cache import invalidate_runs
+from app.services.run_events import evaluation_topic, run_events
+from app.services.scheduler import next_fire_time
+from app.services.webhooks import notify_evaluation_run
+
+router = APIRouter(prefix="/evaluations/scheduled", tags=["Schedules"])
+
+# Changing any of these moves the next run
+TIMING_FIELDS = {"cron_expression", "timezone", "jitter_seconds", "enabled"}
+
+
+async def get_schedule_or_404(db: AsyncSession, schedule_id: UUID) -> EvaluationSchedule:
+    schedule = await db.get(EvaluationSchedule, str(schedule_id))
+    if not schedule:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    return schedule
+
+
+async def check_suites(db: AsyncSession, project_id: str, suite_ids: List[str]) -> None:
+    if not suite_ids:
+        return
+    found = await db.scalar(
+        select(func.count()).select_from(TestSuite).where(
+            TestSuite.project_id == project_id, TestSuite.id.in_(suite_ids)
+        )
+    )
+    if found != len(set(suite_ids)):
+        raise HTTPException(status_code=400, detail="Test suites must belong to the project")
+
+
+@router.get("", response_model=List[EvaluationScheduleResponse])
+async def list_schedules(
+    project_id: Optional[UUID] = None,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    query = select(EvaluationSchedule).order_by(EvaluationSchedule.created_at)
+    if project_id:
+        query = query.where(EvaluationSchedule.project_id == str(project_id))
+    return (await db.scalars(query)).all()
+
+
+@router.post("", response_model=EvaluationScheduleResponse, status_code=status.HTTP_201_CREATED)
+async def create_schedule(
+    project_id: UUID,
+    data: EvaluationScheduleCreate,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Create a schedule; invalid cron expressions or time zones are rejected with 400."""
+    if not await db.get(Project, str(project_id)):
+        raise HTTPException(status_code=404, detail="Project not found")
+    suite_ids = [str(suite_id) for suite_id in data.test_suite_ids]
+    await check_suites(db, str(project_id), suite_ids)
+
+    schedule = EvaluationSchedule(
+        **data.model_dump(exclude={"test_suite_ids"}),
+        # Assigned up front: the jitter offset is derived from the id
+        id=str(uuid.uuid4()),
+        project_id=str(project_id),
+        test_suite_ids=suite_ids,
+        created_by=user.get("sub"),
+    )
+    schedule.next_run_at = next_fire_time(schedule, datetime.now(timezone.utc))
+    db.add(schedule)
+    await db.commit()
+    return schedule
+
+
+@router.get("/{schedule_id}", response_model=EvaluationScheduleResponse)
+async def get_schedule(
+    schedule_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    return await get_schedule_or_404(db, schedule_id)
+
+
+@router.patch("/{schedule_id}", response_model=EvaluationScheduleResponse)
+async def update_schedule(
+    schedule_id: UUID,
+    data: EvaluationScheduleUpdate,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Update a schedule; timing changes and re-enabling start counting from now."""
+    schedule = await get_schedule_or_404(db, schedule_id)
+    changes = data.model_dump(exclude_unset=True)
+    if "test_suite_ids" in changes:
+        changes["test_suite_ids"] = [str(suite_id) for suite_id in changes["test_suite_ids"] or []]
+        await check_suites(db, schedule.project_id, changes["test_suite_ids"])
+    for field, value in changes.items():
+        setattr(schedule, field, value)
+    if TIMING_FIELDS & changes.keys():
+        schedule.next_run_at = next_fire_time(schedule, datetime.now(timezone.utc))
+    await db.commit()
+    return schedule
+
+
+@router.delete("/{schedule_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_schedule(
+    schedule_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Delete a schedule; its runs still waiting for a slot are cancelled."""
+    schedule = await get_schedule_or_404(db, schedule_id)
+    cancelled_ids = (await db.scalars(
+        update(EvaluationRunRecord)
+        .where(
+            EvaluationRunRecord.schedule_id == schedule.id,
+            EvaluationRunRecord.state == RunState.PENDING,
+            EvaluationRunRecord.ces_operation_id.is_(None),
+        )
+        .values(state=RunState.CANCELLED, completed_at=datetime.now(timezone.utc))
+        .returning(EvaluationRunRecord.id)
+    )).all()
+    if cancelled_ids:
+        await invalidate_runs(db, cancelled_ids)
+        for run in await db.scalars(
+            select(EvaluationRunRecord).where(EvaluationRunRecord.id.in_(cancelled_ids))
+        ):
+            await notify_evaluation_run(db, run, WebhookEvent.RUN_COMPLETED)
+    await db.execute(
+        update(EvaluationRunRecord)
+        .where(EvaluationRunRecord.schedule_id == schedule.id)
+        .values(schedule_id=None)
+    )
+    await db.delete(schedule)
+    await db.commit()
+    for run_id in cancelled_ids:
+        run_events.publish_state(evaluation_topic(run_id), RunState.CANCELLED.value)
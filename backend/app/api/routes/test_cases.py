@@ -1,15 +1,18 @@
 """Test case management routes."""
 
-from typing import List, Optional
+import asyncio
+from typing import List, Optional, Tuple
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+from fastapi import (
+    APIRouter, BackgroundTasks, Depends, HTTPException, Query, UploadFile, File, status
+)
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.core.auth import get_current_user
-from app.core.database import get_db
+from app.core.database import get_db, AsyncSessionLocal
 from app.models.test_case import (
     TestCase,
     TestCaseVersion,
@@ -17,40 +20,100 @@ from app.models.test_case import (
     ApprovalStatus,
     ApprovalAction,
 )
-from app.models.project import Project
+from app.models.test_suite import TestSuite
+from app.models.ingestion import (
+    IngestionJob,
+    IngestionDocument,
+    DocumentState,
+)
 from app.schemas.schemas import (
     TestCaseGenerateRequest,
-    TestCaseFromDocxRequest,
+    TestCaseSummary,
     TestCaseResponse,
     TestCaseVersionResponse,
+    TestCaseOutcomeResponse,
     ApprovalRequest,
     ApprovalResponse,
-    TestCaseType,
+    IngestionJobResponse,
 )
 from app.services.gemini_service import get_gemini_service
 from app.services.ces_client import get_ces_client
-from app.services.docx_parser import parse_docx
+from app.services.docx_parser import parse_docx_async
+from app.services.bulk_ingestion import IngestionError, expand_uploads, run_ingestion_job
+from app.services.llm_usage import LLMCall, llm_call_scope
+# Aliased so pytest does not collect it from this test_*-named module
+from app.services.outcome_history import (
+    delete_test_case_history,
+    test_case_history as case_history,
+)
+from app.services.test_case_generation import (
+    fetch_agent_context,
+    get_suite_project_id,
+    save_generated_test_case,
+)
+from app.utils.projection import parse_fields, project, summary_columns
+from app.utils.sse import sse_event, sse_response
 
 router = APIRouter(prefix="/test-cases", tags=["Test Cases"])
 
 
-@router.get("", response_model=List[TestCaseResponse])
+TEST_CASE_FIELDS = {
+    "original_input": TestCase.original_input,
+    "generated_json": TestCaseVersion.generated_json,
+}
+
+
+def case_query(fields: Optional[str]):
+    """Select summary columns plus the requested large ones.
+
+    ``generated_json`` comes from the current version only, joined on
+    (test_case_id, version_number); older versions are never read.
+    """
+    query = select(
+        *project(summary_columns(TestCase, TestCaseSummary), TEST_CASE_FIELDS, fields)
+    )
+    if "generated_json" in parse_fields(fields, TEST_CASE_FIELDS):
+        query = query.outerjoin(
+            TestCaseVersion,
+            (TestCaseVersion.test_case_id == TestCase.id)
+            & (TestCaseVersion.version_number == TestCase.current_version),
+        )
+    return query
+
+
+@router.get(
+    "",
+    response_model=List[TestCaseResponse],
+    response_model_exclude_unset=True,
+)
 async def list_test_cases(
     test_suite_id: Optional[UUID] = None,
     status_filter: Optional[ApprovalStatus] = None,
+    fields: Optional[str] = Query(
+        None, description="Comma-separated extra fields: original_input, generated_json"
+    ),
     db: AsyncSession = Depends(get_db),
     user=Depends(get_current_user),
 ):
-    """List all test cases, optionally filtered by test suite or status."""
-    query = select(TestCase).options(selectinload(TestCase.versions))
+    """List test cases, optionally filtered by test suite or status.
+
+    Rows carry the summary fields only unless ``fields`` asks for more.
+    """
+    query = case_query(fields)
 
     if test_suite_id:
-        query = query.where(TestCase.test_suite_id == test_suite_id)
+        query = query.where(TestCase.test_suite_id == str(test_suite_id))
     if status_filter:
         query = query.where(TestCase.status == status_filter)
 
     result = await db.execute(query.order_by(TestCase.created_at.desc()))
-    return result.scalars().all()
+    return [TestCaseResponse.model_validate(row) for row in result.all()]
+
+
+@router.get("/generation/metrics")
+async def get_generation_metrics(user=Depends(get_current_user)):
+    """JSON parse outcomes for Gemini generations since process start."""
+    return get_gemini_service().get_parse_metrics()
 
 
 @router.post(
@@ -63,71 +126,116 @@ async def generate_test_case(
     user=Depends(get_current_user),
 ):
     """Generate a test case from natural language input using Gemini."""
-    # Get test suite and project
-    result = await db.execute(select(Project).where(Project.id == test_suite_id))
-    # For now, use test_suite_id directly as project id lookup
-    # In production, would need TestSuite model
+    project_id = await get_suite_project_id(db, test_suite_id)
 
     gemini = get_gemini_service()
     ces = get_ces_client()
 
-    # Determine test type
-    test_type = (
-        request.type_hint.value
-        if request.type_hint
-        else await gemini.classify_test_type(request.description)
-    )
+    with llm_call_scope(project_id, "test_cases.generate") as llm_scope:
+        # Determine test type
+        test_type = (
+            request.type_hint.value
+            if request.type_hint
+            else await gemini.classify_test_type(request.description)
+        )
 
-    # Get agent context if provided
-    agent_context = None
-    if request.agent_id:
-        # Fetch agent details from CES
-        try:
-            # Assume agent_id is in format "projects/.../locations/.../apps/.../agents/..."
-            agent_data = await ces.get_agent(
-                request.agent_id.split("/apps/")[-1].split("/agents/")[0],
-                request.agent_id.split("/agents/")[-1],
-            )
-            tools_data = await ces.list_tools(
-                request.agent_id.split("/apps/")[-1].split("/agents/")[0]
-            )
-            agent_context = {"agent": agent_data, "tools": tools_data.get("tools", [])}
-        except Exception:
-            pass  # Continue without context
-
-    # Generate test case
-    generated = await gemini.generate_test_case(
-        user_input=request.description,
-        agent_context=agent_context,
-        test_type=test_type,
-    )
+        # Get agent context if provided
+        agent_context = None
+        if request.agent_id:
+            agent_context = await fetch_agent_context(ces, request.agent_id)
 
-    # Create test case in database
-    test_case = TestCase(
-        test_suite_id=test_suite_id,
-        name=generated.get("displayName", f"Test {test_type.title()}"),
-        description=generated.get("description", request.description[:200]),
-        type=TestCaseType.GOLDEN if test_type == "golden" else TestCaseType.SCENARIO,
-        status=ApprovalStatus.DRAFT,
-        source_type="text",
-        original_input=request.description,
-    )
-    db.add(test_case)
-    await db.flush()
+        # Generate test case
+        generated = await gemini.generate_test_case(
+            user_input=request.description,
+            agent_context=agent_context,
+            test_type=test_type,
+        )
+        llm_call = llm_scope.last_call
 
-    # Create first version
-    version = TestCaseVersion(
-        test_case_id=test_case.id,
-        version_number=1,
-        generated_json=generated,
+    test_case = await save_generated_test_case(
+        db,
+        test_suite_id,
+        generated,
+        test_type,
+        original_input=request.description,
+        source_type="text",
+        default_name=f"Test {test_type.title()}",
+        llm_call=llm_call,
     )
-    db.add(version)
     await db.commit()
     await db.refresh(test_case)
 
     return test_case
 
 
+@router.post("/generate/stream")
+async def generate_test_case_stream(
+    request: TestCaseGenerateRequest,
+    test_suite_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Server-sent-event variant of /generate.
+
+    Emits ``stage`` events (classifying, fetching_context, generating,
+    validating, saving), ``token`` events with partial Gemini output, and a
+    final ``result`` event carrying the persisted test case.
+    """
+    project_id = await get_suite_project_id(db, test_suite_id)
+
+    async def events():
+        gemini = get_gemini_service()
+        ces = get_ces_client()
+        try:
+            with llm_call_scope(project_id, "test_cases.generate") as llm_scope:
+                if request.type_hint:
+                    test_type = request.type_hint.value
+                else:
+                    yield sse_event("stage", {"stage": "classifying"})
+                    test_type = await gemini.classify_test_type(request.description)
+
+                agent_context = None
+                if request.agent_id:
+                    yield sse_event("stage", {"stage": "fetching_context"})
+                    agent_context = await fetch_agent_context(ces, request.agent_id)
+
+                yield sse_event("stage", {"stage": "generating", "type": test_type})
+                generated = None
+                async for kind, value in gemini.generate_test_case_stream(
+                    user_input=request.description,
+                    agent_context=agent_context,
+                    test_type=test_type,
+                ):
+                    if kind == "token":
+                        yield sse_event("token", {"text": value})
+                    elif kind == "stage":
+                        yield sse_event("stage", {"stage": value})
+                    else:
+                        generated = value
+                llm_call = llm_scope.last_call
+
+            yield sse_event("stage", {"stage": "saving"})
+            # The request-scoped session is not usable once the response is streaming
+            async with AsyncSessionLocal() as session:
+                test_case = await save_generated_test_case(
+                    session,
+                    test_suite_id,
+                    generated,
+                    test_type,
+                    original_input=request.description,
+                    source_type="text",
+                    default_name=f"Test {test_type.title()}",
+                    llm_call=llm_call,
+                )
+                await session.commit()
+                await session.refresh(test_case)
+                yield sse_event("result", TestCaseResponse.model_validate(test_case))
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+
+    return sse_response(events())
+
+
 @router.post(
     "/from-docx",
     response_model=List[TestCaseResponse],
@@ -143,48 +251,132 @@ async def generate_test_cases_from_docx(
     """Generate multiple test cases from a Word document."""
     # Read and parse docx
     content = await file.read()
-    docx_text = parse_docx(content)
+    docx_text = (await parse_docx_async(content)).text
 
     gemini = get_gemini_service()
+    project_id = await get_suite_project_id(db, test_suite_id)
 
-    # Extract individual test requirements
-    requirements = await gemini.extract_test_requirements(docx_text)
+    with llm_call_scope(project_id, "test_cases.from_docx") as llm_scope:
+        # Extract individual test requirements
+        requirements = await gemini.extract_test_requirements(docx_text)
 
-    test_cases = []
-    for req in requirements:
-        test_type = req.get("type_hint", "golden") or "golden"
+        test_cases = []
+        for req in requirements:
+            test_type = req.get("type_hint", "golden") or "golden"
 
-        # Generate test case
-        generated = await gemini.generate_test_case(
-            user_input=req.get("description", ""),
-            agent_context=None,  # Could fetch agent context here
-            test_type=test_type,
-        )
+            # Generate test case
+            generated = await gemini.generate_test_case(
+                user_input=req.get("description", ""),
+                agent_context=None,  # Could fetch agent context here
+                test_type=test_type,
+            )
+            llm_call = llm_scope.last_call
+
+            test_case = await save_generated_test_case(
+                db,
+                test_suite_id,
+                generated,
+                test_type,
+                original_input=req.get("description", ""),
+                source_type="docx",
+                default_name=f"Test {len(test_cases) + 1}",
+                llm_call=llm_call,
+            )
+            test_cases.append(test_case)
+
+    await db.commit()
+    return test_cases
+
+
+@router.post(
+    "/bulk-ingest",
+    response_model=IngestionJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def bulk_ingest_documents(
+    test_suite_id: UUID,
+    background_tasks: BackgroundTasks,
+    files: List[UploadFile] = File(...),
+    agent_id: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Generate test cases from many .docx files or ZIP archives in the background.
 
-        test_case = TestCase(
-            test_suite_id=test_suite_id,
-            name=generated.get("displayName", f"Test {len(test_cases) + 1}"),
-            description=generated.get("description", req.get("description", "")[:200]),
-            type=TestCaseType.GOLDEN
-            if test_type == "golden"
-            else TestCaseType.SCENARIO,
-            status=ApprovalStatus.DRAFT,
-            source_type="docx",
-            original_input=req.get("description", ""),
+    Documents identical to one earlier in the upload, or to one already
+    ingested into the suite, are recorded as duplicates and not parsed.
+    Poll GET /test-cases/bulk-ingest/{job_id} for per-document progress.
+    """
+    suite = await db.scalar(select(TestSuite).where(TestSuite.id == str(test_suite_id)))
+    if not suite:
+        raise HTTPException(status_code=404, detail="Test suite not found")
+
+    uploads = [(f.filename, await f.read()) for f in files]
+    try:
+        documents = await asyncio.to_thread(expand_uploads, uploads)
+    except IngestionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    hashes = [doc.content_hash for doc in documents]
+    previous = await db.execute(
+        select(IngestionDocument.content_hash, IngestionDocument.id)
+        .join(IngestionJob, IngestionDocument.job_id == IngestionJob.id)
+        .where(
+            IngestionJob.test_suite_id == suite.id,
+            IngestionDocument.content_hash.in_(set(hashes)),
+            IngestionDocument.state == DocumentState.COMPLETED,
         )
-        db.add(test_case)
-        await db.flush()
+    )
+    first_by_hash = {content_hash: doc_id for content_hash, doc_id in previous.all()}
 
-        version = TestCaseVersion(
-            test_case_id=test_case.id,
-            version_number=1,
-            generated_json=generated,
+    job = IngestionJob(
+        test_suite_id=suite.id,
+        agent_id=agent_id,
+        total_documents=len(documents),
+        documents=[],
+    )
+    db.add(job)
+    await db.flush()
+
+    to_parse: List[Tuple[str, bytes]] = []
+    for position, (doc, content_hash) in enumerate(zip(documents, hashes)):
+        record = IngestionDocument(
+            position=position,
+            filename=doc.filename,
+            content_hash=content_hash,
         )
-        db.add(version)
-        test_cases.append(test_case)
+        job.documents.append(record)
+        await db.flush()
+        if content_hash in first_by_hash:
+            record.state = DocumentState.DUPLICATE
+            record.duplicate_of = first_by_hash[content_hash]
+            job.duplicate_documents += 1
+            job.processed_documents += 1
+        else:
+            first_by_hash[content_hash] = record.id
+            to_parse.append((record.id, doc.data))
 
     await db.commit()
-    return test_cases
+    background_tasks.add_task(run_ingestion_job, job.id, to_parse)
+    return IngestionJobResponse.model_validate(job)
+
+
+@router.get("/bulk-ingest/{job_id}", response_model=IngestionJobResponse)
+async def get_ingestion_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Get a bulk ingestion job with the progress of each document."""
+    job = await db.scalar(
+        select(IngestionJob)
+        .options(selectinload(IngestionJob.documents))
+        .where(IngestionJob.id == str(job_id))
+        .execution_options(populate_existing=True)
+    )
+    if not job:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+    return job
 
 
 @router.get("/{test_case_id}", response_model=TestCaseResponse)
@@ -195,16 +387,27 @@ async def get_test_case(
 ):
     """Get a specific test case with its current version."""
     result = await db.execute(
-        select(TestCase)
-        .options(selectinload(TestCase.versions))
-        .where(TestCase.id == test_case_id)
+        case_query(",".join(TEST_CASE_FIELDS)).where(TestCase.id == str(test_case_id))
     )
-    test_case = result.scalar_one_or_none()
+    row = result.one_or_none()
 
-    if not test_case:
+    if not row:
         raise HTTPException(status_code=404, detail="Test case not found")
 
-    return test_case
+    return TestCaseResponse.model_validate(row)
+
+
+@router.get("/{test_case_id}/outcomes", response_model=List[TestCaseOutcomeResponse])
+async def get_test_case_outcomes(
+    test_case_id: UUID,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """A test case's outcome in each completed run, newest first."""
+    if await db.get(TestCase, str(test_case_id)) is None:
+        raise HTTPException(status_code=404, detail="Test case not found")
+    return await case_history(db, str(test_case_id), limit)
 
 
 @router.get("/{test_case_id}/versions", response_model=List[TestCaseVersionResponse])
@@ -222,6 +425,40 @@ async def get_test_case_versions(
     return result.scalars().all()
 
 
+async def get_current_version(
+    db: AsyncSession, test_case: TestCase
+) -> Optional[TestCaseVersion]:
+    """Load only the version a test case currently points at."""
+    return await db.scalar(
+        select(TestCaseVersion).where(
+            TestCaseVersion.test_case_id == test_case.id,
+            TestCaseVersion.version_number == test_case.current_version,
+        )
+    )
+
+
+def add_regenerated_version(
+    db: AsyncSession,
+    test_case: TestCase,
+    generated: dict,
+    feedback: str,
+    llm_call: Optional[LLMCall] = None,
+) -> int:
+    """Add the next version from a retry generation and return its number."""
+    new_version = TestCaseVersion(
+        test_case_id=test_case.id,
+        version_number=test_case.current_version + 1,
+        generated_json=generated,
+        gemini_prompt=llm_call.prompt if llm_call else None,
+        gemini_response_raw=llm_call.response_text if llm_call else None,
+        user_feedback=feedback,
+    )
+    db.add(new_version)
+    test_case.current_version += 1
+    test_case.status = ApprovalStatus.DRAFT
+    return new_version.version_number
+
+
 @router.post("/{test_case_id}/approve", response_model=ApprovalResponse)
 async def approve_test_case(
     test_case_id: UUID,
@@ -230,19 +467,14 @@ async def approve_test_case(
     user=Depends(get_current_user),
 ):
     """Approve, retry, or deny a test case."""
-    result = await db.execute(
-        select(TestCase)
-        .options(selectinload(TestCase.versions))
-        .where(TestCase.id == test_case_id)
-    )
-    test_case = result.scalar_one_or_none()
+    test_case = await db.scalar(select(TestCase).where(TestCase.id == str(test_case_id)))
 
     if not test_case:
         raise HTTPException(status_code=404, detail="Test case not found")
 
     # Record approval action
     approval_record = ApprovalRecord(
-        test_case_id=test_case_id,
+        test_case_id=test_case.id,
         version_number=test_case.current_version,
         action=ApprovalAction(request.action.value),
         user_email=user.email,
@@ -264,38 +496,20 @@ async def approve_test_case(
         # Generate new version with feedback
         gemini = get_gemini_service()
 
-        # Get current version's generated JSON
-        current_version = next(
-            (
-                v
-                for v in test_case.versions
-                if v.version_number == test_case.current_version
-            ),
-            None,
-        )
-
         # Regenerate with feedback
-        generated = await gemini.generate_test_case(
-            user_input=test_case.original_input or "",
-            test_type=test_case.type.value,
-            retry_feedback=request.feedback,
-        )
-
-        # Create new version
-        new_version = TestCaseVersion(
-            test_case_id=test_case.id,
-            version_number=test_case.current_version + 1,
-            generated_json=generated,
-            user_feedback=request.feedback,
-        )
-        db.add(new_version)
-        test_case.current_version += 1
-        test_case.status = ApprovalStatus.DRAFT
+        project_id = await get_suite_project_id(db, test_case.test_suite_id)
+        with llm_call_scope(project_id, "test_cases.retry") as llm_scope:
+            generated = await gemini.generate_test_case(
+                user_input=test_case.original_input or "",
+                test_type=test_case.type.value,
+                retry_feedback=request.feedback,
+            )
+        llm_call = llm_scope.last_call
 
-        message = (
-            f"Test case sent for regeneration (version {new_version.version_number})"
+        new_version = add_regenerated_version(
+            db, test_case, generated, request.feedback, llm_call
         )
-        new_version = new_version.version_number
+        message = f"Test case sent for regeneration (version {new_version})"
     else:  # DENY
         test_case.status = ApprovalStatus.DENIED
         message = "Test case denied"
@@ -313,6 +527,80 @@ async def approve_test_case(
     )
 
 
+@router.post("/{test_case_id}/approve/stream")
+async def retry_test_case_stream(
+    test_case_id: UUID,
+    request: ApprovalRequest,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Server-sent-event variant of /approve for the retry action.
+
+    Emits ``stage`` and ``token`` events while the new version is generated,
+    then a ``result`` event with the same ApprovalResponse as /approve.
+    """
+    if request.action != ApprovalAction.RETRY:
+        raise HTTPException(status_code=400, detail="Only the retry action can be streamed")
+    if not request.feedback:
+        raise HTTPException(status_code=400, detail="Feedback required for retry")
+
+    test_case = await db.scalar(select(TestCase).where(TestCase.id == str(test_case_id)))
+    if not test_case:
+        raise HTTPException(status_code=404, detail="Test case not found")
+    project_id = await get_suite_project_id(db, test_case.test_suite_id)
+    original_input = test_case.original_input or ""
+    test_type = test_case.type.value
+    retried_version = test_case.current_version
+
+    async def events():
+        gemini = get_gemini_service()
+        try:
+            yield sse_event("stage", {"stage": "generating", "type": test_type})
+            generated = None
+            with llm_call_scope(project_id, "test_cases.retry") as llm_scope:
+                async for kind, value in gemini.generate_test_case_stream(
+                    user_input=original_input,
+                    test_type=test_type,
+                    retry_feedback=request.feedback,
+                ):
+                    if kind == "token":
+                        yield sse_event("token", {"text": value})
+                    elif kind == "stage":
+                        yield sse_event("stage", {"stage": value})
+                    else:
+                        generated = value
+
+            yield sse_event("stage", {"stage": "saving"})
+            # Opened only now so no connection is held while Gemini generates;
+            # the request-scoped session is closed once the response is streaming
+            async with AsyncSessionLocal() as session:
+                test_case = await session.get(TestCase, str(test_case_id))
+                if not test_case:
+                    raise ValueError("Test case was deleted during regeneration")
+                session.add(ApprovalRecord(
+                    test_case_id=test_case.id,
+                    version_number=retried_version,
+                    action=ApprovalAction.RETRY,
+                    user_email=user.get("email"),
+                    feedback=request.feedback,
+                ))
+                new_version = add_regenerated_version(
+                    session, test_case, generated, request.feedback, llm_scope.last_call
+                )
+                await session.commit()
+            yield sse_event("result", ApprovalResponse(
+                test_case_id=test_case_id,
+                action=request.action,
+                new_status=test_case.status,
+                message=f"Test case sent for regeneration (version {new_version})",
+                new_version=new_version,
+            ))
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+
+    return sse_response(events())
+
+
 @router.post("/{test_case_id}/submit", response_model=TestCaseResponse)
 async def submit_test_case(
     test_case_id: UUID,
@@ -320,12 +608,7 @@ async def submit_test_case(
     user=Depends(get_current_user),
 ):
     """Submit an approved test case to CES API."""
-    result = await db.execute(
-        select(TestCase)
-        .options(selectinload(TestCase.versions))
-        .where(TestCase.id == test_case_id)
-    )
-    test_case = result.scalar_one_or_none()
+    test_case = await db.scalar(select(TestCase).where(TestCase.id == str(test_case_id)))
 
     if not test_case:
         raise HTTPException(status_code=404, detail="Test case not found")
@@ -337,15 +620,7 @@ async def submit_test_case(
 
     ces = get_ces_client()
 
-    # Get current version's generated JSON
-    current_version = next(
-        (
-            v
-            for v in test_case.versions
-            if v.version_number == test_case.current_version
-        ),
-        None,
-    )
+    current_version = await get_current_version(db, test_case)
 
     if not current_version:
         raise HTTPException(status_code=500, detail="No version found")
@@ -386,5 +661,6 @@ async def delete_test_case(
     if not test_case:
         raise HTTPException(status_code=404, detail="Test case not found")
 
+    await delete_test_case_history(db, test_case.id)
     await db.delete(test_case)
     await db.commit()
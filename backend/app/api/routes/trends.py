@@ -0,0 +1,77 @@
+"""Trend routes served from the daily rollups.
+
+Runs are rolled up as they complete; any missed are caught up by the
+background reconcile loop, so these handlers only read.
+"""
+
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.auth import get_current_user
+from app.core.database import get_db
+from app.models.rollup import ALL_CATEGORIES
+from app.schemas.schemas import EvaluationTrendPoint, SecurityCategoryTrend, SecurityTrendPoint
+from app.services.rollups import (
+    evaluation_trend,
+    security_categories,
+    security_trend,
+    since_day,
+)
+from app.utils.downsample import lttb
+
+router = APIRouter(prefix="/trends", tags=["Trends"])
+
+DAYS = Query(90, ge=1, le=3660, description="Window size in days, ending today")
+POINTS = Query(
+    None, ge=3, le=5000,
+    description="Downsample to at most this many points (LTTB on the rate series)",
+)
+
+
+def downsample(points: List[dict], limit: Optional[int], rate_key: str) -> List[dict]:
+    """LTTB over the days that have a rate; days without one are dropped when downsampling."""
+    if not limit or len(points) <= limit:
+        return points
+    rated = [p for p in points if p[rate_key] is not None]
+    return lttb(rated, limit, x=lambda p: p["day"].toordinal(), y=lambda p: p[rate_key])
+
+
+@router.get("/evaluations", response_model=List[EvaluationTrendPoint])
+async def get_evaluation_trend(
+    project_id: Optional[str] = None,
+    test_suite_id: Optional[str] = None,
+    days: int = DAYS,
+    points: Optional[int] = POINTS,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Daily pass rate and run counts of completed evaluation runs."""
+    trend = await evaluation_trend(db, since_day(days), project_id, test_suite_id)
+    return downsample(trend, points, "pass_rate")
+
+
+@router.get("/security", response_model=List[SecurityTrendPoint])
+async def get_security_trend(
+    project_id: Optional[str] = None,
+    category: str = Query(ALL_CATEGORIES, description="Prompt category, or * for all"),
+    days: int = DAYS,
+    points: Optional[int] = POINTS,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Daily attack success rate and response latency percentiles of completed security runs."""
+    trend = await security_trend(db, since_day(days), project_id, category)
+    return downsample(trend, points, "attack_success_rate")
+
+
+@router.get("/security/categories", response_model=List[SecurityCategoryTrend])
+async def get_security_category_trend(
+    project_id: Optional[str] = None,
+    days: int = DAYS,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Attack success rate per prompt category over the window."""
+    return await security_categories(db, since_day(days), project_id)
@@ -0,0 +1,189 @@
+"""Webhook subscription routes; deliveries are sent by app.services.webhook_dispatcher."""
+
+import uuid
+from datetime import datetime, timezone
+from typing import List, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.auth import get_current_user
+from app.core.database import get_db
+from app.core.encryption import encrypt_token
+from app.models.project import Project
+from app.models.webhook import WebhookDeadLetter, WebhookDelivery, WebhookSubscription
+from app.schemas.schemas import (
+    WebhookDeadLetterResponse,
+    WebhookSecretResponse,
+    WebhookSubscriptionCreate,
+    WebhookSubscriptionResponse,
+    WebhookSubscriptionUpdate,
+)
+from app.services.webhooks import new_secret
+
+router = APIRouter(prefix="/webhooks", tags=["Webhooks"])
+
+
+async def get_subscription_or_404(db: AsyncSession, subscription_id: UUID) -> WebhookSubscription:
+    subscription = await db.get(WebhookSubscription, str(subscription_id))
+    if not subscription:
+        raise HTTPException(status_code=404, detail="Webhook not found")
+    return subscription
+
+
+def with_secret(subscription: WebhookSubscription, secret: str) -> WebhookSecretResponse:
+    return WebhookSecretResponse(
+        **WebhookSubscriptionResponse.model_validate(subscription).model_dump(), secret=secret
+    )
+
+
+@router.get("", response_model=List[WebhookSubscriptionResponse])
+async def list_webhooks(
+    project_id: Optional[UUID] = None,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    query = select(WebhookSubscription).order_by(WebhookSubscription.created_at)
+    if project_id:
+        query = query.where(WebhookSubscription.project_id == str(project_id))
+    return (await db.scalars(query)).all()
+
+
+@router.post("", response_model=WebhookSecretResponse, status_code=status.HTTP_201_CREATED)
+async def create_webhook(
+    project_id: UUID,
+    data: WebhookSubscriptionCreate,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Subscribe an endpoint to a project's run events.
+
+    The response holds the signing secret, which is not shown again.
+    """
+    if not await db.get(Project, str(project_id)):
+        raise HTTPException(status_code=404, detail="Project not found")
+    secret = new_secret()
+    subscription = WebhookSubscription(
+        **data.model_dump(exclude={"url", "events"}),
+        id=str(uuid.uuid4()),
+        project_id=str(project_id),
+        url=str(data.url),
+        events=[event.value for event in data.events],
+        secret_encrypted=encrypt_token(secret),
+        created_by=user.get("sub"),
+        created_at=datetime.now(timezone.utc),
+    )
+    db.add(subscription)
+    await db.commit()
+    return with_secret(subscription, secret)
+
+
+@router.get("/{subscription_id}", response_model=WebhookSubscriptionResponse)
+async def get_webhook(
+    subscription_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    return await get_subscription_or_404(db, subscription_id)
+
+
+@router.patch("/{subscription_id}", response_model=WebhookSubscriptionResponse)
+async def update_webhook(
+    subscription_id: UUID,
+    data: WebhookSubscriptionUpdate,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Update a webhook; queued deliveries go to the new URL."""
+    subscription = await get_subscription_or_404(db, subscription_id)
+    # Only the description can be cleared
+    changes = {
+        field: value for field, value in data.model_dump(exclude_unset=True).items()
+        if value is not None or field == "description"
+    }
+    if "url" in changes:
+        changes["url"] = str(changes["url"])
+    if "events" in changes:
+        changes["events"] = [event.value for event in changes["events"]]
+    for field, value in changes.items():
+        setattr(subscription, field, value)
+    await db.commit()
+    return subscription
+
+
+@router.post("/{subscription_id}/secret", response_model=WebhookSecretResponse)
+async def rotate_webhook_secret(
+    subscription_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Replace the signing secret; deliveries from now on are signed with the new one."""
+    subscription = await get_subscription_or_404(db, subscription_id)
+    secret = new_secret()
+    subscription.secret_encrypted = encrypt_token(secret)
+    await db.commit()
+    return with_secret(subscription, secret)
+
+
+@router.delete("/{subscription_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_webhook(
+    subscription_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Delete a webhook with its queued deliveries and dead letters."""
+    subscription = await get_subscription_or_404(db, subscription_id)
+    await db.execute(delete(WebhookDelivery).where(WebhookDelivery.subscription_id == subscription.id))
+    await db.execute(
+        delete(WebhookDeadLetter).where(WebhookDeadLetter.subscription_id == subscription.id)
+    )
+    await db.delete(subscription)
+    await db.commit()
+
+
+@router.get("/{subscription_id}/dead-letters", response_model=List[WebhookDeadLetterResponse])
+async def list_dead_letters(
+    subscription_id: UUID,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Deliveries the endpoint rejected or that ran out of attempts, most recent first."""
+    subscription = await get_subscription_or_404(db, subscription_id)
+    rows = await db.scalars(
+        select(WebhookDeadLetter)
+        .where(WebhookDeadLetter.subscription_id == subscription.id)
+        .order_by(WebhookDeadLetter.failed_at.desc())
+        .limit(limit)
+    )
+    return rows.all()
+
+
+@router.post(
+    "/{subscription_id}/dead-letters/{dead_letter_id}/retry",
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def retry_dead_letter(
+    subscription_id: UUID,
+    dead_letter_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Queue a dead letter again with a fresh set of attempts, under its original id."""
+    dead_letter = await db.get(WebhookDeadLetter, str(dead_letter_id))
+    if not dead_letter or dead_letter.subscription_id != str(subscription_id):
+        raise HTTPException(status_code=404, detail="Dead letter not found")
+    db.add(WebhookDelivery(
+        id=dead_letter.id,
+        subscription_id=dead_letter.subscription_id,
+        event=dead_letter.event,
+        payload=dead_letter.payload,
+        attempts=0,
+        next_attempt_at=datetime.now(timezone.utc),
+        created_at=dead_letter.created_at,
+    ))
+    await db.delete(dead_letter)
+    await db.commit()
+    return {"success": True, "delivery_id": dead_letter.id}
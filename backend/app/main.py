@@ -1,19 +1,46 @@
 """CX Agent Studio Testing Platform - FastAPI application."""
 
+import asyncio
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.core.config import settings
 from app.core.database import init_db
+from app.services.bulk_ingestion import shutdown_parse_pool
+from app.services.evaluation_runs import reconcile_forever, stop_polling
+from app.services.llm_usage import LLMBudgetExceeded
+from app.services.scheduler import scheduler_forever
+from app.services.webhook_dispatcher import dispatcher_forever
+from app.utils.cron import InvalidCronExpression
+from app.utils.pagination import InvalidCursor
+from app.utils.projection import UnknownField
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup / shutdown hooks."""
     await init_db()
+    reconciler = None
+    if settings.EVALUATION_RECONCILE_INTERVAL_SECONDS > 0:
+        reconciler = asyncio.create_task(
+            reconcile_forever(settings.EVALUATION_RECONCILE_INTERVAL_SECONDS)
+        )
+    scheduler = None
+    if settings.SCHEDULER_ENABLED:
+        scheduler = asyncio.create_task(scheduler_forever(settings.SCHEDULER_TICK_SECONDS))
+    dispatcher = None
+    if settings.WEBHOOK_DISPATCH_ENABLED:
+        dispatcher = asyncio.create_task(dispatcher_forever(settings.WEBHOOK_TICK_SECONDS))
     yield
+    for task in (reconciler, scheduler, dispatcher):
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+    await stop_polling()
+    shutdown_parse_pool()
 
 
 app = FastAPI(
@@ -30,8 +57,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
+@app.exception_handler(LLMBudgetExceeded)
+async def llm_budget_exceeded_handler(request: Request, exc: LLMBudgetExceeded):
+    return JSONResponse(status_code=429, content={"detail": str(exc)})
+
+
+@app.exception_handler(InvalidCronExpression)
+@app.exception_handler(InvalidCursor)
+@app.exception_handler(UnknownField)
+async def bad_query_handler(request: Request, exc: ValueError):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+
 # Register routers
 from app.api.routes.auth import router as auth_router          # noqa: E402
 from app.api.routes.projects import router as projects_router  # noqa: E402
@@ -42,6 +82,10 @@ from app.api.routes.dashboard import router as dashboard_router  # noqa: E402
 from app.api.routes.export import router as export_router  # noqa: E402
 from app.api.routes.settings import router as settings_router  # noqa: E402
 from app.api.routes.security_testing import router as security_testing_router  # noqa: E402
+from app.api.routes.llm_usage import router as llm_usage_router  # noqa: E402
+from app.api.routes.trends import router as trends_router  # noqa: E402
+from app.api.routes.schedules import router as schedules_router  # noqa: E402
+from app.api.routes.webhooks import router as webhooks_router  # noqa: E402
 
 app.include_router(auth_router, prefix="/api")
 app.include_router(projects_router, prefix="/api")
@@ -52,6 +96,10 @@ app.include_router(dashboard_router, prefix="/api")
 app.include_router(export_router, prefix="/api")
 app.include_router(settings_router, prefix="/api")
 app.include_router(security_testing_router, prefix="/api")
+app.include_router(llm_usage_router, prefix="/api")
+app.include_router(trends_router, prefix="/api")
+app.include_router(schedules_router, prefix="/api")
+app.include_router(webhooks_router, prefix="/api")
 
 
 @app.get("/api/health")
@@ -2,7 +2,7 @@
 from app.models.project import Project
 from app.models.test_suite import TestSuite
 from app.models.test_case import TestCase, TestCaseVersion, ApprovalRecord
-from app.models.evaluation_run import EvaluationRunRecord, RunResultRecord
+from app.models.evaluation_run import EvaluationRunRecord, EvaluationRunShard, RunResultRecord
 from app.models.user import User
 from app.models.audit_log import AuditLog
 from app.models.user_settings import UserSettings
@@ -11,10 +11,35 @@ from app.models.security_testing import (
     SecurityTestResult,
     DatasetCategory,
     SecurityTestState,
+    PromptHistory,
+)
+from app.models.llm_call import LLMCallRecord
+from app.models.analysis import AnalysisCacheEntry, RunAnalysisSummary
+from app.models.dashboard import DashboardSummaryCache
+from app.models.rollup import EvaluationRollup, SecurityRollup
+from app.models.outcome import TestCaseOutcome, TestCaseStability
+from app.models.schedule import EvaluationSchedule, MissedRunPolicy, SchedulerLease
+from app.models.webhook import (
+    WebhookSubscription,
+    WebhookDelivery,
+    WebhookDeadLetter,
+    WebhookEvent,
+)
+from app.models.ingestion import (
+    IngestionJob,
+    IngestionDocument,
+    IngestionState,
+    DocumentState,
 )
 
 __all__ = [
     "Project", "TestSuite", "TestCase", "TestCaseVersion", "ApprovalRecord",
-    "EvaluationRunRecord", "RunResultRecord", "User", "AuditLog", "UserSettings",
+    "EvaluationRunRecord", "EvaluationRunShard", "RunResultRecord", "User", "AuditLog", "UserSettings",
     "SecurityTestRun", "SecurityTestResult", "DatasetCategory", "SecurityTestState",
+    "PromptHistory",
+    "LLMCallRecord", "AnalysisCacheEntry", "RunAnalysisSummary", "DashboardSummaryCache",
+    "EvaluationRollup", "SecurityRollup", "TestCaseOutcome", "TestCaseStability",
+    "EvaluationSchedule", "MissedRunPolicy", "SchedulerLease",
+    "WebhookSubscription", "WebhookDelivery", "WebhookDeadLetter", "WebhookEvent",
+    "IngestionJob", "IngestionDocument", "IngestionState", "DocumentState",
 ]
@@ -0,0 +1,49 @@
+"""Cached AI analyses and per-run analysis summaries."""
+
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import String, DateTime, Text, ForeignKey, JSON, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+
+
+class AnalysisCacheEntry(Base):
+    """A Gemini analysis keyed by subject, input digest, question and model.
+
+    ``subject`` is ``run:<evaluation_run_id>`` for single-run analyses and
+    ``suite:<test_suite_id>`` for cross-run trend analyses.
+    """
+    __tablename__ = "analysis_cache"
+    __table_args__ = (
+        Index(
+            "ux_analysis_cache_key", "subject", "digest", "question_hash", "model",
+            unique=True,
+        ),
+    )
+
+    id: Mapped[str] = mapped_column(
+        String(36), primary_key=True, default=lambda: str(uuid.uuid4())
+    )
+    subject: Mapped[str] = mapped_column(String(100), nullable=False)
+    digest: Mapped[str] = mapped_column(String(64), nullable=False)
+    question_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    question: Mapped[str] = mapped_column(Text, nullable=True)
+    model: Mapped[str] = mapped_column(String(100), nullable=False)
+    analysis: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+
+
+class RunAnalysisSummary(Base):
+    """Clustered failure summary of one evaluation run, reused across questions and trends."""
+    __tablename__ = "run_analysis_summaries"
+
+    evaluation_run_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("evaluation_runs.id", ondelete="CASCADE"), primary_key=True
+    )
+    results_digest: Mapped[str] = mapped_column(String(64), nullable=False)
+    summary: Mapped[dict] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
@@ -0,0 +1,29 @@
+"""Cached dashboard aggregates, one row per project plus one global row."""
+
+from datetime import datetime
+from sqlalchemy import String, DateTime, Integer, Float
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+
+GLOBAL_SCOPE = "*"
+
+
+class DashboardSummaryCache(Base):
+    """Dashboard counters for a project (``scope`` = project id) or all projects (``*``).
+
+    Writes that change the counters bump ``version``; the row is fresh while
+    ``computed_version`` equals it.
+    """
+    __tablename__ = "dashboard_summaries"
+
+    scope: Mapped[str] = mapped_column(String(36), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    computed_version: Mapped[int] = mapped_column(Integer, default=-1, nullable=False)
+    total_test_cases: Mapped[int] = mapped_column(Integer, default=0)
+    approved_count: Mapped[int] = mapped_column(Integer, default=0)
+    pending_count: Mapped[int] = mapped_column(Integer, default=0)
+    total_runs: Mapped[int] = mapped_column(Integer, default=0)
+    total_passed: Mapped[int] = mapped_column(Integer, default=0)
+    total_failed: Mapped[int] = mapped_column(Integer, default=0)
+    last_run_pass_rate: Mapped[float] = mapped_column(Float, nullable=True)
+    computed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
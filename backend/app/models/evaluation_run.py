@@ -3,7 +3,7 @@
 import enum
 import uuid
 from datetime import datetime, timezone
-from sqlalchemy import String, DateTime, Text, ForeignKey, Integer, Boolean, Float, Enum, JSON
+from sqlalchemy import String, DateTime, Text, ForeignKey, Integer, Boolean, Float, Enum, JSON, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.database import Base
 
@@ -18,6 +18,13 @@ class RunState(str, enum.Enum):
 
 class EvaluationRunRecord(Base):
     __tablename__ = "evaluation_runs"
+    __table_args__ = (
+        Index("ix_evaluation_runs_suite_state_created", "test_suite_id", "state", "created_at"),
+        Index("ix_evaluation_runs_suite_keyset", "test_suite_id", "created_at", "id"),
+        Index("ix_evaluation_runs_keyset", "created_at", "id"),
+        Index("ix_evaluation_runs_state_created", "state", "created_at"),
+        Index("ix_evaluation_runs_state_rollup", "state", "rolled_up_at", "completed_at"),
+    )
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
     )
@@ -26,6 +33,10 @@ class EvaluationRunRecord(Base):
     )
     ces_run_id: Mapped[str] = mapped_column(String(500), nullable=True)
     ces_operation_id: Mapped[str] = mapped_column(String(500), nullable=True)
+    # Set for runs started by an EvaluationSchedule; they wait PENDING for a slot
+    schedule_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("evaluation_schedules.id"), nullable=True
+    )
     state: Mapped[RunState] = mapped_column(Enum(RunState), default=RunState.PENDING)
     app_version: Mapped[str] = mapped_column(String(500), nullable=True)
     evaluation_type: Mapped[str] = mapped_column(String(20), nullable=True)
@@ -40,6 +51,18 @@ class EvaluationRunRecord(Base):
     completed_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=True
     )
+    # Stored RunResultRecords; exceeds total_count when evaluations were repeated
+    result_count: Mapped[int] = mapped_column(Integer, default=0)
+    # Set once the run has been added to the daily rollups
+    rolled_up_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Number of EvaluationRunShards; NULL for runs submitted as one CES operation
+    shard_count: Mapped[int] = mapped_column(Integer, nullable=True)
+    # Adaptive repetition settings and per-scenario intervals; NULL for fixed run_count runs
+    repetition: Mapped[dict] = mapped_column(JSON, nullable=True)
+    # Fingerprint of the app's agents and tools at submission, see app.services.change_impact
+    app_snapshot: Mapped[dict] = mapped_column(JSON(none_as_null=True), nullable=True)
+    # Impact-analysis runs: the changes found and how many evaluations they selected
+    change_impact: Mapped[dict] = mapped_column(JSON(none_as_null=True), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
@@ -47,10 +70,47 @@ class EvaluationRunRecord(Base):
     results = relationship(
         "RunResultRecord", back_populates="evaluation_run", cascade="all, delete-orphan"
     )
+    shards = relationship(
+        "EvaluationRunShard", back_populates="evaluation_run", cascade="all, delete-orphan"
+    )
+
+
+class EvaluationRunShard(Base):
+    """One CES operation of a sharded run, retried on its own when it fails."""
+    __tablename__ = "evaluation_run_shards"
+    __table_args__ = (
+        Index("ux_evaluation_run_shards_run_index", "evaluation_run_id", "shard_index", unique=True),
+    )
+    id: Mapped[str] = mapped_column(
+        String(36), primary_key=True, default=lambda: str(uuid.uuid4())
+    )
+    evaluation_run_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("evaluation_runs.id"), nullable=False
+    )
+    shard_index: Mapped[int] = mapped_column(Integer, nullable=False)
+    # runEvaluation body for this shard's evaluationIds
+    run_config: Mapped[dict] = mapped_column(JSON, nullable=False)
+    state: Mapped[RunState] = mapped_column(Enum(RunState), default=RunState.PENDING)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    ces_operation_id: Mapped[str] = mapped_column(String(500), nullable=True)
+    ces_run_id: Mapped[str] = mapped_column(String(500), nullable=True)
+    # When the current attempt was claimed, before CES accepted its operation
+    claimed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    total_count: Mapped[int] = mapped_column(Integer, default=0)
+    passed_count: Mapped[int] = mapped_column(Integer, default=0)
+    failed_count: Mapped[int] = mapped_column(Integer, default=0)
+    error_count: Mapped[int] = mapped_column(Integer, default=0)
+    last_error: Mapped[str] = mapped_column(Text, nullable=True)
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    completed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    evaluation_run = relationship("EvaluationRunRecord", back_populates="shards")
 
 
 class RunResultRecord(Base):
     __tablename__ = "run_results"
+    __table_args__ = (
+        Index("ix_run_results_run_keyset", "evaluation_run_id", "created_at", "id"),
+    )
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
     )
@@ -59,6 +119,9 @@ class RunResultRecord(Base):
     )
     ces_result_id: Mapped[str] = mapped_column(String(500), nullable=True)
     ces_evaluation_id: Mapped[str] = mapped_column(String(500), nullable=True)
+    shard_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("evaluation_run_shards.id"), nullable=True
+    )
     test_case_name: Mapped[str] = mapped_column(String(255), nullable=True)
     passed: Mapped[bool] = mapped_column(Boolean, nullable=True)
     score: Mapped[float] = mapped_column(Float, nullable=True)
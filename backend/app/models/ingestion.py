@@ -0,0 +1,96 @@
+"""IngestionJob and IngestionDocument models for bulk document ingestion."""
+
+import enum
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import String, DateTime, Text, ForeignKey, Integer, Enum, Index
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.core.database import Base
+
+
+class IngestionState(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    ERROR = "error"
+
+
+class DocumentState(str, enum.Enum):
+    PENDING = "pending"
+    PARSING = "parsing"
+    EXTRACTING = "extracting"
+    GENERATING = "generating"
+    COMPLETED = "completed"
+    DUPLICATE = "duplicate"
+    ERROR = "error"
+
+
+class IngestionJob(Base):
+    """A batch of specification documents turned into test cases in the background."""
+    __tablename__ = "ingestion_jobs"
+
+    id: Mapped[str] = mapped_column(
+        String(36), primary_key=True, default=lambda: str(uuid.uuid4())
+    )
+    test_suite_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("test_suites.id"), nullable=False
+    )
+    agent_id: Mapped[str] = mapped_column(String(500), nullable=True)
+    state: Mapped[IngestionState] = mapped_column(
+        Enum(IngestionState), default=IngestionState.PENDING
+    )
+    total_documents: Mapped[int] = mapped_column(Integer, default=0)
+    processed_documents: Mapped[int] = mapped_column(Integer, default=0)
+    duplicate_documents: Mapped[int] = mapped_column(Integer, default=0)
+    duplicate_sections: Mapped[int] = mapped_column(Integer, default=0)
+    requirements_count: Mapped[int] = mapped_column(Integer, default=0)
+    duplicate_requirements: Mapped[int] = mapped_column(Integer, default=0)
+    generated_count: Mapped[int] = mapped_column(Integer, default=0)
+    error: Mapped[str] = mapped_column(Text, nullable=True)
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    completed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+
+    documents = relationship(
+        "IngestionDocument",
+        back_populates="job",
+        cascade="all, delete-orphan",
+        order_by="IngestionDocument.position",
+    )
+
+
+class IngestionDocument(Base):
+    """Progress of one document within an ingestion job."""
+    __tablename__ = "ingestion_documents"
+    __table_args__ = (
+        Index("ix_ingestion_documents_content_hash", "content_hash"),
+        Index("ix_ingestion_documents_job_position", "job_id", "position"),
+    )
+
+    id: Mapped[str] = mapped_column(
+        String(36), primary_key=True, default=lambda: str(uuid.uuid4())
+    )
+    job_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("ingestion_jobs.id"), nullable=False
+    )
+    position: Mapped[int] = mapped_column(Integer, default=0)
+    filename: Mapped[str] = mapped_column(String(500), nullable=False)
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    state: Mapped[DocumentState] = mapped_column(
+        Enum(DocumentState), default=DocumentState.PENDING
+    )
+    duplicate_of: Mapped[str] = mapped_column(String(36), nullable=True)
+    sections_count: Mapped[int] = mapped_column(Integer, default=0)
+    duplicate_sections: Mapped[int] = mapped_column(Integer, default=0)
+    requirements_count: Mapped[int] = mapped_column(Integer, default=0)
+    generated_count: Mapped[int] = mapped_column(Integer, default=0)
+    error: Mapped[str] = mapped_column(Text, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+    job = relationship("IngestionJob", back_populates="documents")
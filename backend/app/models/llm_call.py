@@ -0,0 +1,37 @@
+"""LLMCallRecord model for per-call token and latency accounting."""
+
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import String, DateTime, Text, ForeignKey, Integer, Float, Boolean, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+
+
+class LLMCallRecord(Base):
+    """One row per Gemini call; prompts and responses are not stored here."""
+    __tablename__ = "llm_calls"
+    __table_args__ = (
+        Index("ix_llm_calls_project_created", "project_id", "created_at"),
+        Index("ix_llm_calls_endpoint_created", "endpoint", "created_at"),
+    )
+
+    id: Mapped[str] = mapped_column(
+        String(36), primary_key=True, default=lambda: str(uuid.uuid4())
+    )
+    project_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("projects.id"), nullable=True
+    )
+    endpoint: Mapped[str] = mapped_column(String(100), nullable=True)
+    operation: Mapped[str] = mapped_column(String(100), nullable=False)
+    model: Mapped[str] = mapped_column(String(100), nullable=False)
+    prompt_tokens: Mapped[int] = mapped_column(Integer, default=0)
+    response_tokens: Mapped[int] = mapped_column(Integer, default=0)
+    cached_tokens: Mapped[int] = mapped_column(Integer, default=0)
+    total_tokens: Mapped[int] = mapped_column(Integer, default=0)
+    latency_ms: Mapped[float] = mapped_column(Float, nullable=True)
+    cache_status: Mapped[str] = mapped_column(String(20), default="miss")
+    success: Mapped[bool] = mapped_column(Boolean, default=True)
+    error: Mapped[str] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
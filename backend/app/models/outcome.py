@@ -0,0 +1,68 @@
+"""Per-test-case outcome history across evaluation runs."""
+
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import String, DateTime, Float, ForeignKey, Integer, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+
+
+class TestCaseOutcome(Base):
+    """A test case's results in one completed run, and how they compare with its previous run."""
+    __tablename__ = "test_case_outcomes"
+    __table_args__ = (
+        Index("ux_test_case_outcomes_case_run", "test_case_id", "evaluation_run_id", unique=True),
+        Index("ix_test_case_outcomes_case_completed", "test_case_id", "run_completed_at"),
+        Index("ix_test_case_outcomes_run_transition", "evaluation_run_id", "transition"),
+    )
+
+    id: Mapped[str] = mapped_column(
+        String(36), primary_key=True, default=lambda: str(uuid.uuid4())
+    )
+    test_case_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("test_cases.id"), nullable=False
+    )
+    evaluation_run_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("evaluation_runs.id"), nullable=False
+    )
+    test_suite_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("test_suites.id"), nullable=False
+    )
+    run_completed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    passed_count: Mapped[int] = mapped_column(Integer, default=0)
+    failed_count: Mapped[int] = mapped_column(Integer, default=0)
+    error_count: Mapped[int] = mapped_column(Integer, default=0)
+    # passed, failed, flaky (both within the run) or error
+    outcome: Mapped[str] = mapped_column(String(20), nullable=False)
+    # new_failure, still_failing, fixed, still_passing, flaky or error;
+    # NULL when the run was recorded after a newer run of the test case
+    transition: Mapped[str] = mapped_column(String(20), nullable=True)
+
+
+class TestCaseStability(Base):
+    """Running flakiness of a test case, updated as each run is recorded."""
+    __tablename__ = "test_case_stability"
+    __table_args__ = (
+        Index("ix_test_case_stability_suite_flakiness", "test_suite_id", "flakiness"),
+    )
+
+    test_case_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("test_cases.id"), primary_key=True
+    )
+    test_suite_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("test_suites.id"), nullable=False
+    )
+    run_count: Mapped[int] = mapped_column(Integer, default=0)
+    # Runs whose outcome differed from the previous passed or failed one
+    flip_count: Mapped[int] = mapped_column(Integer, default=0)
+    # Runs in which the test case both passed and failed
+    mixed_count: Mapped[int] = mapped_column(Integer, default=0)
+    # Exponentially weighted share of recent runs that flipped or were mixed
+    flakiness: Mapped[float] = mapped_column(Float, default=0.0)
+    # Latest passed, failed or flaky outcome; errors do not replace it
+    last_outcome: Mapped[str] = mapped_column(String(20), nullable=True)
+    last_run_id: Mapped[str] = mapped_column(String(36), nullable=True)
+    last_run_completed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
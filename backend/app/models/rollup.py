@@ -0,0 +1,54 @@
+"""Daily rollups of finished evaluation and security runs for trend charts."""
+
+import uuid
+from datetime import date
+from sqlalchemy import String, Date, Integer, ForeignKey, JSON, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+
+ALL_CATEGORIES = "*"
+
+
+class EvaluationRollup(Base):
+    """Completed evaluation runs of one test suite on one day (UTC)."""
+    __tablename__ = "evaluation_rollups"
+    __table_args__ = (
+        Index("ux_evaluation_rollups_suite_day", "test_suite_id", "day", unique=True),
+    )
+
+    id: Mapped[str] = mapped_column(
+        String(36), primary_key=True, default=lambda: str(uuid.uuid4())
+    )
+    test_suite_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("test_suites.id"), nullable=False
+    )
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    run_count: Mapped[int] = mapped_column(Integer, default=0)
+    total_count: Mapped[int] = mapped_column(Integer, default=0)
+    passed_count: Mapped[int] = mapped_column(Integer, default=0)
+    failed_count: Mapped[int] = mapped_column(Integer, default=0)
+    error_count: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class SecurityRollup(Base):
+    """Attack outcomes and response latency per project, prompt category and day (UTC)."""
+    __tablename__ = "security_rollups"
+    __table_args__ = (
+        Index("ux_security_rollups_project_category_day", "project_id", "category", "day", unique=True),
+        Index("ix_security_rollups_project_day", "project_id", "day"),
+    )
+
+    id: Mapped[str] = mapped_column(
+        String(36), primary_key=True, default=lambda: str(uuid.uuid4())
+    )
+    project_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("projects.id"), nullable=False
+    )
+    # Prompt category, or ALL_CATEGORIES for the whole day of the project
+    category: Mapped[str] = mapped_column(String(100), nullable=False)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    run_count: Mapped[int] = mapped_column(Integer, default=0)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    successes: Mapped[int] = mapped_column(Integer, default=0)
+    # LatencyHistogram.to_dict() of every timed result
+    latency_histogram: Mapped[dict] = mapped_column(JSON, nullable=True)
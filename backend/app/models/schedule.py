@@ -0,0 +1,60 @@
+"""Cron schedules for evaluation runs and the scheduler's leader lease."""
+
+import enum
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import String, DateTime, Text, ForeignKey, Integer, Boolean, Enum, JSON, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+
+
+class MissedRunPolicy(str, enum.Enum):
+    # Drop occurrences that are more than the misfire grace period late
+    SKIP = "skip"
+    # Fire once for any number of missed occurrences
+    RUN_ONCE = "run_once"
+
+
+class EvaluationSchedule(Base):
+    """Runs the submitted test cases of a project's suites on a cron schedule."""
+    __tablename__ = "evaluation_schedules"
+    __table_args__ = (
+        Index("ix_evaluation_schedules_enabled_next_run", "enabled", "next_run_at"),
+        Index("ix_evaluation_schedules_project", "project_id"),
+    )
+
+    id: Mapped[str] = mapped_column(
+        String(36), primary_key=True, default=lambda: str(uuid.uuid4())
+    )
+    project_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("projects.id"), nullable=False
+    )
+    display_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    description: Mapped[str] = mapped_column(Text, nullable=True)
+    cron_expression: Mapped[str] = mapped_column(String(100), nullable=False)
+    timezone: Mapped[str] = mapped_column(String(64), default="UTC")
+    # Suite ids to run; empty runs every suite of the project
+    test_suite_ids: Mapped[list] = mapped_column(JSON, default=list)
+    run_count: Mapped[int] = mapped_column(Integer, default=1)
+    generate_latency_report: Mapped[bool] = mapped_column(Boolean, default=True)
+    # Each schedule fires at a fixed offset within this window after its cron time
+    jitter_seconds: Mapped[int] = mapped_column(Integer, default=300)
+    missed_run_policy: Mapped[MissedRunPolicy] = mapped_column(
+        Enum(MissedRunPolicy), default=MissedRunPolicy.RUN_ONCE
+    )
+    enabled: Mapped[bool] = mapped_column(Boolean, default=True)
+    next_run_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_run_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_by: Mapped[str] = mapped_column(String(36), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+
+
+class SchedulerLease(Base):
+    """Named lease; the replica holding an unexpired lease is the leader."""
+    __tablename__ = "scheduler_leases"
+
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    holder: Mapped[str] = mapped_column(String(255), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -3,7 +3,7 @@
 import enum
 import uuid
 from datetime import datetime, timezone
-from sqlalchemy import String, DateTime, Text, ForeignKey, Integer, Float, Enum, JSON
+from sqlalchemy import String, DateTime, Text, ForeignKey, Integer, Float, Enum, JSON, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.database import Base
 
@@ -28,6 +28,11 @@ class SecurityTestState(str, enum.Enum):
 class SecurityTestRun(Base):
     """Model for tracking security test run executions."""
     __tablename__ = "security_test_runs"
+    __table_args__ = (
+        Index("ix_security_test_runs_project_keyset", "project_id", "created_at", "id"),
+        Index("ix_security_test_runs_project_dataset", "project_id", "dataset_source"),
+        Index("ix_security_test_runs_state_rollup", "state", "rolled_up_at", "completed_at"),
+    )
 
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
@@ -47,10 +52,25 @@ class SecurityTestRun(Base):
     total_prompts: Mapped[int] = mapped_column(Integer, default=0)
     completed_prompts: Mapped[int] = mapped_column(Integer, default=0)
     attack_success_count: Mapped[int] = mapped_column(Integer, default=0)
+    # Cached per-filter result counts, kept current as results are stored
+    blocked_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    low_confidence_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
     attack_success_rate: Mapped[float] = mapped_column(Float, nullable=True)
+    # CES app version the prompts were sent to; keys the run's prompt history
+    app_version: Mapped[str] = mapped_column(String(500), nullable=True)
+    # Prompts left out by incremental mode, already tested against app_version
+    skipped_prompts: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    # Sequential sampling: widest interval half-width reached (percentage points)
+    # and the per-category intervals it was taken from
+    achieved_precision: Mapped[float] = mapped_column(Float, nullable=True)
+    precision_report: Mapped[dict] = mapped_column(JSON, nullable=True)
+    # LatencySketch.to_dict() of every timed result, updated as results are stored
+    latency_sketch: Mapped[dict] = mapped_column(JSON, nullable=True)
     ces_session_id: Mapped[str] = mapped_column(String(500), nullable=True)
     started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
     completed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Set once the run has been added to the daily rollups
+    rolled_up_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
@@ -65,6 +85,19 @@ class SecurityTestRun(Base):
 class SecurityTestResult(Base):
     """Model for individual security test results."""
     __tablename__ = "security_test_results"
+    __table_args__ = (
+        Index("ix_security_test_results_run_keyset", "security_test_run_id", "created_at", "id"),
+        Index("ix_security_test_results_run_confidence", "security_test_run_id", "confidence_score"),
+        # Partial index for the "successful_attacks" filter, a small slice of each run
+        Index(
+            "ix_security_test_results_run_attacks_keyset",
+            "security_test_run_id",
+            "created_at",
+            "id",
+            postgresql_where=text("is_attack_successful"),
+            sqlite_where=text("is_attack_successful = 1"),
+        ),
+    )
 
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
@@ -85,3 +118,37 @@ class SecurityTestResult(Base):
 
     # Relationships
     security_test_run = relationship("SecurityTestRun", back_populates="results")
+
+
+class PromptHistory(Base):
+    """Outcomes of one attack prompt against one app version of a project.
+
+    Prompts are keyed by the hash of their normalised text, so the same
+    prompt from different datasets or runs shares its history.
+    """
+    __tablename__ = "prompt_history"
+    __table_args__ = (
+        Index(
+            "ux_prompt_history_project_hash_version",
+            "project_id", "prompt_hash", "app_version",
+            unique=True,
+        ),
+    )
+
+    id: Mapped[str] = mapped_column(
+        String(36), primary_key=True, default=lambda: str(uuid.uuid4())
+    )
+    project_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("projects.id"), nullable=False
+    )
+    prompt_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    # "" when the run's app version was unknown
+    app_version: Mapped[str] = mapped_column(String(500), nullable=False, default="")
+    prompt_category: Mapped[str] = mapped_column(String(100), nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    successes: Mapped[int] = mapped_column(Integer, default=0)
+    last_successful: Mapped[bool] = mapped_column(nullable=True)
+    last_run_id: Mapped[str] = mapped_column(String(36), nullable=True)
+    last_tested_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
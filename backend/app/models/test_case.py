@@ -3,7 +3,7 @@
 import enum
 import uuid
 from datetime import datetime, timezone
-from sqlalchemy import String, DateTime, Text, ForeignKey, Integer, Enum, JSON
+from sqlalchemy import String, DateTime, Text, ForeignKey, Integer, Enum, JSON, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.database import Base
 
@@ -29,6 +29,11 @@ class ApprovalAction(str, enum.Enum):
 
 class TestCase(Base):
     __tablename__ = "test_cases"
+    __table_args__ = (
+        Index("ix_test_cases_suite_created", "test_suite_id", "created_at"),
+        Index("ix_test_cases_suite_status", "test_suite_id", "status"),
+        Index("ix_test_cases_status_created", "status", "created_at"),
+    )
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     test_suite_id: Mapped[str] = mapped_column(String(36), ForeignKey("test_suites.id"), nullable=False)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -48,6 +53,9 @@ class TestCase(Base):
 
 class TestCaseVersion(Base):
     __tablename__ = "test_case_versions"
+    __table_args__ = (
+        Index("ix_test_case_versions_case_version", "test_case_id", "version_number"),
+    )
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     test_case_id: Mapped[str] = mapped_column(String(36), ForeignKey("test_cases.id"), nullable=False)
     version_number: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -61,6 +69,9 @@ class TestCaseVersion(Base):
 
 class ApprovalRecord(Base):
     __tablename__ = "approval_records"
+    __table_args__ = (
+        Index("ix_approval_records_case_timestamp", "test_case_id", "timestamp"),
+    )
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     test_case_id: Mapped[str] = mapped_column(String(36), ForeignKey("test_cases.id"), nullable=False)
     version_number: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -0,0 +1,93 @@
+"""Webhook subscriptions of a project, their delivery queue and dead letters."""
+
+import enum
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import String, DateTime, Text, ForeignKey, Integer, Boolean, JSON, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+
+
+class WebhookEvent(str, enum.Enum):
+    RUN_STARTED = "run.started"
+    # Sent as a run passes 25%, 50% and 75% of its work
+    RUN_PROGRESS = "run.progress"
+    # Sent once a run is finished, whether completed, failed or cancelled
+    RUN_COMPLETED = "run.completed"
+    # Test cases that passed in their previous run failed in this one
+    REGRESSION_DETECTED = "run.regression_detected"
+
+
+class WebhookSubscription(Base):
+    """An endpoint that receives a project's run events."""
+    __tablename__ = "webhook_subscriptions"
+    __table_args__ = (
+        Index("ix_webhook_subscriptions_project", "project_id"),
+    )
+
+    id: Mapped[str] = mapped_column(
+        String(36), primary_key=True, default=lambda: str(uuid.uuid4())
+    )
+    project_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("projects.id"), nullable=False
+    )
+    url: Mapped[str] = mapped_column(String(2048), nullable=False)
+    description: Mapped[str] = mapped_column(Text, nullable=True)
+    # WebhookEvent values the endpoint receives
+    events: Mapped[list] = mapped_column(JSON, default=list)
+    # HMAC signing secret, encrypted at rest
+    secret_encrypted: Mapped[str] = mapped_column(Text, nullable=False)
+    # Deliveries in flight to the endpoint at once
+    max_concurrency: Mapped[int] = mapped_column(Integer, default=4)
+    # Disabled subscriptions receive no new events; queued deliveries wait
+    enabled: Mapped[bool] = mapped_column(Boolean, default=True)
+    created_by: Mapped[str] = mapped_column(String(36), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+
+
+class WebhookDelivery(Base):
+    """An event waiting to be delivered to a subscription, or retried."""
+    __tablename__ = "webhook_deliveries"
+    __table_args__ = (
+        Index("ix_webhook_deliveries_subscription_next_attempt", "subscription_id", "next_attempt_at"),
+    )
+
+    id: Mapped[str] = mapped_column(
+        String(36), primary_key=True, default=lambda: str(uuid.uuid4())
+    )
+    subscription_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("webhook_subscriptions.id"), nullable=False
+    )
+    event: Mapped[str] = mapped_column(String(50), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    last_status_code: Mapped[int] = mapped_column(Integer, nullable=True)
+    last_error: Mapped[str] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+
+
+class WebhookDeadLetter(Base):
+    """A delivery that was rejected or ran out of attempts; kept until retried or deleted."""
+    __tablename__ = "webhook_dead_letters"
+    __table_args__ = (
+        Index("ix_webhook_dead_letters_subscription_failed", "subscription_id", "failed_at"),
+    )
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    subscription_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("webhook_subscriptions.id"), nullable=False
+    )
+    event: Mapped[str] = mapped_column(String(50), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    last_status_code: Mapped[int] = mapped_column(Integer, nullable=True)
+    last_error: Mapped[str] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    failed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
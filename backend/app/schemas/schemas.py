@@ -1,10 +1,11 @@
 """Pydantic schemas for API request/response validation."""
 
-from datetime import datetime
+import ipaddress
+from datetime import date, datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Annotated, Any, Dict, List, Optional
 from uuid import UUID
-from pydantic import BaseModel, Field
+from pydantic import AfterValidator, BaseModel, Field, HttpUrl, model_validator
 
 
 class TestCaseType(str, Enum):
@@ -81,7 +82,8 @@ class TestCaseGenerateRequest(BaseModel):
 class TestCaseFromDocxRequest(BaseModel):
     agent_id: Optional[str] = None
 
-class TestCaseResponse(BaseModel):
+class TestCaseSummary(BaseModel):
+    """List view of a test case; the columns it is read from are exactly these fields."""
     id: UUID
     test_suite_id: UUID
     name: str
@@ -90,14 +92,16 @@ class TestCaseResponse(BaseModel):
     status: ApprovalStatus
     ces_evaluation_id: Optional[str]
     source_type: str
-    original_input: Optional[str]
     current_version: int
-    generated_json: Optional[Dict[str, Any]] = None
     created_at: datetime
     updated_at: datetime
     class Config:
         from_attributes = True
 
+class TestCaseResponse(TestCaseSummary):
+    original_input: Optional[str] = None
+    generated_json: Optional[Dict[str, Any]] = None
+
 class TestCaseVersionResponse(BaseModel):
     id: UUID
     test_case_id: UUID
@@ -119,12 +123,26 @@ class ApprovalResponse(BaseModel):
     message: str
     new_version: Optional[int] = None
 
+class AdaptiveRepetition(BaseModel):
+    """Repeat each scenario in rounds until its pass rate is settled; run_count is the cap."""
+    round_size: int = Field(5, ge=1, le=100)
+    # Stop once the confidence interval of the pass rate is this narrow...
+    target_width: float = Field(0.2, gt=0, lt=1)
+    # ...or lies wholly above or below this pass rate
+    pass_threshold: float = Field(0.8, gt=0, lt=1)
+    confidence: float = Field(0.95, ge=0.5, lt=1)
+
 class RunEvaluationRequest(BaseModel):
     evaluation_ids: Optional[List[str]] = None
     use_dataset: bool = False
     app_version: Optional[str] = None
     run_count: int = 1
     generate_latency_report: bool = True
+    # Split the run into this many concurrent CES operations
+    shard_count: Optional[int] = Field(None, ge=2, le=100)
+    adaptive: Optional[AdaptiveRepetition] = None
+    # Submit only evaluations touched by agent/tool changes since the last passing run
+    impact_analysis: bool = False
 
 class EvaluationRunResponse(BaseModel):
     id: UUID
@@ -142,10 +160,32 @@ class EvaluationRunResponse(BaseModel):
     completed_at: Optional[datetime]
     created_at: datetime
     pass_rate: Optional[float] = None
+    schedule_id: Optional[UUID] = None
+    shard_count: Optional[int] = None
+    repetition: Optional[Dict] = None
+    change_impact: Optional[Dict] = None
     class Config:
         from_attributes = True
 
-class RunResultResponse(BaseModel):
+class EvaluationRunShardResponse(BaseModel):
+    id: UUID
+    evaluation_run_id: UUID
+    shard_index: int
+    state: RunState
+    attempts: int
+    ces_run_id: Optional[str]
+    total_count: int
+    passed_count: int
+    failed_count: int
+    error_count: int
+    last_error: Optional[str]
+    started_at: Optional[datetime]
+    completed_at: Optional[datetime]
+    class Config:
+        from_attributes = True
+
+class RunResultSummary(BaseModel):
+    """List view of a run result, without the diagnostics and conversation blobs."""
     id: UUID
     evaluation_run_id: UUID
     ces_result_id: Optional[str]
@@ -153,12 +193,50 @@ class RunResultResponse(BaseModel):
     passed: Optional[bool]
     score: Optional[float]
     failure_reason: Optional[str]
-    diagnostics: Optional[Dict]
-    conversation_log: Optional[Dict]
     created_at: datetime
     class Config:
         from_attributes = True
 
+class RunResultResponse(RunResultSummary):
+    diagnostics: Optional[Dict] = None
+    conversation_log: Optional[Dict] = None
+
+class TestCaseOutcomeResponse(BaseModel):
+    evaluation_run_id: UUID
+    run_completed_at: datetime
+    passed_count: int
+    failed_count: int
+    error_count: int
+    outcome: str
+    transition: Optional[str]
+    class Config:
+        from_attributes = True
+
+class RunChangeEntry(BaseModel):
+    test_case_id: UUID
+    test_case_name: str
+    passed_count: int
+    failed_count: int
+    error_count: int
+    flakiness: Optional[float]
+
+class RunChangesResponse(BaseModel):
+    """Test cases whose outcome changed since their previous run."""
+    counts: Dict[str, int]
+    new_failures: List[RunChangeEntry]
+    fixed: List[RunChangeEntry]
+    flaky: List[RunChangeEntry]
+
+class FlakyTestCaseResponse(BaseModel):
+    test_case_id: UUID
+    test_case_name: str
+    flakiness: float
+    run_count: int
+    flip_count: int
+    mixed_count: int
+    last_outcome: Optional[str]
+    last_run_id: Optional[UUID]
+
 class SessionMessage(BaseModel):
     text: str
     entry_agent: Optional[str] = None
@@ -181,10 +259,24 @@ class DashboardSummary(BaseModel):
 class AIAnalysisRequest(BaseModel):
     run_id: UUID
     question: Optional[str] = None
+    refresh: bool = False
 
 class AIAnalysisResponse(BaseModel):
     analysis: str
     run_id: UUID
+    cached: bool = False
+
+class TrendAnalysisRequest(BaseModel):
+    test_suite_id: UUID
+    question: Optional[str] = None
+    run_limit: int = Field(default=10, ge=2, le=50)
+    refresh: bool = False
+
+class TrendAnalysisResponse(BaseModel):
+    analysis: str
+    test_suite_id: UUID
+    run_ids: List[UUID]
+    cached: bool = False
 
 class TokenResponse(BaseModel):
     access_token: str
@@ -227,11 +319,34 @@ class HFTokenStatusResponse(BaseModel):
     last_updated: Optional[datetime] = None
 
 
+class SequentialSamplingConfig(BaseModel):
+    """Stop once the attack success rate is known to within ``precision``."""
+    # Target half-width of the interval, in percentage points
+    precision: float = Field(default=2.0, gt=0, le=50)
+    confidence: float = Field(default=0.95, ge=0.5, lt=1)
+    # Never stop before this many prompts have been scored
+    min_prompts: int = Field(default=100, ge=1, le=10000)
+
+
 class SecurityTestConfig(BaseModel):
     sample_size: int = Field(default=100, ge=1, le=10000)
     batch_size: int = Field(default=10, ge=1, le=100)
     timeout_per_prompt: int = Field(default=30, ge=1, le=120)
     shuffle: bool = True
+    sequential: Optional[SequentialSamplingConfig] = None
+    # Send prompts that got through before, or have little history, first
+    prioritize: bool = False
+    # Send only prompts not yet tested against this app version
+    incremental: bool = False
+    # CES app version the run is recorded against; defaults to the newest one
+    app_version: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_sampling(self):
+        # Early stopping assumes a random sample; a prioritised order biases it
+        if self.prioritize and self.sequential:
+            raise ValueError("prioritize cannot be combined with sequential sampling")
+        return self
 
 
 class SecurityTestRunCreate(BaseModel):
@@ -253,7 +368,13 @@ class SecurityTestRunResponse(BaseModel):
     total_prompts: int
     completed_prompts: int
     attack_success_count: int
+    blocked_count: Optional[int] = 0
+    low_confidence_count: Optional[int] = 0
     attack_success_rate: Optional[float]
+    achieved_precision: Optional[float] = None
+    precision_report: Optional[Dict[str, Any]] = None
+    app_version: Optional[str] = None
+    skipped_prompts: Optional[int] = 0
     ces_session_id: Optional[str]
     started_at: Optional[datetime]
     completed_at: Optional[datetime]
@@ -263,6 +384,20 @@ class SecurityTestRunResponse(BaseModel):
         from_attributes = True
 
 
+class LatencyPercentiles(BaseModel):
+    count: int
+    p50_ms: Optional[float]
+    p95_ms: Optional[float]
+    p99_ms: Optional[float]
+
+
+class LatencySummaryResponse(LatencyPercentiles):
+    """Latency of one or more security runs, merged from their sketches."""
+    run_count: int
+    categories: Dict[str, LatencyPercentiles]
+    endpoints: Dict[str, LatencyPercentiles]
+
+
 class SecurityTestResultResponse(BaseModel):
     id: str  # String UUID to match model
     security_test_run_id: str
@@ -296,3 +431,253 @@ class DatasetValidateResponse(BaseModel):
     size: Optional[int] = None
     columns: Optional[List[str]] = None
     error: Optional[str] = None
+
+
+# ─── LLM Usage Schemas ───────────────────────────────────────
+
+class LLMUsageBucket(BaseModel):
+    key: Optional[str]
+    calls: int
+    failed_calls: int
+    prompt_tokens: int
+    response_tokens: int
+    cached_tokens: int
+    total_tokens: int
+    avg_latency_ms: Optional[float]
+    max_latency_ms: Optional[float]
+
+
+class LLMUsageSummary(BaseModel):
+    group_by: str
+    since: datetime
+    buckets: List[LLMUsageBucket]
+
+
+class LLMBudgetStatus(BaseModel):
+    project_id: str
+    budget: Optional[int]
+    used_last_24h: int
+    remaining: Optional[int]
+
+
+# ─── Bulk Ingestion Schemas ──────────────────────────────────
+
+class IngestionState(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    ERROR = "error"
+
+
+class DocumentState(str, Enum):
+    PENDING = "pending"
+    PARSING = "parsing"
+    EXTRACTING = "extracting"
+    GENERATING = "generating"
+    COMPLETED = "completed"
+    DUPLICATE = "duplicate"
+    ERROR = "error"
+
+
+class IngestionDocumentResponse(BaseModel):
+    id: str
+    filename: str
+    content_hash: str
+    state: DocumentState
+    duplicate_of: Optional[str]
+    sections_count: int
+    duplicate_sections: int
+    requirements_count: int
+    generated_count: int
+    error: Optional[str]
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class IngestionJobResponse(BaseModel):
+    id: str
+    test_suite_id: str
+    agent_id: Optional[str]
+    state: IngestionState
+    total_documents: int
+    processed_documents: int
+    duplicate_documents: int
+    duplicate_sections: int
+    requirements_count: int
+    duplicate_requirements: int
+    generated_count: int
+    error: Optional[str]
+    started_at: Optional[datetime]
+    completed_at: Optional[datetime]
+    created_at: datetime
+    documents: List[IngestionDocumentResponse] = []
+
+    class Config:
+        from_attributes = True
+
+
+# ─── Trend Schemas ───────────────────────────────────────────
+
+class EvaluationTrendPoint(BaseModel):
+    day: date
+    run_count: int
+    total_count: int
+    passed_count: int
+    failed_count: int
+    pass_rate: Optional[float]
+
+
+class SecurityTrendPoint(BaseModel):
+    day: date
+    run_count: int
+    attempts: int
+    successes: int
+    attack_success_rate: Optional[float]
+    latency_p50_ms: Optional[float]
+    latency_p95_ms: Optional[float]
+    latency_p99_ms: Optional[float]
+
+
+class SecurityCategoryTrend(BaseModel):
+    category: str
+    run_count: int
+    attempts: int
+    successes: int
+    attack_success_rate: Optional[float]
+
+
+# ─── Schedule Schemas ────────────────────────────────────────
+
+class MissedRunPolicy(str, Enum):
+    SKIP = "skip"
+    RUN_ONCE = "run_once"
+
+
+class EvaluationScheduleCreate(BaseModel):
+    display_name: str = Field(..., min_length=1, max_length=255)
+    description: Optional[str] = None
+    cron_expression: str = Field(..., description="Five-field cron expression or @daily style macro")
+    timezone: str = "UTC"
+    test_suite_ids: List[UUID] = Field(default_factory=list, description="Empty runs every suite of the project")
+    run_count: int = Field(1, ge=1, le=10)
+    generate_latency_report: bool = True
+    jitter_seconds: int = Field(300, ge=0, le=3600)
+    missed_run_policy: MissedRunPolicy = MissedRunPolicy.RUN_ONCE
+    enabled: bool = True
+
+
+class EvaluationScheduleUpdate(BaseModel):
+    display_name: Optional[str] = Field(None, min_length=1, max_length=255)
+    description: Optional[str] = None
+    cron_expression: Optional[str] = None
+    timezone: Optional[str] = None
+    test_suite_ids: Optional[List[UUID]] = None
+    run_count: Optional[int] = Field(None, ge=1, le=10)
+    generate_latency_report: Optional[bool] = None
+    jitter_seconds: Optional[int] = Field(None, ge=0, le=3600)
+    missed_run_policy: Optional[MissedRunPolicy] = None
+    enabled: Optional[bool] = None
+
+
+class EvaluationScheduleResponse(BaseModel):
+    id: UUID
+    project_id: UUID
+    display_name: str
+    description: Optional[str]
+    cron_expression: str
+    timezone: str
+    test_suite_ids: List[UUID]
+    run_count: int
+    generate_latency_report: bool
+    jitter_seconds: int
+    missed_run_policy: MissedRunPolicy
+    enabled: bool
+    next_run_at: Optional[datetime]
+    last_run_at: Optional[datetime]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+# ─── Webhook Schemas ─────────────────────────────────────────
+
+class WebhookEvent(str, Enum):
+    RUN_STARTED = "run.started"
+    RUN_PROGRESS = "run.progress"
+    RUN_COMPLETED = "run.completed"
+    REGRESSION_DETECTED = "run.regression_detected"
+
+
+def public_https_url(url: HttpUrl) -> HttpUrl:
+    """Reject webhook endpoints that are not HTTPS or point at this network.
+
+    Only literal addresses and localhost names are checked here; names are
+    resolved and checked on every delivery, see app.services.webhook_dispatcher.
+    """
+    if url.scheme != "https":
+        raise ValueError("Webhook URLs must use https")
+    host = (url.host or "").rstrip(".").lower()
+    if host == "localhost" or host.endswith(".localhost"):
+        raise ValueError("Webhook URLs must not point at loopback or private hosts")
+    try:
+        address = ipaddress.ip_address(host.strip("[]"))
+    except ValueError:
+        return url
+    if not address.is_global:
+        raise ValueError("Webhook URLs must not point at loopback or private hosts")
+    return url
+
+
+WebhookUrl = Annotated[HttpUrl, AfterValidator(public_https_url)]
+
+
+class WebhookSubscriptionCreate(BaseModel):
+    url: WebhookUrl
+    description: Optional[str] = None
+    events: List[WebhookEvent] = Field(..., min_length=1)
+    max_concurrency: int = Field(4, ge=1, le=32, description="Deliveries in flight to the endpoint at once")
+    enabled: bool = True
+
+
+class WebhookSubscriptionUpdate(BaseModel):
+    url: Optional[WebhookUrl] = None
+    description: Optional[str] = None
+    events: Optional[List[WebhookEvent]] = Field(None, min_length=1)
+    max_concurrency: Optional[int] = Field(None, ge=1, le=32)
+    enabled: Optional[bool] = None
+
+
+class WebhookSubscriptionResponse(BaseModel):
+    id: UUID
+    project_id: UUID
+    url: str
+    description: Optional[str]
+    events: List[WebhookEvent]
+    max_concurrency: int
+    enabled: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class WebhookSecretResponse(WebhookSubscriptionResponse):
+    """Returned when a secret is created; it cannot be read back later."""
+    secret: str
+
+
+class WebhookDeadLetterResponse(BaseModel):
+    id: UUID
+    event: WebhookEvent
+    payload: Dict[str, Any]
+    attempts: int
+    last_status_code: Optional[int]
+    last_error: Optional[str]
+    created_at: datetime
+    failed_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,229 @@
+"""Adaptive repetition of scenario evaluations.
+
+Instead of submitting every scenario ``run_count`` times up front, an
+adaptive run submits rounds of ``round_size`` repetitions. After each round
+the Wilson interval of every scenario's pass rate is recomputed from the
+stored results. A scenario stops being repeated once its interval is
+narrower than ``target_width`` or lies wholly above or below
+``pass_threshold``; ``run_count`` caps the repetitions of the rest.
+
+The run's ``repetition`` JSON holds the settings, the repetitions done so far
+and each scenario's latest interval, so a restarted process resumes where the
+last round left off.
+"""
+
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import AsyncSessionLocal
+from app.models.evaluation_run import EvaluationRunRecord, RunResultRecord, RunState
+from app.models.webhook import WebhookEvent
+from app.services.ces_client import get_ces_client, poll_operation
+from app.services.dashboard_cache import invalidate_runs
+from app.services.result_ingestion import fetch_result_pages, ingest_run_results
+from app.services.rollups import roll_up_evaluation_run
+from app.services.run_events import evaluation_topic, publish_evaluation_run, run_events
+from app.services.webhooks import notify_evaluation_run
+from app.utils.stats import interval_settled, wilson_interval
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATES = (RunState.PENDING, RunState.RUNNING)
+
+
+def initial_repetition(
+    run_config: Dict[str, Any],
+    round_size: int,
+    target_width: float,
+    pass_threshold: float,
+    confidence: float,
+) -> Dict[str, Any]:
+    """``repetition`` of a new adaptive run; ``runCount`` of ``run_config`` is the cap."""
+    return {
+        "run_config": run_config,
+        "max_runs": run_config.get("runCount", 1),
+        "round_size": round_size,
+        "target_width": target_width,
+        "pass_threshold": pass_threshold,
+        "confidence": confidence,
+        "rounds": 0,
+        "runs_done": 0,
+        "round_runs": 0,
+        "scenarios": {},
+    }
+
+
+def _short_id(resource_name: str) -> str:
+    return resource_name.rsplit("/", 1)[-1]
+
+
+async def scenario_tallies(db: AsyncSession, run_id: str) -> Dict[str, Tuple[int, int]]:
+    """(passed, scored) result counts of a run per evaluation short id."""
+    rows = await db.execute(
+        select(
+            RunResultRecord.ces_evaluation_id,
+            func.sum(case((RunResultRecord.passed.is_(True), 1), else_=0)),
+            func.count(RunResultRecord.passed),
+        )
+        .where(RunResultRecord.evaluation_run_id == run_id)
+        .group_by(RunResultRecord.ces_evaluation_id)
+    )
+    tallies: Dict[str, Tuple[int, int]] = {}
+    for evaluation_id, passed, scored in rows:
+        if evaluation_id:
+            previous = tallies.get(_short_id(evaluation_id), (0, 0))
+            tallies[_short_id(evaluation_id)] = (previous[0] + (passed or 0), previous[1] + scored)
+    return tallies
+
+
+def scenario_intervals(
+    repetition: Dict[str, Any], tallies: Dict[str, Tuple[int, int]]
+) -> Dict[str, Dict[str, Any]]:
+    """Each scenario's pass counts, Wilson interval and whether it is settled."""
+    scenarios = {}
+    for evaluation_id in repetition["run_config"]["evaluationIds"]:
+        passed, trials = tallies.get(_short_id(evaluation_id), (0, 0))
+        low, high = wilson_interval(passed, trials, repetition["confidence"])
+        scenarios[evaluation_id] = {
+            "passed": passed,
+            "trials": trials,
+            "low": round(low, 4),
+            "high": round(high, 4),
+            "settled": trials > 0 and interval_settled(
+                low, high, repetition["target_width"], repetition["pass_threshold"]
+            ),
+        }
+    return scenarios
+
+
+def open_scenarios(repetition: Dict[str, Any]) -> List[str]:
+    """Scenarios still to be repeated; empty once settled or out of repetitions."""
+    if repetition["runs_done"] >= repetition["max_runs"]:
+        return []
+    if not repetition["rounds"]:
+        return list(repetition["run_config"]["evaluationIds"])
+    return [
+        evaluation_id
+        for evaluation_id, scenario in repetition["scenarios"].items()
+        if not scenario["settled"]
+    ]
+
+
+async def _record_round(db: AsyncSession, eval_run: EvaluationRunRecord, rounds_done: int) -> None:
+    """Refresh a run's totals and scenario intervals from its stored results."""
+    tallies = await scenario_tallies(db, eval_run.id)
+    repetition = eval_run.repetition
+    counts = (await db.execute(
+        select(
+            func.count(),
+            func.sum(case((RunResultRecord.passed.is_(True), 1), else_=0)),
+            func.sum(case((RunResultRecord.passed.is_(False), 1), else_=0)),
+        ).where(RunResultRecord.evaluation_run_id == eval_run.id)
+    )).one()
+    eval_run.total_count, eval_run.passed_count, eval_run.failed_count = (
+        counts[0], counts[1] or 0, counts[2] or 0
+    )
+    eval_run.error_count = eval_run.total_count - eval_run.passed_count - eval_run.failed_count
+    if eval_run.total_count > 0:
+        eval_run.pass_rate = (eval_run.passed_count / eval_run.total_count) * 100
+
+    # JSON columns are not change-tracked in place, so assign a new dict
+    eval_run.repetition = {
+        **repetition,
+        "rounds": rounds_done,
+        "runs_done": repetition["runs_done"] + (repetition["round_runs"] if rounds_done else 0),
+        "round_runs": 0,
+        "scenarios": scenario_intervals(repetition, tallies),
+    }
+
+
+async def _finish(db: AsyncSession, eval_run: EvaluationRunRecord) -> None:
+    repetition = eval_run.repetition
+    planned = repetition["max_runs"] * len(repetition["run_config"]["evaluationIds"])
+    eval_run.repetition = {
+        **repetition,
+        "runs_saved": max(0, planned - sum(s["trials"] for s in repetition["scenarios"].values())),
+    }
+    eval_run.state = RunState.COMPLETED
+    eval_run.completed_at = datetime.now(timezone.utc)
+    await roll_up_evaluation_run(db, eval_run)
+    await notify_evaluation_run(db, eval_run, WebhookEvent.RUN_COMPLETED)
+
+
+async def run_adaptive(run_id: str, app_id: str) -> None:
+    """Submit rounds for a run's unsettled scenarios until none are left."""
+    ces = get_ces_client()
+    try:
+        while True:
+            async with AsyncSessionLocal() as db:
+                # Locked until the round's operation id is stored, so two
+                # processes driving the run never submit the same round
+                eval_run = await db.scalar(
+                    select(EvaluationRunRecord)
+                    .where(EvaluationRunRecord.id == run_id)
+                    .with_for_update()
+                )
+                if eval_run is None or eval_run.state not in ACTIVE_STATES:
+                    return
+                operation_id = eval_run.ces_operation_id
+                if operation_id is None:
+                    repetition = eval_run.repetition
+                    evaluation_ids = open_scenarios(repetition)
+                    if not evaluation_ids:
+                        await _finish(db, eval_run)
+                        await db.commit()
+                        publish_evaluation_run(eval_run)
+                        return
+                    runs = min(repetition["round_size"], repetition["max_runs"] - repetition["runs_done"])
+                    operation = await ces.run_evaluation(app_id, {
+                        **repetition["run_config"], "evaluationIds": evaluation_ids, "runCount": runs,
+                    })
+                    operation_id = operation.get("name", "").split("/")[-1]
+                    eval_run.ces_operation_id = operation_id
+                    eval_run.repetition = {**repetition, "round_runs": runs}
+                    await db.commit()
+
+            result = await poll_operation(ces, operation_id)
+            ces_run_id = result.get("evaluationRun", {}).get("name", "").split("/")[-1]
+            pages = await fetch_result_pages(ces, app_id, ces_run_id)
+
+            async with AsyncSessionLocal() as db:
+                eval_run = await db.scalar(
+                    select(EvaluationRunRecord)
+                    .where(EvaluationRunRecord.id == run_id)
+                    .with_for_update()
+                )
+                if eval_run is None or eval_run.state not in ACTIVE_STATES:
+                    return
+                # Another process already stored this round
+                if eval_run.ces_operation_id != operation_id:
+                    continue
+                await ingest_run_results(db, eval_run, pages, replace=False)
+                eval_run.ces_run_id = ces_run_id
+                eval_run.ces_operation_id = None
+                await _record_round(db, eval_run, eval_run.repetition["rounds"] + 1)
+                await db.commit()
+                publish_evaluation_run(eval_run)
+
+    except Exception:
+        logger.exception("Adaptive evaluation run %s failed", run_id)
+        async with AsyncSessionLocal() as db:
+            failed = await db.execute(
+                update(EvaluationRunRecord)
+                .where(
+                    EvaluationRunRecord.id == run_id,
+                    EvaluationRunRecord.state.in_(ACTIVE_STATES),
+                )
+                .values(state=RunState.ERROR, completed_at=datetime.now(timezone.utc))
+            )
+            if failed.rowcount:
+                await invalidate_runs(db, [run_id])
+                eval_run = await db.get(EvaluationRunRecord, run_id)
+                await notify_evaluation_run(db, eval_run, WebhookEvent.RUN_COMPLETED)
+            await db.commit()
+        if failed.rowcount:
+            run_events.publish_state(evaluation_topic(run_id), RunState.ERROR.value)
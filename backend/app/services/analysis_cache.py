@@ -0,0 +1,158 @@
+"""Cache for Gemini analyses of evaluation runs.
+
+Completed runs are immutable, so an analysis is reusable for as long as the
+run's results are unchanged. Entries are keyed by subject, a digest of the
+analysed input, the normalised question and the model. The clustered failure
+summary of each run is stored once and shared by every question asked about
+that run and by cross-run trend analyses.
+"""
+
+import asyncio
+import hashlib
+import re
+from typing import Any, Dict, Optional, Sequence
+
+from sqlalchemy import select, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.analysis import AnalysisCacheEntry, RunAnalysisSummary
+from app.models.evaluation_run import EvaluationRunRecord, RunResultRecord
+from app.services.failure_clustering import summarize_for_analysis
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question(question: Optional[str]) -> str:
+    """Case- and whitespace-insensitive form of a question; '' for the default analysis."""
+    return _WHITESPACE.sub(" ", (question or "").strip().lower())
+
+
+def question_hash(question: Optional[str]) -> str:
+    return hashlib.sha256(normalize_question(question).encode()).hexdigest()
+
+
+def combine_digests(parts: Sequence[str]) -> str:
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+
+async def results_digest(db: AsyncSession, run_id: str) -> str:
+    """Digest of a run's results from one aggregate query, without loading rows."""
+    row = (await db.execute(
+        select(
+            func.count(RunResultRecord.id),
+            func.coalesce(func.sum(case((RunResultRecord.passed == True, 1), else_=0)), 0),  # noqa: E712
+            func.coalesce(func.sum(RunResultRecord.score), 0),
+            func.min(RunResultRecord.created_at),
+            func.max(RunResultRecord.created_at),
+        ).where(RunResultRecord.evaluation_run_id == str(run_id))
+    )).one()
+    return combine_digests([str(run_id)] + [str(v) for v in row])
+
+
+async def get_cached_analysis(
+    db: AsyncSession, subject: str, digest: str, question: Optional[str], model: str
+) -> Optional[AnalysisCacheEntry]:
+    result = await db.execute(
+        select(AnalysisCacheEntry).where(
+            AnalysisCacheEntry.subject == subject,
+            AnalysisCacheEntry.digest == digest,
+            AnalysisCacheEntry.question_hash == question_hash(question),
+            AnalysisCacheEntry.model == model,
+        )
+    )
+    return result.scalar_one_or_none()
+
+
+async def store_analysis(
+    db: AsyncSession,
+    subject: str,
+    digest: str,
+    question: Optional[str],
+    model: str,
+    analysis: str,
+) -> AnalysisCacheEntry:
+    """Insert or replace the cache entry for this key."""
+    entry = await get_cached_analysis(db, subject, digest, question, model)
+    if entry is None:
+        entry = AnalysisCacheEntry(
+            subject=subject,
+            digest=digest,
+            question_hash=question_hash(question),
+            question=question,
+            model=model,
+            analysis=analysis,
+        )
+        db.add(entry)
+    else:
+        entry.analysis = analysis
+    await db.flush()
+    return entry
+
+
+async def get_or_build_run_summary(
+    db: AsyncSession, run_id: str, digest: str
+) -> Dict[str, Any]:
+    """Return the stored clustered summary for a run, rebuilding it if results changed."""
+    stored = await db.get(RunAnalysisSummary, str(run_id))
+    if stored is not None and stored.results_digest == digest:
+        return stored.summary
+
+    rows = await db.execute(
+        select(
+            RunResultRecord.test_case_name,
+            RunResultRecord.passed,
+            RunResultRecord.score,
+            RunResultRecord.failure_reason,
+            RunResultRecord.diagnostics,
+        ).where(RunResultRecord.evaluation_run_id == str(run_id))
+    )
+    results_data = [dict(row) for row in rows.mappings().all()]
+
+    # Cluster failures off the event loop; only representatives reach Gemini
+    summary = await asyncio.to_thread(
+        summarize_for_analysis, results_data, settings.ANALYSIS_MAX_CLUSTERS
+    )
+
+    if stored is None:
+        db.add(RunAnalysisSummary(
+            evaluation_run_id=str(run_id), results_digest=digest, summary=summary
+        ))
+    else:
+        stored.results_digest = digest
+        stored.summary = summary
+    await db.flush()
+    return summary
+
+
+def compact_run_summary(
+    run: EvaluationRunRecord, summary: Dict[str, Any], max_clusters: int = 10
+) -> Dict[str, Any]:
+    """Per-run entry for trend prompts: totals plus the largest failure modes."""
+    return {
+        "run_id": run.id,
+        "created_at": run.created_at.isoformat() if run.created_at else None,
+        "app_version": run.app_version,
+        "pass_rate": run.pass_rate,
+        **summary["overview"],
+        "top_failures": [
+            {
+                "count": c["count"],
+                "keywords": c["keywords"],
+                "failure_reason": (c.get("failure_reason") or "")[:300],
+            }
+            for c in summary["clusters"][:max_clusters]
+        ],
+    }
+
+
+async def delete_run_analyses(db: AsyncSession, run_id: str) -> None:
+    """Drop cached analyses and the stored summary of a deleted run."""
+    cached = await db.execute(
+        select(AnalysisCacheEntry).where(AnalysisCacheEntry.subject == f"run:{run_id}")
+    )
+    for entry in cached.scalars().all():
+        await db.delete(entry)
+    stored = await db.get(RunAnalysisSummary, str(run_id))
+    if stored is not None:
+        await db.delete(stored)
@@ -0,0 +1,352 @@
+"""Bulk ingestion of specification documents.
+
+Uploads are expanded from ZIP archives, deduplicated by content hash and
+parsed in a process pool so CPU-bound XML parsing runs in parallel and off
+the event loop. Sections and requirements repeated across documents of the
+same job are dropped before they reach Gemini. ``run_ingestion_job`` is the
+background task that drives one job to completion. Uploads are held only in
+memory, so a job cannot resume after its process exits; ``fail_stale_jobs``
+marks such jobs ERROR from the evaluation reconcile loop.
+"""
+
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import posixpath
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import exists, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.ingestion import DocumentState, IngestionDocument, IngestionJob, IngestionState
+from app.services.ces_client import get_ces_client
+from app.services.docx_parser import ParsedDocument, parse_document
+from app.services.gemini_service import get_gemini_service
+from app.services.llm_usage import LLMBudgetExceeded, llm_call_scope
+from app.services.test_case_generation import (
+    fetch_agent_context,
+    get_suite_project_id,
+    save_generated_test_case,
+)
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+ACTIVE_DOCUMENT_STATES = (
+    DocumentState.PENDING, DocumentState.PARSING, DocumentState.EXTRACTING, DocumentState.GENERATING,
+)
+# Jobs with no document progress for this long died with their process
+STALE_JOB_AFTER = timedelta(minutes=30)
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+class IngestionError(ValueError):
+    """Raised when an upload cannot be accepted for ingestion."""
+
+
+@dataclass
+class UploadedDocument:
+    filename: str
+    data: bytes
+
+    @property
+    def content_hash(self) -> str:
+        return hashlib.sha256(self.data).hexdigest()
+
+
+def _is_docx_member(name: str) -> bool:
+    base = posixpath.basename(name)
+    return (
+        name.lower().endswith(".docx")
+        and not name.startswith("__MACOSX/")
+        and not base.startswith("~$")  # Word lock files
+    )
+
+
+def expand_uploads(uploads: Iterable[Tuple[str, bytes]]) -> List[UploadedDocument]:
+    """
+    Flatten uploaded .docx files and ZIP archives into a list of documents.
+
+    Raises:
+        IngestionError: On unsupported files, or when the document count or
+            total uncompressed size exceeds the configured limits
+    """
+    documents: List[UploadedDocument] = []
+    total_bytes = 0
+
+    def add(filename: str, data: bytes) -> None:
+        nonlocal total_bytes
+        total_bytes += len(data)
+        if total_bytes > settings.BULK_INGEST_MAX_BYTES:
+            raise IngestionError(
+                f"Upload exceeds {settings.BULK_INGEST_MAX_BYTES} bytes uncompressed"
+            )
+        documents.append(UploadedDocument(filename=filename, data=data))
+        if len(documents) > settings.BULK_INGEST_MAX_DOCUMENTS:
+            raise IngestionError(
+                f"Upload contains more than {settings.BULK_INGEST_MAX_DOCUMENTS} documents"
+            )
+
+    for filename, data in uploads:
+        lower = (filename or "").lower()
+        if lower.endswith(".docx"):
+            add(filename, data)
+        elif lower.endswith(".zip"):
+            try:
+                archive = zipfile.ZipFile(io.BytesIO(data))
+            except zipfile.BadZipFile:
+                raise IngestionError(f"{filename} is not a valid ZIP archive")
+            with archive:
+                for info in archive.infolist():
+                    if info.is_dir() or not _is_docx_member(info.filename):
+                        continue
+                    # Check the declared size before inflating anything
+                    if total_bytes + info.file_size > settings.BULK_INGEST_MAX_BYTES:
+                        raise IngestionError(
+                            f"Upload exceeds {settings.BULK_INGEST_MAX_BYTES} bytes uncompressed"
+                        )
+                    add(f"{filename}/{info.filename}", archive.read(info))
+        else:
+            raise IngestionError(f"Unsupported file type: {filename}")
+
+    if not documents:
+        raise IngestionError("No .docx documents found in upload")
+    return documents
+
+
+def normalize_text(text: str) -> str:
+    return _WHITESPACE.sub(" ", text.strip().lower())
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode()).hexdigest()
+
+
+def unique_sections(
+    parsed: ParsedDocument, seen: Set[str]
+) -> Tuple[List[dict], int]:
+    """
+    Drop sections whose content was already seen in this job.
+
+    ``seen`` is updated in place. Returns the kept sections and the number
+    dropped as duplicates.
+    """
+    kept, duplicates = [], 0
+    for section in parsed.sections:
+        digest = text_hash("\n".join(section["content"]))
+        if digest in seen:
+            duplicates += 1
+            continue
+        seen.add(digest)
+        kept.append(section)
+    return kept, duplicates
+
+
+def sections_to_text(sections: List[dict]) -> str:
+    return "\n\n".join(
+        f"# {section['heading']}\n\n" + "\n\n".join(section["content"])
+        for section in sections
+    )
+
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    """Shared process pool for document parsing, created on first use."""
+    global _pool
+    if _pool is None:
+        workers = settings.BULK_INGEST_WORKERS or max(1, (os.cpu_count() or 2) - 1)
+        _pool = ProcessPoolExecutor(max_workers=workers)
+    return _pool
+
+
+def shutdown_parse_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+async def parse_in_pool(data: bytes) -> ParsedDocument:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_parse_pool(), parse_document, data)
+
+
+async def _parse_document(document_id: str, data: bytes):
+    try:
+        return document_id, await parse_in_pool(data), None
+    except Exception as e:
+        return document_id, None, e
+
+
+async def run_ingestion_job(job_id: str, documents: List[Tuple[str, bytes]]):
+    """Background task: parse documents in the process pool and generate test cases.
+
+    Documents are handled in the order their parses finish. Sections and
+    requirements already seen earlier in the job are skipped.
+    """
+    async with AsyncSessionLocal() as db:
+        job = None
+        try:
+            job = await db.scalar(
+                select(IngestionJob)
+                .options(selectinload(IngestionJob.documents))
+                .where(IngestionJob.id == job_id)
+            )
+            records = {record.id: record for record in job.documents}
+            job.state = IngestionState.RUNNING
+            job.started_at = datetime.now(timezone.utc)
+            for document_id, _ in documents:
+                records[document_id].state = DocumentState.PARSING
+            await db.commit()
+
+            gemini = get_gemini_service()
+            project_id = await get_suite_project_id(db, job.test_suite_id)
+            agent_context = None
+            if job.agent_id:
+                agent_context = await fetch_agent_context(get_ces_client(), job.agent_id)
+
+            seen_sections: set = set()
+            seen_requirements: set = set()
+            parses = [_parse_document(document_id, data) for document_id, data in documents]
+
+            for next_parsed in asyncio.as_completed(parses):
+                document_id, parsed, error = await next_parsed
+                record = records[document_id]
+                try:
+                    if error:
+                        raise error
+                    sections, duplicate_sections = unique_sections(parsed, seen_sections)
+                    record.sections_count = len(parsed.sections)
+                    record.duplicate_sections = duplicate_sections
+                    job.duplicate_sections += duplicate_sections
+
+                    if sections:
+                        record.state = DocumentState.EXTRACTING
+                        await db.commit()
+                        await _generate_from_sections(
+                            db, job, record, sections, gemini, project_id,
+                            agent_context, seen_requirements,
+                        )
+                    record.state = DocumentState.COMPLETED
+                except LLMBudgetExceeded as e:
+                    record.state = DocumentState.ERROR
+                    record.error = str(e)
+                    raise
+                except Exception as e:
+                    record.state = DocumentState.ERROR
+                    record.error = str(e)
+                job.processed_documents += 1
+                await db.commit()
+
+            job.state = IngestionState.COMPLETED
+            job.completed_at = datetime.now(timezone.utc)
+            await db.commit()
+
+        except Exception as e:
+            logger.exception("Ingestion job %s failed", job_id)
+            if job:
+                job.state = IngestionState.ERROR
+                job.error = str(e)
+                job.completed_at = datetime.now(timezone.utc)
+                for record in job.documents:
+                    if record.state in ACTIVE_DOCUMENT_STATES:
+                        record.state = DocumentState.ERROR
+                        record.error = record.error or "Ingestion job failed"
+                await db.commit()
+
+
+async def fail_stale_jobs() -> int:
+    """Fail unfinished jobs whose documents stopped progressing; returns how many.
+
+    Their unfinished documents are failed with them.
+    """
+    now = datetime.now(timezone.utc)
+    stale_before = now - STALE_JOB_AFTER
+    error = "Ingestion stopped before completion"
+    async with AsyncSessionLocal() as db:
+        job_ids = (await db.scalars(
+            update(IngestionJob)
+            .where(
+                IngestionJob.state.in_((IngestionState.PENDING, IngestionState.RUNNING)),
+                func.coalesce(IngestionJob.started_at, IngestionJob.created_at) < stale_before,
+                ~exists().where(
+                    IngestionDocument.job_id == IngestionJob.id,
+                    IngestionDocument.updated_at >= stale_before,
+                ),
+            )
+            .values(state=IngestionState.ERROR, error=error, completed_at=now)
+            .returning(IngestionJob.id)
+        )).all()
+        if job_ids:
+            await db.execute(
+                update(IngestionDocument)
+                .where(
+                    IngestionDocument.job_id.in_(job_ids),
+                    IngestionDocument.state.in_(ACTIVE_DOCUMENT_STATES),
+                )
+                .values(state=DocumentState.ERROR, error=error)
+            )
+        await db.commit()
+    return len(job_ids)
+
+
+async def _generate_from_sections(
+    db: AsyncSession,
+    job: IngestionJob,
+    record: IngestionDocument,
+    sections: List[dict],
+    gemini,
+    project_id: Optional[str],
+    agent_context: Optional[dict],
+    seen_requirements: set,
+):
+    """Extract requirements from a document's new sections and generate a test case for each."""
+    with llm_call_scope(project_id, "test_cases.bulk_ingest") as llm_scope:
+        requirements = await gemini.extract_test_requirements(sections_to_text(sections))
+
+        fresh = []
+        for req in requirements:
+            description = (req.get("description") or "").strip()
+            digest = text_hash(description)
+            if not description or digest in seen_requirements:
+                job.duplicate_requirements += 1
+                continue
+            seen_requirements.add(digest)
+            fresh.append((description, req.get("type_hint") or "golden"))
+
+        record.requirements_count = len(fresh)
+        job.requirements_count += len(fresh)
+        record.state = DocumentState.GENERATING
+        await db.commit()
+
+        name = posixpath.splitext(posixpath.basename(record.filename))[0]
+        for description, test_type in fresh:
+            generated = await gemini.generate_test_case(
+                user_input=description,
+                agent_context=agent_context,
+                test_type=test_type,
+            )
+            await save_generated_test_case(
+                db,
+                job.test_suite_id,
+                generated,
+                test_type,
+                original_input=description,
+                source_type="docx",
+                default_name=f"{name} {record.generated_count + 1}",
+                llm_call=llm_scope.last_call,
+            )
+            record.generated_count += 1
+            job.generated_count += 1
+            await db.commit()
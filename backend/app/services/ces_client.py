@@ -1,5 +1,7 @@
 """Google CES (Customer Engagement Suite) API client."""
 
+import asyncio
+import time
 import httpx
 from typing import Any, Dict, List, Optional
 from app.core.config import settings
@@ -167,13 +169,16 @@ class CESClient:
         )
 
     async def get_evaluation_run_results(
-        self, app_id: str, run_id: str, page_size: int = 100
+        self, app_id: str, run_id: str, page_size: int = 100, page_token: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Get results for an evaluation run."""
+        """Get one page of results for an evaluation run."""
+        params = {"pageSize": page_size}
+        if page_token:
+            params["pageToken"] = page_token
         return await self._request(
             "GET",
             f"projects/{self.project_id}/locations/{self.location}/apps/{app_id}/evaluationRuns/{run_id}/results",
-            params={"pageSize": page_size},
+            params=params,
         )
 
     # Sessions (Live Testing)
@@ -249,3 +254,20 @@ def get_ces_client() -> CESClient:
     if _ces_client is None:
         _ces_client = CESClient()
     return _ces_client
+
+
+async def poll_operation(ces: CESClient, operation_id: str, timeout: int = 600):
+    """Poll operation until completion."""
+    start_time = time.time()
+
+    while time.time() - start_time < timeout:
+        operation = await ces.get_operation(operation_id)
+
+        if operation.get("done"):
+            if operation.get("error"):
+                raise Exception(f"Operation failed: {operation.get('error')}")
+            return operation.get("result", {})
+
+        await asyncio.sleep(5)
+
+    raise TimeoutError("Operation timed out")
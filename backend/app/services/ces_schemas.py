@@ -0,0 +1,103 @@
+"""Response schemas for Gemini structured output.
+
+These mirror the parts of the CES v1beta Evaluation resource that the
+generation prompts ask for, expressed in the OpenAPI subset accepted by
+``GenerationConfig.response_schema``.
+"""
+
+from typing import Any, Dict
+
+_USER_INPUT = {
+    "type": "object",
+    "properties": {
+        "text": {"type": "string", "nullable": True},
+        "dtmf": {"type": "string", "nullable": True},
+        "event": {"type": "string", "nullable": True},
+    },
+}
+
+GOLDEN_EVALUATION_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "displayName": {"type": "string"},
+        "description": {"type": "string"},
+        "golden": {
+            "type": "object",
+            "properties": {
+                "turns": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "userInput": _USER_INPUT,
+                            "expectedAgentResponse": {"type": "string", "nullable": True},
+                            "evaluationExpectations": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                            },
+                        },
+                        "required": ["userInput"],
+                    },
+                },
+            },
+            "required": ["turns"],
+        },
+    },
+    "required": ["displayName", "golden"],
+}
+
+SCENARIO_EVALUATION_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "displayName": {"type": "string"},
+        "description": {"type": "string"},
+        "scenario": {
+            "type": "object",
+            "properties": {
+                "task": {"type": "string"},
+                "rubrics": {"type": "array", "items": {"type": "string"}},
+                "userGoalBehavior": {
+                    "type": "string",
+                    "enum": ["SATISFIED", "REJECTED", "IGNORED"],
+                },
+                "userFacts": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "name": {"type": "string"},
+                            "value": {"type": "string"},
+                        },
+                        "required": ["name", "value"],
+                    },
+                },
+                "maxTurns": {"type": "integer"},
+            },
+            "required": ["task", "rubrics"],
+        },
+    },
+    "required": ["displayName", "scenario"],
+}
+
+TEST_REQUIREMENTS_SCHEMA: Dict[str, Any] = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "description": {"type": "string"},
+            "type_hint": {
+                "type": "string",
+                "enum": ["golden", "scenario"],
+                "nullable": True,
+            },
+        },
+        "required": ["description"],
+    },
+}
+
+
+def evaluation_schema(test_type: str) -> Dict[str, Any]:
+    """Return the response schema for a golden or scenario evaluation."""
+    if test_type == "golden":
+        return GOLDEN_EVALUATION_SCHEMA
+    return SCENARIO_EVALUATION_SCHEMA
@@ -0,0 +1,163 @@
+"""Change-impact selection of evaluations.
+
+Impact-analysis runs and scheduled runs record a fingerprint of the CES app
+they ran against: one hash per agent and tool, taken from the CES list
+endpoints. Other runs skip those calls. An impact-analysis run diffs the
+current fingerprint against the one recorded by the suite's last passing run
+and submits only the evaluations whose test case mentions a changed agent or
+tool by display name or id.
+
+Generated test cases have no structured link to agents or tools, so a
+mention in the current version's text is what ties them together. A change
+that no test case mentions (a root agent's instructions, say) may affect any
+conversation, so it falls back to running the whole suite.
+"""
+
+import hashlib
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.evaluation_run import EvaluationRunRecord, RunState
+from app.models.test_case import ApprovalStatus, TestCase, TestCaseVersion
+
+# Server-maintained fields that change without the resource changing
+VOLATILE_FIELDS = {"createTime", "updateTime", "etag"}
+# Names shorter than this match too much text to be useful
+MIN_NAME_LENGTH = 3
+
+_SEPARATORS = re.compile(r"[\W_]+")
+
+
+def resource_fingerprint(resource: Dict[str, Any]) -> str:
+    stable = {k: v for k, v in resource.items() if k not in VOLATILE_FIELDS}
+    return hashlib.sha256(json.dumps(stable, sort_keys=True, default=str).encode()).hexdigest()
+
+
+async def app_snapshot(ces, app_id: str) -> Dict[str, Dict[str, str]]:
+    """Fingerprint of every agent and tool of a CES app, keyed by resource name."""
+    snapshot: Dict[str, Dict[str, str]] = {}
+    listings = (("agent", "agents", ces.list_agents), ("tool", "tools", ces.list_tools))
+    for kind, collection, list_resources in listings:
+        for resource in (await list_resources(app_id)).get(collection, []):
+            name = resource.get("name") or resource.get("displayName")
+            if not name:
+                continue
+            snapshot[name] = {
+                "kind": kind,
+                "display_name": resource.get("displayName", ""),
+                "hash": resource_fingerprint(resource),
+            }
+    return snapshot
+
+
+def diff_snapshots(
+    old: Dict[str, Dict[str, str]], new: Dict[str, Dict[str, str]]
+) -> List[Dict[str, str]]:
+    """Agents and tools added, removed or modified between two snapshots."""
+    changes = []
+    for name in sorted(old.keys() | new.keys()):
+        before, after = old.get(name), new.get(name)
+        if before and after and before["hash"] == after["hash"]:
+            continue
+        change = "added" if before is None else "removed" if after is None else "modified"
+        resource = after or before
+        changes.append({
+            "name": name,
+            "kind": resource["kind"],
+            "display_name": resource.get("display_name", ""),
+            "change": change,
+        })
+    return changes
+
+
+def _normalize(text: str) -> str:
+    return f" {_SEPARATORS.sub(' ', text.casefold()).strip()} "
+
+
+def mentions(text: str, change: Dict[str, str]) -> bool:
+    """True when normalised ``text`` names the changed resource as a whole word."""
+    for name in (change.get("display_name", ""), change["name"].rsplit("/", 1)[-1]):
+        needle = _normalize(name)
+        if len(needle.strip()) >= MIN_NAME_LENGTH and needle in text:
+            return True
+    return False
+
+
+async def last_passing_snapshot(
+    db: AsyncSession, test_suite_id: str
+) -> Tuple[Optional[str], Optional[Dict[str, Dict[str, str]]]]:
+    """Id and app snapshot of the suite's latest run that completed without failures."""
+    row = (await db.execute(
+        select(EvaluationRunRecord.id, EvaluationRunRecord.app_snapshot)
+        .where(
+            EvaluationRunRecord.test_suite_id == test_suite_id,
+            EvaluationRunRecord.state == RunState.COMPLETED,
+            EvaluationRunRecord.failed_count == 0,
+            EvaluationRunRecord.error_count == 0,
+            EvaluationRunRecord.app_snapshot.isnot(None),
+        )
+        .order_by(EvaluationRunRecord.created_at.desc())
+        .limit(1)
+    )).first()
+    return (row[0], row[1]) if row else (None, None)
+
+
+async def evaluation_texts(db: AsyncSession, test_suite_id: str) -> Dict[str, str]:
+    """Normalised text of each submitted test case's current version, by CES evaluation id."""
+    rows = await db.execute(
+        select(TestCase.ces_evaluation_id, TestCase.name, TestCase.description,
+               TestCaseVersion.generated_json)
+        .outerjoin(
+            TestCaseVersion,
+            (TestCaseVersion.test_case_id == TestCase.id)
+            & (TestCaseVersion.version_number == TestCase.current_version),
+        )
+        .where(
+            TestCase.test_suite_id == test_suite_id,
+            TestCase.status == ApprovalStatus.SUBMITTED,
+            TestCase.ces_evaluation_id.isnot(None),
+        )
+    )
+    return {
+        evaluation_id: _normalize(" ".join([
+            name or "", description or "", json.dumps(generated or {}, ensure_ascii=False),
+        ]))
+        for evaluation_id, name, description, generated in rows
+    }
+
+
+async def select_impacted(
+    db: AsyncSession,
+    test_suite_id: str,
+    evaluation_ids: List[str],
+    snapshot: Optional[Dict[str, Dict[str, str]]],
+) -> Tuple[List[str], Dict[str, Any]]:
+    """The ``evaluation_ids`` affected by changes since the last passing run, and why."""
+    baseline_id, baseline = await last_passing_snapshot(db, test_suite_id)
+    report: Dict[str, Any] = {"baseline_run_id": baseline_id, "changes": [], "full_run_reason": None}
+    selected = list(evaluation_ids)
+    if snapshot is None:
+        report["full_run_reason"] = "The app's agents and tools could not be listed"
+    elif baseline is None:
+        report["full_run_reason"] = "No earlier passing run recorded the app's agents and tools"
+    else:
+        changes = diff_snapshots(baseline, snapshot)
+        texts = await evaluation_texts(db, test_suite_id)
+        hits = set()
+        for change in changes:
+            affected = {e for e in evaluation_ids if mentions(texts.get(e, ""), change)}
+            change["test_cases"] = len(affected)
+            hits |= affected
+        report["changes"] = changes
+        if any(not change["test_cases"] for change in changes):
+            report["full_run_reason"] = "A change is not mentioned by any test case"
+        else:
+            selected = [e for e in evaluation_ids if e in hits]
+
+    report["selected"] = len(selected)
+    report["skipped"] = len(evaluation_ids) - len(selected)
+    return selected, report
@@ -0,0 +1,221 @@
+"""Dashboard summaries computed by one aggregate query and cached per project.
+
+A cached row is served until a flush changes what it counts: a test case is
+added, deleted or changes status, or an evaluation run is added, deleted or
+changes state or counts. Such a flush bumps the ``version`` of the affected
+project rows and of the global row in the same transaction, so a dashboard
+read is a primary-key lookup unless something changed since the last one.
+Core UPDATEs of runs bypass the flush, so they call ``invalidate_runs``.
+
+Reads never write: a stale row is answered from the aggregate, and
+``refresh_summaries`` stores fresh counters from the background reconcile
+loop. It only stores a result if the version it started from is still
+current, so a write that commits while the aggregate runs is never masked.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import case, event, func, inspect, select, true, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.dashboard import GLOBAL_SCOPE, DashboardSummaryCache
+from app.models.evaluation_run import EvaluationRunRecord, RunState
+from app.models.project import Project
+from app.models.test_case import ApprovalStatus, TestCase
+from app.models.test_suite import TestSuite
+from app.schemas.schemas import DashboardSummary
+
+COUNTERS = (
+    "total_test_cases", "approved_count", "pending_count",
+    "total_runs", "total_passed", "total_failed", "last_run_pass_rate",
+)
+
+# Attributes whose changes move the dashboard counters
+_TRACKED = {
+    TestCase: ("status", "test_suite_id"),
+    EvaluationRunRecord: ("state", "test_suite_id", "total_count", "passed_count", "failed_count"),
+}
+
+_SUITES_KEY = "dashboard_suites"
+_PROJECTS_KEY = "dashboard_projects"
+
+
+def summary_query(project_id: Optional[str] = None):
+    """All dashboard counters in a single statement."""
+    def in_scope(suite_column):
+        if project_id is None:
+            return []
+        return [suite_column.in_(select(TestSuite.id).where(TestSuite.project_id == project_id))]
+
+    def count_status(status: ApprovalStatus):
+        return func.coalesce(func.sum(case((TestCase.status == status, 1), else_=0)), 0)
+
+    test_cases = select(
+        func.count(TestCase.id).label("total_test_cases"),
+        count_status(ApprovalStatus.SUBMITTED).label("approved_count"),
+        count_status(ApprovalStatus.DRAFT).label("pending_count"),
+    ).where(*in_scope(TestCase.test_suite_id)).subquery()
+
+    runs = select(
+        func.count(EvaluationRunRecord.id).label("total_runs"),
+        func.coalesce(func.sum(EvaluationRunRecord.passed_count), 0).label("total_passed"),
+        func.coalesce(func.sum(EvaluationRunRecord.failed_count), 0).label("total_failed"),
+    ).where(*in_scope(EvaluationRunRecord.test_suite_id)).subquery()
+
+    last_run_pass_rate = (
+        select(
+            EvaluationRunRecord.passed_count * 100.0
+            / func.nullif(EvaluationRunRecord.total_count, 0)
+        )
+        .where(EvaluationRunRecord.state == RunState.COMPLETED, *in_scope(EvaluationRunRecord.test_suite_id))
+        .order_by(EvaluationRunRecord.created_at.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+    return select(
+        *test_cases.c, *runs.c, last_run_pass_rate.label("last_run_pass_rate")
+    ).select_from(test_cases.join(runs, true()))
+
+
+async def compute_summary(db: AsyncSession, project_id: Optional[str] = None) -> Dict[str, Any]:
+    row = (await db.execute(summary_query(project_id))).one()
+    return {name: getattr(row, name) for name in COUNTERS}
+
+
+def to_summary(counters: Dict[str, Any]) -> DashboardSummary:
+    passed, failed = counters["total_passed"] or 0, counters["total_failed"] or 0
+    last_rate = counters["last_run_pass_rate"]
+    return DashboardSummary(
+        total_test_cases=counters["total_test_cases"] or 0,
+        approved_count=counters["approved_count"] or 0,
+        pending_count=counters["pending_count"] or 0,
+        total_runs=counters["total_runs"] or 0,
+        last_run_pass_rate=round(last_rate, 1) if last_rate is not None else None,
+        avg_pass_rate=round(passed / (passed + failed) * 100, 1) if passed + failed > 0 else None,
+        total_passed=passed,
+        total_failed=failed,
+    )
+
+
+async def get_dashboard_summary(
+    db: AsyncSession, project_id: Optional[str] = None
+) -> DashboardSummary:
+    """Cached summary for a project, or for all projects when ``project_id`` is None.
+
+    Read-only: a stale or missing row is answered from a fresh aggregate and
+    left for ``refresh_summaries`` to store.
+    """
+    entry = await db.get(DashboardSummaryCache, project_id or GLOBAL_SCOPE, populate_existing=True)
+    if entry is not None and entry.computed_version == entry.version:
+        return to_summary({name: getattr(entry, name) for name in COUNTERS})
+    return to_summary(await compute_summary(db, project_id))
+
+
+async def refresh_summaries(db: AsyncSession) -> int:
+    """Create missing cache rows and store fresh counters in stale ones; returns how many were stored."""
+    scopes = [GLOBAL_SCOPE, *(await db.scalars(select(Project.id)))]
+    existing = set(await db.scalars(select(DashboardSummaryCache.scope)))
+    missing = [scope for scope in scopes if scope not in existing]
+    if missing:
+        # Committed before computing so writes from here on bump their version
+        db.add_all(DashboardSummaryCache(scope=scope, version=0, computed_version=-1) for scope in missing)
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+
+    stale = (await db.execute(
+        select(DashboardSummaryCache.scope, DashboardSummaryCache.version)
+        .where(DashboardSummaryCache.computed_version != DashboardSummaryCache.version)
+    )).all()
+    stored = 0
+    for scope, version in stale:
+        counters = await compute_summary(db, None if scope == GLOBAL_SCOPE else scope)
+        # Only if no write bumped the version while the aggregate ran
+        result = await db.execute(
+            update(DashboardSummaryCache)
+            .where(DashboardSummaryCache.scope == scope, DashboardSummaryCache.version == version)
+            .values(
+                **counters,
+                computed_version=version,
+                computed_at=datetime.now(timezone.utc),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        stored += result.rowcount
+    return stored
+
+
+def _bump(scopes):
+    return (
+        update(DashboardSummaryCache)
+        .where(scopes)
+        .values(version=DashboardSummaryCache.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def invalidate_runs(db: AsyncSession, run_ids: Iterable[str]) -> None:
+    """Bump the dashboards counting ``run_ids``; the caller commits.
+
+    For Core UPDATEs of run state or counts, which the flush listeners do not see.
+    """
+    run_ids = list(run_ids)
+    if not run_ids:
+        return
+    await db.execute(_bump(
+        DashboardSummaryCache.scope.in_([GLOBAL_SCOPE])
+        | DashboardSummaryCache.scope.in_(
+            select(TestSuite.project_id)
+            .join(EvaluationRunRecord, EvaluationRunRecord.test_suite_id == TestSuite.id)
+            .where(EvaluationRunRecord.id.in_(run_ids))
+        )
+    ))
+
+
+def _changed(obj, attributes) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[name].history.has_changes() for name in attributes)
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_dashboard_changes(session, flush_context, instances):
+    suites = session.info.setdefault(_SUITES_KEY, set())
+    projects = session.info.setdefault(_PROJECTS_KEY, set())
+
+    for obj in (*session.new, *session.deleted):
+        if isinstance(obj, (TestCase, EvaluationRunRecord)) and obj.test_suite_id:
+            suites.add(str(obj.test_suite_id))
+    for obj in session.dirty:
+        attributes = _TRACKED.get(type(obj))
+        if attributes and _changed(obj, attributes):
+            suites.add(str(obj.test_suite_id))
+            # A test case or run moved out of a suite also changes the old one
+            for value in inspect(obj).attrs.test_suite_id.history.deleted:
+                suites.add(str(value))
+    for obj in session.deleted:
+        # Suite and project rows are gone after the flush; record their projects now
+        if isinstance(obj, TestSuite):
+            projects.add(str(obj.project_id))
+        elif isinstance(obj, Project):
+            projects.add(str(obj.id))
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_dashboards(session, flush_context):
+    suites = session.info.pop(_SUITES_KEY, None)
+    projects = session.info.pop(_PROJECTS_KEY, None)
+    if not suites and not projects:
+        return
+
+    scopes = DashboardSummaryCache.scope.in_([GLOBAL_SCOPE, *(projects or ())])
+    if suites:
+        scopes |= DashboardSummaryCache.scope.in_(
+            select(TestSuite.project_id).where(TestSuite.id.in_(suites))
+        )
+    session.connection().execute(_bump(scopes))
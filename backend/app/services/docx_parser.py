@@ -1,57 +1,201 @@
-"""Document parser service - extracts test content from .docx files."""
+"""Document parser service - extracts test content from .docx files.
 
+``iter_blocks`` streams ``word/document.xml`` once with ``iterparse`` and
+yields headings, paragraphs and tables in document order, discarding each
+element once it has been read. ``parse_document`` builds the flat text view
+and the section view from that single pass.
+"""
+
+import asyncio
 import io
-from typing import List
-from docx import Document as DocxDocument
+import re
+import zipfile
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+from xml.etree import ElementTree
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_BODY = f"{_W}body"
+_PARAGRAPH = f"{_W}p"
+_TABLE = f"{_W}tbl"
+_ROW = f"{_W}tr"
+_CELL = f"{_W}tc"
+_TEXT = f"{_W}t"
+_TAB = f"{_W}tab"
+_BREAKS = (f"{_W}br", f"{_W}cr")
+_STYLE_ID = f"{_W}pPr/{_W}pStyle"
+_VAL = f"{_W}val"
+_DIGITS = re.compile(r"\d+")
+
+
+@dataclass
+class DocxBlock:
+    """One top-level block of a document body."""
+    kind: str  # "heading", "paragraph" or "table"
+    text: str = ""
+    level: Optional[int] = None
+    rows: List[List[str]] = field(default_factory=list)
+
+
+@dataclass
+class ParsedDocument:
+    text: str
+    sections: List[dict]
+
+
+def _style_names(archive: zipfile.ZipFile) -> Dict[str, str]:
+    """Map paragraph style ids to their display names."""
+    try:
+        styles = ElementTree.fromstring(archive.read("word/styles.xml"))
+    except KeyError:
+        return {}
+    names = {}
+    for style in styles.iter(f"{_W}style"):
+        style_id = style.get(f"{_W}styleId")
+        name = style.find(f"{_W}name")
+        if style_id and name is not None:
+            names[style_id] = name.get(_VAL, style_id)
+    return names
+
+
+def _paragraph_text(paragraph: ElementTree.Element) -> str:
+    """Run text of a paragraph, excluding paragraphs nested in text boxes."""
+    parts = []
+    stack = list(reversed(paragraph))
+    while stack:
+        node = stack.pop()
+        if node.tag == _TEXT:
+            parts.append(node.text or "")
+        elif node.tag == _TAB:
+            parts.append("\t")
+        elif node.tag in _BREAKS:
+            parts.append("\n")
+        elif node.tag not in (_PARAGRAPH, _TABLE):
+            stack.extend(reversed(node))
+    return "".join(parts)
+
+
+def _heading_level(style_name: str) -> Optional[int]:
+    """Level of a heading style, 0 for an unnumbered heading, None otherwise."""
+    if "heading" not in style_name.lower():
+        return None
+    match = _DIGITS.search(style_name)
+    return int(match.group()) if match else 0
+
+
+def iter_blocks(file_bytes: bytes) -> Iterator[DocxBlock]:
+    """
+    Yield the document's headings, paragraphs and tables in document order.
+
+    Empty paragraphs are skipped. Nested tables are flattened into the text
+    of the cell that contains them; text boxes are ignored, as in python-docx.
+    """
+    with zipfile.ZipFile(io.BytesIO(file_bytes)) as archive:
+        style_names = _style_names(archive)
+        with archive.open("word/document.xml") as xml:
+            body = None
+            # Rows/cells of each open table, innermost last
+            tables: List[List[List[str]]] = []
+            cells: List[List[str]] = []
+            paragraph_depth = 0
+
+            for event, elem in ElementTree.iterparse(xml, events=("start", "end")):
+                if event == "start":
+                    if elem.tag == _PARAGRAPH:
+                        paragraph_depth += 1
+                    elif paragraph_depth:
+                        continue  # text box content inside a paragraph
+                    elif elem.tag == _BODY:
+                        body = elem
+                    elif elem.tag == _TABLE:
+                        tables.append([])
+                    elif elem.tag == _ROW and tables:
+                        tables[-1].append([])
+                    elif elem.tag == _CELL:
+                        cells.append([])
+                    continue
+
+                if elem.tag == _PARAGRAPH:
+                    paragraph_depth -= 1
+                if paragraph_depth:
+                    continue
+
+                if elem.tag == _PARAGRAPH:
+                    text = _paragraph_text(elem).strip()
+                    if cells:
+                        if text:
+                            cells[-1].append(text)
+                    elif text:
+                        style = elem.find(_STYLE_ID)
+                        style_id = style.get(_VAL, "") if style is not None else ""
+                        level = _heading_level(style_names.get(style_id, style_id))
+                        if level is None:
+                            yield DocxBlock(kind="paragraph", text=text)
+                        else:
+                            yield DocxBlock(kind="heading", text=text, level=level)
+                elif elem.tag == _CELL and cells:
+                    cell_text = "\n".join(cells.pop())
+                    if tables and tables[-1]:
+                        tables[-1][-1].append(cell_text)
+                elif elem.tag == _TABLE and tables:
+                    rows = tables.pop()
+                    if cells:
+                        cells[-1].extend(" | ".join(row) for row in rows)
+                    elif rows:
+                        yield DocxBlock(
+                            kind="table",
+                            text="\n".join(" | ".join(row) for row in rows),
+                            rows=rows,
+                        )
+
+                # Drop finished top-level blocks so memory stays flat
+                if body is not None and not tables and elem.tag in (_PARAGRAPH, _TABLE):
+                    body.clear()
+
+
+def _block_markdown(block: DocxBlock) -> str:
+    if block.kind == "heading":
+        return f"{'#' * block.level if block.level else '#'} {block.text}"
+    if block.kind == "table":
+        return f"\n[TABLE]\n{block.text}\n[/TABLE]"
+    return block.text
+
+
+def parse_document(file_bytes: bytes) -> ParsedDocument:
+    """Build the text and section views of a document in one pass."""
+    text_parts = []
+    sections = []
+    current_section = {"heading": "Introduction", "content": []}
+    for block in iter_blocks(file_bytes):
+        text_parts.append(_block_markdown(block))
+        if block.kind == "heading":
+            if current_section["content"]:
+                sections.append(current_section)
+            current_section = {"heading": block.text, "content": []}
+        elif block.kind == "table":
+            current_section["content"].append(f"[TABLE]\n{block.text}\n[/TABLE]")
+        else:
+            current_section["content"].append(block.text)
+    if current_section["content"]:
+        sections.append(current_section)
+    return ParsedDocument(text="\n\n".join(text_parts), sections=sections)
 
 
 class DocxParser:
     @staticmethod
     def extract_text(file_bytes: bytes) -> str:
-        doc = DocxDocument(io.BytesIO(file_bytes))
-        sections = []
-        for para in doc.paragraphs:
-            style = para.style.name if para.style else ""
-            text = para.text.strip()
-            if not text:
-                continue
-            if "Heading" in style:
-                level = style.replace("Heading", "").strip()
-                sections.append(
-                    f"{'#' * int(level) if level.isdigit() else '#'} {text}"
-                )
-            else:
-                sections.append(text)
-        for table in doc.tables:
-            rows = []
-            for row in table.rows:
-                cells = [cell.text.strip() for cell in row.cells]
-                rows.append(" | ".join(cells))
-            if rows:
-                sections.append("\n[TABLE]\n" + "\n".join(rows) + "\n[/TABLE]")
-        return "\n\n".join(sections)
+        return parse_document(file_bytes).text
 
     @staticmethod
     def extract_sections(file_bytes: bytes) -> List[dict]:
-        doc = DocxDocument(io.BytesIO(file_bytes))
-        sections = []
-        current_section = {"heading": "Introduction", "content": []}
-        for para in doc.paragraphs:
-            style = para.style.name if para.style else ""
-            text = para.text.strip()
-            if not text:
-                continue
-            if "Heading" in style:
-                if current_section["content"]:
-                    sections.append(current_section)
-                current_section = {"heading": text, "content": []}
-            else:
-                current_section["content"].append(text)
-        if current_section["content"]:
-            sections.append(current_section)
-        return sections
+        return parse_document(file_bytes).sections
 
 
 def parse_docx(file_bytes: bytes) -> str:
     """Convenience function to parse docx and extract text."""
     return DocxParser.extract_text(file_bytes)
+
+
+async def parse_docx_async(file_bytes: bytes) -> ParsedDocument:
+    """Parse a document in a worker thread so the event loop stays responsive."""
+    return await asyncio.to_thread(parse_document, file_bytes)
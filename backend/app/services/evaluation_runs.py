@@ -0,0 +1,409 @@
+"""Background polling and reconciliation of CES evaluation runs.
+
+Polling never borrows a request's session: it opens a short session of its
+own for each write, and none is held while waiting on CES. Because polling
+tasks die with the process, ``reconcile_runs`` re-attaches polling to every
+PENDING/RUNNING run that CES has accepted; it runs at startup and then every
+``EVALUATION_RECONCILE_INTERVAL_SECONDS`` on the one replica holding the
+reconciler lease, so replicas do not each start pollers for the same runs.
+Sharded and adaptive runs are resumed the same way, through
+app.services.sharding and app.services.adaptive_runs. The same loop rolls up
+any completed run whose rollup was missed
+(``app.services.rollups.roll_up_pending_runs``), saves missing security run
+latency sketches, fails ingestion jobs that died with their process
+(``app.services.bulk_ingestion.fail_stale_jobs``) and refreshes stale
+dashboard caches (``app.services.dashboard_cache.refresh_summaries``).
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import AsyncSessionLocal
+from app.models.evaluation_run import EvaluationRunRecord, RunState
+from app.models.project import Project
+from app.models.test_case import ApprovalStatus, TestCase
+from app.models.test_suite import TestSuite
+from app.models.webhook import WebhookEvent
+from app.services.adaptive_runs import initial_repetition, run_adaptive
+from app.services.ces_client import get_ces_client, poll_operation
+from app.services.bulk_ingestion import fail_stale_jobs
+from app.services.change_impact import app_snapshot
+from app.services.dashboard_cache import invalidate_runs, refresh_summaries
+from app.services.leases import INSTANCE_ID, acquire_lease, release_lease
+from app.services.result_ingestion import fetch_result_pages, ingest_run_results
+from app.services.rollups import (
+    roll_up_evaluation_run,
+    roll_up_pending_runs,
+    store_missing_sketches,
+)
+from app.services.run_events import evaluation_topic, publish_evaluation_run, run_events
+from app.services.sharding import build_shards, run_sharded
+from app.services.webhooks import notify_evaluation_run
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATES = (RunState.PENDING, RunState.RUNNING)
+# PENDING runs never handed to CES are failed after this long
+STALE_PENDING_AFTER = timedelta(minutes=10)
+LEASE_NAME = "evaluation-reconciler"
+
+_polling: Dict[str, asyncio.Task] = {}
+
+
+def app_id_from_name(ces_app_name: Optional[str]) -> str:
+    """Short CES app id from a ``projects/.../apps/{id}`` resource name."""
+    return (ces_app_name or "").rsplit("/", 1)[-1]
+
+
+async def poll_and_store_results(run_id: str, operation_id: str, app_id: str):
+    """Wait for a run's CES operation, then store its results and totals."""
+    ces = get_ces_client()
+
+    try:
+        result = await poll_operation(ces, operation_id)
+        ces_run_id = result.get("evaluationRun", {}).get("name", "").split("/")[-1]
+        run_details = await ces.get_evaluation_run(app_id, ces_run_id)
+        pages = await fetch_result_pages(ces, app_id, ces_run_id)
+
+        async with AsyncSessionLocal() as db:
+            eval_run = await db.scalar(
+                select(EvaluationRunRecord)
+                .where(EvaluationRunRecord.id == run_id)
+                .with_for_update()
+            )
+            # Cancelled meanwhile, or already stored by another poller
+            if eval_run is None or eval_run.state not in ACTIVE_STATES:
+                return
+
+            if "latencyReport" in run_details:
+                eval_run.latency_report = run_details["latencyReport"]
+
+            counts = await ingest_run_results(db, eval_run, pages)
+
+            eval_run.ces_run_id = ces_run_id
+            eval_run.state = RunState.COMPLETED
+            eval_run.started_at = eval_run.started_at or eval_run.created_at
+            eval_run.completed_at = datetime.now(timezone.utc)
+            eval_run.total_count = run_details.get("totalCount", counts["total"])
+            eval_run.passed_count = run_details.get("passedCount", counts["passed"])
+            eval_run.failed_count = run_details.get("failedCount", counts["failed"])
+            eval_run.error_count = run_details.get("errorCount", 0)
+
+            if eval_run.total_count > 0:
+                eval_run.pass_rate = (
+                    eval_run.passed_count / eval_run.total_count
+                ) * 100
+
+            await roll_up_evaluation_run(db, eval_run)
+            await notify_evaluation_run(db, eval_run, WebhookEvent.RUN_COMPLETED)
+            await db.commit()
+            publish_evaluation_run(eval_run)
+
+    except Exception:
+        logger.exception("Evaluation run %s failed", run_id)
+        async with AsyncSessionLocal() as db:
+            failed = await db.execute(
+                update(EvaluationRunRecord)
+                .where(
+                    EvaluationRunRecord.id == run_id,
+                    EvaluationRunRecord.state.in_(ACTIVE_STATES),
+                )
+                .values(state=RunState.ERROR, completed_at=datetime.now(timezone.utc))
+            )
+            if failed.rowcount:
+                await invalidate_runs(db, [run_id])
+                eval_run = await db.get(EvaluationRunRecord, run_id)
+                await notify_evaluation_run(db, eval_run, WebhookEvent.RUN_COMPLETED)
+            await db.commit()
+        if failed.rowcount:
+            run_events.publish_state(evaluation_topic(run_id), RunState.ERROR.value)
+
+
+async def submitted_evaluation_ids(db: AsyncSession, test_suite_id: str) -> List[str]:
+    """CES evaluation names of a suite's submitted test cases."""
+    result = await db.scalars(
+        select(TestCase.ces_evaluation_id).where(
+            TestCase.test_suite_id == test_suite_id,
+            TestCase.status == ApprovalStatus.SUBMITTED,
+            TestCase.ces_evaluation_id.isnot(None),
+        )
+    )
+    return list(result.all())
+
+
+def build_run_config(
+    evaluation_ids: List[str],
+    run_count: int = 1,
+    app_version: Optional[str] = None,
+    generate_latency_report: bool = True,
+) -> Dict[str, Any]:
+    """``runEvaluation`` request body."""
+    run_config: Dict[str, Any] = {
+        "evaluationIds": evaluation_ids,
+        "runCount": run_count,
+    }
+    if app_version:
+        run_config["appVersion"] = app_version
+    if generate_latency_report:
+        run_config["generateLatencyReport"] = True
+    return run_config
+
+
+async def suite_app_id(db: AsyncSession, test_suite_id: str) -> str:
+    return app_id_from_name(await db.scalar(
+        select(Project.ces_app_name)
+        .join(TestSuite, TestSuite.project_id == Project.id)
+        .where(TestSuite.id == test_suite_id)
+    ))
+
+
+async def capture_app_snapshot(app_id: str) -> Optional[Dict[str, Any]]:
+    """Fingerprint of the app's agents and tools, or None when CES cannot list them."""
+    try:
+        return await app_snapshot(get_ces_client(), app_id)
+    except Exception:
+        logger.warning("Could not snapshot agents and tools of app %s", app_id, exc_info=True)
+        return None
+
+
+async def submit_run(
+    db: AsyncSession, eval_run: EvaluationRunRecord, run_config: Dict[str, Any], app_id: str
+) -> None:
+    """Start a run's CES operation and poll it; marks the run ERROR and re-raises on failure."""
+    ces = get_ces_client()
+    try:
+        operation = await ces.run_evaluation(app_id, run_config)
+        operation_id = operation.get("name", "").split("/")[-1]
+
+        eval_run.ces_operation_id = operation_id
+        eval_run.state = RunState.RUNNING
+        eval_run.started_at = datetime.now(timezone.utc)
+        await notify_evaluation_run(db, eval_run, WebhookEvent.RUN_STARTED)
+        await db.commit()
+    except Exception:
+        eval_run.state = RunState.ERROR
+        eval_run.completed_at = datetime.now(timezone.utc)
+        await notify_evaluation_run(db, eval_run, WebhookEvent.RUN_COMPLETED)
+        await db.commit()
+        publish_evaluation_run(eval_run)
+        raise
+
+    run_events.publish_state(evaluation_topic(eval_run.id), eval_run.state.value)
+
+    attach_polling(eval_run.id, operation_id, app_id)
+
+
+async def submit_sharded_run(
+    db: AsyncSession,
+    eval_run: EvaluationRunRecord,
+    run_config: Dict[str, Any],
+    app_id: str,
+    shard_count: int,
+) -> None:
+    """Split a run into shards and start running them in the background."""
+    shards = build_shards(run_config, shard_count)
+    for shard in shards:
+        shard.evaluation_run_id = eval_run.id
+    db.add_all(shards)
+    eval_run.shard_count = len(shards)
+    eval_run.state = RunState.RUNNING
+    eval_run.started_at = datetime.now(timezone.utc)
+    await notify_evaluation_run(db, eval_run, WebhookEvent.RUN_STARTED)
+    await db.commit()
+    run_events.publish_state(evaluation_topic(eval_run.id), eval_run.state.value)
+
+    attach_sharded(eval_run.id, app_id)
+
+
+async def submit_adaptive_run(
+    db: AsyncSession,
+    eval_run: EvaluationRunRecord,
+    run_config: Dict[str, Any],
+    app_id: str,
+    round_size: int,
+    target_width: float,
+    pass_threshold: float,
+    confidence: float,
+) -> None:
+    """Start a run that repeats each scenario only until its pass rate is settled."""
+    eval_run.repetition = initial_repetition(
+        run_config, round_size, target_width, pass_threshold, confidence
+    )
+    eval_run.state = RunState.RUNNING
+    eval_run.started_at = datetime.now(timezone.utc)
+    await notify_evaluation_run(db, eval_run, WebhookEvent.RUN_STARTED)
+    await db.commit()
+    run_events.publish_state(evaluation_topic(eval_run.id), eval_run.state.value)
+
+    attach_adaptive(eval_run.id, app_id)
+
+
+def _track(run_id: str, start: Callable[[], Awaitable[None]]) -> bool:
+    """Run ``start()`` as the run's task unless this process already has one for it."""
+    task = _polling.get(run_id)
+    if task is not None and not task.done():
+        return False
+    task = asyncio.create_task(start())
+    _polling[run_id] = task
+    task.add_done_callback(
+        lambda done: _polling.pop(run_id, None) if _polling.get(run_id) is done else None
+    )
+    return True
+
+
+def attach_polling(run_id: str, operation_id: str, app_id: str) -> bool:
+    """Start polling a run unless this process is already polling it."""
+    return _track(run_id, lambda: poll_and_store_results(run_id, operation_id, app_id))
+
+
+def attach_sharded(run_id: str, app_id: str) -> bool:
+    """Start running a sharded run's unfinished shards unless already running here."""
+    return _track(run_id, lambda: run_sharded(run_id, app_id))
+
+
+def attach_adaptive(run_id: str, app_id: str) -> bool:
+    """Start an adaptive run's next round unless already running here."""
+    return _track(run_id, lambda: run_adaptive(run_id, app_id))
+
+
+async def reconcile_runs() -> int:
+    """Re-attach polling to unfinished runs; returns how many were attached.
+
+    Runs created before the CES operation id was stored have it in
+    ``ces_run_id``; sharded and adaptive runs resume where they stopped.
+    PENDING runs that never reached CES are failed once stale; scheduled runs
+    waiting for a slot are not stale until picked up.
+    """
+    stale_before = datetime.now(timezone.utc) - STALE_PENDING_AFTER
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(
+            select(
+                EvaluationRunRecord.id,
+                EvaluationRunRecord.ces_operation_id,
+                EvaluationRunRecord.ces_run_id,
+                EvaluationRunRecord.shard_count,
+                EvaluationRunRecord.repetition.isnot(None),
+                Project.ces_app_name,
+            )
+            .join(TestSuite, TestSuite.id == EvaluationRunRecord.test_suite_id)
+            .join(Project, Project.id == TestSuite.project_id)
+            .where(
+                EvaluationRunRecord.state.in_(ACTIVE_STATES),
+                or_(
+                    EvaluationRunRecord.ces_operation_id.isnot(None),
+                    EvaluationRunRecord.ces_run_id.isnot(None),
+                    EvaluationRunRecord.shard_count.isnot(None),
+                    EvaluationRunRecord.repetition.isnot(None),
+                ),
+            )
+        )).all()
+
+        failed_ids = (await db.scalars(
+            update(EvaluationRunRecord)
+            .where(
+                EvaluationRunRecord.state == RunState.PENDING,
+                EvaluationRunRecord.ces_operation_id.is_(None),
+                EvaluationRunRecord.ces_run_id.is_(None),
+                EvaluationRunRecord.shard_count.is_(None),
+                EvaluationRunRecord.repetition.is_(None),
+                or_(
+                    and_(
+                        EvaluationRunRecord.schedule_id.is_(None),
+                        EvaluationRunRecord.created_at < stale_before,
+                    ),
+                    # Scheduled runs count from when the scheduler picked them up
+                    EvaluationRunRecord.started_at < stale_before,
+                ),
+            )
+            .values(state=RunState.ERROR, completed_at=datetime.now(timezone.utc))
+            .returning(EvaluationRunRecord.id)
+        )).all()
+        if failed_ids:
+            await invalidate_runs(db, failed_ids)
+            for eval_run in await db.scalars(
+                select(EvaluationRunRecord).where(EvaluationRunRecord.id.in_(failed_ids))
+            ):
+                await notify_evaluation_run(db, eval_run, WebhookEvent.RUN_COMPLETED)
+        await db.commit()
+    for run_id in failed_ids:
+        run_events.publish_state(evaluation_topic(run_id), RunState.ERROR.value)
+
+    attached = 0
+    for run_id, operation_id, ces_run_id, shard_count, adaptive, ces_app_name in rows:
+        app_id = app_id_from_name(ces_app_name)
+        if shard_count:
+            attached += attach_sharded(run_id, app_id)
+        elif adaptive:
+            attached += attach_adaptive(run_id, app_id)
+        else:
+            attached += attach_polling(run_id, operation_id or ces_run_id, app_id)
+    return attached
+
+
+async def catch_up_rollups() -> int:
+    """Roll up completed runs that missed it; returns how many were rolled up.
+
+    Also saves the latency sketches of finished security runs stored without one.
+    """
+    async with AsyncSessionLocal() as db:
+        rolled = await roll_up_pending_runs(db)
+        await store_missing_sketches(db)
+        return rolled
+
+
+async def refresh_dashboards() -> int:
+    """Store fresh counters in stale dashboard caches; returns how many were stored."""
+    async with AsyncSessionLocal() as db:
+        return await refresh_summaries(db)
+
+
+async def run_reconcile_tick(interval: float) -> bool:
+    """One reconcile pass; False when another replica holds the reconciler lease."""
+    async with AsyncSessionLocal() as db:
+        if not await acquire_lease(db, LEASE_NAME, INSTANCE_ID, timedelta(seconds=interval * 3)):
+            return False
+    try:
+        await reconcile_runs()
+    except Exception:
+        logger.exception("Evaluation run reconciliation failed")
+    try:
+        await catch_up_rollups()
+    except Exception:
+        logger.exception("Rollup catch-up failed")
+    try:
+        await fail_stale_jobs()
+    except Exception:
+        logger.exception("Failing stale ingestion jobs failed")
+    try:
+        await refresh_dashboards()
+    except Exception:
+        logger.exception("Dashboard summary refresh failed")
+    return True
+
+
+async def reconcile_forever(interval: float):
+    """Reconcile every ``interval`` seconds until cancelled, then hand the lease back."""
+    try:
+        while True:
+            try:
+                await run_reconcile_tick(interval)
+            except Exception:
+                logger.exception("Evaluation run reconciliation failed")
+            await asyncio.sleep(interval)
+    finally:
+        async with AsyncSessionLocal() as db:
+            await release_lease(db, LEASE_NAME, INSTANCE_ID)
+
+
+async def stop_polling():
+    """Cancel this process's polling tasks; reconciliation resumes them later."""
+    tasks = list(_polling.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    _polling.clear()
@@ -0,0 +1,247 @@
+"""Failure clustering for evaluation run analysis.
+
+Failed results are grouped by the text of their ``failure_reason`` and
+``diagnostics`` so that Gemini sees one representative per failure mode
+instead of every result. Identical signatures are collapsed first; the
+remaining unique signatures are compared with MinHash + LSH banding
+(vectorised with numpy), and each cluster is labelled and represented using
+TF-IDF weights.
+"""
+
+import json
+import math
+import re
+import zlib
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+_MAX_HASH = (1 << 31) - 1
+_TOKEN_CHUNK = 1 << 16
+
+_VOLATILE = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"  # uuids
+    r"|\b[0-9a-f]{16,}\b"  # long hex ids
+    r"|\d+(?:\.\d+)?"  # numbers
+)
+_WORD = re.compile(r"[a-z_][a-z0-9_]+")
+
+
+@dataclass
+class FailureCluster:
+    """A group of failed results sharing one failure mode."""
+    size: int
+    label: List[str]
+    representative: Dict[str, Any]
+    member_indices: List[int] = field(default_factory=list)
+    sample_names: List[str] = field(default_factory=list)
+
+    def to_prompt_dict(self, max_chars: int = 2000) -> Dict[str, Any]:
+        """Compact, size-bounded view of the cluster for an LLM prompt."""
+        diagnostics = self.representative.get("diagnostics")
+        diagnostics_text = json.dumps(diagnostics, default=str) if diagnostics else None
+        if diagnostics_text and len(diagnostics_text) > max_chars:
+            diagnostics_text = diagnostics_text[:max_chars] + "…"
+        return {
+            "count": self.size,
+            "keywords": self.label,
+            "example_test_cases": self.sample_names,
+            "failure_reason": (self.representative.get("failure_reason") or "")[:max_chars],
+            "score": self.representative.get("score"),
+            "diagnostics": diagnostics_text,
+        }
+
+
+def failure_signature(result: Dict[str, Any]) -> str:
+    """Text used to compare two failed results."""
+    parts = [result.get("failure_reason") or ""]
+    diagnostics = result.get("diagnostics")
+    if diagnostics:
+        parts.append(json.dumps(diagnostics, sort_keys=True, default=str))
+    return " ".join(parts)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word unigrams and bigrams with volatile ids and numbers masked."""
+    words = _WORD.findall(_VOLATILE.sub(" ", text.lower()))
+    if not words:
+        return ["<empty>"]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def _token_hashes(tokens: Sequence[str]) -> np.ndarray:
+    return np.fromiter(
+        (zlib.crc32(t.encode()) & _MAX_HASH for t in set(tokens)),
+        dtype=np.uint64,
+    )
+
+
+def minhash_signatures(token_lists: Sequence[Sequence[str]], num_perm: int = 64, seed: int = 1) -> np.ndarray:
+    """Return a (num_docs, num_perm) MinHash matrix."""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, _MAX_HASH, size=num_perm, dtype=np.uint64)[:, None]
+    b = rng.integers(0, _MAX_HASH, size=num_perm, dtype=np.uint64)[:, None]
+
+    signatures = np.empty((len(token_lists), num_perm), dtype=np.uint64)
+    doc_hashes = [_token_hashes(tokens) for tokens in token_lists]
+
+    # Process documents in chunks so the (num_perm x tokens) matrix stays small
+    start = 0
+    while start < len(doc_hashes):
+        end, total = start, 0
+        while end < len(doc_hashes) and (total == 0 or total + len(doc_hashes[end]) <= _TOKEN_CHUNK):
+            total += len(doc_hashes[end])
+            end += 1
+        hashes = np.concatenate(doc_hashes[start:end])
+        offsets = np.cumsum([0] + [len(h) for h in doc_hashes[start:end - 1]])
+        permuted = (a * hashes[None, :] + b) % _MERSENNE_PRIME
+        signatures[start:end] = np.minimum.reduceat(permuted, offsets, axis=1).T
+        start = end
+    return signatures
+
+
+def _find(parent: List[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def _lsh_groups(signatures: np.ndarray, threshold: float, bands: int) -> List[List[int]]:
+    """Union documents whose estimated Jaccard similarity reaches the threshold."""
+    n, num_perm = signatures.shape
+    rows = num_perm // bands
+    parent = list(range(n))
+
+    for band in range(bands):
+        buckets: Dict[bytes, List[int]] = defaultdict(list)
+        band_slice = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        for i in range(n):
+            buckets[band_slice[i].tobytes()].append(i)
+        for members in buckets.values():
+            first = members[0]
+            for other in members[1:]:
+                ra, rb = _find(parent, first), _find(parent, other)
+                if ra == rb:
+                    continue
+                similarity = float(np.mean(signatures[first] == signatures[other]))
+                if similarity >= threshold:
+                    parent[rb] = ra
+
+    groups: Dict[int, List[int]] = defaultdict(list)
+    for i in range(n):
+        groups[_find(parent, i)].append(i)
+    return list(groups.values())
+
+
+def cluster_failures(
+    results: Sequence[Dict[str, Any]],
+    threshold: float = 0.5,
+    num_perm: int = 64,
+    bands: int = 16,
+    label_terms: int = 5,
+) -> List[FailureCluster]:
+    """
+    Cluster failed results by failure reason and diagnostics.
+
+    Args:
+        results: Result dicts with passed, failure_reason, diagnostics and
+            optionally test_case_name
+        threshold: Minimum estimated Jaccard similarity to merge two signatures
+
+    Returns:
+        Clusters ordered by size, largest first
+    """
+    failed = [i for i, r in enumerate(results) if r.get("passed") is not True]
+    if not failed:
+        return []
+
+    # Collapse signatures that differ only in ids and numbers before any
+    # similarity work
+    by_signature: Dict[str, List[int]] = defaultdict(list)
+    for i in failed:
+        by_signature[_VOLATILE.sub("#", failure_signature(results[i]).lower())].append(i)
+    unique = list(by_signature.keys())
+    token_lists = [tokenize(sig) for sig in unique]
+
+    if len(unique) == 1:
+        groups = [[0]]
+    else:
+        groups = _lsh_groups(minhash_signatures(token_lists, num_perm), threshold, bands)
+
+    # Document frequency over unique signatures, for TF-IDF weights
+    df: Counter = Counter()
+    for tokens in token_lists:
+        df.update(set(tokens))
+    n_docs = len(token_lists)
+
+    def idf(term: str) -> float:
+        return math.log((1 + n_docs) / (1 + df[term])) + 1
+
+    clusters = []
+    for group in groups:
+        weights = [len(by_signature[unique[u]]) for u in group]
+        centroid: Counter = Counter()
+        for u, weight in zip(group, weights):
+            for term, tf in Counter(token_lists[u]).items():
+                centroid[term] += weight * tf * idf(term)
+
+        centroid_norm = math.sqrt(sum(v * v for v in centroid.values())) or 1.0
+        best, best_score = group[0], -1.0
+        for u in group:
+            vec = {t: tf * idf(t) for t, tf in Counter(token_lists[u]).items()}
+            norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+            score = sum(v * centroid[t] for t, v in vec.items()) / (norm * centroid_norm)
+            if score > best_score:
+                best, best_score = u, score
+
+        members = [i for u in group for i in by_signature[unique[u]]]
+        names = []
+        for i in members:
+            name = results[i].get("test_case_name")
+            if name and name not in names:
+                names.append(name)
+            if len(names) >= 5:
+                break
+        clusters.append(FailureCluster(
+            size=len(members),
+            label=[t for t, _ in centroid.most_common(label_terms) if t != "<empty>"],
+            representative=dict(results[by_signature[unique[best]][0]]),
+            member_indices=members,
+            sample_names=names,
+        ))
+
+    clusters.sort(key=lambda c: c.size, reverse=True)
+    return clusters
+
+
+def summarize_for_analysis(
+    results: Sequence[Dict[str, Any]],
+    max_clusters: int,
+    max_chars: int = 2000,
+) -> Dict[str, Any]:
+    """
+    Build the bounded analysis payload: run totals plus the largest clusters.
+
+    Clusters beyond ``max_clusters`` are folded into a single "other" count so
+    the payload size does not grow with the number of results.
+    """
+    clusters = cluster_failures(results)
+    passed = sum(1 for r in results if r.get("passed") is True)
+    kept = clusters[:max_clusters]
+    other = sum(c.size for c in clusters[max_clusters:])
+    overview: Dict[str, Any] = {
+        "total_results": len(results),
+        "passed": passed,
+        "failed": len(results) - passed,
+        "failure_clusters": len(clusters),
+    }
+    if other:
+        overview["failures_in_smaller_clusters"] = other
+    return {
+        "overview": overview,
+        "clusters": [c.to_prompt_dict(max_chars) for c in kept],
+    }
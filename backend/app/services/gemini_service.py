@@ -1,12 +1,23 @@
 """Google Gemini API client for AI-powered test generation."""
 
+import asyncio
 import json
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 import google.generativeai as genai
 from google.generativeai import types
 
 from app.core.config import settings
+from app.services.ces_schemas import TEST_REQUIREMENTS_SCHEMA, evaluation_schema
+from app.services.json_extraction import JSONExtractionError, extract_json
+from app.services.llm_usage import (
+    LLMCall,
+    check_budget,
+    current_scope,
+    record_call,
+    usage_from_response,
+)
 
 
 class GeminiService:
@@ -19,14 +30,105 @@ class GeminiService:
             "temperature": settings.GEMINI_TEMPERATURE,
             "max_output_tokens": settings.GEMINI_MAX_OUTPUT_TOKENS,
         }
-
-    def _get_model(self):
-        """Get configured Gemini model."""
+        self.structured_output = settings.GEMINI_STRUCTURED_OUTPUT
+        self.parse_stats = {"total": 0, "repaired": 0, "failed": 0}
+
+    def _get_model(self, response_schema: Optional[Dict[str, Any]] = None):
+        """Get configured Gemini model, constrained to a JSON schema if given."""
+        generation_config = dict(self.generation_config)
+        if response_schema is not None and self.structured_output:
+            generation_config["response_mime_type"] = "application/json"
+            generation_config["response_schema"] = response_schema
         return genai.GenerativeModel(
             self.model_name,
-            generation_config=self.generation_config,
+            generation_config=generation_config,
         )
 
+    @staticmethod
+    def _apply_usage(call: LLMCall, response: Any) -> None:
+        usage = usage_from_response(response)
+        call.prompt_tokens = usage["prompt_tokens"]
+        call.response_tokens = usage["response_tokens"]
+        call.cached_tokens = usage["cached_tokens"]
+        call.total_tokens = usage["total_tokens"]
+        call.cache_status = "hit" if call.cached_tokens else "miss"
+
+    async def _generate(self, model, prompt: str, operation: str):
+        """Call Gemini and record tokens, latency and cache status for the call."""
+        scope = current_scope()
+        await check_budget(scope.project_id if scope else None)
+
+        call = LLMCall(operation=operation, model=self.model_name, prompt=prompt)
+        start = time.perf_counter()
+        try:
+            response = await model.generate_content_async(prompt)
+            call.response_text = response.text
+        except Exception as e:
+            call.success = False
+            call.error = str(e)[:1000]
+            raise
+        finally:
+            call.latency_ms = (time.perf_counter() - start) * 1000
+            if call.success:
+                self._apply_usage(call, response)
+            await record_call(call)
+        return response
+
+    async def _generate_stream(self, model, prompt: str, operation: str) -> AsyncIterator[str]:
+        """Stream Gemini text chunks; the call is recorded once the stream ends."""
+        scope = current_scope()
+        await check_budget(scope.project_id if scope else None)
+
+        call = LLMCall(operation=operation, model=self.model_name, prompt=prompt)
+        parts: List[str] = []
+        response = None
+        start = time.perf_counter()
+        try:
+            response = await model.generate_content_async(prompt, stream=True)
+            async for chunk in response:
+                try:
+                    text = chunk.text
+                except ValueError:
+                    continue  # chunk without text parts, e.g. the final finish_reason
+                parts.append(text)
+                yield text
+        except (GeneratorExit, asyncio.CancelledError):
+            # The client went away mid-stream; the output is incomplete
+            call.success = False
+            call.error = "Stream aborted before completion"
+            raise
+        except Exception as e:
+            call.success = False
+            call.error = str(e)[:1000]
+            raise
+        finally:
+            call.response_text = "".join(parts)
+            call.latency_ms = (time.perf_counter() - start) * 1000
+            if call.success and response is not None:
+                self._apply_usage(call, response)
+            await record_call(call)
+
+    def _parse_json(self, text: str) -> Any:
+        """Parse model output as JSON, repairing truncation and counting outcomes."""
+        self.parse_stats["total"] += 1
+        try:
+            value, repaired = extract_json(text)
+        except JSONExtractionError:
+            self.parse_stats["failed"] += 1
+            raise
+        if repaired:
+            self.parse_stats["repaired"] += 1
+        return value
+
+    def get_parse_metrics(self) -> Dict[str, Any]:
+        """Return JSON parse counters and the parse-failure rate."""
+        total = self.parse_stats["total"]
+        return {
+            **self.parse_stats,
+            "failure_rate": self.parse_stats["failed"] / total if total else 0.0,
+            "structured_output": self.structured_output,
+        }
+
     async def generate_test_case(
         self,
         user_input: str,
@@ -46,7 +148,7 @@ class GeminiService:
         Returns:
             Generated test case JSON matching CES Evaluation schema
         """
-        model = self._get_model()
+        model = self._get_model(evaluation_schema(test_type))
 
         # Build prompt based on test type
         if test_type == "golden":
@@ -59,23 +161,43 @@ class GeminiService:
             )
 
         # Generate with structured output
-        response = model.generate_content(prompt)
+        response = await self._generate(model, prompt, "generate_test_case")
 
-        # Parse response
+        return self._parse_generated(response.text)
+
+    def _parse_generated(self, text: str) -> Dict[str, Any]:
         try:
-            # Try to extract JSON from response
-            text = response.text
-            if "```json" in text:
-                json_str = text.split("```json")[1].split("```")[0]
-            elif "```" in text:
-                json_str = text.split("```")[1].split("```")[0]
-            else:
-                json_str = text
-
-            return json.loads(json_str.strip())
-        except (json.JSONDecodeError, IndexError) as e:
+            return self._parse_json(text)
+        except JSONExtractionError as e:
             # Return raw text if JSON parsing fails
-            return {"raw_response": response.text, "parse_error": str(e)}
+            return {"raw_response": text, "parse_error": str(e)}
+
+    async def generate_test_case_stream(
+        self,
+        user_input: str,
+        agent_context: Optional[Dict[str, Any]] = None,
+        test_type: str = "golden",
+        retry_feedback: Optional[str] = None,
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Streaming variant of generate_test_case.
+
+        Yields ("token", text) for each chunk, ("stage", "validating") once
+        generation ends, then ("result", generated_json).
+        """
+        model = self._get_model(evaluation_schema(test_type))
+        if test_type == "golden":
+            prompt = self._build_golden_prompt(user_input, agent_context, retry_feedback)
+        else:
+            prompt = self._build_scenario_prompt(user_input, agent_context, retry_feedback)
+
+        parts: List[str] = []
+        async for text in self._generate_stream(model, prompt, "generate_test_case"):
+            parts.append(text)
+            yield "token", text
+
+        yield "stage", "validating"
+        yield "result", self._parse_generated("".join(parts))
 
     def _build_golden_prompt(
         self,
@@ -143,25 +265,143 @@ Output format: JSON object matching CES Evaluation schema with 'scenario' field.
 
         return prompt
 
-    async def analyze_results(
-        self, run_results: List[Dict[str, Any]], question: Optional[str] = None
+    async def analyze_failure_clusters(
+        self,
+        overview: Dict[str, Any],
+        clusters: List[Dict[str, Any]],
+        question: Optional[str] = None,
     ) -> str:
         """
-        Analyze evaluation run results using Gemini.
+        Analyze clustered failures with a bounded prompt size.
+
+        Clusters are split into chunks of at most GEMINI_ANALYSIS_CHUNK_CHARS.
+        A single chunk is analyzed directly; otherwise each chunk is analyzed
+        concurrently, at most GEMINI_ANALYSIS_CONCURRENCY at once (map), and
+        the partial analyses, cut to share one chunk's size, are merged (reduce).
 
         Args:
-            run_results: List of evaluation results
+            overview: Run totals from failure_clustering.summarize_for_analysis
+            clusters: Cluster prompt dicts, largest first
             question: Optional specific question about results
 
         Returns:
             Natural language analysis
         """
+        analysis = ""
+        async for kind, value in self.analyze_failure_clusters_stream(overview, clusters, question):
+            if kind == "result":
+                analysis = value
+        return analysis
+
+    async def analyze_failure_clusters_stream(
+        self,
+        overview: Dict[str, Any],
+        clusters: List[Dict[str, Any]],
+        question: Optional[str] = None,
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Streaming variant of analyze_failure_clusters.
+
+        Yields ("stage", name) as map steps complete, ("token", text) for the
+        final analysis, then ("result", analysis).
+        """
+        chunks: List[List[Dict[str, Any]]] = [[]]
+        size = 0
+        for cluster in clusters:
+            cluster_size = len(json.dumps(cluster, default=str))
+            if chunks[-1] and size + cluster_size > settings.GEMINI_ANALYSIS_CHUNK_CHARS:
+                chunks.append([])
+                size = 0
+            chunks[-1].append(cluster)
+            size += cluster_size
+
+        instructions = (
+            f"\nSpecific question: {question}\n"
+            if question
+            else """
+Provide:
+1. Summary of pass/fail rates
+2. Key failure patterns
+3. Root cause analysis for failures
+4. Recommended fixes
+"""
+        )
         model = self._get_model()
 
-        prompt = f"""You are a QA analyst analyzing CX Agent evaluation results.
+        if len(chunks) == 1:
+            prompt = f"""You are a QA analyst analyzing CX Agent evaluation results.
 
-Evaluation Results:
-{json.dumps(run_results, indent=2)}
+Failures have been grouped into clusters; each cluster shows how many results
+it covers and one representative failure.
+
+Run Overview:
+{json.dumps(overview, indent=2)}
+
+Failure Clusters:
+{json.dumps(chunks[0], indent=2)}
+{instructions}"""
+            operation = "analyze_results"
+        else:
+            async def analyze_chunk(index: int, chunk: List[Dict[str, Any]]) -> str:
+                prompt = f"""You are a QA analyst. Below is part {index + 1} of {len(chunks)} of the
+failure clusters from one CX Agent evaluation run. Each cluster shows how many
+results it covers and one representative failure.
+
+Failure Clusters:
+{json.dumps(chunk, indent=2)}
+
+Describe the failure patterns and likely root causes in these clusters only.
+Be concise; your notes will be merged with notes on the other parts."""
+                async with slots:
+                    response = await self._generate(model, prompt, "analyze_results.map")
+                # The reduce prompt stays within one chunk however many parts there are
+                return response.text[:note_chars]
+
+            slots = asyncio.Semaphore(max(1, settings.GEMINI_ANALYSIS_CONCURRENCY))
+            note_chars = settings.GEMINI_ANALYSIS_CHUNK_CHARS // len(chunks)
+            yield "stage", f"analyzing {len(chunks)} parts"
+            partials = await asyncio.gather(
+                *(analyze_chunk(i, chunk) for i, chunk in enumerate(chunks))
+            )
+            yield "stage", "merging"
+            notes = "\n\n".join(f"Part {i + 1}:\n{text}" for i, text in enumerate(partials))
+            prompt = f"""You are a QA analyst analyzing CX Agent evaluation results.
+
+Run Overview:
+{json.dumps(overview, indent=2)}
+
+Analyst notes on the failure clusters, one per part of the run:
+{notes}
+{instructions}"""
+            operation = "analyze_results.reduce"
+
+        parts: List[str] = []
+        async for text in self._generate_stream(model, prompt, operation):
+            parts.append(text)
+            yield "token", text
+        yield "result", "".join(parts)
+
+    async def analyze_trends(
+        self, run_summaries: List[Dict[str, Any]], question: Optional[str] = None
+    ) -> str:
+        """
+        Analyze trends across evaluation runs from their stored summaries.
+
+        Args:
+            run_summaries: Compact per-run summaries, oldest first
+            question: Optional specific question about the trend
+
+        Returns:
+            Natural language analysis
+        """
+        model = self._get_model()
+
+        prompt = f"""You are a QA analyst reviewing a series of CX Agent evaluation runs
+of the same test suite, oldest first. Each run lists its totals and its largest
+failure clusters.
+
+Runs:
+{json.dumps(run_summaries, indent=2)}
 
 """
 
@@ -170,13 +410,13 @@ Evaluation Results:
         else:
             prompt += """
 Provide:
-1. Summary of pass/fail rates
-2. Key failure patterns
-3. Root cause analysis for failures
-4. Recommended fixes
+1. How the pass rate has moved across runs
+2. Failure patterns that are new, persistent, or resolved
+3. Likely causes, referencing app versions where relevant
+4. Recommended next steps
 """
 
-        response = model.generate_content(prompt)
+        response = await self._generate(model, prompt, "analyze_trends")
         return response.text
 
     async def classify_test_type(self, user_input: str) -> str:
@@ -197,7 +437,7 @@ Test requirement: {user_input}
 
 Respond with just "golden" or "scenario" (lowercase)."""
 
-        response = model.generate_content(prompt)
+        response = await self._generate(model, prompt, "classify_test_type")
         result = response.text.strip().lower()
 
         if "golden" in result:
@@ -216,7 +456,7 @@ Respond with just "golden" or "scenario" (lowercase)."""
         Returns:
             List of test requirement objects with description and type_hint
         """
-        model = self._get_model()
+        model = self._get_model(TEST_REQUIREMENTS_SCHEMA)
 
         prompt = f"""Extract individual test requirements from this document.
 
@@ -229,20 +469,15 @@ Document content:
 
 Output as JSON array."""
 
-        response = model.generate_content(prompt)
+        response = await self._generate(model, prompt, "extract_test_requirements")
 
         try:
-            text = response.text
-            if "```json" in text:
-                json_str = text.split("```json")[1].split("```")[0]
-            elif "```" in text:
-                json_str = text.split("```")[1].split("```")[0]
-            else:
-                json_str = text
-
-            return json.loads(json_str.strip())
-        except (json.JSONDecodeError, IndexError):
+            requirements = self._parse_json(response.text)
+        except JSONExtractionError:
             return [{"description": docx_content[:1000], "type_hint": None}]
+        if isinstance(requirements, dict):
+            requirements = [requirements]
+        return requirements
 
     async def suggest_improvements(
         self, test_case: Dict[str, Any], failure_info: Optional[Dict[str, Any]] = None
@@ -271,7 +506,7 @@ Test Case:
 
         prompt += "\nProvide specific, actionable suggestions for improving test coverage and accuracy."
 
-        response = model.generate_content(prompt)
+        response = await self._generate(model, prompt, "suggest_improvements")
         return response.text
 
 
@@ -0,0 +1,157 @@
+"""Tolerant JSON extraction for LLM output.
+
+Gemini output is usually valid JSON, but it may be wrapped in a code fence,
+preceded by prose, or cut short when the model hits ``max_output_tokens``.
+``IncrementalJSONParser`` consumes the text chunk by chunk, tracks the open
+containers as it goes, and can close a truncated document at the last complete
+value without rescanning what it has already seen.
+"""
+
+import json
+from typing import Any, List, Optional, Tuple
+
+
+class JSONExtractionError(ValueError):
+    """Raised when no JSON value can be recovered from the text."""
+
+
+class IncrementalJSONParser:
+    """Single-pass, repairable JSON scanner.
+
+    Text before the first ``{`` or ``[`` and after the root value closes is
+    ignored, so fenced or chatty responses need no pre-processing.
+    """
+
+    def __init__(self):
+        self._buf: List[str] = []
+        self._stack: List[List[str]] = []  # [container, expecting] per level
+        self._started = False
+        self._done = False
+        self._in_string = False
+        self._string_is_value = False
+        self._escape_start: Optional[int] = None
+        self._safe_len = 0
+        self.repaired = False
+
+    @property
+    def done(self) -> bool:
+        """True once the root value has been closed."""
+        return self._done
+
+    def feed(self, chunk: str) -> None:
+        """Consume the next chunk of model output."""
+        for ch in chunk:
+            if self._done:
+                return
+            if not self._started:
+                if ch in "{[":
+                    self._started = True
+                    self._open(ch)
+                continue
+            self._consume(ch)
+
+    def _open(self, ch: str) -> None:
+        self._buf.append(ch)
+        self._stack.append([ch, "key" if ch == "{" else "value"])
+        self._safe_len = len(self._buf)
+
+    def _consume(self, ch: str) -> None:
+        buf = self._buf
+        if self._in_string:
+            buf.append(ch)
+            if self._escape_start is not None:
+                # \uXXXX needs four more characters before it is complete
+                if buf[self._escape_start + 1] != "u" or len(buf) - self._escape_start >= 6:
+                    self._escape_start = None
+            elif ch == "\\":
+                self._escape_start = len(buf) - 1
+            elif ch == '"':
+                self._in_string = False
+                if self._string_is_value:
+                    self._safe_len = len(buf)
+            return
+
+        top = self._stack[-1]
+        if ch == '"':
+            self._in_string = True
+            self._string_is_value = top[0] == "[" or top[1] == "value"
+            buf.append(ch)
+        elif ch in "{[":
+            self._open(ch)
+        elif ch in "}]":
+            buf.append(ch)
+            self._stack.pop()
+            self._safe_len = len(buf)
+            if not self._stack:
+                self._done = True
+        elif ch == ",":
+            self._safe_len = len(buf)
+            buf.append(ch)
+            if top[0] == "{":
+                top[1] = "key"
+        elif ch == ":":
+            buf.append(ch)
+            top[1] = "value"
+        elif not ch.isspace():
+            buf.append(ch)
+
+    def _repaired_text(self) -> str:
+        """Return the buffer closed at the last complete value."""
+        if self._done:
+            return "".join(self._buf)
+        if self._in_string and self._string_is_value:
+            end = self._escape_start if self._escape_start is not None else len(self._buf)
+            text = "".join(self._buf[:end]) + '"'
+        else:
+            text = "".join(self._buf[: self._safe_len])
+        closers = "".join("}" if level[0] == "{" else "]" for level in reversed(self._stack))
+        return text + closers
+
+    def snapshot(self) -> Optional[Any]:
+        """Best-effort value for everything fed so far, or None."""
+        if not self._started:
+            return None
+        try:
+            return json.loads(self._repaired_text())
+        except json.JSONDecodeError:
+            return None
+
+    def close(self) -> Any:
+        """Finish parsing, repairing a truncated document if needed."""
+        if not self._started:
+            raise JSONExtractionError("No JSON object or array found in response")
+        text = self._repaired_text()
+        try:
+            value = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise JSONExtractionError(f"Unrecoverable JSON: {e}") from e
+        self.repaired = not self._done
+        return value
+
+
+def strip_code_fence(text: str) -> str:
+    """Remove a surrounding ```json / ``` fence if present."""
+    if "```json" in text:
+        return text.split("```json", 1)[1].split("```", 1)[0].strip()
+    if "```" in text:
+        return text.split("```", 1)[1].split("```", 1)[0].strip()
+    return text.strip()
+
+
+def extract_json(text: str) -> Tuple[Any, bool]:
+    """
+    Extract a JSON value from model output.
+
+    Returns:
+        Tuple of (value, repaired) where repaired is True when the value was
+        recovered from truncated or malformed output.
+    """
+    try:
+        return json.loads(strip_code_fence(text)), False
+    except json.JSONDecodeError:
+        pass
+
+    parser = IncrementalJSONParser()
+    parser.feed(text)
+    value = parser.close()
+    return value, parser.repaired
@@ -0,0 +1,154 @@
+"""Mergeable latency histogram with bounded relative error.
+
+Values are counted in logarithmic buckets (the DDSketch layout): bucket ``i``
+covers ``(gamma**(i-1), gamma**i]``, so any quantile is reported within
+``RELATIVE_ACCURACY`` of the true sample value. Two histograms merge by adding
+bucket counts, which is what lets rollups combine runs and days without
+revisiting individual results. ``LatencySketch`` keeps one histogram per
+prompt category and per CES endpoint next to the overall one, and is what
+security runs persist as results come in.
+"""
+
+import math
+from typing import Dict, Iterable, Optional
+
+RELATIVE_ACCURACY = 0.01
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+
+
+class LatencyHistogram:
+    """Counts of latency samples (milliseconds) per logarithmic bucket."""
+
+    def __init__(self, buckets: Optional[Dict[int, int]] = None, zero_count: int = 0):
+        self.buckets: Dict[int, int] = dict(buckets or {})
+        self.zero_count = zero_count
+
+    @property
+    def count(self) -> int:
+        return self.zero_count + sum(self.buckets.values())
+
+    def add(self, value: float, count: int = 1) -> None:
+        if value <= 0:
+            self.zero_count += count
+            return
+        index = math.ceil(math.log(value) / _LOG_GAMMA)
+        self.buckets[index] = self.buckets.get(index, 0) + count
+
+    def update(self, values: Iterable[Optional[float]]) -> "LatencyHistogram":
+        for value in values:
+            if value is not None:
+                self.add(value)
+        return self
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        self.zero_count += other.zero_count
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        return self
+
+    def subtract(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """Remove ``other``'s samples, e.g. a deleted run's from a rollup that merged it."""
+        self.zero_count = max(0, self.zero_count - other.zero_count)
+        for index, count in other.buckets.items():
+            remaining = self.buckets.get(index, 0) - count
+            if remaining > 0:
+                self.buckets[index] = remaining
+            else:
+                self.buckets.pop(index, None)
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate ``q``-quantile (0 <= q <= 1), or None when empty."""
+        total = self.count
+        if total == 0:
+            return None
+        rank = q * (total - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                # Midpoint of the bucket in relative terms
+                return 2 * _GAMMA ** index / (_GAMMA + 1)
+        return 2 * _GAMMA ** max(self.buckets) / (_GAMMA + 1)
+
+    def to_dict(self) -> dict:
+        return {
+            "zero": self.zero_count,
+            "buckets": {str(index): count for index, count in sorted(self.buckets.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> "LatencyHistogram":
+        if not data:
+            return cls()
+        return cls(
+            {int(index): count for index, count in data.get("buckets", {}).items()},
+            data.get("zero", 0),
+        )
+
+
+def percentiles(histogram: LatencyHistogram) -> dict:
+    def rounded(q: float) -> Optional[float]:
+        value = histogram.quantile(q)
+        return round(value, 1) if value is not None else None
+
+    return {
+        "count": histogram.count,
+        "p50_ms": rounded(0.5),
+        "p95_ms": rounded(0.95),
+        "p99_ms": rounded(0.99),
+    }
+
+
+class LatencySketch:
+    """Latency histograms of one or more runs: overall, per prompt category and per CES endpoint."""
+
+    def __init__(self):
+        self.overall = LatencyHistogram()
+        self.categories: Dict[str, LatencyHistogram] = {}
+        self.endpoints: Dict[str, LatencyHistogram] = {}
+
+    def add(self, value: float, category: str, endpoint: Optional[str] = None) -> None:
+        self.overall.add(value)
+        self.categories.setdefault(category, LatencyHistogram()).add(value)
+        if endpoint:
+            self.endpoints.setdefault(endpoint, LatencyHistogram()).add(value)
+
+    def merge(self, other: "LatencySketch") -> "LatencySketch":
+        self.overall.merge(other.overall)
+        for mine, theirs in ((self.categories, other.categories), (self.endpoints, other.endpoints)):
+            for key, histogram in theirs.items():
+                mine.setdefault(key, LatencyHistogram()).merge(histogram)
+        return self
+
+    def summary(self) -> dict:
+        """p50/p95/p99 overall, per category and per endpoint."""
+        return {
+            **percentiles(self.overall),
+            "categories": {k: percentiles(h) for k, h in sorted(self.categories.items())},
+            "endpoints": {k: percentiles(h) for k, h in sorted(self.endpoints.items())},
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "overall": self.overall.to_dict(),
+            "categories": {k: h.to_dict() for k, h in sorted(self.categories.items())},
+            "endpoints": {k: h.to_dict() for k, h in sorted(self.endpoints.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> "LatencySketch":
+        sketch = cls()
+        if not data:
+            return sketch
+        sketch.overall = LatencyHistogram.from_dict(data.get("overall"))
+        sketch.categories = {
+            k: LatencyHistogram.from_dict(h) for k, h in data.get("categories", {}).items()
+        }
+        sketch.endpoints = {
+            k: LatencyHistogram.from_dict(h) for k, h in data.get("endpoints", {}).items()
+        }
+        return sketch
@@ -0,0 +1,50 @@
+"""Named leases that let one API replica at a time run a background loop.
+
+A lease is a ``scheduler_leases`` row naming its holder and expiry. The
+holder renews it each tick; once it lapses, any replica may take it over.
+The scheduler, the evaluation run reconciler and the webhook dispatcher
+each hold their own lease.
+"""
+
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.schedule import SchedulerLease
+
+INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+async def acquire_lease(db: AsyncSession, name: str, holder: str, ttl: timedelta) -> bool:
+    """Take or renew lease ``name`` for ``holder``; False while another holder's is unexpired."""
+    now = datetime.now(timezone.utc)
+    result = await db.execute(
+        update(SchedulerLease)
+        .where(
+            SchedulerLease.name == name,
+            or_(SchedulerLease.holder == holder, SchedulerLease.expires_at < now),
+        )
+        .values(holder=holder, expires_at=now + ttl)
+    )
+    if result.rowcount == 0:
+        try:
+            async with db.begin_nested():
+                db.add(SchedulerLease(name=name, holder=holder, expires_at=now + ttl))
+        except IntegrityError:
+            # Held by another replica
+            await db.commit()
+            return False
+    await db.commit()
+    return True
+
+
+async def release_lease(db: AsyncSession, name: str, holder: str) -> None:
+    await db.execute(
+        delete(SchedulerLease).where(SchedulerLease.name == name, SchedulerLease.holder == holder)
+    )
+    await db.commit()
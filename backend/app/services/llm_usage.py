@@ -0,0 +1,142 @@
+"""Token and latency accounting for Gemini calls.
+
+Routes open an ``llm_call_scope`` naming the project and endpoint they are
+serving; ``GeminiService`` reads that scope for every call it makes, checks
+the project's token budget and writes one ``LLMCallRecord`` per call.
+"""
+
+import contextvars
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.llm_call import LLMCallRecord
+
+logger = logging.getLogger(__name__)
+
+
+class LLMBudgetExceeded(Exception):
+    """Raised before a call when the project has used its daily token budget."""
+
+    def __init__(self, project_id: str, used: int, budget: int):
+        self.project_id = project_id
+        self.used = used
+        self.budget = budget
+        super().__init__(
+            f"Project {project_id} used {used} of {budget} LLM tokens in the last 24h"
+        )
+
+
+@dataclass
+class LLMCall:
+    """In-memory view of one call, including the texts not persisted in the table."""
+    operation: str
+    model: str
+    prompt: str
+    response_text: str = ""
+    prompt_tokens: int = 0
+    response_tokens: int = 0
+    cached_tokens: int = 0
+    total_tokens: int = 0
+    latency_ms: float = 0.0
+    cache_status: str = "miss"
+    success: bool = True
+    error: Optional[str] = None
+
+
+@dataclass
+class LLMCallScope:
+    project_id: Optional[str] = None
+    endpoint: Optional[str] = None
+    calls: List[LLMCall] = field(default_factory=list)
+
+    @property
+    def last_call(self) -> Optional[LLMCall]:
+        return self.calls[-1] if self.calls else None
+
+
+_current_scope: contextvars.ContextVar[Optional[LLMCallScope]] = contextvars.ContextVar(
+    "llm_call_scope", default=None
+)
+
+
+@contextmanager
+def llm_call_scope(
+    project_id: Optional[str] = None, endpoint: Optional[str] = None
+) -> Iterator[LLMCallScope]:
+    """Attribute every Gemini call made inside the block to a project and endpoint."""
+    scope = LLMCallScope(
+        project_id=str(project_id) if project_id else None, endpoint=endpoint
+    )
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+
+
+def current_scope() -> Optional[LLMCallScope]:
+    return _current_scope.get()
+
+
+def usage_from_response(response: Any) -> Dict[str, int]:
+    """Read token counts from a Gemini response's usage_metadata."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return {"prompt_tokens": 0, "response_tokens": 0, "cached_tokens": 0, "total_tokens": 0}
+    return {
+        "prompt_tokens": getattr(usage, "prompt_token_count", 0) or 0,
+        "response_tokens": getattr(usage, "candidates_token_count", 0) or 0,
+        "cached_tokens": getattr(usage, "cached_content_token_count", 0) or 0,
+        "total_tokens": getattr(usage, "total_token_count", 0) or 0,
+    }
+
+
+async def check_budget(project_id: Optional[str]) -> None:
+    """Raise LLMBudgetExceeded if the project is over its rolling 24h budget."""
+    budget = settings.LLM_PROJECT_DAILY_TOKEN_BUDGET
+    if not project_id or budget <= 0:
+        return
+    since = datetime.now(timezone.utc) - timedelta(days=1)
+    async with AsyncSessionLocal() as db:
+        used = await db.scalar(
+            select(func.coalesce(func.sum(LLMCallRecord.total_tokens), 0)).where(
+                LLMCallRecord.project_id == project_id,
+                LLMCallRecord.created_at >= since,
+            )
+        ) or 0
+    if used >= budget:
+        raise LLMBudgetExceeded(project_id, used, budget)
+
+
+async def record_call(call: LLMCall) -> None:
+    """Attach the call to the current scope and persist its accounting row."""
+    scope = current_scope()
+    if scope is not None:
+        scope.calls.append(call)
+    try:
+        async with AsyncSessionLocal() as db:
+            db.add(LLMCallRecord(
+                project_id=scope.project_id if scope else None,
+                endpoint=scope.endpoint if scope else None,
+                operation=call.operation,
+                model=call.model,
+                prompt_tokens=call.prompt_tokens,
+                response_tokens=call.response_tokens,
+                cached_tokens=call.cached_tokens,
+                total_tokens=call.total_tokens,
+                latency_ms=call.latency_ms,
+                cache_status=call.cache_status,
+                success=call.success,
+                error=call.error,
+            ))
+            await db.commit()
+    except Exception:
+        # Accounting must never fail the call it is measuring
+        logger.exception("Failed to record LLM call %s", call.operation)
@@ -0,0 +1,290 @@
+"""Outcome history, regressions and flakiness of test cases across runs.
+
+When a completed run is rolled up, its results are grouped per test case
+into one ``TestCaseOutcome`` row and compared with the test case's previous
+passed or failed outcome, which ``TestCaseStability`` carries along with a
+running flakiness score. A run is therefore compared with its predecessor
+through one lookup per test case instead of a scan of older results, and the
+"new failures / fixed / flaky" views read those rows through their indexes.
+
+Flakiness is an exponentially weighted average over runs of "the outcome
+flipped between passed and failed, or the test case did both within the
+run", so it decays once a test case settles. Errors say nothing about the
+agent and are recorded without counting towards it.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.evaluation_run import EvaluationRunRecord, RunResultRecord
+from app.models.outcome import TestCaseOutcome, TestCaseStability
+from app.models.test_case import TestCase
+
+PASSED = "passed"
+FAILED = "failed"
+FLAKY = "flaky"
+ERROR = "error"
+
+NEW_FAILURE = "new_failure"
+STILL_FAILING = "still_failing"
+FIXED = "fixed"
+STILL_PASSING = "still_passing"
+
+# Weight of the latest run in the flakiness score
+FLAKINESS_WEIGHT = 0.2
+# Keeps IN lists well below SQLite's bound-parameter limit
+LOOKUP_CHUNK = 500
+
+
+def _short_id(resource_name: str) -> str:
+    return resource_name.rsplit("/", 1)[-1]
+
+
+def _utc(moment: datetime) -> datetime:
+    # SQLite hands back naive datetimes
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def classify(passed: int, failed: int) -> str:
+    """Outcome of a test case's results in one run."""
+    if passed and failed:
+        return FLAKY
+    if failed:
+        return FAILED
+    return PASSED if passed else ERROR
+
+
+def transition(previous: Optional[str], outcome: str) -> str:
+    """How ``outcome`` compares with the previous passed, failed or flaky outcome."""
+    if outcome == FAILED:
+        return STILL_FAILING if previous == FAILED else NEW_FAILURE
+    if outcome == PASSED:
+        return FIXED if previous == FAILED else STILL_PASSING
+    return outcome
+
+
+def unstable(previous: Optional[str], outcome: str) -> bool:
+    """True when a run counts towards flakiness."""
+    if outcome == FLAKY:
+        return True
+    return previous in (PASSED, FAILED) and previous != outcome
+
+
+async def _test_case_ids(db: AsyncSession, test_suite_id: str) -> Dict[str, str]:
+    """Test case ids of a suite keyed by CES evaluation resource name and short id."""
+    rows = await db.execute(
+        select(TestCase.ces_evaluation_id, TestCase.id).where(
+            TestCase.test_suite_id == test_suite_id,
+            TestCase.ces_evaluation_id.isnot(None),
+        )
+    )
+    index: Dict[str, str] = {}
+    for evaluation_id, test_case_id in rows:
+        index[evaluation_id] = test_case_id
+        index.setdefault(_short_id(evaluation_id), test_case_id)
+    return index
+
+
+async def _run_counts(db: AsyncSession, run: EvaluationRunRecord) -> Dict[str, List[int]]:
+    """[passed, failed, error] result counts of a run per test case id."""
+    index = await _test_case_ids(db, run.test_suite_id)
+    rows = await db.execute(
+        select(
+            RunResultRecord.ces_evaluation_id,
+            func.sum(case((RunResultRecord.passed.is_(True), 1), else_=0)),
+            func.sum(case((RunResultRecord.passed.is_(False), 1), else_=0)),
+            func.count(),
+        )
+        .where(RunResultRecord.evaluation_run_id == run.id)
+        .group_by(RunResultRecord.ces_evaluation_id)
+    )
+    counts: Dict[str, List[int]] = {}
+    for evaluation_id, passed, failed, total in rows:
+        test_case_id = evaluation_id and (
+            index.get(evaluation_id) or index.get(_short_id(evaluation_id))
+        )
+        if not test_case_id:
+            continue
+        tally = counts.setdefault(test_case_id, [0, 0, 0])
+        tally[0] += passed or 0
+        tally[1] += failed or 0
+        tally[2] += total - (passed or 0) - (failed or 0)
+    return counts
+
+
+async def _locked_stability(
+    db: AsyncSession, test_suite_id: str, test_case_ids: List[str]
+) -> Dict[str, TestCaseStability]:
+    """Stability rows of the given test cases, created empty if missing."""
+    rows: Dict[str, TestCaseStability] = {}
+    for start in range(0, len(test_case_ids), LOOKUP_CHUNK):
+        chunk = test_case_ids[start:start + LOOKUP_CHUNK]
+        query = select(TestCaseStability).where(TestCaseStability.test_case_id.in_(chunk))
+        rows.update((row.test_case_id, row) for row in await db.scalars(query.with_for_update()))
+        missing = [test_case_id for test_case_id in chunk if test_case_id not in rows]
+        if not missing:
+            continue
+        try:
+            async with db.begin_nested():
+                created = [
+                    TestCaseStability(
+                        test_case_id=test_case_id, test_suite_id=test_suite_id,
+                        run_count=0, flip_count=0, mixed_count=0, flakiness=0.0,
+                    )
+                    for test_case_id in missing
+                ]
+                db.add_all(created)
+            rows.update((row.test_case_id, row) for row in created)
+        except IntegrityError:
+            # Created concurrently by another run of the same suite
+            locked = query.where(TestCaseStability.test_case_id.in_(missing))
+            rows.update(
+                (row.test_case_id, row)
+                for row in await db.scalars(
+                    locked.with_for_update().execution_options(populate_existing=True)
+                )
+            )
+    return rows
+
+
+async def record_run_outcomes(db: AsyncSession, run: EvaluationRunRecord) -> int:
+    """Add a completed run to its test cases' history; the caller commits.
+
+    Called once per run from the rollup, which guarantees a run is recorded
+    exactly once. A run finishing before the test case's latest recorded run
+    (a late catch-up) is stored without a transition and leaves the
+    flakiness score alone. Returns the number of test cases recorded.
+    """
+    counts = await _run_counts(db, run)
+    if not counts:
+        return 0
+    completed_at = _utc(run.completed_at or run.created_at or datetime.now(timezone.utc))
+    stability = await _locked_stability(db, run.test_suite_id, sorted(counts))
+
+    now = datetime.now(timezone.utc)
+    outcomes = []
+    for test_case_id, (passed, failed, errors) in counts.items():
+        row = stability[test_case_id]
+        outcome = classify(passed, failed)
+        late = (
+            row.last_run_completed_at is not None
+            and completed_at < _utc(row.last_run_completed_at)
+        )
+        outcomes.append({
+            "test_case_id": test_case_id,
+            "evaluation_run_id": run.id,
+            "test_suite_id": run.test_suite_id,
+            "run_completed_at": completed_at,
+            "passed_count": passed,
+            "failed_count": failed,
+            "error_count": errors,
+            "outcome": outcome,
+            "transition": None if late else transition(row.last_outcome, outcome),
+        })
+        if late:
+            continue
+        row.last_run_id = run.id
+        row.last_run_completed_at = completed_at
+        row.updated_at = now
+        if outcome == ERROR:
+            continue
+        flipped = unstable(row.last_outcome, outcome)
+        row.run_count += 1
+        row.flip_count += int(flipped and outcome != FLAKY)
+        row.mixed_count += int(outcome == FLAKY)
+        row.flakiness = (1 - FLAKINESS_WEIGHT) * row.flakiness + FLAKINESS_WEIGHT * flipped
+        row.last_outcome = outcome
+
+    await db.execute(insert(TestCaseOutcome), outcomes)
+    return len(outcomes)
+
+
+async def run_changes(db: AsyncSession, run_id: str) -> Dict[str, Any]:
+    """Transition counts of a run and the test cases that newly failed, got fixed or were flaky."""
+    counts = dict((await db.execute(
+        select(TestCaseOutcome.transition, func.count())
+        .where(TestCaseOutcome.evaluation_run_id == run_id)
+        .group_by(TestCaseOutcome.transition)
+    )).all())
+    rows = await db.execute(
+        select(
+            TestCaseOutcome.test_case_id,
+            TestCase.name.label("test_case_name"),
+            TestCaseOutcome.transition,
+            TestCaseOutcome.passed_count,
+            TestCaseOutcome.failed_count,
+            TestCaseOutcome.error_count,
+            TestCaseStability.flakiness,
+        )
+        .join(TestCase, TestCase.id == TestCaseOutcome.test_case_id)
+        .outerjoin(TestCaseStability, TestCaseStability.test_case_id == TestCaseOutcome.test_case_id)
+        .where(
+            TestCaseOutcome.evaluation_run_id == run_id,
+            TestCaseOutcome.transition.in_((NEW_FAILURE, FIXED, FLAKY)),
+        )
+        .order_by(TestCase.name)
+    )
+    changes: Dict[str, Any] = {
+        "counts": {key: value for key, value in counts.items() if key is not None},
+        "new_failures": [],
+        "fixed": [],
+        "flaky": [],
+    }
+    lists = {NEW_FAILURE: "new_failures", FIXED: "fixed", FLAKY: "flaky"}
+    for row in rows.mappings():
+        changes[lists[row["transition"]]].append(dict(row))
+    return changes
+
+
+async def flaky_test_cases(
+    db: AsyncSession, test_suite_id: str, min_flakiness: float, limit: int
+) -> List[Dict[str, Any]]:
+    """A suite's test cases with at least ``min_flakiness``, flakiest first."""
+    rows = await db.execute(
+        select(
+            TestCaseStability.test_case_id,
+            TestCase.name.label("test_case_name"),
+            TestCaseStability.flakiness,
+            TestCaseStability.run_count,
+            TestCaseStability.flip_count,
+            TestCaseStability.mixed_count,
+            TestCaseStability.last_outcome,
+            TestCaseStability.last_run_id,
+        )
+        .join(TestCase, TestCase.id == TestCaseStability.test_case_id)
+        .where(
+            TestCaseStability.test_suite_id == test_suite_id,
+            TestCaseStability.flakiness >= min_flakiness,
+        )
+        .order_by(TestCaseStability.flakiness.desc())
+        .limit(limit)
+    )
+    return [dict(row) for row in rows.mappings()]
+
+
+async def test_case_history(db: AsyncSession, test_case_id: str, limit: int) -> List[TestCaseOutcome]:
+    """A test case's recorded outcomes, newest run first."""
+    rows = await db.scalars(
+        select(TestCaseOutcome)
+        .where(TestCaseOutcome.test_case_id == test_case_id)
+        .order_by(TestCaseOutcome.run_completed_at.desc())
+        .limit(limit)
+    )
+    return rows.all()
+
+
+async def delete_run_outcomes(db: AsyncSession, run_id: str) -> None:
+    """Drop the outcome rows of a deleted run; stability scores keep what they learned."""
+    await db.execute(delete(TestCaseOutcome).where(TestCaseOutcome.evaluation_run_id == run_id))
+
+
+async def delete_test_case_history(db: AsyncSession, test_case_id: str) -> None:
+    """Drop the outcome history and stability of a deleted test case."""
+    await db.execute(delete(TestCaseOutcome).where(TestCaseOutcome.test_case_id == test_case_id))
+    await db.execute(
+        delete(TestCaseStability).where(TestCaseStability.test_case_id == test_case_id)
+    )
@@ -0,0 +1,181 @@
+"""Per-project history of attack prompt outcomes.
+
+Each prompt is identified by the SHA-256 of its normalised text (Unicode
+NFKC, case-folded, whitespace collapsed), and its outcomes are counted per
+app version. The history drives two optional security run modes:
+
+* ``prioritize`` sends prompts with the highest upper confidence bound on
+  their historical success rate first. Prompts that got through before, and
+  prompts with little or no history, come first; reliably blocked prompts
+  come last, so regressions show up early in the run.
+* ``incremental`` sends only prompts not yet tested against the run's app
+  version.
+"""
+
+import hashlib
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.security_testing import PromptHistory
+from app.utils.stats import wilson_interval
+
+# Keeps IN lists well below SQLite's bound-parameter limit
+LOOKUP_CHUNK = 500
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(text: str) -> str:
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text).casefold()).strip()
+
+
+def prompt_hash(text: str) -> str:
+    return hashlib.sha256(normalize_prompt(text).encode()).hexdigest()
+
+
+@dataclass
+class PromptRecord:
+    """A prompt's outcomes summed over app versions."""
+    attempts: int = 0
+    successes: int = 0
+    versions: Set[str] = field(default_factory=set)
+
+    @property
+    def priority(self) -> Tuple[float, float]:
+        _, high = wilson_interval(self.successes, self.attempts)
+        rate = self.successes / self.attempts if self.attempts else 0.0
+        return high, rate
+
+
+async def latest_app_version(ces, ces_app_name: str) -> Optional[str]:
+    """Name of the app's newest CES version, or None when it cannot be listed."""
+    try:
+        response = await ces.list_versions(ces_app_name.rsplit("/", 1)[-1])
+    except Exception:
+        return None
+    versions = response.get("appVersions") or response.get("versions") or []
+    if not versions:
+        return None
+    return max(versions, key=lambda version: version.get("createTime", "")).get("name")
+
+
+async def load_history(
+    db: AsyncSession, project_id: str, hashes: Iterable[str]
+) -> Dict[str, PromptRecord]:
+    """History of the given prompt hashes in a project."""
+    hashes = list(dict.fromkeys(hashes))
+    history: Dict[str, PromptRecord] = {}
+    for start in range(0, len(hashes), LOOKUP_CHUNK):
+        rows = await db.execute(
+            select(
+                PromptHistory.prompt_hash,
+                PromptHistory.app_version,
+                PromptHistory.attempts,
+                PromptHistory.successes,
+            ).where(
+                PromptHistory.project_id == project_id,
+                PromptHistory.prompt_hash.in_(hashes[start:start + LOOKUP_CHUNK]),
+            )
+        )
+        for digest, app_version, attempts, successes in rows:
+            record = history.setdefault(digest, PromptRecord())
+            record.attempts += attempts or 0
+            record.successes += successes or 0
+            record.versions.add(app_version)
+    return history
+
+
+def prioritize_prompts(
+    prompts: List[Dict[str, Any]], history: Dict[str, PromptRecord]
+) -> List[Dict[str, Any]]:
+    """``prompts`` most likely to get through first; ties keep dataset order."""
+    return sorted(
+        prompts,
+        key=lambda prompt: history.get(prompt["hash"], PromptRecord()).priority,
+        reverse=True,
+    )
+
+
+def untested_prompts(
+    prompts: List[Dict[str, Any]], history: Dict[str, PromptRecord], app_version: str
+) -> List[Dict[str, Any]]:
+    """``prompts`` with no outcome recorded against ``app_version``."""
+    return [
+        prompt for prompt in prompts
+        if app_version not in history.get(prompt["hash"], PromptRecord()).versions
+    ]
+
+
+async def _locked_history(
+    db: AsyncSession,
+    project_id: str,
+    app_version: str,
+    outcomes: Dict[str, Tuple[Optional[str], bool]],
+) -> Dict[str, PromptHistory]:
+    """History rows of the given prompts at ``app_version``, created empty if missing."""
+    rows: Dict[str, PromptHistory] = {}
+    hashes = list(outcomes)
+    for start in range(0, len(hashes), LOOKUP_CHUNK):
+        chunk = hashes[start:start + LOOKUP_CHUNK]
+        query = select(PromptHistory).where(
+            PromptHistory.project_id == project_id,
+            PromptHistory.app_version == app_version,
+            PromptHistory.prompt_hash.in_(chunk),
+        )
+        rows.update((row.prompt_hash, row) for row in await db.scalars(query.with_for_update()))
+        missing = [digest for digest in chunk if digest not in rows]
+        if not missing:
+            continue
+        try:
+            async with db.begin_nested():
+                created = [
+                    PromptHistory(
+                        project_id=project_id,
+                        prompt_hash=digest,
+                        app_version=app_version,
+                        prompt_category=outcomes[digest][0],
+                        attempts=0,
+                        successes=0,
+                    )
+                    for digest in missing
+                ]
+                db.add_all(created)
+            rows.update((row.prompt_hash, row) for row in created)
+        except IntegrityError:
+            # Created concurrently by another run against the same version
+            locked = query.where(PromptHistory.prompt_hash.in_(missing))
+            rows.update(
+                (row.prompt_hash, row)
+                for row in await db.scalars(
+                    locked.with_for_update().execution_options(populate_existing=True)
+                )
+            )
+    return rows
+
+
+async def record_outcomes(
+    db: AsyncSession,
+    project_id: str,
+    app_version: Optional[str],
+    run_id: str,
+    outcomes: Dict[str, Tuple[Optional[str], bool]],
+) -> None:
+    """Add a batch of ``{hash: (category, successful)}`` outcomes; the caller commits."""
+    if not outcomes:
+        return
+    now = datetime.now(timezone.utc)
+    rows = await _locked_history(db, project_id, app_version or "", outcomes)
+    for digest, (_, successful) in outcomes.items():
+        row = rows[digest]
+        row.attempts += 1
+        row.successes += int(successful)
+        row.last_successful = successful
+        row.last_run_id = run_id
+        row.last_tested_at = now
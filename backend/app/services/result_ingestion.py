@@ -0,0 +1,144 @@
+"""Ingestion of CES evaluation run results.
+
+Result pages are followed through ``nextPageToken``, the next page being
+requested while the current one is read. Every page is fetched before the
+caller opens its session, so no transaction or row lock is held while
+waiting on CES. Each page is then stored with one bulk INSERT; results are
+mapped back to their test cases through an in-memory index of the suite's
+``ces_evaluation_id`` values instead of a lookup per result.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.evaluation_run import EvaluationRunRecord, RunResultRecord
+from app.models.test_case import TestCase
+from app.services.run_events import evaluation_topic, run_events
+
+RESULT_PAGE_SIZE = 1000
+# Fields of each stored result pushed to the run's event stream
+RESULT_EVENT_FIELDS = (
+    "ces_evaluation_id", "shard_id", "test_case_name", "passed", "score", "failure_reason",
+)
+
+
+async def iter_result_pages(
+    ces, app_id: str, ces_run_id: str, page_size: int = RESULT_PAGE_SIZE
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Yield every page of a run's results, prefetching the next page."""
+    pending = asyncio.ensure_future(
+        ces.get_evaluation_run_results(app_id, ces_run_id, page_size)
+    )
+    try:
+        while pending is not None:
+            page = await pending
+            token = page.get("nextPageToken")
+            pending = asyncio.ensure_future(
+                ces.get_evaluation_run_results(app_id, ces_run_id, page_size, page_token=token)
+            ) if token else None
+            yield page.get("results", [])
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+async def fetch_result_pages(
+    ces, app_id: str, ces_run_id: str, page_size: int = RESULT_PAGE_SIZE
+) -> List[List[Dict[str, Any]]]:
+    """Every page of a run's results; call it before opening the session that stores them."""
+    return [page async for page in iter_result_pages(ces, app_id, ces_run_id, page_size)]
+
+
+def _short_id(resource_name: str) -> str:
+    return resource_name.rsplit("/", 1)[-1]
+
+
+async def evaluation_index(db: AsyncSession, test_suite_id: str) -> Dict[str, str]:
+    """Test case names of a suite keyed by CES evaluation resource name and short id."""
+    rows = await db.execute(
+        select(TestCase.ces_evaluation_id, TestCase.name).where(
+            TestCase.test_suite_id == test_suite_id,
+            TestCase.ces_evaluation_id.isnot(None),
+        )
+    )
+    index: Dict[str, str] = {}
+    for evaluation_id, name in rows:
+        index[evaluation_id] = name
+        index.setdefault(_short_id(evaluation_id), name)
+    return index
+
+
+def result_row(
+    run_id: str,
+    result: Dict[str, Any],
+    index: Dict[str, str],
+    created_at: datetime,
+    shard_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    evaluation_id: Optional[str] = result.get("evaluation")
+    test_case_name = None
+    if evaluation_id:
+        test_case_name = index.get(evaluation_id) or index.get(_short_id(evaluation_id))
+    return {
+        "evaluation_run_id": run_id,
+        "shard_id": shard_id,
+        "ces_result_id": result.get("name"),
+        "ces_evaluation_id": evaluation_id,
+        "test_case_name": test_case_name or result.get("displayName"),
+        "passed": result.get("passed"),
+        "score": result.get("score"),
+        "failure_reason": result.get("failureReason"),
+        "diagnostics": result.get("diagnosticInfo"),
+        "conversation_log": result.get("sessionOutput"),
+        "created_at": created_at,
+    }
+
+
+async def ingest_run_results(
+    db: AsyncSession,
+    eval_run: EvaluationRunRecord,
+    pages: Iterable[List[Dict[str, Any]]],
+    shard_id: Optional[str] = None,
+    replace: bool = True,
+) -> Dict[str, int]:
+    """Replace a run's stored results with ``pages``; the caller commits.
+
+    With ``shard_id`` only that shard's results are replaced; with
+    ``replace=False`` the pages are added to what is stored. Keeps the
+    run's ``result_count`` in step. Returns the total, passed and failed
+    counts of what was stored.
+    """
+    index = await evaluation_index(db, eval_run.test_suite_id)
+    removed = 0
+    if replace:
+        stale = delete(RunResultRecord).where(RunResultRecord.evaluation_run_id == eval_run.id)
+        if shard_id:
+            stale = stale.where(RunResultRecord.shard_id == shard_id)
+        removed = (await db.execute(stale)).rowcount
+
+    # Microsecond offsets keep CES order under (created_at, id) pagination
+    start = datetime.now(timezone.utc)
+    topic = evaluation_topic(eval_run.id)
+    counts = {"total": 0, "passed": 0, "failed": 0}
+    for results in pages:
+        if not results:
+            continue
+        rows = [
+            result_row(eval_run.id, result, index,
+                       start + timedelta(microseconds=counts["total"] + i), shard_id)
+            for i, result in enumerate(results)
+        ]
+        await db.execute(insert(RunResultRecord), rows)
+        if run_events.subscriber_count(topic):
+            run_events.publish(topic, "results", {"results": [
+                {key: row[key] for key in RESULT_EVENT_FIELDS} for row in rows
+            ]})
+        counts["total"] += len(rows)
+        counts["passed"] += sum(1 for row in rows if row["passed"] is True)
+        counts["failed"] += sum(1 for row in rows if row["passed"] is False)
+    eval_run.result_count = (eval_run.result_count or 0) - removed + counts["total"]
+    return counts
@@ -0,0 +1,390 @@
+"""Daily trend rollups, updated once per finished run.
+
+A run is folded into its day's rollup rows when it completes, in the same
+transaction that marks it completed; evaluation runs are also added to the
+test case outcome history (``app.services.outcome_history``) there and
+checked for regressions to send to webhooks. Claiming a run sets
+``rolled_up_at`` with a conditional UPDATE, so a run is counted exactly
+once even if the completion hook and the catch-up in
+``roll_up_pending_runs`` race; the catch-up runs in the background
+reconcile loop (app.services.evaluation_runs), never in a request, as does
+``store_missing_sketches`` for security runs stored without a latency
+sketch. Deleting a rolled-up run takes it back out of its day's rows. Trend
+endpoints read the rollups only and never touch run or result rows.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.evaluation_run import EvaluationRunRecord, RunState
+from app.models.rollup import ALL_CATEGORIES, EvaluationRollup, SecurityRollup
+from app.models.security_testing import SecurityTestResult, SecurityTestRun, SecurityTestState
+from app.models.test_suite import TestSuite
+from app.services.latency_histogram import LatencyHistogram, LatencySketch
+from app.services.outcome_history import record_run_outcomes
+from app.services.webhooks import notify_regressions
+
+UNCATEGORIZED = "uncategorized"
+
+
+def run_category(run: SecurityTestRun) -> str:
+    """Category of a security run's results that have no prompt category of their own."""
+    return run.dataset_category.value if run.dataset_category else UNCATEGORIZED
+
+
+async def security_run_sketch(db: AsyncSession, run: SecurityTestRun) -> LatencySketch:
+    """A security run's latency sketch, built from its results for runs stored without one.
+
+    Results carry no CES endpoint, so a rebuilt sketch has none. Nothing is
+    saved here; ``store_missing_sketches`` saves rebuilt sketches in the
+    background.
+    """
+    if run.latency_sketch is not None:
+        return LatencySketch.from_dict(run.latency_sketch)
+    sketch = LatencySketch()
+    default_category = run_category(run)
+    rows = await db.execute(
+        select(SecurityTestResult.prompt_category, SecurityTestResult.latency_ms).where(
+            SecurityTestResult.security_test_run_id == run.id,
+            SecurityTestResult.latency_ms.isnot(None),
+        )
+    )
+    for category, latency_ms in rows:
+        sketch.add(latency_ms, category or default_category)
+    return sketch
+
+
+async def store_missing_sketches(db: AsyncSession, batch_size: int = 200) -> int:
+    """Save rebuilt latency sketches of finished security runs stored without one.
+
+    Covers runs finished before sketches existed, so latency reads never
+    have to write. Each batch is committed on its own.
+    """
+    stored = 0
+    while True:
+        runs = (await db.execute(
+            select(SecurityTestRun)
+            .where(
+                SecurityTestRun.latency_sketch.is_(None),
+                SecurityTestRun.state.notin_((SecurityTestState.PENDING, SecurityTestState.RUNNING)),
+            )
+            .limit(batch_size)
+        )).scalars().all()
+        for run in runs:
+            run.latency_sketch = (await security_run_sketch(db, run)).to_dict()
+        if runs:
+            await db.commit()
+        stored += len(runs)
+        if len(runs) < batch_size:
+            return stored
+
+
+def rollup_day(run) -> date:
+    """UTC day a run is counted on: when it finished, else when it was created."""
+    moment = run.completed_at or run.created_at or datetime.now(timezone.utc)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return moment.date()
+
+
+async def _claim(db: AsyncSession, model, run_id: str) -> bool:
+    result = await db.execute(
+        update(model)
+        .where(model.id == run_id, model.rolled_up_at.is_(None))
+        .values(rolled_up_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+async def _locked_row(db: AsyncSession, model, counters: List[str], **key):
+    """The rollup row for ``key``, created with zeroed counters if missing."""
+    query = select(model).filter_by(**key).with_for_update()
+    row = await db.scalar(query)
+    if row is not None:
+        return row
+    try:
+        async with db.begin_nested():
+            row = model(**key, **{name: 0 for name in counters})
+            db.add(row)
+    except IntegrityError:
+        # Created concurrently by another run of the same day
+        row = await db.scalar(query.execution_options(populate_existing=True))
+    return row
+
+
+async def roll_up_evaluation_run(db: AsyncSession, run: EvaluationRunRecord) -> bool:
+    """Add a completed evaluation run to its suite's daily rollup and outcome history; the caller commits."""
+    if run.state != RunState.COMPLETED or not await _claim(db, EvaluationRunRecord, run.id):
+        return False
+    row = await _locked_row(
+        db, EvaluationRollup,
+        ["run_count", "total_count", "passed_count", "failed_count", "error_count"],
+        test_suite_id=run.test_suite_id, day=rollup_day(run),
+    )
+    row.run_count += 1
+    row.total_count += run.total_count or 0
+    row.passed_count += run.passed_count or 0
+    row.failed_count += run.failed_count or 0
+    row.error_count += run.error_count or 0
+    await record_run_outcomes(db, run)
+    await notify_regressions(db, run)
+    return True
+
+
+async def _security_run_totals(db: AsyncSession, run: SecurityTestRun):
+    """Attempts, successes and latency histogram per category of a security run.
+
+    Reads only this run's result counts, grouped by prompt category, and its
+    latency sketch; the ALL_CATEGORIES entry covers the run as a whole.
+    """
+    default_category = run_category(run)
+    attempts: Dict[str, int] = defaultdict(int)
+    successes: Dict[str, int] = defaultdict(int)
+    rows = await db.execute(
+        select(
+            SecurityTestResult.prompt_category,
+            func.count(),
+            func.sum(case((SecurityTestResult.is_attack_successful.is_(True), 1), else_=0)),
+        )
+        .where(SecurityTestResult.security_test_run_id == run.id)
+        .group_by(SecurityTestResult.prompt_category)
+    )
+    for category, count, successful in rows:
+        for key in (category or default_category, ALL_CATEGORIES):
+            attempts[key] += count
+            successes[key] += successful or 0
+    attempts.setdefault(ALL_CATEGORIES, 0)
+
+    sketch = await security_run_sketch(db, run)
+    histograms = defaultdict(LatencyHistogram, sketch.categories)
+    histograms[ALL_CATEGORIES] = sketch.overall
+    return attempts, successes, histograms
+
+
+async def roll_up_security_run(db: AsyncSession, run: SecurityTestRun) -> bool:
+    """Add a completed security run to its project's daily rollups; the caller commits."""
+    if run.state != SecurityTestState.COMPLETED or not await _claim(db, SecurityTestRun, run.id):
+        return False
+
+    attempts, successes, histograms = await _security_run_totals(db, run)
+    day = rollup_day(run)
+    for category in attempts:
+        row = await _locked_row(
+            db, SecurityRollup, ["run_count", "attempts", "successes"],
+            project_id=run.project_id, category=category, day=day,
+        )
+        row.run_count += 1
+        row.attempts += attempts[category]
+        row.successes += successes[category]
+        row.latency_histogram = (
+            LatencyHistogram.from_dict(row.latency_histogram)
+            .merge(histograms[category])
+            .to_dict()
+        )
+    return True
+
+
+async def remove_evaluation_run(db: AsyncSession, run: EvaluationRunRecord) -> bool:
+    """Take a rolled-up evaluation run out of its day's rollup before it is deleted; the caller commits."""
+    if run.rolled_up_at is None:
+        return False
+    row = await db.scalar(
+        select(EvaluationRollup)
+        .filter_by(test_suite_id=run.test_suite_id, day=rollup_day(run))
+        .with_for_update()
+    )
+    if row is None:
+        return False
+    row.run_count -= 1
+    row.total_count -= run.total_count or 0
+    row.passed_count -= run.passed_count or 0
+    row.failed_count -= run.failed_count or 0
+    row.error_count -= run.error_count or 0
+    if row.run_count <= 0:
+        await db.delete(row)
+    return True
+
+
+async def remove_security_run(db: AsyncSession, run: SecurityTestRun) -> bool:
+    """Take a rolled-up security run out of its day's rollups before it is deleted; the caller commits.
+
+    Must run while the run's results still exist.
+    """
+    if run.rolled_up_at is None:
+        return False
+    attempts, successes, histograms = await _security_run_totals(db, run)
+    day = rollup_day(run)
+    for category in attempts:
+        row = await db.scalar(
+            select(SecurityRollup)
+            .filter_by(project_id=run.project_id, category=category, day=day)
+            .with_for_update()
+        )
+        if row is None:
+            continue
+        row.run_count -= 1
+        if row.run_count <= 0:
+            await db.delete(row)
+            continue
+        row.attempts -= attempts[category]
+        row.successes -= successes[category]
+        row.latency_histogram = (
+            LatencyHistogram.from_dict(row.latency_histogram)
+            .subtract(histograms[category])
+            .to_dict()
+        )
+    return True
+
+
+async def roll_up_pending_runs(db: AsyncSession, batch_size: int = 200) -> int:
+    """Fold in completed runs that finished without being rolled up.
+
+    Covers runs completed before rollups existed and any whose completion
+    transaction was interrupted; in steady state it is one indexed lookup.
+    Each batch is committed on its own so a long backlog makes progress.
+    """
+    rolled = 0
+    for model, state, roll_up in (
+        (EvaluationRunRecord, RunState.COMPLETED, roll_up_evaluation_run),
+        (SecurityTestRun, SecurityTestState.COMPLETED, roll_up_security_run),
+    ):
+        while True:
+            runs = (await db.execute(
+                select(model)
+                .where(model.state == state, model.rolled_up_at.is_(None))
+                # Oldest first, so outcome history sees runs in order
+                .order_by(model.completed_at)
+                .limit(batch_size)
+            )).scalars().all()
+            for run in runs:
+                rolled += await roll_up(db, run)
+            if runs:
+                await db.commit()
+            if len(runs) < batch_size:
+                break
+    return rolled
+
+
+def since_day(days: int) -> date:
+    return datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+
+
+async def evaluation_trend(
+    db: AsyncSession,
+    since: date,
+    project_id: Optional[str] = None,
+    test_suite_id: Optional[str] = None,
+) -> List[dict]:
+    """Per-day evaluation totals across the suites in scope, oldest first."""
+    query = (
+        select(
+            EvaluationRollup.day,
+            func.sum(EvaluationRollup.run_count).label("run_count"),
+            func.sum(EvaluationRollup.total_count).label("total_count"),
+            func.sum(EvaluationRollup.passed_count).label("passed_count"),
+            func.sum(EvaluationRollup.failed_count).label("failed_count"),
+        )
+        .where(EvaluationRollup.day >= since)
+        .group_by(EvaluationRollup.day)
+        .order_by(EvaluationRollup.day)
+    )
+    if test_suite_id:
+        query = query.where(EvaluationRollup.test_suite_id == test_suite_id)
+    elif project_id:
+        query = query.where(EvaluationRollup.test_suite_id.in_(
+            select(TestSuite.id).where(TestSuite.project_id == project_id)
+        ))
+
+    points = []
+    for row in await db.execute(query):
+        total = row.passed_count + row.failed_count
+        points.append({
+            "day": row.day,
+            "run_count": row.run_count,
+            "total_count": row.total_count,
+            "passed_count": row.passed_count,
+            "failed_count": row.failed_count,
+            "pass_rate": round(row.passed_count / total * 100, 2) if total else None,
+        })
+    return points
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 1) if value is not None else None
+
+
+def _attack_success_rate(attempts: int, successes: int) -> Optional[float]:
+    return round(successes / attempts * 100, 2) if attempts else None
+
+
+async def security_trend(
+    db: AsyncSession,
+    since: date,
+    project_id: Optional[str] = None,
+    category: str = ALL_CATEGORIES,
+) -> List[dict]:
+    """Per-day attack success rate and latency percentiles, oldest first."""
+    query = select(SecurityRollup).where(
+        SecurityRollup.category == category, SecurityRollup.day >= since
+    )
+    if project_id:
+        query = query.where(SecurityRollup.project_id == project_id)
+
+    days: Dict[date, dict] = {}
+    for row in (await db.execute(query)).scalars():
+        day = days.setdefault(row.day, {
+            "run_count": 0, "attempts": 0, "successes": 0, "histogram": LatencyHistogram(),
+        })
+        day["run_count"] += row.run_count
+        day["attempts"] += row.attempts
+        day["successes"] += row.successes
+        day["histogram"].merge(LatencyHistogram.from_dict(row.latency_histogram))
+
+    points = []
+    for day in sorted(days):
+        totals = days[day]
+        histogram = totals.pop("histogram")
+        points.append({
+            "day": day,
+            **totals,
+            "attack_success_rate": _attack_success_rate(totals["attempts"], totals["successes"]),
+            "latency_p50_ms": _round(histogram.quantile(0.5)),
+            "latency_p95_ms": _round(histogram.quantile(0.95)),
+            "latency_p99_ms": _round(histogram.quantile(0.99)),
+        })
+    return points
+
+
+async def security_categories(
+    db: AsyncSession, since: date, project_id: Optional[str] = None
+) -> List[dict]:
+    """Attack success rate per prompt category over the window, most attacked first."""
+    query = (
+        select(
+            SecurityRollup.category,
+            func.sum(SecurityRollup.run_count).label("run_count"),
+            func.sum(SecurityRollup.attempts).label("attempts"),
+            func.sum(SecurityRollup.successes).label("successes"),
+        )
+        .where(SecurityRollup.category != ALL_CATEGORIES, SecurityRollup.day >= since)
+        .group_by(SecurityRollup.category)
+        .order_by(func.sum(SecurityRollup.successes).desc())
+    )
+    if project_id:
+        query = query.where(SecurityRollup.project_id == project_id)
+    return [
+        {
+            "category": row.category,
+            "run_count": row.run_count,
+            "attempts": row.attempts,
+            "successes": row.successes,
+            "attack_success_rate": _attack_success_rate(row.attempts, row.successes),
+        }
+        for row in await db.execute(query)
+    ]
@@ -0,0 +1,146 @@
+"""In-process event bus for live run progress.
+
+Runners publish counter updates, newly scored results and state changes;
+the ``/runs/{id}/events`` streams subscribe to the run's topic and forward
+what arrives. State changes are published after the commit that stores them.
+Results and counters are published as they are scored, before the batch
+holding them commits, so a watcher can be ahead of the database and a run
+that fails mid-batch may have shown results it never stored. Nothing is
+stored: a subscriber reads the run once when it connects and relies on the
+bus afterwards, so watching a run costs no database queries while it
+progresses.
+
+The bus only reaches watchers in the process running the run, and with
+several replicas a run (a leased reconciler's poller, say) may be driven by
+another one. A stream that has seen nothing for ``RELOAD_AFTER_KEEPALIVES``
+keep-alives re-reads the run: it forwards the stored counters and ends once
+the stored state is final. Watchers on another replica therefore see
+progress about once a minute instead of live, but their streams still close.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from app.utils.sse import sse_event
+
+# States after which a run publishes nothing more
+TERMINAL_STATES = {"completed", "error", "cancelled"}
+# Events a slow subscriber may fall behind by before the oldest are dropped
+QUEUE_SIZE = 1000
+# Comment line sent on quiet streams so proxies keep the connection open
+KEEPALIVE_SECONDS = 15.0
+# Quiet keep-alives after which a stream re-reads its run from the database
+RELOAD_AFTER_KEEPALIVES = 4
+
+Event = Tuple[str, Dict[str, Any]]
+
+
+def security_topic(run_id: str) -> str:
+    return f"security:{run_id}"
+
+
+def evaluation_topic(run_id: str) -> str:
+    return f"evaluation:{run_id}"
+
+
+class RunEventBus:
+    """Fan-out of run events to the queues subscribed to each topic."""
+
+    def __init__(self, queue_size: int = QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    def subscriber_count(self, topic: str) -> int:
+        return len(self._subscribers.get(topic, ()))
+
+    def subscribe(self, topic: str) -> "asyncio.Queue[Event]":
+        queue: "asyncio.Queue[Event]" = asyncio.Queue(self.queue_size)
+        self._subscribers.setdefault(topic, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, topic: str, queue: asyncio.Queue) -> None:
+        subscribers = self._subscribers.get(topic)
+        if subscribers is not None:
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[topic]
+
+    def publish(self, topic: str, event: str, data: Dict[str, Any]) -> None:
+        """Hand an event to every subscriber of ``topic`` without waiting on any."""
+        for queue in list(self._subscribers.get(topic, ())):
+            if queue.full():
+                # A stalled stream loses its oldest events, never the newest state
+                queue.get_nowait()
+            queue.put_nowait((event, data))
+
+    def publish_state(self, topic: str, state: str, **data: Any) -> None:
+        """Publish a state change; after a terminal state the topic is dropped.
+
+        Dropping the topic also releases queues of streams that were never
+        started, e.g. when the client went away before the first read.
+        """
+        self.publish(topic, "state", {"state": state, **data})
+        if state in TERMINAL_STATES:
+            self._subscribers.pop(topic, None)
+
+    async def stream(
+        self,
+        topic: str,
+        queue: "asyncio.Queue[Event]",
+        snapshot: Dict[str, Any],
+        reload: Optional[Callable[[], Awaitable[Optional[Dict[str, Any]]]]] = None,
+        keepalive: float = KEEPALIVE_SECONDS,
+    ) -> AsyncIterator[str]:
+        """SSE frames for a subscriber: the run as read on connect, then its events.
+
+        Subscribe before reading ``snapshot`` so nothing published in
+        between is missed. Ends after a terminal state. ``reload`` reads the
+        run again, as ``snapshot`` was read, or None once it is deleted; it is
+        called after ``RELOAD_AFTER_KEEPALIVES`` quiet keep-alives in a row.
+        """
+        try:
+            yield sse_event("snapshot", snapshot)
+            if snapshot.get("state") in TERMINAL_STATES:
+                return
+            quiet = 0
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), keepalive)
+                except asyncio.TimeoutError:
+                    quiet += 1
+                    if reload is None or quiet < RELOAD_AFTER_KEEPALIVES:
+                        yield ": keep-alive\n\n"
+                        continue
+                    # Possibly run by another replica, whose events never arrive here
+                    quiet = 0
+                    current = await reload()
+                    if current is None:
+                        return
+                    if current.get("state") not in TERMINAL_STATES:
+                        yield sse_event("progress", current)
+                        continue
+                    event, data = "state", current
+                quiet = 0
+                yield sse_event(event, data)
+                if event == "state" and data["state"] in TERMINAL_STATES:
+                    return
+        finally:
+            self.unsubscribe(topic, queue)
+
+
+run_events = RunEventBus()
+
+
+def publish_evaluation_run(eval_run) -> None:
+    """Push an evaluation run's counters after a commit, and its state once it is final."""
+    topic = evaluation_topic(eval_run.id)
+    counters = {
+        "total_count": eval_run.total_count,
+        "passed_count": eval_run.passed_count,
+        "failed_count": eval_run.failed_count,
+        "error_count": eval_run.error_count,
+        "pass_rate": eval_run.pass_rate,
+    }
+    run_events.publish(topic, "progress", counters)
+    if eval_run.state.value in TERMINAL_STATES:
+        run_events.publish_state(topic, eval_run.state.value, **counters)
@@ -0,0 +1,228 @@
+"""Built-in cron scheduler for evaluation runs.
+
+Every API replica runs the scheduler loop, but a tick only does work on the
+replica holding the scheduler lease (app.services.leases), so each schedule
+fires once however many replicas there are. Firing a schedule queues one
+PENDING run per suite; queued runs go to CES oldest first while their
+project has fewer than ``SCHEDULER_MAX_RUNS_PER_PROJECT`` runs in flight.
+Each schedule fires at a fixed offset of up to ``jitter_seconds`` after its
+cron time, so schedules sharing a cron expression are spread out instead of
+starting together.
+"""
+
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import exists, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.evaluation_run import EvaluationRunRecord, RunState
+from app.models.schedule import EvaluationSchedule, MissedRunPolicy
+from app.models.test_case import ApprovalStatus, TestCase
+from app.models.test_suite import TestSuite
+from app.models.webhook import WebhookEvent
+from app.services.evaluation_runs import (
+    build_run_config,
+    capture_app_snapshot,
+    submit_run,
+    submitted_evaluation_ids,
+    suite_app_id,
+)
+from app.services.leases import INSTANCE_ID, acquire_lease, release_lease
+from app.services.run_events import evaluation_topic, run_events
+from app.services.webhooks import notify_evaluation_run
+from app.utils.cron import CronSchedule
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = "evaluation-scheduler"
+
+
+def as_utc(moment: datetime) -> datetime:
+    """``moment`` as an aware UTC datetime; SQLite returns naive ones."""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def jitter_offset(schedule_id: str, jitter_seconds: int) -> timedelta:
+    """Stable per-schedule delay in ``[0, jitter_seconds]``."""
+    if not jitter_seconds or jitter_seconds <= 0:
+        return timedelta(0)
+    digest = hashlib.sha256(schedule_id.encode()).digest()
+    return timedelta(seconds=int.from_bytes(digest[:8], "big") % (jitter_seconds + 1))
+
+
+def next_fire_time(schedule: EvaluationSchedule, after: datetime) -> datetime:
+    """First jittered occurrence of ``schedule`` strictly after ``after``."""
+    jitter = jitter_offset(schedule.id, schedule.jitter_seconds)
+    cron = CronSchedule(schedule.cron_expression, schedule.timezone or "UTC")
+    return cron.next_after(as_utc(after) - jitter) + jitter
+
+
+def runnable_suites(schedule: EvaluationSchedule):
+    """Suites of the schedule that have submitted test cases."""
+    query = select(TestSuite.id).where(
+        TestSuite.project_id == schedule.project_id,
+        exists().where(
+            TestCase.test_suite_id == TestSuite.id,
+            TestCase.status == ApprovalStatus.SUBMITTED,
+            TestCase.ces_evaluation_id.isnot(None),
+        ),
+    )
+    if schedule.test_suite_ids:
+        query = query.where(TestSuite.id.in_(schedule.test_suite_ids))
+    return query
+
+
+async def fire_due_schedules(db: AsyncSession, now: datetime) -> int:
+    """Queue runs for every schedule whose next run is due; returns how many fired.
+
+    A schedule more than ``SCHEDULER_MISFIRE_GRACE_SECONDS`` late (the
+    scheduler was down) fires once under RUN_ONCE and not at all under SKIP.
+    Either way its next run moves past ``now``.
+    """
+    grace = timedelta(seconds=settings.SCHEDULER_MISFIRE_GRACE_SECONDS)
+    schedules = (await db.scalars(
+        select(EvaluationSchedule)
+        .where(EvaluationSchedule.enabled.is_(True), EvaluationSchedule.next_run_at <= now)
+        .order_by(EvaluationSchedule.next_run_at)
+    )).all()
+
+    fired = 0
+    for schedule in schedules:
+        due_at = as_utc(schedule.next_run_at)
+        fire = (
+            schedule.missed_run_policy == MissedRunPolicy.RUN_ONCE
+            or now - due_at <= grace
+        )
+        values = {"next_run_at": next_fire_time(schedule, now)}
+        if fire:
+            values["last_run_at"] = now
+        # Compare-and-set so a schedule fires once even if leadership changed hands
+        claimed = await db.execute(
+            update(EvaluationSchedule)
+            .where(
+                EvaluationSchedule.id == schedule.id,
+                EvaluationSchedule.next_run_at == schedule.next_run_at,
+            )
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        if claimed.rowcount != 1:
+            continue
+        if fire:
+            for suite_id in (await db.scalars(runnable_suites(schedule))).all():
+                db.add(EvaluationRunRecord(
+                    test_suite_id=suite_id,
+                    schedule_id=schedule.id,
+                    state=RunState.PENDING,
+                    evaluation_type="golden" if schedule.run_count == 1 else "scenario",
+                    total_count=0,
+                    passed_count=0,
+                    failed_count=0,
+                    error_count=0,
+                ))
+            fired += 1
+        await db.commit()
+    return fired
+
+
+async def dispatch_queued_runs(db: AsyncSession, max_per_project: int) -> int:
+    """Submit queued scheduled runs to CES within each project's concurrency limit."""
+    active: Dict[str, int] = dict((await db.execute(
+        select(TestSuite.project_id, func.count())
+        .join(EvaluationRunRecord, EvaluationRunRecord.test_suite_id == TestSuite.id)
+        .where(EvaluationRunRecord.state == RunState.RUNNING)
+        .group_by(TestSuite.project_id)
+    )).all())
+    queued = (await db.execute(
+        select(EvaluationRunRecord, TestSuite.project_id)
+        .join(TestSuite, TestSuite.id == EvaluationRunRecord.test_suite_id)
+        .where(
+            EvaluationRunRecord.state == RunState.PENDING,
+            EvaluationRunRecord.schedule_id.isnot(None),
+            EvaluationRunRecord.ces_operation_id.is_(None),
+            EvaluationRunRecord.started_at.is_(None),
+        )
+        .order_by(EvaluationRunRecord.created_at)
+    )).all()
+
+    submitted = 0
+    for run, project_id in queued:
+        if active.get(project_id, 0) >= max_per_project:
+            continue
+        claimed = await db.execute(
+            update(EvaluationRunRecord)
+            .where(
+                EvaluationRunRecord.id == run.id,
+                EvaluationRunRecord.state == RunState.PENDING,
+                EvaluationRunRecord.started_at.is_(None),
+            )
+            .values(started_at=datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        if claimed.rowcount != 1:
+            continue
+
+        schedule = await db.get(EvaluationSchedule, run.schedule_id)
+        evaluation_ids = await submitted_evaluation_ids(db, run.test_suite_id)
+        if schedule is None or not evaluation_ids:
+            run.state = RunState.CANCELLED
+            run.completed_at = datetime.now(timezone.utc)
+            await notify_evaluation_run(db, run, WebhookEvent.RUN_COMPLETED)
+            await db.commit()
+            run_events.publish_state(evaluation_topic(run.id), run.state.value)
+            continue
+
+        run.total_count = len(evaluation_ids)
+        run_config = build_run_config(
+            evaluation_ids,
+            run_count=schedule.run_count,
+            generate_latency_report=schedule.generate_latency_report,
+        )
+        app_id = await suite_app_id(db, run.test_suite_id)
+        # Scheduled runs are the usual baseline for impact-analysis runs
+        run.app_snapshot = await capture_app_snapshot(app_id)
+        try:
+            await submit_run(db, run, run_config, app_id)
+        except Exception:
+            logger.exception("Scheduled run %s could not be started", run.id)
+            continue
+        active[project_id] = active.get(project_id, 0) + 1
+        submitted += 1
+    return submitted
+
+
+def lease_ttl() -> timedelta:
+    return timedelta(seconds=settings.SCHEDULER_TICK_SECONDS * 3)
+
+
+async def run_scheduler_tick(now: Optional[datetime] = None) -> bool:
+    """One scheduler pass; False when another replica is the leader."""
+    async with AsyncSessionLocal() as db:
+        if not await acquire_lease(db, LEASE_NAME, INSTANCE_ID, lease_ttl()):
+            return False
+        await fire_due_schedules(db, now or datetime.now(timezone.utc))
+        await dispatch_queued_runs(db, settings.SCHEDULER_MAX_RUNS_PER_PROJECT)
+    return True
+
+
+async def scheduler_forever(interval: float):
+    """Tick every ``interval`` seconds until cancelled, then hand the lease back."""
+    try:
+        while True:
+            try:
+                await run_scheduler_tick()
+            except Exception:
+                logger.exception("Scheduler tick failed")
+            await asyncio.sleep(interval)
+    finally:
+        async with AsyncSessionLocal() as db:
+            await release_lease(db, LEASE_NAME, INSTANCE_ID)
@@ -0,0 +1,74 @@
+"""Sequential sampling for security test runs.
+
+With sequential sampling a run stops sending prompts once the Wilson interval
+of its attack success rate is within ``precision`` percentage points either
+way, both overall and for every prompt category seen so far. Timeouts and
+CES errors say nothing about the agent's defences and are not counted.
+"""
+
+from typing import Any, Dict, Optional
+
+from app.utils.stats import wilson_interval
+
+UNCATEGORIZED = "uncategorized"
+
+
+class SequentialSampler:
+    """Attack outcome counts, overall and per prompt category."""
+
+    def __init__(self, precision: float, confidence: float = 0.95, min_prompts: int = 100):
+        # Half-width of the interval to reach, in percentage points
+        self.precision = precision
+        self.confidence = confidence
+        self.min_prompts = min_prompts
+        self.trials: Dict[str, int] = {}
+        self.successes: Dict[str, int] = {}
+
+    @property
+    def total(self) -> int:
+        return sum(self.trials.values())
+
+    def add(self, category: Optional[str], successful: bool) -> None:
+        category = category or UNCATEGORIZED
+        self.trials[category] = self.trials.get(category, 0) + 1
+        self.successes[category] = self.successes.get(category, 0) + int(successful)
+
+    def half_width(self, successes: int, trials: int) -> float:
+        """Half-width of the Wilson interval in percentage points."""
+        low, high = wilson_interval(successes, trials, self.confidence)
+        return (high - low) * 50
+
+    def achieved_precision(self) -> Optional[float]:
+        """Widest half-width over the run and its categories; None before any prompt."""
+        if not self.total:
+            return None
+        widths = [self.half_width(sum(self.successes.values()), self.total)]
+        widths += [self.half_width(self.successes[c], self.trials[c]) for c in self.trials]
+        return max(widths)
+
+    def settled(self) -> bool:
+        if self.total < self.min_prompts:
+            return False
+        return self.achieved_precision() <= self.precision
+
+    def _interval(self, successes: int, trials: int) -> Dict[str, Any]:
+        low, high = wilson_interval(successes, trials, self.confidence)
+        return {
+            "prompts": trials,
+            "successes": successes,
+            "low": round(low * 100, 3),
+            "high": round(high * 100, 3),
+            "half_width": round((high - low) * 50, 3),
+        }
+
+    def report(self) -> Dict[str, Any]:
+        """Interval of the attack success rate (percent), overall and per category."""
+        return {
+            "confidence": self.confidence,
+            "target_precision": self.precision,
+            "overall": self._interval(sum(self.successes.values()), self.total),
+            "categories": {
+                category: self._interval(self.successes[category], trials)
+                for category, trials in sorted(self.trials.items())
+            },
+        }
@@ -0,0 +1,284 @@
+"""Sharded execution of large evaluation runs.
+
+A sharded run splits its ``evaluationIds`` into contiguous shards, each
+submitted to CES as its own ``runEvaluation`` operation. At most
+``EVALUATION_SHARD_CONCURRENCY`` shards of a run are in flight at once. A
+failed shard is resubmitted on its own, up to
+``EVALUATION_SHARD_MAX_ATTEMPTS`` times, without touching the others. Each
+shard's results are stored against the parent run as the shard finishes, and
+the parent's totals are re-derived from its shards every time.
+
+Each attempt is claimed with a conditional update before CES is called, so a
+run driven by two processes at once still submits every attempt once. A
+process that dies between the claim and CES accepting the operation leaves
+that shard RUNNING without an operation; once the claim is older than
+``STALE_CLAIM_AFTER`` the next driver (the reconciler resumes the run) claims
+it again as a new attempt.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.evaluation_run import EvaluationRunRecord, EvaluationRunShard, RunState
+from app.models.webhook import WebhookEvent
+from app.services.ces_client import get_ces_client, poll_operation
+from app.services.result_ingestion import fetch_result_pages, ingest_run_results
+from app.services.rollups import roll_up_evaluation_run
+from app.services.run_events import publish_evaluation_run
+from app.services.webhooks import milestone, notify_evaluation_run
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATES = (RunState.PENDING, RunState.RUNNING)
+# Seconds to wait before a shard's next attempt, multiplied by the attempt number
+RETRY_BACKOFF_SECONDS = 5.0
+# A claim with no CES operation after this long belongs to a driver that died
+STALE_CLAIM_AFTER = timedelta(minutes=5)
+
+
+def split_evaluation_ids(evaluation_ids: List[str], shard_count: int) -> List[List[str]]:
+    """Split ``evaluation_ids`` into at most ``shard_count`` contiguous, near-equal chunks."""
+    shard_count = max(1, min(shard_count, len(evaluation_ids)))
+    size, extra = divmod(len(evaluation_ids), shard_count)
+    chunks, start = [], 0
+    for index in range(shard_count):
+        end = start + size + (1 if index < extra else 0)
+        chunks.append(evaluation_ids[start:end])
+        start = end
+    return chunks
+
+
+def build_shards(run_config: Dict[str, Any], shard_count: int) -> List[EvaluationRunShard]:
+    """Shards of ``run_config``, each with its own slice of ``evaluationIds``."""
+    return [
+        EvaluationRunShard(
+            shard_index=index,
+            run_config={**run_config, "evaluationIds": chunk},
+            state=RunState.PENDING,
+            attempts=0,
+        )
+        for index, chunk in enumerate(
+            split_evaluation_ids(run_config["evaluationIds"], shard_count)
+        )
+    ]
+
+
+async def _locked_run(db: AsyncSession, run_id: str) -> EvaluationRunRecord:
+    return await db.scalar(
+        select(EvaluationRunRecord)
+        .where(EvaluationRunRecord.id == run_id)
+        .with_for_update()
+    )
+
+
+async def merge_shards(db: AsyncSession, eval_run: EvaluationRunRecord) -> None:
+    """Re-derive a parent run's totals from its shards; the caller commits.
+
+    Evaluations of a shard that gave up count as errors. Once every shard is
+    finished the run is COMPLETED if any shard completed, ERROR otherwise.
+    Called as each shard finishes, so the shard just finished is the one that
+    may carry the run past a progress milestone.
+    """
+    shards = (await db.scalars(
+        select(EvaluationRunShard).where(EvaluationRunShard.evaluation_run_id == eval_run.id)
+    )).all()
+    completed = [shard for shard in shards if shard.state == RunState.COMPLETED]
+    failed = [shard for shard in shards if shard.state == RunState.ERROR]
+    failed_evaluations = sum(len(shard.run_config.get("evaluationIds", [])) for shard in failed)
+
+    eval_run.total_count = sum(shard.total_count for shard in completed) + failed_evaluations
+    eval_run.passed_count = sum(shard.passed_count for shard in completed)
+    eval_run.failed_count = sum(shard.failed_count for shard in completed)
+    eval_run.error_count = sum(shard.error_count for shard in completed) + failed_evaluations
+    if eval_run.total_count > 0:
+        eval_run.pass_rate = (eval_run.passed_count / eval_run.total_count) * 100
+
+    if any(shard.state in ACTIVE_STATES for shard in shards):
+        finished = len(completed) + len(failed)
+        mark = milestone((finished - 1) * 100 / len(shards), finished * 100 / len(shards))
+        if mark is not None:
+            await notify_evaluation_run(db, eval_run, WebhookEvent.RUN_PROGRESS, progress=mark)
+        return
+    eval_run.state = RunState.COMPLETED if completed else RunState.ERROR
+    eval_run.completed_at = datetime.now(timezone.utc)
+    await roll_up_evaluation_run(db, eval_run)
+    await notify_evaluation_run(db, eval_run, WebhookEvent.RUN_COMPLETED)
+
+
+async def _start_attempt(ces, shard_id: str, app_id: str):
+    """Operation id of the shard's current attempt, submitting a new one if needed.
+
+    The shard is claimed by moving it from PENDING to RUNNING before CES is
+    called, so only one driver submits each attempt; a RUNNING shard whose
+    claim went stale without an operation is claimed again. None when the
+    shard or its run is no longer active, or another driver holds the claim.
+    """
+    async with AsyncSessionLocal() as db:
+        shard = await db.get(EvaluationRunShard, shard_id)
+        if shard is None or shard.state not in ACTIVE_STATES:
+            return None
+        if shard.ces_operation_id:
+            # Resumed after a restart; the operation may still be running
+            return shard.ces_operation_id
+        eval_run = await db.get(EvaluationRunRecord, shard.evaluation_run_id)
+        if eval_run is None or eval_run.state not in ACTIVE_STATES:
+            return None
+
+        now = datetime.now(timezone.utc)
+        claimed = await db.execute(
+            update(EvaluationRunShard)
+            .where(
+                EvaluationRunShard.id == shard_id,
+                EvaluationRunShard.ces_operation_id.is_(None),
+                or_(
+                    EvaluationRunShard.state == RunState.PENDING,
+                    and_(
+                        EvaluationRunShard.state == RunState.RUNNING,
+                        or_(
+                            EvaluationRunShard.claimed_at.is_(None),
+                            EvaluationRunShard.claimed_at < now - STALE_CLAIM_AFTER,
+                        ),
+                    ),
+                ),
+            )
+            .values(
+                state=RunState.RUNNING,
+                attempts=EvaluationRunShard.attempts + 1,
+                claimed_at=now,
+                started_at=func.coalesce(EvaluationRunShard.started_at, now),
+            )
+            # ``shard`` is not read again; SQLite hands back naive datetimes
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        if not claimed.rowcount:
+            return None
+        operation = await ces.run_evaluation(app_id, shard.run_config)
+        operation_id = operation.get("name", "").split("/")[-1]
+        stored = await db.execute(
+            update(EvaluationRunShard)
+            .where(EvaluationRunShard.id == shard_id, EvaluationRunShard.claimed_at == now)
+            .values(ces_operation_id=operation_id)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        if not stored.rowcount:
+            # Our claim went stale and another driver took the shard over
+            logger.warning("Shard %s claim lost; operation %s is not tracked", shard_id, operation_id)
+            return None
+        return operation_id
+
+
+async def _store_shard(ces, shard_id: str, app_id: str, ces_run_id: str) -> None:
+    run_details = await ces.get_evaluation_run(app_id, ces_run_id)
+    pages = await fetch_result_pages(ces, app_id, ces_run_id)
+    async with AsyncSessionLocal() as db:
+        shard = await db.get(EvaluationRunShard, shard_id)
+        eval_run = await _locked_run(db, shard.evaluation_run_id)
+        await db.refresh(shard)
+        if eval_run is None or eval_run.state not in ACTIVE_STATES or shard.state not in ACTIVE_STATES:
+            return
+
+        counts = await ingest_run_results(db, eval_run, pages, shard_id=shard.id)
+        shard.ces_run_id = ces_run_id
+        shard.state = RunState.COMPLETED
+        shard.completed_at = datetime.now(timezone.utc)
+        shard.total_count = run_details.get("totalCount", counts["total"])
+        shard.passed_count = run_details.get("passedCount", counts["passed"])
+        shard.failed_count = run_details.get("failedCount", counts["failed"])
+        shard.error_count = run_details.get("errorCount", 0)
+        shard.last_error = None
+        if eval_run.latency_report is None and "latencyReport" in run_details:
+            eval_run.latency_report = run_details["latencyReport"]
+
+        await merge_shards(db, eval_run)
+        await db.commit()
+    publish_evaluation_run(eval_run)
+
+
+async def _fail_attempt(shard_id: str, error: Exception) -> bool:
+    """Record a failed attempt; True when the shard should be tried again."""
+    async with AsyncSessionLocal() as db:
+        shard = await db.get(EvaluationRunShard, shard_id)
+        if shard is None or shard.state not in ACTIVE_STATES:
+            return False
+        eval_run = await _locked_run(db, shard.evaluation_run_id)
+        await db.refresh(shard)
+
+        shard.ces_operation_id = None
+        shard.last_error = str(error)
+        retry = (
+            shard.attempts < settings.EVALUATION_SHARD_MAX_ATTEMPTS
+            and eval_run is not None
+            and eval_run.state in ACTIVE_STATES
+        )
+        if retry:
+            shard.state = RunState.PENDING
+        else:
+            shard.state = RunState.ERROR
+            shard.completed_at = datetime.now(timezone.utc)
+            if eval_run is not None and eval_run.state in ACTIVE_STATES:
+                await merge_shards(db, eval_run)
+        await db.commit()
+        if eval_run is not None and not retry:
+            publish_evaluation_run(eval_run)
+        return retry
+
+
+async def run_shard(shard_id: str, app_id: str) -> None:
+    """Run one shard to completion, retrying failed attempts."""
+    ces = get_ces_client()
+    while True:
+        try:
+            operation_id = await _start_attempt(ces, shard_id, app_id)
+            if operation_id is None:
+                return
+            result = await poll_operation(ces, operation_id)
+            ces_run_id = result.get("evaluationRun", {}).get("name", "").split("/")[-1]
+            await _store_shard(ces, shard_id, app_id, ces_run_id)
+            return
+        except Exception as error:
+            logger.warning("Shard %s attempt failed: %s", shard_id, error)
+            if not await _fail_attempt(shard_id, error):
+                return
+        async with AsyncSessionLocal() as db:
+            attempts = await db.scalar(
+                select(EvaluationRunShard.attempts).where(EvaluationRunShard.id == shard_id)
+            )
+        await asyncio.sleep(RETRY_BACKOFF_SECONDS * (attempts or 1))
+
+
+async def run_sharded(run_id: str, app_id: str) -> None:
+    """Run a sharded run's unfinished shards, at most ``EVALUATION_SHARD_CONCURRENCY`` at once."""
+    async with AsyncSessionLocal() as db:
+        shard_ids = (await db.scalars(
+            select(EvaluationRunShard.id)
+            .where(
+                EvaluationRunShard.evaluation_run_id == run_id,
+                EvaluationRunShard.state.in_(ACTIVE_STATES),
+            )
+            .order_by(EvaluationRunShard.shard_index)
+        )).all()
+
+    slots = asyncio.Semaphore(max(1, settings.EVALUATION_SHARD_CONCURRENCY))
+
+    async def bounded(shard_id: str):
+        async with slots:
+            await run_shard(shard_id, app_id)
+
+    await asyncio.gather(*(bounded(shard_id) for shard_id in shard_ids))
+
+    # Settles runs whose last shard finished before a restart
+    async with AsyncSessionLocal() as db:
+        eval_run = await _locked_run(db, run_id)
+        if eval_run is not None and eval_run.state in ACTIVE_STATES:
+            await merge_shards(db, eval_run)
+            await db.commit()
+            publish_evaluation_run(eval_run)
@@ -0,0 +1,63 @@
+"""Helpers shared by the routes and background jobs that generate test cases."""
+
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.test_case import ApprovalStatus, TestCase, TestCaseType, TestCaseVersion
+from app.models.test_suite import TestSuite
+from app.services.llm_usage import LLMCall
+
+
+async def get_suite_project_id(db: AsyncSession, test_suite_id) -> Optional[str]:
+    """Return the project owning a test suite, for LLM usage attribution."""
+    return await db.scalar(
+        select(TestSuite.project_id).where(TestSuite.id == str(test_suite_id))
+    )
+
+
+async def fetch_agent_context(ces, agent_id: str) -> Optional[dict]:
+    """Fetch agent and tool definitions from CES to ground generation."""
+    try:
+        # Assume agent_id is in format "projects/.../locations/.../apps/.../agents/..."
+        app_id = agent_id.split("/apps/")[-1].split("/agents/")[0]
+        agent_data = await ces.get_agent(app_id, agent_id.split("/agents/")[-1])
+        tools_data = await ces.list_tools(app_id)
+        return {"agent": agent_data, "tools": tools_data.get("tools", [])}
+    except Exception:
+        return None  # Continue without context
+
+
+async def save_generated_test_case(
+    db: AsyncSession,
+    test_suite_id,
+    generated: dict,
+    test_type: str,
+    original_input: str,
+    source_type: str,
+    default_name: str,
+    llm_call: Optional[LLMCall] = None,
+) -> TestCase:
+    """Create a draft test case and its first version from a Gemini generation."""
+    test_case = TestCase(
+        test_suite_id=str(test_suite_id),
+        name=generated.get("displayName", default_name),
+        description=generated.get("description", original_input[:200]),
+        type=TestCaseType.GOLDEN if test_type == "golden" else TestCaseType.SCENARIO,
+        status=ApprovalStatus.DRAFT,
+        source_type=source_type,
+        original_input=original_input,
+    )
+    db.add(test_case)
+    await db.flush()
+
+    version = TestCaseVersion(
+        test_case_id=test_case.id,
+        version_number=1,
+        generated_json=generated,
+        gemini_prompt=llm_call.prompt if llm_call else None,
+        gemini_response_raw=llm_call.response_text if llm_call else None,
+    )
+    db.add(version)
+    return test_case
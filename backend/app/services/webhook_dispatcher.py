@@ -0,0 +1,286 @@
+"""Sends the webhook deliveries queued by app.services.webhooks.
+
+Like the scheduler, every replica runs the dispatcher loop but only the one
+holding its lease sends, so each endpoint's concurrency limit holds across
+replicas. Deliveries go out in rounds: a round takes the due deliveries of
+every enabled subscription, at most ``max_concurrency`` per subscription
+and ``WEBHOOK_BATCH_SIZE`` in all, sends them concurrently and records the
+outcomes in one commit; rounds repeat while deliveries are due. A failed
+delivery is retried with exponential backoff. One the endpoint rejects
+outright (a 4xx other than 408 or 429) or that runs out of
+``WEBHOOK_MAX_ATTEMPTS`` moves to the dead-letter table.
+
+Subscription URLs are checked when saved, but a name can resolve to a
+private address later. Deliveries therefore go through
+``PublicAddressTransport``, which resolves the host on every connection,
+refuses it unless every address is global and connects to the address it
+checked, so a rebinding DNS answer cannot slip in between. TLS still
+verifies the certificate against the URL's host name.
+"""
+
+import asyncio
+import ipaddress
+import json
+import logging
+import random
+import socket
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Tuple
+
+import httpcore
+import httpx
+from sqlalchemy import delete, exists, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.encryption import decrypt_token
+from app.models.webhook import WebhookDeadLetter, WebhookDelivery, WebhookSubscription
+from app.services.leases import INSTANCE_ID, acquire_lease, release_lease
+from app.services.webhooks import sign
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = "webhook-dispatcher"
+# Client errors worth retrying; any other 4xx goes straight to the dead letters
+RETRYABLE_STATUS = {408, 429}
+# Response text kept with a failed attempt
+ERROR_TEXT_LIMIT = 500
+
+Due = Tuple[WebhookDelivery, WebhookSubscription]
+
+
+def as_utc(moment: datetime) -> datetime:
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Wait before the next try after ``attempts`` failed ones, with ±20% jitter."""
+    seconds = min(
+        settings.WEBHOOK_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+        settings.WEBHOOK_RETRY_MAX_SECONDS,
+    )
+    return timedelta(seconds=seconds * random.uniform(0.8, 1.2))
+
+
+def retryable(status_code: Optional[int]) -> bool:
+    """True for network errors, timeouts, 5xx and throttling."""
+    return status_code is None or status_code >= 500 or status_code in RETRYABLE_STATUS
+
+
+async def resolve(host: str, port: int) -> List[str]:
+    """Addresses ``host`` resolves to for a TCP connection."""
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    return [info[4][0] for info in infos]
+
+
+def is_public(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        # Scoped IPv6 addresses (``fe80::1%eth0``) are link-local anyway
+        return False
+    if ip.version == 6 and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return ip.is_global
+
+
+class PublicAddressBackend(httpcore.AsyncNetworkBackend):
+    """Network backend that connects only to global addresses, the ones it checked."""
+
+    def __init__(self, backend: httpcore.AsyncNetworkBackend):
+        self._backend = backend
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: Optional[float] = None,
+        local_address: Optional[str] = None,
+        socket_options: Optional[Iterable] = None,
+    ) -> httpcore.AsyncNetworkStream:
+        try:
+            addresses = await asyncio.wait_for(resolve(host, port), timeout)
+        except (OSError, asyncio.TimeoutError) as exc:
+            raise httpcore.ConnectError(f"Could not resolve {host}: {exc}") from exc
+        if not addresses or not all(is_public(address) for address in addresses):
+            raise httpcore.ConnectError(f"{host} resolves to a loopback or private address")
+        return await self._backend.connect_tcp(
+            addresses[0], port, timeout, local_address, socket_options
+        )
+
+    async def connect_unix_socket(self, path: str, timeout=None, socket_options=None):
+        raise httpcore.ConnectError("Webhooks are not sent over Unix sockets")
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+class PublicAddressTransport(httpx.AsyncHTTPTransport):
+    """httpx transport whose connections go through ``PublicAddressBackend``."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # httpx has no public hook for the network backend of its pool
+        self._pool._network_backend = PublicAddressBackend(self._pool._network_backend)
+
+
+def request_body(delivery: WebhookDelivery) -> bytes:
+    return json.dumps({
+        "id": delivery.id,
+        "event": delivery.event,
+        "created_at": as_utc(delivery.created_at).isoformat(),
+        **delivery.payload,
+    }, separators=(",", ":")).encode()
+
+
+async def send(
+    client: httpx.AsyncClient, url: str, secret: str, delivery: WebhookDelivery
+) -> Tuple[Optional[int], Optional[str]]:
+    """Status code and error of one attempt; the error is None when it was delivered."""
+    body = request_body(delivery)
+    timestamp = str(int(time.time()))
+    headers = {
+        "Content-Type": "application/json",
+        "X-Webhook-Id": delivery.id,
+        "X-Webhook-Event": delivery.event,
+        "X-Webhook-Timestamp": timestamp,
+        "X-Webhook-Signature": sign(secret, timestamp, body),
+    }
+    try:
+        response = await client.post(url, content=body, headers=headers)
+    except httpx.HTTPError as exc:
+        return None, f"{type(exc).__name__}: {exc}"[:ERROR_TEXT_LIMIT]
+    if response.is_success:
+        return response.status_code, None
+    return response.status_code, f"HTTP {response.status_code}: {response.text}"[:ERROR_TEXT_LIMIT]
+
+
+async def due_deliveries(db: AsyncSession, now: datetime, batch_size: int) -> List[Due]:
+    """Due deliveries of enabled subscriptions, oldest first and at most ``max_concurrency`` each."""
+    subscriptions = (await db.scalars(
+        select(WebhookSubscription).where(
+            WebhookSubscription.enabled.is_(True),
+            exists().where(
+                WebhookDelivery.subscription_id == WebhookSubscription.id,
+                WebhookDelivery.next_attempt_at <= now,
+            ),
+        )
+    )).all()
+    # Endpoints left over when the batch fills up get the first slots next round
+    subscriptions = random.sample(subscriptions, len(subscriptions))
+    batch: List[Due] = []
+    for subscription in subscriptions:
+        limit = min(subscription.max_concurrency or 1, batch_size - len(batch))
+        if limit <= 0:
+            break
+        deliveries = await db.scalars(
+            select(WebhookDelivery)
+            .where(
+                WebhookDelivery.subscription_id == subscription.id,
+                WebhookDelivery.next_attempt_at <= now,
+            )
+            .order_by(WebhookDelivery.next_attempt_at)
+            .limit(limit)
+        )
+        batch.extend((delivery, subscription) for delivery in deliveries)
+    return batch
+
+
+async def dispatch_round(
+    db: AsyncSession, client: httpx.AsyncClient, now: Optional[datetime] = None
+) -> int:
+    """Send one round of due deliveries and record how each went; returns how many were sent."""
+    batch = await due_deliveries(
+        db, now or datetime.now(timezone.utc), settings.WEBHOOK_BATCH_SIZE
+    )
+    if not batch:
+        return 0
+    # No transaction stays open while endpoints respond
+    await db.commit()
+    keys = {subscription.id: decrypt_token(subscription.secret_encrypted) for _, subscription in batch}
+    results = await asyncio.gather(*(
+        send(client, subscription.url, keys[subscription.id], delivery)
+        for delivery, subscription in batch
+    ))
+
+    finished_at = datetime.now(timezone.utc)
+    finished, retries, dead = [], [], []
+    for (delivery, _), (status_code, error) in zip(batch, results):
+        if error is None:
+            finished.append(delivery.id)
+            continue
+        attempts = delivery.attempts + 1
+        failure = {
+            "id": delivery.id,
+            "attempts": attempts,
+            "last_status_code": status_code,
+            "last_error": error,
+        }
+        if retryable(status_code) and attempts < settings.WEBHOOK_MAX_ATTEMPTS:
+            retries.append({**failure, "next_attempt_at": finished_at + retry_delay(attempts)})
+        else:
+            logger.warning("Webhook delivery %s dead-lettered: %s", delivery.id, error)
+            dead.append({
+                **failure,
+                "subscription_id": delivery.subscription_id,
+                "event": delivery.event,
+                "payload": delivery.payload,
+                "created_at": delivery.created_at,
+                "failed_at": finished_at,
+            })
+            finished.append(delivery.id)
+
+    if retries:
+        await db.execute(update(WebhookDelivery), retries)
+    if dead:
+        await db.execute(insert(WebhookDeadLetter), dead)
+    if finished:
+        await db.execute(
+            delete(WebhookDelivery)
+            .where(WebhookDelivery.id.in_(finished))
+            .execution_options(synchronize_session=False)
+        )
+    await db.commit()
+    # The loaded rows are stale now; the next round reads fresh ones
+    db.expunge_all()
+    return len(batch)
+
+
+def lease_ttl() -> timedelta:
+    return timedelta(
+        seconds=max(settings.WEBHOOK_TICK_SECONDS, settings.WEBHOOK_TIMEOUT_SECONDS) * 3
+    )
+
+
+async def run_dispatcher_tick() -> int:
+    """Send rounds until nothing is due, renewing the lease before each; returns how many were sent."""
+    sent = 0
+    # No proxies from the environment: they would connect around the address check
+    async with httpx.AsyncClient(
+        timeout=settings.WEBHOOK_TIMEOUT_SECONDS,
+        transport=PublicAddressTransport(),
+        trust_env=False,
+    ) as client:
+        async with AsyncSessionLocal() as db:
+            while await acquire_lease(db, LEASE_NAME, INSTANCE_ID, lease_ttl()):
+                count = await dispatch_round(db, client)
+                if not count:
+                    break
+                sent += count
+    return sent
+
+
+async def dispatcher_forever(interval: float):
+    """Dispatch every ``interval`` seconds until cancelled, then hand the lease back."""
+    try:
+        while True:
+            try:
+                await run_dispatcher_tick()
+            except Exception:
+                logger.exception("Webhook dispatch failed")
+            await asyncio.sleep(interval)
+    finally:
+        async with AsyncSessionLocal() as db:
+            await release_lease(db, LEASE_NAME, INSTANCE_ID)
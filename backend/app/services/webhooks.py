@@ -0,0 +1,187 @@
+"""Webhook notifications of run events.
+
+Runners call the ``notify_*`` functions in the transaction that changes a
+run, which queues one ``WebhookDelivery`` per interested subscription of the
+run's project. An event is thereby sent exactly when the change it reports
+was committed, and CI pipelines can wait for a callback instead of polling
+the run. Queued deliveries are sent by app.services.webhook_dispatcher.
+
+Each request body is a JSON object with the delivery ``id``, the ``event``,
+its ``created_at``, the ``project_id`` and the ``run``, plus event-specific
+fields. It is signed with the subscription's secret: ``X-Webhook-Signature``
+is ``sha256=`` followed by the hex HMAC-SHA256 of
+``"{X-Webhook-Timestamp}.{body}"``. Delivery is at least once, so receivers
+should skip an ``X-Webhook-Id`` they have already handled.
+"""
+
+import hashlib
+import hmac
+import secrets
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.evaluation_run import EvaluationRunRecord
+from app.models.outcome import TestCaseOutcome
+from app.models.security_testing import SecurityTestRun
+from app.models.test_case import TestCase
+from app.models.test_suite import TestSuite
+from app.models.webhook import WebhookDelivery, WebhookEvent, WebhookSubscription
+from app.services.outcome_history import NEW_FAILURE
+
+# Percent of a run's work at which a progress event is sent
+PROGRESS_MILESTONES = (25, 50, 75)
+# New failures listed in a regression event; ``new_failure_count`` has them all
+REGRESSION_LIST_LIMIT = 50
+
+
+def new_secret() -> str:
+    return secrets.token_urlsafe(32)
+
+
+def sign(secret: str, timestamp: str, body: bytes) -> str:
+    digest = hmac.new(secret.encode(), timestamp.encode() + b"." + body, hashlib.sha256)
+    return f"sha256={digest.hexdigest()}"
+
+
+def milestone(previous: float, current: float) -> Optional[int]:
+    """Highest progress milestone passed on going from ``previous`` to ``current`` percent."""
+    passed = [mark for mark in PROGRESS_MILESTONES if previous < mark <= current]
+    return passed[-1] if passed else None
+
+
+def _iso(moment: Optional[datetime]) -> Optional[str]:
+    if moment is None:
+        return None
+    # SQLite hands back naive datetimes
+    return (moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)).isoformat()
+
+
+def evaluation_run_data(run: EvaluationRunRecord) -> Dict[str, Any]:
+    return {
+        "type": "evaluation",
+        "id": run.id,
+        "test_suite_id": run.test_suite_id,
+        "state": run.state.value,
+        "total_count": run.total_count,
+        "passed_count": run.passed_count,
+        "failed_count": run.failed_count,
+        "error_count": run.error_count,
+        "pass_rate": run.pass_rate,
+        "started_at": _iso(run.started_at),
+        "completed_at": _iso(run.completed_at),
+    }
+
+
+def security_run_data(run: SecurityTestRun) -> Dict[str, Any]:
+    return {
+        "type": "security",
+        "id": run.id,
+        "name": run.name,
+        "state": run.state.value,
+        "total_prompts": run.total_prompts,
+        "completed_prompts": run.completed_prompts,
+        "attack_success_count": run.attack_success_count,
+        "attack_success_rate": run.attack_success_rate,
+        "started_at": _iso(run.started_at),
+        "completed_at": _iso(run.completed_at),
+    }
+
+
+def _interested(subscriptions, event: WebhookEvent) -> List[WebhookSubscription]:
+    return [s for s in subscriptions if event.value in (s.events or [])]
+
+
+def _queue(
+    db: AsyncSession,
+    subscriptions: List[WebhookSubscription],
+    event: WebhookEvent,
+    payload: Dict[str, Any],
+) -> int:
+    now = datetime.now(timezone.utc)
+    db.add_all(
+        WebhookDelivery(
+            subscription_id=subscription.id,
+            event=event.value,
+            payload=payload,
+            attempts=0,
+            next_attempt_at=now,
+            created_at=now,
+        )
+        for subscription in subscriptions
+    )
+    return len(subscriptions)
+
+
+async def _evaluation_subscriptions(
+    db: AsyncSession, run: EvaluationRunRecord, event: WebhookEvent
+) -> List[WebhookSubscription]:
+    subscriptions = await db.scalars(
+        select(WebhookSubscription)
+        .join(TestSuite, TestSuite.project_id == WebhookSubscription.project_id)
+        .where(TestSuite.id == run.test_suite_id, WebhookSubscription.enabled.is_(True))
+    )
+    return _interested(subscriptions, event)
+
+
+async def notify_evaluation_run(
+    db: AsyncSession, run: EvaluationRunRecord, event: WebhookEvent, **data: Any
+) -> int:
+    """Queue ``event`` for an evaluation run; the caller commits. Returns the deliveries queued."""
+    subscriptions = await _evaluation_subscriptions(db, run, event)
+    if not subscriptions:
+        return 0
+    payload = {"project_id": subscriptions[0].project_id, "run": evaluation_run_data(run), **data}
+    return _queue(db, subscriptions, event, payload)
+
+
+async def notify_security_run(
+    db: AsyncSession, run: SecurityTestRun, event: WebhookEvent, **data: Any
+) -> int:
+    """Queue ``event`` for a security run; the caller commits. Returns the deliveries queued."""
+    subscriptions = _interested(
+        await db.scalars(
+            select(WebhookSubscription).where(
+                WebhookSubscription.project_id == run.project_id,
+                WebhookSubscription.enabled.is_(True),
+            )
+        ),
+        event,
+    )
+    if not subscriptions:
+        return 0
+    payload = {"project_id": run.project_id, "run": security_run_data(run), **data}
+    return _queue(db, subscriptions, event, payload)
+
+
+async def notify_regressions(db: AsyncSession, run: EvaluationRunRecord) -> int:
+    """Queue a regression event when a run's outcome history has new failures; the caller commits.
+
+    Called right after the run is added to the outcome history, so each run
+    is checked once.
+    """
+    subscriptions = await _evaluation_subscriptions(db, run, WebhookEvent.REGRESSION_DETECTED)
+    if not subscriptions:
+        return 0
+    rows = sorted((await db.execute(
+        select(TestCaseOutcome.test_case_id, TestCase.name)
+        .join(TestCase, TestCase.id == TestCaseOutcome.test_case_id)
+        .where(
+            TestCaseOutcome.evaluation_run_id == run.id,
+            TestCaseOutcome.transition == NEW_FAILURE,
+        )
+    )).all(), key=lambda row: row[1] or "")
+    if not rows:
+        return 0
+    payload = {
+        "project_id": subscriptions[0].project_id,
+        "run": evaluation_run_data(run),
+        "new_failure_count": len(rows),
+        "new_failures": [
+            {"test_case_id": test_case_id, "test_case_name": name}
+            for test_case_id, name in rows[:REGRESSION_LIST_LIMIT]
+        ],
+    }
+    return _queue(db, subscriptions, WebhookEvent.REGRESSION_DETECTED, payload)
@@ -0,0 +1,108 @@
+"""Five-field cron expressions: minute, hour, day of month, month, day of week."""
+
+from datetime import datetime, timedelta, timezone
+from typing import FrozenSet, List, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+MONTH_NAMES = {name: i + 1 for i, name in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+)}
+DAY_NAMES = {name: i for i, name in enumerate(["sun", "mon", "tue", "wed", "thu", "fri", "sat"])}
+# (low, high, names) per field
+FIELDS: List[Tuple[int, int, dict]] = [
+    (0, 59, {}), (0, 23, {}), (1, 31, {}), (1, 12, MONTH_NAMES), (0, 7, DAY_NAMES),
+]
+# Far enough to find Feb 29 on a given weekday
+SEARCH_DAYS = 366 * 28
+
+
+class InvalidCronExpression(ValueError):
+    """Raised for cron expressions or time zones that cannot be parsed."""
+
+
+def _value(token: str, names: dict) -> int:
+    token = token.lower()
+    if token in names:
+        return names[token]
+    if not token.isdigit():
+        raise InvalidCronExpression(f"Invalid cron value {token!r}")
+    return int(token)
+
+
+def _parse_field(field: str, low: int, high: int, names: dict) -> FrozenSet[int]:
+    values = set()
+    for part in field.split(","):
+        spec, _, step = part.partition("/")
+        if step and (not step.isdigit() or int(step) == 0):
+            raise InvalidCronExpression(f"Invalid cron step {part!r}")
+        if spec == "*":
+            start, end = low, high
+        elif "-" in spec:
+            first, _, last = spec.partition("-")
+            start, end = _value(first, names), _value(last, names)
+        else:
+            start = _value(spec, names)
+            end = high if step else start
+        if not low <= start <= end <= high:
+            raise InvalidCronExpression(f"Cron field {part!r} is outside {low}-{high}")
+        values.update(range(start, end + 1, int(step or 1)))
+    return frozenset(values)
+
+
+class CronSchedule:
+    """A parsed cron expression evaluated in ``tz``."""
+
+    def __init__(self, expression: str, tz: str = "UTC"):
+        self.expression = expression
+        fields = MACROS.get(expression.strip().lower(), expression).split()
+        if len(fields) != 5:
+            raise InvalidCronExpression("Cron expressions need five fields")
+        try:
+            self.tz = ZoneInfo(tz)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise InvalidCronExpression(f"Unknown time zone {tz!r}")
+
+        parsed = [_parse_field(f, *spec) for f, spec in zip(fields, FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = frozenset(d % 7 for d in weekdays)
+        # Standard cron: when both day fields are restricted, either may match
+        self.any_day = fields[2] != "*" and fields[4] != "*"
+        self.day_restricted = fields[2] != "*"
+        self.weekday_restricted = fields[4] != "*"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day = moment.day in self.days
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.any_day:
+            return day or weekday
+        return (day or not self.day_restricted) and (weekday or not self.weekday_restricted)
+
+    def next_after(self, after: datetime) -> datetime:
+        """First occurrence strictly after ``after``, as an aware UTC datetime."""
+        if after.tzinfo is None:
+            after = after.replace(tzinfo=timezone.utc)
+        moment = after.astimezone(self.tz).replace(tzinfo=None, second=0, microsecond=0)
+        moment += timedelta(minutes=1)
+        limit = moment + timedelta(days=SEARCH_DAYS)
+
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment.replace(tzinfo=self.tz).astimezone(timezone.utc)
+        raise InvalidCronExpression(f"Cron expression {self.expression!r} never fires")
@@ -0,0 +1,74 @@
+"""Keyset (cursor) pagination on (created_at, id).
+
+A cursor encodes the sort key of the last row of a page; the next page
+starts strictly after it, so every page is an index range scan no matter how
+deep it is. Ties on created_at are broken by id. Paged endpoints return the
+next page's cursor in the X-Next-Cursor header.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import Response
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor was not produced by encode_cursor."""
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    payload = json.dumps([created_at.isoformat(), str(row_id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), str(row_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+
+def keyset_paginate(
+    query: Select,
+    created_col: InstrumentedAttribute,
+    id_col: InstrumentedAttribute,
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = False,
+) -> Select:
+    """
+    Restrict a query to the page after ``cursor``.
+
+    One extra row is fetched so ``split_page`` can tell whether another page
+    follows without a count query.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        key = tuple_(created_col, id_col)
+        query = query.where(key < (created_at, row_id) if descending else key > (created_at, row_id))
+    if descending:
+        query = query.order_by(created_col.desc(), id_col.desc())
+    else:
+        query = query.order_by(created_col, id_col)
+    return query.limit(limit + 1)
+
+
+def split_page(rows: Sequence[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Return the page's rows and the cursor of the next page, if any."""
+    page = list(rows[:limit])
+    if len(rows) <= limit or not page:
+        return page, None
+    last = page[-1]
+    return page, encode_cursor(last.created_at, last.id)
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    """Expose the next page's cursor in the X-Next-Cursor header, when there is one."""
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
@@ -0,0 +1,44 @@
+"""Column projections for list endpoints.
+
+List endpoints select only the columns of their summary schema; large
+columns (JSON blobs, raw documents) are read only when a client names them
+in ``?fields=``.
+"""
+
+from typing import Any, Iterable, List, Mapping, Optional, Set, Type
+
+from pydantic import BaseModel
+
+
+class UnknownField(ValueError):
+    """Raised when ``?fields=`` names a field the endpoint cannot add."""
+
+
+def parse_fields(fields: Optional[str], available: Iterable[str]) -> Set[str]:
+    """Parse a comma-separated ``fields`` parameter against the optional fields."""
+    if not fields:
+        return set()
+    available = set(available)
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - available
+    if unknown:
+        raise UnknownField(
+            f"Unknown fields: {', '.join(sorted(unknown))}. "
+            f"Available: {', '.join(sorted(available))}"
+        )
+    return requested
+
+
+def summary_columns(model: Any, schema: Type[BaseModel]) -> List[Any]:
+    """The mapped columns backing every field of a summary schema."""
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+def project(
+    columns: List[Any], optional: Mapping[str, Any], fields: Optional[str]
+) -> List[Any]:
+    """Summary columns plus the optional columns named in ``fields``."""
+    requested = parse_fields(fields, optional)
+    return columns + [
+        column.label(name) for name, column in optional.items() if name in requested
+    ]
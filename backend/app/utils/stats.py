@@ -0,0 +1,35 @@
+"""Confidence intervals for pass and success rates."""
+
+from math import sqrt
+from statistics import NormalDist
+from typing import Tuple
+
+
+def z_score(confidence: float) -> float:
+    """Two-sided standard normal quantile for ``confidence`` (0.95 -> 1.96)."""
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def wilson_interval(successes: int, trials: int, confidence: float = 0.95) -> Tuple[float, float]:
+    """
+    Wilson score interval for a binomial proportion.
+
+    Unlike the normal approximation it stays inside [0, 1] and is still
+    meaningful at 0 or ``trials`` successes, which is where stable scenarios
+    and well-defended agents spend most of their time. ``(0, 1)`` without trials.
+    """
+    if trials <= 0:
+        return 0.0, 1.0
+    z = z_score(confidence)
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    margin = z * sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+def interval_settled(
+    low: float, high: float, target_width: float, threshold: float
+) -> bool:
+    """True once an interval is narrower than ``target_width`` or lies wholly on one side of ``threshold``."""
+    return high - low <= target_width or low >= threshold or high < threshold
@@ -0,0 +1,64 @@
+# backend/tests/api/test_outcome_routes.py
+import asyncio
+
+import httpx
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401
+from app.core.auth import get_current_user
+from app.core.database import Base, get_db
+from app.main import app
+from app.models.evaluation_run import EvaluationRunRecord, RunState
+from app.models.project import Project
+from app.models.test_suite import TestSuite
+
+RUN_ID = "00000000-0000-0000-0000-0000000000a1"
+
+
+def _get(tmp_path, *paths):
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'outcomes.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        async with sessions() as db:
+            db.add_all([
+                Project(id="p", name="P", gcp_project_id="g", ces_app_name="apps/a"),
+                TestSuite(id="s", project_id="p", name="S", tags=[]),
+                EvaluationRunRecord(id=RUN_ID, test_suite_id="s", state=RunState.COMPLETED),
+            ])
+            await db.commit()
+
+        async def db_override():
+            async with sessions() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = db_override
+        app.dependency_overrides[get_current_user] = lambda: {"sub": "u"}
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                responses = [await client.get(path) for path in paths]
+        finally:
+            app.dependency_overrides.clear()
+        async with sessions() as db:
+            rolled_up_at = (await db.get(EvaluationRunRecord, RUN_ID)).rolled_up_at
+        await engine.dispose()
+        return responses, rolled_up_at
+
+    return asyncio.run(run())
+
+
+def test_unknown_test_case_outcomes_are_not_found(tmp_path):
+    (response,), _ = _get(tmp_path, "/api/test-cases/00000000-0000-0000-0000-0000000000ff/outcomes")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Test case not found"
+
+
+def test_reads_do_not_roll_up_runs(tmp_path):
+    (changes, flaky), rolled_up_at = _get(
+        tmp_path, f"/api/evaluations/runs/{RUN_ID}/changes", "/api/evaluations/flaky?test_suite_id=00000000-0000-0000-0000-0000000000b1"
+    )
+    assert changes.status_code == 409
+    assert flaky.status_code == 200
+    assert rolled_up_at is None
@@ -0,0 +1,57 @@
+# backend/tests/api/test_security_latency.py
+import asyncio
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401
+from app.api.routes.security_testing import latency_summary
+from app.core.database import Base
+from app.models.project import Project
+from app.models.security_testing import (
+    DatasetCategory,
+    SecurityTestResult,
+    SecurityTestRun,
+    SecurityTestState,
+)
+from app.services.latency_histogram import LatencySketch
+from app.services.rollups import store_missing_sketches
+
+
+def test_reads_rebuild_missing_sketches_and_backfill_stores_them(tmp_path):
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'latency.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        sketch = LatencySketch()
+        for value in range(100, 200):
+            sketch.add(value, "jailbreaking", "detectIntent")
+        async with sessions() as db:
+            db.add(Project(id="p", name="P", gcp_project_id="g", ces_app_name="apps/a"))
+            old = SecurityTestRun(id="old", project_id="p", name="old", state=SecurityTestState.COMPLETED,
+                                  dataset_category=DatasetCategory.TOXICITY)
+            new = SecurityTestRun(id="new", project_id="p", name="new", state=SecurityTestState.COMPLETED,
+                                  latency_sketch=sketch.to_dict())
+            db.add_all([old, new])
+            db.add_all(
+                SecurityTestResult(security_test_run_id="old", prompt_text="x", is_attack_successful=False,
+                                   latency_ms=latency)
+                for latency in (1000, 2000, None)
+            )
+            await db.commit()
+            summary = await latency_summary(db, [old, new])
+        async with sessions() as db:
+            read_only = (await db.get(SecurityTestRun, "old")).latency_sketch
+            backfilled = await store_missing_sketches(db)
+        async with sessions() as db:
+            stored = (await db.get(SecurityTestRun, "old")).latency_sketch
+        await engine.dispose()
+        return summary, read_only, backfilled, stored
+
+    summary, read_only, backfilled, stored = asyncio.run(run())
+    assert (summary["run_count"], summary["count"]) == (2, 102)
+    assert summary["categories"]["toxicity"]["count"] == 2
+    assert summary["endpoints"] == {"detectIntent": summary["categories"]["jailbreaking"]}
+    assert read_only is None
+    assert backfilled == 1
+    assert LatencySketch.from_dict(stored).overall.count == 2
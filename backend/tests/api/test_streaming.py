@@ -0,0 +1,159 @@
+# backend/tests/api/test_streaming.py
+import asyncio
+import json
+
+import httpx
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401
+from app.api.routes import test_cases as test_case_routes
+from app.core.auth import get_current_user
+from app.core.database import Base, get_db
+from app.main import app
+from app.models.project import Project
+from app.models.test_case import ApprovalRecord, ApprovalStatus, TestCase, TestCaseType, TestCaseVersion
+from app.models.test_suite import TestSuite
+from app.services import gemini_service
+from app.services.gemini_service import GeminiService
+
+GENERATED = {"displayName": "Check balance", "scenario": {"task": "Check the balance"}}
+
+
+class FakeGemini:
+    model_name = "fake"
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+
+    async def generate_test_case_stream(self, user_input, agent_context=None, test_type="golden",
+                                        retry_feedback=None):
+        yield "token", '{"displayName": '
+        if self.fail:
+            raise RuntimeError("model overloaded")
+        yield "token", '"Check balance"}'
+        yield "stage", "validating"
+        yield "result", GENERATED
+
+
+def parse_events(body: str):
+    events = []
+    for frame in body.strip().split("\n\n"):
+        event, data = frame.split("\n")
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+async def _database(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'streaming.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    async with sessions() as db:
+        db.add_all([
+            Project(id="p", name="P", gcp_project_id="g", ces_app_name="apps/a"),
+            TestSuite(id="s", project_id="p", name="S", tags=[]),
+            TestCase(id="00000000-0000-0000-0000-0000000000c1", test_suite_id="s", name="Balance",
+                     type=TestCaseType.SCENARIO, original_input="check my balance", current_version=1),
+        ])
+        db.add(TestCaseVersion(test_case_id="00000000-0000-0000-0000-0000000000c1", version_number=1,
+                               generated_json={"displayName": "Balance"}))
+        await db.commit()
+    return engine, sessions
+
+
+def _retry(tmp_path, monkeypatch, gemini):
+    async def run():
+        engine, sessions = await _database(tmp_path)
+
+        async def db_override():
+            async with sessions() as session:
+                yield session
+
+        monkeypatch.setattr(test_case_routes, "AsyncSessionLocal", sessions)
+        monkeypatch.setattr(test_case_routes, "get_gemini_service", lambda: gemini)
+        app.dependency_overrides[get_db] = db_override
+        app.dependency_overrides[get_current_user] = lambda: {"sub": "u", "email": "qa@example.com"}
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                response = await client.post(
+                    "/api/test-cases/00000000-0000-0000-0000-0000000000c1/approve/stream",
+                    json={"action": "retry", "feedback": "Ask for the savings account"},
+                )
+        finally:
+            app.dependency_overrides.clear()
+        async with sessions() as db:
+            test_case = await db.get(TestCase, "00000000-0000-0000-0000-0000000000c1")
+            versions = (await db.scalars(select(TestCaseVersion.version_number))).all()
+            approvals = (await db.scalars(select(ApprovalRecord))).all()
+        await engine.dispose()
+        return response, test_case, sorted(versions), approvals
+
+    return asyncio.run(run())
+
+
+def test_retry_stream_emits_tokens_then_saves_the_new_version(tmp_path, monkeypatch):
+    response, test_case, versions, approvals = _retry(tmp_path, monkeypatch, FakeGemini())
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_events(response.text)
+    assert [kind for kind, _ in events] == ["stage", "token", "token", "stage", "stage", "result"]
+    assert events[0][1] == {"stage": "generating", "type": "scenario"}
+    assert "".join(data["text"] for kind, data in events if kind == "token") == '{"displayName": "Check balance"}'
+    assert events[-1][1]["new_version"] == 2
+    assert events[-1][1]["new_status"] == "draft"
+    assert versions == [1, 2]
+    assert (test_case.current_version, test_case.status) == (2, ApprovalStatus.DRAFT)
+    assert [(a.version_number, a.user_email) for a in approvals] == [(1, "qa@example.com")]
+
+
+def test_retry_stream_reports_errors_without_writing(tmp_path, monkeypatch):
+    response, test_case, versions, approvals = _retry(tmp_path, monkeypatch, FakeGemini(fail=True))
+
+    assert response.status_code == 200
+    events = parse_events(response.text)
+    assert events[-1] == ("error", {"detail": "model overloaded"})
+    assert not any(kind == "result" for kind, _ in events)
+    assert versions == [1]
+    assert test_case.current_version == 1
+    assert approvals == []
+
+
+def test_aborted_stream_is_recorded_as_failed(monkeypatch):
+    recorded = []
+
+    async def record_call(call):
+        recorded.append(call)
+
+    async def check_budget(project_id):
+        return None
+
+    class Chunk:
+        def __init__(self, text):
+            self.text = text
+
+    class Model:
+        async def generate_content_async(self, prompt, stream=False):
+            async def chunks():
+                for text in ("a", "b", "c"):
+                    yield Chunk(text)
+            return chunks()
+
+    monkeypatch.setattr(gemini_service, "record_call", record_call)
+    monkeypatch.setattr(gemini_service, "check_budget", check_budget)
+    service = GeminiService.__new__(GeminiService)
+    service.model_name = "fake"
+
+    async def run():
+        stream = service._generate_stream(Model(), "prompt", "generate_test_case")
+        first = await stream.__anext__()
+        # What Starlette does when the client disconnects
+        await stream.aclose()
+        return first
+
+    assert asyncio.run(run()) == "a"
+    assert len(recorded) == 1
+    assert recorded[0].success is False
+    assert recorded[0].response_text == "a"
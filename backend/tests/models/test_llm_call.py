@@ -0,0 +1,14 @@
+# backend/tests/models/test_llm_call.py
+import pytest
+from app.models.llm_call import LLMCallRecord
+
+
+def test_llm_call_model_exists():
+    assert LLMCallRecord.__tablename__ == "llm_calls"
+
+
+def test_llm_call_has_accounting_columns():
+    columns = [c.name for c in LLMCallRecord.__table__.columns]
+    for name in ["project_id", "endpoint", "operation", "model", "prompt_tokens",
+                 "response_tokens", "total_tokens", "latency_ms", "cache_status"]:
+        assert name in columns
@@ -0,0 +1,334 @@
+# backend/tests/models/test_query_plans.py
+"""EXPLAIN each hot-path query against a seeded SQLite database.
+
+Every query here mirrors one issued by a route. A plan step that scans a
+whole table without an index, or sorts results in a temporary b-tree, fails
+the test; add or adjust an index in the models (and a migration) to fix it.
+"""
+import re
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, func, select, text
+
+import app.models  # noqa: F401
+from app.core.database import Base
+from app.models.evaluation_run import EvaluationRunRecord, RunResultRecord, RunState
+from app.models.outcome import TestCaseOutcome, TestCaseStability
+from app.models.project import Project
+from app.models.schedule import EvaluationSchedule
+from app.models.security_testing import (
+    PromptHistory,
+    SecurityTestResult,
+    SecurityTestRun,
+    SecurityTestState,
+)
+from app.models.test_case import ApprovalStatus, TestCase, TestCaseType, TestCaseVersion
+from app.models.test_suite import TestSuite
+from app.models.user import User
+from app.models.user_settings import UserSettings
+from app.models.webhook import WebhookDeadLetter, WebhookDelivery, WebhookSubscription
+from app.services.dashboard_cache import summary_query
+from app.utils.pagination import encode_cursor, keyset_paginate
+
+_FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+PROJECT = "p-0"
+SUITE = "s-0"
+RUN = "r-0"
+SECURITY_RUN = "sr-0"
+TEST_CASE = "tc-0"
+USER = "u-0"
+
+
+def _id() -> str:
+    return str(uuid.uuid4())
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    now = datetime.now(timezone.utc)
+    statuses = list(ApprovalStatus)
+    states = list(RunState)
+
+    with engine.begin() as conn:
+        conn.execute(Project.__table__.insert(), [
+            {"id": f"p-{i}", "name": f"P{i}", "gcp_project_id": "g", "ces_app_name": "a"}
+            for i in range(5)
+        ])
+        conn.execute(TestSuite.__table__.insert(), [
+            {"id": f"s-{i}", "project_id": f"p-{i % 5}", "name": f"S{i}", "tags": []}
+            for i in range(50)
+        ])
+        conn.execute(TestCase.__table__.insert(), [
+            {
+                "id": f"tc-{i}", "test_suite_id": f"s-{i % 50}", "name": f"T{i}",
+                "type": TestCaseType.GOLDEN, "status": statuses[i % len(statuses)],
+                "ces_evaluation_id": f"e{i}" if i % 2 else None,
+                "created_at": now - timedelta(minutes=i),
+            }
+            for i in range(5000)
+        ])
+        conn.execute(TestCaseVersion.__table__.insert(), [
+            {"id": _id(), "test_case_id": f"tc-{i % 5000}", "version_number": i // 5000 + 1,
+             "generated_json": {}}
+            for i in range(10000)
+        ])
+        conn.execute(EvaluationRunRecord.__table__.insert(), [
+            {"id": f"r-{i}", "test_suite_id": f"s-{i % 50}", "state": states[i % len(states)],
+             "created_at": now - timedelta(hours=i), "rolled_up_at": now if i > 3 else None}
+            for i in range(500)
+        ])
+        conn.execute(RunResultRecord.__table__.insert(), [
+            {"id": _id(), "evaluation_run_id": f"r-{i % 500}", "passed": i % 3 == 0,
+             "score": 0.5, "created_at": now - timedelta(seconds=i)}
+            for i in range(20000)
+        ])
+        conn.execute(SecurityTestRun.__table__.insert(), [
+            {"id": f"sr-{i}", "project_id": f"p-{i % 5}", "name": f"R{i}",
+             "dataset_source": f"d{i % 3}", "created_at": now - timedelta(hours=i),
+             "state": SecurityTestState.COMPLETED if i > 3 else SecurityTestState.RUNNING,
+             "rolled_up_at": now if i > 3 else None}
+            for i in range(100)
+        ])
+        conn.execute(SecurityTestResult.__table__.insert(), [
+            {"id": _id(), "security_test_run_id": f"sr-{i % 100}", "prompt_text": "x",
+             "is_attack_successful": i % 7 == 0, "confidence_score": (i % 10) / 10,
+             "created_at": now - timedelta(seconds=i)}
+            for i in range(20000)
+        ])
+        conn.execute(EvaluationSchedule.__table__.insert(), [
+            {"id": f"sch-{i}", "project_id": f"p-{i % 5}", "display_name": f"N{i}",
+             "cron_expression": "0 2 * * *", "enabled": i % 4 != 0,
+             "next_run_at": now + timedelta(minutes=i)}
+            for i in range(200)
+        ])
+        conn.execute(PromptHistory.__table__.insert(), [
+            {"id": _id(), "project_id": f"p-{i % 5}", "prompt_hash": f"h{i % 2000}",
+             "app_version": f"v{i // 2000}", "attempts": 1, "successes": 0}
+            for i in range(6000)
+        ])
+        conn.execute(TestCaseOutcome.__table__.insert(), [
+            {"id": _id(), "test_case_id": f"tc-{i % 1000}", "evaluation_run_id": f"r-{i // 1000}",
+             "test_suite_id": f"s-{i % 50}", "run_completed_at": now - timedelta(hours=i // 1000),
+             "outcome": "failed" if i % 4 else "passed",
+             "transition": ["new_failure", "still_failing", "fixed", "still_passing"][i % 4]}
+            for i in range(10000)
+        ])
+        conn.execute(TestCaseStability.__table__.insert(), [
+            {"test_case_id": f"tc-{i}", "test_suite_id": f"s-{i % 50}", "run_count": 10,
+             "flakiness": (i % 10) / 10}
+            for i in range(1000)
+        ])
+        conn.execute(WebhookSubscription.__table__.insert(), [
+            {"id": f"wh-{i}", "project_id": f"p-{i % 5}", "url": "https://ci.example.com/hook",
+             "events": ["run.completed"], "secret_encrypted": "x", "max_concurrency": 4,
+             "enabled": i % 3 != 0}
+            for i in range(50)
+        ])
+        conn.execute(WebhookDelivery.__table__.insert(), [
+            {"id": _id(), "subscription_id": f"wh-{i % 50}", "event": "run.completed",
+             "payload": {}, "attempts": i % 3, "next_attempt_at": now + timedelta(seconds=i - 2500)}
+            for i in range(5000)
+        ])
+        conn.execute(WebhookDeadLetter.__table__.insert(), [
+            {"id": _id(), "subscription_id": f"wh-{i % 50}", "event": "run.completed",
+             "payload": {}, "created_at": now, "failed_at": now - timedelta(minutes=i)}
+            for i in range(2000)
+        ])
+        conn.execute(User.__table__.insert(), [
+            {"id": f"u-{i}", "email": f"u{i}@example.com", "name": f"U{i}"} for i in range(100)
+        ])
+        conn.execute(UserSettings.__table__.insert(), [
+            {"id": _id(), "user_id": f"u-{i}"} for i in range(100)
+        ])
+        conn.execute(text("ANALYZE"))
+    yield engine
+    engine.dispose()
+
+
+def _plan(engine, statement) -> list:
+    compiled = statement.compile(engine, compile_kwargs={"literal_binds": True})
+    with engine.connect() as conn:
+        return [row[3] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))]
+
+
+CURSOR = encode_cursor(datetime(2024, 1, 1), "x")
+
+HOT_QUERIES = {
+    # evaluations.get_run_results / export
+    "run_results_page": keyset_paginate(
+        select(RunResultRecord).where(RunResultRecord.evaluation_run_id == RUN),
+        RunResultRecord.created_at, RunResultRecord.id, CURSOR, 100,
+    ),
+    # analysis_cache.results_digest
+    "run_results_digest": select(
+        func.count(RunResultRecord.id), func.max(RunResultRecord.created_at)
+    ).where(RunResultRecord.evaluation_run_id == RUN),
+    # evaluations.list_evaluation_runs
+    "runs_by_suite": keyset_paginate(
+        select(EvaluationRunRecord).where(EvaluationRunRecord.test_suite_id == SUITE),
+        EvaluationRunRecord.created_at, EvaluationRunRecord.id, CURSOR, 50, descending=True,
+    ),
+    "runs_all": keyset_paginate(
+        select(EvaluationRunRecord),
+        EvaluationRunRecord.created_at, EvaluationRunRecord.id, CURSOR, 50, descending=True,
+    ),
+    # evaluations.analyze_run_trends
+    "completed_runs_by_suite": select(EvaluationRunRecord)
+        .where(
+            EvaluationRunRecord.test_suite_id == SUITE,
+            EvaluationRunRecord.state == RunState.COMPLETED,
+        )
+        .order_by(EvaluationRunRecord.created_at.desc())
+        .limit(10),
+    # dashboard_cache.compute_summary (recomputed only after the counters change)
+    "dashboard_project": summary_query(PROJECT),
+    "last_completed_run": select(EvaluationRunRecord)
+        .where(EvaluationRunRecord.state == RunState.COMPLETED)
+        .order_by(EvaluationRunRecord.created_at.desc())
+        .limit(1),
+    # test_cases.list_test_cases
+    "test_cases_by_suite": select(TestCase)
+        .where(TestCase.test_suite_id == SUITE)
+        .order_by(TestCase.created_at.desc()),
+    "test_cases_by_status": select(TestCase)
+        .where(TestCase.status == ApprovalStatus.DRAFT)
+        .order_by(TestCase.created_at.desc()),
+    # evaluations.run_evaluation
+    "submitted_test_cases": select(TestCase).where(
+        TestCase.test_suite_id == SUITE,
+        TestCase.status == ApprovalStatus.SUBMITTED,
+        TestCase.ces_evaluation_id.isnot(None),
+    ),
+    # test_cases.get_test_case_versions / selectinload(TestCase.versions)
+    "test_case_versions": select(TestCaseVersion)
+        .where(TestCaseVersion.test_case_id == TEST_CASE)
+        .order_by(TestCaseVersion.version_number),
+    # security_testing.list_security_test_runs
+    "security_runs_by_project": keyset_paginate(
+        select(SecurityTestRun).where(SecurityTestRun.project_id == PROJECT),
+        SecurityTestRun.created_at, SecurityTestRun.id, CURSOR, 20, descending=True,
+    ),
+    # security_testing.create_security_test_run
+    "security_runs_by_dataset": select(func.count()).select_from(SecurityTestRun).where(
+        SecurityTestRun.project_id == PROJECT, SecurityTestRun.dataset_source == "d1"
+    ),
+    # security_testing.get_security_test_results
+    "security_results_page": keyset_paginate(
+        select(SecurityTestResult).where(SecurityTestResult.security_test_run_id == SECURITY_RUN),
+        SecurityTestResult.created_at, SecurityTestResult.id, CURSOR, 50,
+    ),
+    "security_results_attacks": keyset_paginate(
+        select(SecurityTestResult).where(
+            SecurityTestResult.security_test_run_id == SECURITY_RUN,
+            SecurityTestResult.is_attack_successful == True,  # noqa: E712
+        ),
+        SecurityTestResult.created_at, SecurityTestResult.id, CURSOR, 50,
+    ),
+    "security_results_low_confidence": keyset_paginate(
+        select(SecurityTestResult).where(
+            SecurityTestResult.security_test_run_id == SECURITY_RUN,
+            SecurityTestResult.confidence_score < 0.7,
+        ),
+        SecurityTestResult.created_at, SecurityTestResult.id, CURSOR, 50,
+    ),
+    # rollups.roll_up_pending_runs
+    "pending_evaluation_rollups": select(EvaluationRunRecord).where(
+        EvaluationRunRecord.state == RunState.COMPLETED, EvaluationRunRecord.rolled_up_at.is_(None)
+    ).order_by(EvaluationRunRecord.completed_at).limit(200),
+    "pending_security_rollups": select(SecurityTestRun).where(
+        SecurityTestRun.state == SecurityTestState.COMPLETED, SecurityTestRun.rolled_up_at.is_(None)
+    ).order_by(SecurityTestRun.completed_at).limit(200),
+    # outcome_history.run_changes / flaky_test_cases / test_case_history
+    "run_outcome_changes": select(TestCaseOutcome.test_case_id, TestCaseStability.flakiness)
+    .outerjoin(TestCaseStability, TestCaseStability.test_case_id == TestCaseOutcome.test_case_id)
+    .where(
+        TestCaseOutcome.evaluation_run_id == RUN,
+        TestCaseOutcome.transition.in_(["new_failure", "fixed", "flaky"]),
+    ),
+    "flaky_test_cases": select(TestCaseStability)
+    .where(TestCaseStability.test_suite_id == SUITE, TestCaseStability.flakiness >= 0.1)
+    .order_by(TestCaseStability.flakiness.desc())
+    .limit(50),
+    "test_case_outcomes": select(TestCaseOutcome)
+    .where(TestCaseOutcome.test_case_id == TEST_CASE)
+    .order_by(TestCaseOutcome.run_completed_at.desc())
+    .limit(50),
+    # evaluation_runs.reconcile_runs
+    "unfinished_runs": select(EvaluationRunRecord.id)
+    .join(TestSuite, TestSuite.id == EvaluationRunRecord.test_suite_id)
+    .join(Project, Project.id == TestSuite.project_id)
+    .where(
+        EvaluationRunRecord.state.in_([RunState.PENDING, RunState.RUNNING]),
+        EvaluationRunRecord.ces_operation_id.isnot(None),
+    ),
+    # scheduler.fire_due_schedules / dispatch_queued_runs
+    "due_schedules": select(EvaluationSchedule)
+    .where(EvaluationSchedule.enabled.is_(True), EvaluationSchedule.next_run_at <= datetime(2024, 1, 1))
+    .order_by(EvaluationSchedule.next_run_at),
+    "queued_scheduled_runs": select(EvaluationRunRecord)
+    .join(TestSuite, TestSuite.id == EvaluationRunRecord.test_suite_id)
+    .where(
+        EvaluationRunRecord.state == RunState.PENDING,
+        EvaluationRunRecord.schedule_id.isnot(None),
+        EvaluationRunRecord.started_at.is_(None),
+    )
+    .order_by(EvaluationRunRecord.created_at),
+    "running_runs_per_project": select(TestSuite.project_id, func.count())
+    .join(EvaluationRunRecord, EvaluationRunRecord.test_suite_id == TestSuite.id)
+    .where(EvaluationRunRecord.state == RunState.RUNNING)
+    .group_by(TestSuite.project_id),
+    # prompt_history.load_history / record_outcomes
+    "prompt_history_by_hash": select(PromptHistory.prompt_hash, PromptHistory.attempts).where(
+        PromptHistory.project_id == PROJECT, PromptHistory.prompt_hash.in_(["h1", "h2", "h3"])
+    ),
+    "prompt_history_by_version": select(PromptHistory).where(
+        PromptHistory.project_id == PROJECT,
+        PromptHistory.app_version == "v1",
+        PromptHistory.prompt_hash.in_(["h1", "h2", "h3"]),
+    ),
+    # webhooks.notify_* / notify_regressions
+    "project_webhooks": select(WebhookSubscription).where(
+        WebhookSubscription.project_id == PROJECT, WebhookSubscription.enabled.is_(True)
+    ),
+    "suite_webhooks": select(WebhookSubscription)
+    .join(TestSuite, TestSuite.project_id == WebhookSubscription.project_id)
+    .where(TestSuite.id == SUITE, WebhookSubscription.enabled.is_(True)),
+    "run_new_failures": select(TestCaseOutcome.test_case_id, TestCase.name)
+    .join(TestCase, TestCase.id == TestCaseOutcome.test_case_id)
+    .where(TestCaseOutcome.evaluation_run_id == RUN, TestCaseOutcome.transition == "new_failure"),
+    # webhook_dispatcher.due_deliveries and the dead-letter list
+    "due_webhook_deliveries": select(WebhookDelivery)
+    .where(WebhookDelivery.subscription_id == "wh-1", WebhookDelivery.next_attempt_at <= datetime(2024, 1, 1))
+    .order_by(WebhookDelivery.next_attempt_at)
+    .limit(4),
+    "webhook_dead_letters": select(WebhookDeadLetter)
+    .where(WebhookDeadLetter.subscription_id == "wh-1")
+    .order_by(WebhookDeadLetter.failed_at.desc())
+    .limit(50),
+    # settings.get_hf_token_status and security run creation
+    "user_settings_by_user": select(UserSettings).where(UserSettings.user_id == USER),
+}
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_index(engine, name):
+    plan = _plan(engine, HOT_QUERIES[name])
+    # Scans of materialized one-row subqueries (anon_N) are fine; only tables count
+    full_scans = [
+        step for step in plan
+        if (match := _FULL_SCAN.match(step)) and match.group(1) in Base.metadata.tables
+    ]
+    assert not full_scans, f"{name} scans without an index: {plan}"
+    assert not any("TEMP B-TREE FOR ORDER BY" in step for step in plan), (
+        f"{name} sorts outside an index: {plan}"
+    )
+
+
+def test_successful_attacks_use_partial_index(engine):
+    plan = _plan(engine, HOT_QUERIES["security_results_attacks"])
+    assert any("ix_security_test_results_run_attacks_keyset" in step for step in plan), plan
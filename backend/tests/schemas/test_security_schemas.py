@@ -37,3 +37,25 @@ def test_dataset_info():
         description="Binary classification dataset"
     )
     assert info.id == "deepset/prompt-injections"
+
+def test_security_test_config_sequential():
+    run = SecurityTestRunCreate(
+        project_id="uuid-string",
+        dataset_id="test/dataset",
+        category="jailbreaking",
+        config={"sample_size": 10000, "sequential": {"precision": 1.5}},
+    )
+    assert run.config.sequential.precision == 1.5
+    assert run.config.sequential.min_prompts == 100
+    with pytest.raises(ValidationError):
+        SecurityTestRunCreate(
+            project_id="uuid-string", dataset_id="test/dataset", category="jailbreaking",
+            config={"sequential": {"precision": 0}},
+        )
+
+def test_security_test_config_rejects_prioritized_sequential():
+    with pytest.raises(ValidationError):
+        SecurityTestRunCreate(
+            project_id="uuid-string", dataset_id="test/dataset", category="jailbreaking",
+            config={"prioritize": True, "sequential": {"precision": 2}},
+        )
@@ -0,0 +1,26 @@
+import pytest
+from pydantic import ValidationError
+from app.schemas.schemas import WebhookSubscriptionCreate, WebhookSubscriptionUpdate
+
+def test_webhook_url_accepts_public_https():
+    subscription = WebhookSubscriptionCreate(url="https://hooks.example.com/cx", events=["run.completed"])
+    assert str(subscription.url) == "https://hooks.example.com/cx"
+    assert str(WebhookSubscriptionCreate(url="https://8.8.8.8/hook", events=["run.completed"]).url)
+    assert WebhookSubscriptionUpdate(description="renamed").url is None
+
+@pytest.mark.parametrize("url", [
+    "http://hooks.example.com/cx",
+    "https://localhost/hook",
+    "https://api.localhost/hook",
+    "https://127.0.0.1/hook",
+    "https://10.1.2.3/hook",
+    "https://192.168.0.10/hook",
+    "https://169.254.169.254/latest/meta-data",
+    "https://[::1]/hook",
+    "https://[fd00::1]/hook",
+])
+def test_webhook_url_rejects_plain_http_and_internal_hosts(url):
+    with pytest.raises(ValidationError):
+        WebhookSubscriptionCreate(url=url, events=["run.completed"])
+    with pytest.raises(ValidationError):
+        WebhookSubscriptionUpdate(url=url)
@@ -0,0 +1,83 @@
+# backend/tests/services/test_adaptive_runs.py
+import asyncio
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401
+from app.core.database import Base
+from app.models.evaluation_run import EvaluationRunRecord, RunState
+from app.models.project import Project
+from app.models.test_suite import TestSuite
+from app.services import adaptive_runs
+from app.services.evaluation_runs import build_run_config
+
+
+class FakeCES:
+    """``stable`` always passes, ``broken`` always fails, ``flaky`` passes four times in five."""
+
+    def __init__(self):
+        self.operations = {}
+        self.flips = 0
+
+    async def run_evaluation(self, app_id, run_config):
+        name = f"op{len(self.operations) + 1}"
+        self.operations[name] = run_config
+        return {"name": f"operations/{name}"}
+
+    async def get_operation(self, operation_id):
+        return {"done": True, "result": {"evaluationRun": {"name": f"evaluationRuns/{operation_id}"}}}
+
+    async def get_evaluation_run_results(self, app_id, run_id, page_size=100, page_token=None):
+        config = self.operations[run_id]
+        results = []
+        for evaluation_id in config["evaluationIds"]:
+            for _ in range(config["runCount"]):
+                self.flips += evaluation_id.endswith("flaky")
+                passed = {"stable": True, "broken": False}.get(
+                    evaluation_id.rsplit("/", 1)[-1], self.flips % 5 != 0
+                )
+                results.append({"evaluation": evaluation_id, "passed": passed})
+        return {"results": results}
+
+
+async def run_adaptive(monkeypatch, tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'adaptive.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    ces = FakeCES()
+    monkeypatch.setattr(adaptive_runs, "AsyncSessionLocal", sessions)
+    monkeypatch.setattr(adaptive_runs, "get_ces_client", lambda: ces)
+
+    ids = [f"apps/app1/evaluations/{name}" for name in ("stable", "broken", "flaky")]
+    async with sessions() as db:
+        db.add(Project(id="p", name="P", gcp_project_id="g", ces_app_name="apps/app1"))
+        db.add(TestSuite(id="s", project_id="p", name="S", tags=[]))
+        db.add(EvaluationRunRecord(
+            id="run", test_suite_id="s", state=RunState.RUNNING,
+            repetition=adaptive_runs.initial_repetition(
+                build_run_config(ids, run_count=30), 5, 0.2, 0.8, 0.95
+            ),
+        ))
+        await db.commit()
+
+    await adaptive_runs.run_adaptive("run", "app1")
+
+    async with sessions() as db:
+        run = await db.get(EvaluationRunRecord, "run")
+    await engine.dispose()
+    return run, ces
+
+
+def test_scenarios_stop_once_settled(monkeypatch, tmp_path):
+    run, ces = asyncio.run(run_adaptive(monkeypatch, tmp_path))
+
+    trials = {k.rsplit("/", 1)[-1]: s["trials"] for k, s in run.repetition["scenarios"].items()}
+    # Failing settles after one round, passing once 20/20 clears 80%,
+    # one hovering around 80% runs to the cap
+    assert trials == {"stable": 20, "broken": 5, "flaky": 30}
+    assert run.repetition["runs_saved"] == 90 - 55
+    assert len(ces.operations) == 6
+    assert all(config["runCount"] == 5 for config in ces.operations.values())
+    assert run.state == RunState.COMPLETED
+    assert (run.total_count, run.passed_count, run.failed_count) == (55, 44, 11)
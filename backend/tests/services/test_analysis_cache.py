@@ -0,0 +1,40 @@
+# backend/tests/services/test_analysis_cache.py
+import pytest
+from datetime import datetime, timezone
+from app.models.evaluation_run import EvaluationRunRecord
+from app.services.analysis_cache import (
+    combine_digests, compact_run_summary, normalize_question, question_hash
+)
+
+
+def test_question_normalization_ignores_case_and_spacing():
+    assert normalize_question("  Why did   TURN 3 fail? ") == "why did turn 3 fail?"
+    assert question_hash("Why did turn 3 fail?") == question_hash("why  did turn 3 FAIL?")
+
+
+def test_default_question_hash():
+    assert question_hash(None) == question_hash("")
+
+
+def test_combine_digests_is_order_sensitive():
+    assert combine_digests(["a", "b"]) != combine_digests(["b", "a"])
+
+
+def test_compact_run_summary_truncates_clusters():
+    run = EvaluationRunRecord(
+        id="run-1", app_version="v2", pass_rate=80.0,
+        created_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+    )
+    summary = {
+        "overview": {"total_results": 10, "passed": 8, "failed": 2, "failure_clusters": 12},
+        "clusters": [
+            {"count": 1, "keywords": ["k"], "failure_reason": "x" * 1000, "diagnostics": "{}"}
+            for _ in range(12)
+        ],
+    }
+    compact = compact_run_summary(run, summary, max_clusters=3)
+    assert compact["run_id"] == "run-1"
+    assert compact["total_results"] == 10
+    assert len(compact["top_failures"]) == 3
+    assert len(compact["top_failures"][0]["failure_reason"]) == 300
+    assert "diagnostics" not in compact["top_failures"][0]
@@ -0,0 +1,259 @@
+# backend/tests/services/test_bulk_ingestion.py
+import asyncio
+import io
+import zipfile
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401
+from app.core.config import settings
+from app.core.database import Base
+from app.models.ingestion import DocumentState, IngestionDocument, IngestionJob, IngestionState
+from app.models.project import Project
+from app.models.test_case import TestCase
+from app.models.test_suite import TestSuite
+from app.services import bulk_ingestion
+from app.services.bulk_ingestion import (
+    IngestionError, expand_uploads, run_ingestion_job, sections_to_text, unique_sections
+)
+from app.services.docx_parser import ParsedDocument
+from app.services.llm_usage import LLMBudgetExceeded
+
+
+def _zip(members: dict) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    return buf.getvalue()
+
+
+def test_expand_zip_keeps_only_docx_members():
+    archive = _zip({
+        "specs/a.docx": b"a",
+        "specs/~$a.docx": b"lock",
+        "__MACOSX/specs/._a.docx": b"meta",
+        "specs/notes.txt": b"txt",
+    })
+    documents = expand_uploads([("specs.zip", archive), ("b.docx", b"b")])
+    assert [d.filename for d in documents] == ["specs.zip/specs/a.docx", "b.docx"]
+
+
+def test_identical_documents_share_content_hash():
+    documents = expand_uploads([("a.docx", b"same"), ("b.docx", b"same")])
+    assert documents[0].content_hash == documents[1].content_hash
+
+
+def test_rejects_unsupported_and_empty_uploads():
+    with pytest.raises(IngestionError):
+        expand_uploads([("a.pdf", b"x")])
+    with pytest.raises(IngestionError):
+        expand_uploads([("empty.zip", _zip({"notes.txt": b"x"}))])
+
+
+def test_rejects_too_many_documents(monkeypatch):
+    monkeypatch.setattr(settings, "BULK_INGEST_MAX_DOCUMENTS", 2)
+    with pytest.raises(IngestionError):
+        expand_uploads([(f"{i}.docx", b"x") for i in range(3)])
+
+
+def test_rejects_oversized_archive_before_inflating(monkeypatch):
+    monkeypatch.setattr(settings, "BULK_INGEST_MAX_BYTES", 100)
+    with pytest.raises(IngestionError):
+        expand_uploads([("big.zip", _zip({"big.docx": b"0" * 1000}))])
+
+
+def test_unique_sections_skips_content_seen_in_job():
+    seen = set()
+    first = ParsedDocument(text="", sections=[
+        {"heading": "Billing", "content": ["Refund flow"]},
+        {"heading": "Common", "content": ["Greet the user"]},
+    ])
+    second = ParsedDocument(text="", sections=[
+        {"heading": "Shared", "content": ["greet  the USER"]},
+        {"heading": "Shipping", "content": ["Track parcel"]},
+    ])
+    assert unique_sections(first, seen) == (first.sections, 0)
+    kept, duplicates = unique_sections(second, seen)
+    assert [s["heading"] for s in kept] == ["Shipping"]
+    assert duplicates == 1
+    assert sections_to_text(kept) == "# Shipping\n\nTrack parcel"
+
+
+PARSED = {
+    b"a": [{"heading": "Billing", "content": ["Refund flow"]},
+           {"heading": "Common", "content": ["Greet the user"]}],
+    b"b": [{"heading": "Common", "content": ["Greet the user"]},
+           {"heading": "Shipping", "content": ["Track parcel"]}],
+    b"d": [{"heading": "Refunds", "content": ["Escalate to a human"]}],
+}
+
+
+class FakeGemini:
+    async def extract_test_requirements(self, text):
+        headings = [line[2:] for line in text.splitlines() if line.startswith("# ")]
+        # Every document also asks for the same greeting check
+        return [{"description": "Greeting"}] + [{"description": f"Test {h}"} for h in headings]
+
+    async def generate_test_case(self, user_input, agent_context=None, test_type="golden"):
+        if user_input == "Test Refunds":
+            raise RuntimeError("generation failed")
+        return {"displayName": user_input}
+
+
+def test_ingestion_job_records_each_document_and_final_counts(tmp_path, monkeypatch):
+    async def parse_in_pool(data):
+        if data not in PARSED:
+            raise ValueError("not a .docx file")
+        return ParsedDocument(text="", sections=PARSED[data])
+
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'ingest.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        monkeypatch.setattr(bulk_ingestion, "AsyncSessionLocal", sessions)
+        monkeypatch.setattr(bulk_ingestion, "get_gemini_service", FakeGemini)
+        monkeypatch.setattr(bulk_ingestion, "parse_in_pool", parse_in_pool)
+
+        async with sessions() as db:
+            db.add_all([
+                Project(id="p", name="P", gcp_project_id="g", ces_app_name="apps/a"),
+                TestSuite(id="s", project_id="p", name="S", tags=[]),
+                # The route marks repeated uploads as duplicates before the job runs
+                IngestionJob(id="j", test_suite_id="s", total_documents=5,
+                             processed_documents=1, duplicate_documents=1),
+            ])
+            db.add_all(
+                IngestionDocument(id=name, job_id="j", position=i, filename=f"specs/{name}.docx",
+                                  content_hash=name, state=state)
+                for i, (name, state) in enumerate([
+                    ("a", DocumentState.PENDING), ("b", DocumentState.PENDING),
+                    ("c", DocumentState.PENDING), ("d", DocumentState.PENDING),
+                    ("e", DocumentState.DUPLICATE),
+                ])
+            )
+            await db.commit()
+
+        await run_ingestion_job("j", [("a", b"a"), ("b", b"b"), ("c", b"c"), ("d", b"d")])
+
+        async with sessions() as db:
+            job = await db.get(IngestionJob, "j")
+            documents = {d.id: d for d in await db.scalars(select(IngestionDocument))}
+            names = sorted((await db.scalars(select(TestCase.name))).all())
+        await engine.dispose()
+        return job, documents, names
+
+    job, documents, names = asyncio.run(run())
+    assert job.state == IngestionState.COMPLETED
+    assert job.started_at is not None and job.completed_at is not None
+    assert (job.total_documents, job.processed_documents, job.duplicate_documents) == (5, 5, 1)
+    assert job.duplicate_sections == 1
+    assert (job.requirements_count, job.duplicate_requirements) == (5, 2)
+    assert job.generated_count == 4
+    assert names == ["Greeting", "Test Billing", "Test Common", "Test Shipping"]
+
+    states = {name: document.state for name, document in documents.items()}
+    assert states == {
+        "a": DocumentState.COMPLETED,
+        "b": DocumentState.COMPLETED,
+        "c": DocumentState.ERROR,
+        "d": DocumentState.ERROR,
+        "e": DocumentState.DUPLICATE,
+    }
+    assert documents["c"].error == "not a .docx file"
+    assert documents["d"].error == "generation failed"
+    assert documents["a"].sections_count == 2
+    assert sum(d.generated_count for d in documents.values()) == 4
+
+
+async def _ingestion_database(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    monkeypatch.setattr(bulk_ingestion, "AsyncSessionLocal", sessions)
+    async with sessions() as db:
+        db.add_all([
+            Project(id="p", name="P", gcp_project_id="g", ces_app_name="apps/a"),
+            TestSuite(id="s", project_id="p", name="S", tags=[]),
+        ])
+        await db.commit()
+    return engine, sessions
+
+
+def test_budget_exhaustion_fails_the_job_and_its_unfinished_documents(tmp_path, monkeypatch):
+    class BrokeGemini(FakeGemini):
+        async def extract_test_requirements(self, text):
+            raise LLMBudgetExceeded("p", 200, 100)
+
+    async def parse_in_pool(data):
+        return ParsedDocument(text="", sections=PARSED[data])
+
+    async def run():
+        engine, sessions = await _ingestion_database(tmp_path, monkeypatch)
+        monkeypatch.setattr(bulk_ingestion, "get_gemini_service", BrokeGemini)
+        monkeypatch.setattr(bulk_ingestion, "parse_in_pool", parse_in_pool)
+        async with sessions() as db:
+            db.add(IngestionJob(id="j", test_suite_id="s", total_documents=2))
+            db.add_all(
+                IngestionDocument(id=name, job_id="j", position=i, filename=f"{name}.docx", content_hash=name)
+                for i, name in enumerate(["a", "b"])
+            )
+            await db.commit()
+
+        await run_ingestion_job("j", [("a", b"a"), ("b", b"b")])
+
+        async with sessions() as db:
+            job = await db.get(IngestionJob, "j")
+            states = {d.id: d.state for d in await db.scalars(select(IngestionDocument))}
+        await engine.dispose()
+        return job, states
+
+    job, states = asyncio.run(run())
+    assert job.state == IngestionState.ERROR
+    assert states == {"a": DocumentState.ERROR, "b": DocumentState.ERROR}
+
+
+def test_stale_jobs_are_failed_with_their_unfinished_documents(tmp_path, monkeypatch):
+    long_ago = datetime.now(timezone.utc) - timedelta(hours=2)
+
+    async def run():
+        engine, sessions = await _ingestion_database(tmp_path, monkeypatch)
+        async with sessions() as db:
+            db.add_all([
+                IngestionJob(id="dead", test_suite_id="s", state=IngestionState.RUNNING,
+                             started_at=long_ago, created_at=long_ago),
+                IngestionJob(id="busy", test_suite_id="s", state=IngestionState.RUNNING,
+                             started_at=long_ago, created_at=long_ago),
+                IngestionJob(id="done", test_suite_id="s", state=IngestionState.COMPLETED,
+                             started_at=long_ago, created_at=long_ago),
+            ])
+            db.add_all([
+                IngestionDocument(id="d1", job_id="dead", filename="1.docx", content_hash="1",
+                                  state=DocumentState.GENERATING, updated_at=long_ago),
+                IngestionDocument(id="d2", job_id="dead", filename="2.docx", content_hash="2",
+                                  state=DocumentState.COMPLETED, updated_at=long_ago),
+                # Still progressing on another replica
+                IngestionDocument(id="b1", job_id="busy", filename="3.docx", content_hash="3",
+                                  state=DocumentState.GENERATING),
+            ])
+            await db.commit()
+
+        failed = await bulk_ingestion.fail_stale_jobs()
+
+        async with sessions() as db:
+            jobs = {j.id: j.state for j in await db.scalars(select(IngestionJob))}
+            documents = {d.id: d.state for d in await db.scalars(select(IngestionDocument))}
+        await engine.dispose()
+        return failed, jobs, documents
+
+    failed, jobs, documents = asyncio.run(run())
+    assert failed == 1
+    assert jobs == {"dead": IngestionState.ERROR, "busy": IngestionState.RUNNING,
+                    "done": IngestionState.COMPLETED}
+    assert documents == {"d1": DocumentState.ERROR, "d2": DocumentState.COMPLETED,
+                         "b1": DocumentState.GENERATING}
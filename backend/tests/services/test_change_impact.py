@@ -0,0 +1,103 @@
+# backend/tests/services/test_change_impact.py
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401
+from app.core.database import Base
+from app.models.evaluation_run import EvaluationRunRecord, RunState
+from app.models.project import Project
+from app.models.test_case import ApprovalStatus, TestCase, TestCaseType, TestCaseVersion
+from app.models.test_suite import TestSuite
+from app.services.change_impact import app_snapshot, diff_snapshots, mentions, select_impacted
+
+AGENT = "apps/a/agents/root"
+TOOL = "apps/a/tools/t1"
+
+
+class FakeCES:
+    def __init__(self, tool_description="Looks up an order", extra_tools=()):
+        self.tools = [
+            {"name": TOOL, "displayName": "lookup_order", "description": tool_description,
+             "updateTime": datetime.now(timezone.utc).isoformat()},
+            *extra_tools,
+        ]
+
+    async def list_agents(self, app_id):
+        return {"agents": [{"name": AGENT, "displayName": "Root", "instruction": "Be helpful"}]}
+
+    async def list_tools(self, app_id):
+        return {"tools": self.tools}
+
+
+def test_snapshot_diff_ignores_server_timestamps():
+    before = asyncio.run(app_snapshot(FakeCES(), "a"))
+    assert asyncio.run(app_snapshot(FakeCES(), "a")) == before
+    after = asyncio.run(app_snapshot(
+        FakeCES("Finds an order", [{"name": "apps/a/tools/t2", "displayName": "refund"}]), "a"
+    ))
+    changes = diff_snapshots(before, after)
+    assert [(c["name"], c["change"]) for c in changes] == [
+        (TOOL, "modified"), ("apps/a/tools/t2", "added"),
+    ]
+    assert diff_snapshots(after, before)[1]["change"] == "removed"
+
+
+def test_mentions_matches_whole_names_across_separators():
+    change = {"name": TOOL, "display_name": "lookup_order"}
+    assert mentions(' {"task": "check the lookup order tool is used"} '.replace('"', " "), change)
+    assert not mentions(" lookup orders ", change)
+    assert mentions(" calls t1 first ", {"name": TOOL, "display_name": ""}) is False
+
+
+async def impact(tmp_path, new_ces, baseline=True):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'impact.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    now = datetime.now(timezone.utc)
+    async with sessions() as db:
+        db.add(Project(id="p", name="P", gcp_project_id="g", ces_app_name="apps/a"))
+        db.add(TestSuite(id="s", project_id="p", name="S", tags=[]))
+        tasks = ["Ask for status; the agent calls lookup_order", "Say hello", "Refund flow"]
+        for i, task in enumerate(tasks):
+            db.add(TestCase(id=f"tc{i}", test_suite_id="s", name=f"T{i}", type=TestCaseType.SCENARIO,
+                            status=ApprovalStatus.SUBMITTED, ces_evaluation_id=f"e{i}"))
+            db.add(TestCaseVersion(test_case_id=f"tc{i}", version_number=1,
+                                   generated_json={"scenario": {"task": task, "rubrics": []}}))
+        if baseline:
+            db.add(EvaluationRunRecord(
+                id="old", test_suite_id="s", state=RunState.COMPLETED, failed_count=0, error_count=0,
+                app_snapshot=await app_snapshot(FakeCES(), "a"), created_at=now - timedelta(days=1),
+            ))
+        db.add(EvaluationRunRecord(
+            id="failing", test_suite_id="s", state=RunState.COMPLETED, failed_count=1, error_count=0,
+            app_snapshot={}, created_at=now,
+        ))
+        await db.commit()
+        snapshot = await app_snapshot(new_ces, "a")
+        selected = await select_impacted(db, "s", ["e0", "e1", "e2"], snapshot)
+    await engine.dispose()
+    return selected
+
+
+def test_only_evaluations_mentioning_a_change_are_selected(tmp_path):
+    selected, report = asyncio.run(impact(tmp_path, FakeCES("Finds an order")))
+    assert selected == ["e0"]
+    assert report["baseline_run_id"] == "old"
+    assert (report["selected"], report["skipped"]) == (1, 2)
+    assert report["full_run_reason"] is None
+
+
+def test_unmentioned_change_or_no_baseline_runs_everything(tmp_path):
+    extra = [{"name": "apps/a/tools/t9", "displayName": "escalate"}]
+    selected, report = asyncio.run(impact(tmp_path, FakeCES(extra_tools=extra)))
+    assert selected == ["e0", "e1", "e2"]
+    assert report["changes"][0]["test_cases"] == 0
+    assert report["full_run_reason"]
+
+
+def test_no_changes_selects_nothing(tmp_path):
+    selected, report = asyncio.run(impact(tmp_path, FakeCES()))
+    assert selected == [] and report["changes"] == []
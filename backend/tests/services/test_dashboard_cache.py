@@ -0,0 +1,151 @@
+# backend/tests/services/test_dashboard_cache.py
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+import app.models  # noqa: F401
+from app.core.database import Base
+from app.models.dashboard import GLOBAL_SCOPE, DashboardSummaryCache
+from app.models.evaluation_run import EvaluationRunRecord, RunState
+from app.models.project import Project
+from app.models.test_case import ApprovalStatus, TestCase, TestCaseType
+from app.models.test_suite import TestSuite
+from app.services.dashboard_cache import (
+    COUNTERS,
+    get_dashboard_summary,
+    invalidate_runs,
+    refresh_summaries,
+    summary_query,
+    to_summary,
+)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    now = datetime.now(timezone.utc)
+    with Session(engine) as session:
+        for p in ("p1", "p2"):
+            session.add(Project(id=p, name=p, gcp_project_id="g", ces_app_name="a"))
+            session.add(TestSuite(id=f"{p}-s", project_id=p, name="S", tags=[]))
+        session.add_all([
+            TestCase(id=f"tc{i}", test_suite_id="p1-s", name="T", type=TestCaseType.GOLDEN,
+                     status=[ApprovalStatus.DRAFT, ApprovalStatus.SUBMITTED, ApprovalStatus.DENIED][i % 3])
+            for i in range(6)
+        ])
+        session.add_all([
+            EvaluationRunRecord(id="r-old", test_suite_id="p1-s", state=RunState.COMPLETED,
+                                total_count=4, passed_count=4, failed_count=0,
+                                created_at=now - timedelta(days=1)),
+            EvaluationRunRecord(id="r-new", test_suite_id="p1-s", state=RunState.COMPLETED,
+                                total_count=4, passed_count=1, failed_count=3, created_at=now),
+            EvaluationRunRecord(id="r-running", test_suite_id="p1-s", state=RunState.RUNNING,
+                                total_count=0, passed_count=0, failed_count=0,
+                                created_at=now + timedelta(hours=1)),
+        ])
+        session.commit()
+        session.add_all([DashboardSummaryCache(scope=s) for s in (GLOBAL_SCOPE, "p1", "p2")])
+        session.commit()
+        yield session
+    engine.dispose()
+
+
+def versions(session):
+    session.expire_all()
+    return {row.scope: row.version for row in session.query(DashboardSummaryCache)}
+
+
+def test_summary_query_matches_separate_counts(session):
+    row = session.execute(summary_query("p1")).one()
+    summary = to_summary({name: getattr(row, name) for name in COUNTERS})
+    assert summary.total_test_cases == 6
+    assert summary.approved_count == 2
+    assert summary.pending_count == 2
+    assert summary.total_runs == 3
+    assert (summary.total_passed, summary.total_failed) == (5, 3)
+    assert summary.avg_pass_rate == 62.5
+    # The newest completed run, not the newer running one
+    assert summary.last_run_pass_rate == 25.0
+
+
+def test_summary_query_for_empty_project(session):
+    row = session.execute(summary_query("p2")).one()
+    summary = to_summary({name: getattr(row, name) for name in COUNTERS})
+    assert summary.total_test_cases == summary.total_runs == 0
+    assert summary.last_run_pass_rate is None and summary.avg_pass_rate is None
+
+
+def test_status_change_invalidates_its_project_and_global(session):
+    session.get(TestCase, "tc0").status = ApprovalStatus.APPROVED
+    session.commit()
+    assert versions(session) == {GLOBAL_SCOPE: 1, "p1": 1, "p2": 0}
+
+
+def test_untracked_change_keeps_cache(session):
+    session.get(TestCase, "tc0").name = "renamed"
+    session.commit()
+    assert versions(session) == {GLOBAL_SCOPE: 0, "p1": 0, "p2": 0}
+
+
+def test_new_test_case_in_other_project(session):
+    session.add(TestCase(id="new", test_suite_id="p2-s", name="T", type=TestCaseType.GOLDEN))
+    session.commit()
+    assert versions(session) == {GLOBAL_SCOPE: 1, "p1": 0, "p2": 1}
+
+
+def test_completed_run_invalidates(session):
+    run = session.get(EvaluationRunRecord, "r-running")
+    run.state = RunState.COMPLETED
+    run.passed_count = 2
+    session.commit()
+    assert versions(session)["p1"] == 1
+
+
+def test_rolled_back_write_keeps_cache(session):
+    session.get(TestCase, "tc0").status = ApprovalStatus.APPROVED
+    session.flush()
+    session.rollback()
+    assert versions(session) == {GLOBAL_SCOPE: 0, "p1": 0, "p2": 0}
+
+
+def test_reads_do_not_write_and_refresh_stores_stale_rows(tmp_path):
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'dashboard.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        async with sessions() as db:
+            db.add_all([
+                Project(id="p1", name="p1", gcp_project_id="g", ces_app_name="a"),
+                TestSuite(id="p1-s", project_id="p1", name="S", tags=[]),
+                EvaluationRunRecord(id="r", test_suite_id="p1-s", state=RunState.RUNNING,
+                                    total_count=2, passed_count=2, failed_count=0),
+            ])
+            await db.commit()
+
+            read = await get_dashboard_summary(db, "p1")
+            rows_after_read = (await db.scalars(select(DashboardSummaryCache.scope))).all()
+            stored = await refresh_summaries(db)
+            stored_again = await refresh_summaries(db)
+
+            # A Core UPDATE, as the pollers make, bypasses the flush listeners
+            await db.execute(update(EvaluationRunRecord).values(state=RunState.ERROR))
+            await invalidate_runs(db, ["r"])
+            await db.commit()
+            entries = {
+                row.scope: row.version == row.computed_version
+                for row in await db.scalars(select(DashboardSummaryCache))
+            }
+        await engine.dispose()
+        return read, rows_after_read, stored, stored_again, entries
+
+    read, rows_after_read, stored, stored_again, entries = asyncio.run(run())
+    assert read.total_runs == 1
+    assert rows_after_read == []
+    assert (stored, stored_again) == (2, 0)
+    assert entries == {GLOBAL_SCOPE: False, "p1": False}
@@ -0,0 +1,65 @@
+# backend/tests/services/test_docx_parser.py
+import io
+
+from docx import Document
+
+from app.services.docx_parser import DocxParser, iter_blocks, parse_document
+
+
+def _build_docx() -> bytes:
+    doc = Document()
+    doc.add_paragraph("Overview of the agent.")
+    doc.add_heading("Billing", level=1)
+    doc.add_paragraph("User asks for a refund.")
+    table = doc.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = "Input"
+    table.cell(0, 1).text = "Expected"
+    table.cell(1, 0).text = "refund please"
+    table.cell(1, 1).text = "Sure"
+    doc.add_paragraph("")
+    doc.add_heading("Escalation", level=2)
+    doc.add_paragraph("Transfer to a human.")
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def test_blocks_in_document_order():
+    blocks = list(iter_blocks(_build_docx()))
+    assert [b.kind for b in blocks] == [
+        "paragraph", "heading", "paragraph", "table", "heading", "paragraph"
+    ]
+    assert blocks[1].level == 1
+    assert blocks[4].level == 2
+    assert blocks[3].rows == [["Input", "Expected"], ["refund please", "Sure"]]
+
+
+def test_text_view_keeps_tables_in_place():
+    text = DocxParser.extract_text(_build_docx())
+    assert text.index("# Billing") < text.index("[TABLE]") < text.index("## Escalation")
+    assert "refund please | Sure" in text
+
+
+def test_sections_view_from_same_pass():
+    parsed = parse_document(_build_docx())
+    assert [s["heading"] for s in parsed.sections] == ["Introduction", "Billing", "Escalation"]
+    billing = parsed.sections[1]["content"]
+    assert billing[0] == "User asks for a refund."
+    assert billing[1].startswith("[TABLE]\nInput | Expected")
+    assert parsed.sections == DocxParser.extract_sections(_build_docx())
+
+
+def test_nested_table_flattened_into_cell():
+    doc = Document()
+    outer = doc.add_table(rows=1, cols=1)
+    cell = outer.cell(0, 0)
+    cell.text = "Steps"
+    inner = cell.add_table(rows=1, cols=2)
+    inner.cell(0, 0).text = "a"
+    inner.cell(0, 1).text = "b"
+    buf = io.BytesIO()
+    doc.save(buf)
+
+    blocks = list(iter_blocks(buf.getvalue()))
+    assert len(blocks) == 1
+    assert blocks[0].rows == [["Steps\na | b"]]
@@ -0,0 +1,131 @@
+# backend/tests/services/test_evaluation_runs.py
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401
+from app.core.database import Base
+from app.models.evaluation_run import EvaluationRunRecord, RunResultRecord, RunState
+from app.models.project import Project
+from app.models.test_suite import TestSuite
+from app.models.webhook import WebhookDelivery, WebhookSubscription
+from app.services import evaluation_runs
+from app.services.leases import acquire_lease, release_lease
+
+
+class FakeCES:
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.app_ids = set()
+
+    async def get_operation(self, operation_id):
+        await self.release.wait()
+        return {"done": True, "result": {"evaluationRun": {"name": f"evaluationRuns/run-{operation_id}"}}}
+
+    async def get_evaluation_run(self, app_id, run_id):
+        self.app_ids.add(app_id)
+        return {"totalCount": 2, "passedCount": 1, "failedCount": 1}
+
+    async def get_evaluation_run_results(self, app_id, run_id, page_size=100, page_token=None):
+        return {"results": [{"name": f"{run_id}/1", "passed": True}, {"name": f"{run_id}/2", "passed": False}]}
+
+
+async def reconcile(monkeypatch, tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'runs.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    ces = FakeCES()
+    monkeypatch.setattr(evaluation_runs, "AsyncSessionLocal", sessions)
+    monkeypatch.setattr(evaluation_runs, "get_ces_client", lambda: ces)
+
+    old = datetime.now(timezone.utc) - timedelta(hours=1)
+    async with sessions() as db:
+        db.add(Project(id="p", name="P", gcp_project_id="g", ces_app_name="projects/g/locations/l/apps/app1"))
+        db.add(TestSuite(id="s", project_id="p", name="S", tags=[]))
+        db.add(WebhookSubscription(id="w", project_id="p", url="https://w.test/hook",
+                                   events=["run.completed"], secret_encrypted="x"))
+        db.add_all([
+            EvaluationRunRecord(id="running", test_suite_id="s", state=RunState.RUNNING,
+                                ces_operation_id="op1", started_at=old, created_at=old),
+            EvaluationRunRecord(id="legacy", test_suite_id="s", state=RunState.RUNNING,
+                                ces_run_id="op2", created_at=old),
+            EvaluationRunRecord(id="done", test_suite_id="s", state=RunState.COMPLETED,
+                                ces_operation_id="op3", created_at=old),
+            EvaluationRunRecord(id="stale", test_suite_id="s", state=RunState.PENDING, created_at=old),
+            EvaluationRunRecord(id="fresh", test_suite_id="s", state=RunState.PENDING),
+        ])
+        await db.commit()
+
+    attached = await evaluation_runs.reconcile_runs()
+    attached_again = await evaluation_runs.reconcile_runs()
+    ces.release.set()
+    await asyncio.gather(*evaluation_runs._polling.values())
+
+    async with sessions() as db:
+        runs = {r.id: r for r in (await db.execute(select(EvaluationRunRecord))).scalars()}
+        result_counts = dict((await db.execute(
+            select(RunResultRecord.evaluation_run_id, func.count()).group_by(RunResultRecord.evaluation_run_id)
+        )).all())
+        completed = sorted(
+            delivery.payload["run"]["id"] for delivery in await db.scalars(select(WebhookDelivery))
+        )
+    await engine.dispose()
+    return attached, attached_again, runs, result_counts, ces, completed
+
+
+def test_reconcile_resumes_unfinished_runs(monkeypatch, tmp_path):
+    attached, attached_again, runs, result_counts, ces, _ = asyncio.run(reconcile(monkeypatch, tmp_path))
+    assert (attached, attached_again) == (2, 0)
+    assert ces.app_ids == {"app1"}
+    for run_id in ("running", "legacy"):
+        run = runs[run_id]
+        assert run.state == RunState.COMPLETED
+        assert run.ces_run_id == f"run-op{1 if run_id == 'running' else 2}"
+        assert run.started_at is not None and run.completed_at is not None
+        assert run.pass_rate == 50.0
+        assert result_counts[run_id] == 2
+    assert "done" not in result_counts
+
+
+def test_reconcile_fails_stale_pending_runs(monkeypatch, tmp_path):
+    _, _, runs, _, _, completed = asyncio.run(reconcile(monkeypatch, tmp_path))
+    assert runs["stale"].state == RunState.ERROR
+    assert runs["stale"].completed_at is not None
+    assert runs["fresh"].state == RunState.PENDING
+    # run.completed for the failed run as well as the two that finished polling
+    assert completed == ["legacy", "running", "stale"]
+
+
+def test_only_the_lease_holder_reconciles(monkeypatch, tmp_path):
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'lease.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        monkeypatch.setattr(evaluation_runs, "AsyncSessionLocal", sessions)
+        reconciled = []
+
+        async def reconcile_runs():
+            reconciled.append(True)
+            return 0
+
+        async def fail_stale_jobs():
+            return 0
+
+        monkeypatch.setattr(evaluation_runs, "reconcile_runs", reconcile_runs)
+        monkeypatch.setattr(evaluation_runs, "fail_stale_jobs", fail_stale_jobs)
+        async with sessions() as db:
+            await acquire_lease(db, evaluation_runs.LEASE_NAME, "other-replica", timedelta(minutes=1))
+        while_held = await evaluation_runs.run_reconcile_tick(60)
+        async with sessions() as db:
+            await release_lease(db, evaluation_runs.LEASE_NAME, "other-replica")
+        after_release = await evaluation_runs.run_reconcile_tick(60)
+        await engine.dispose()
+        return while_held, after_release, reconciled
+
+    while_held, after_release, reconciled = asyncio.run(run())
+    assert (while_held, after_release) == (False, True)
+    assert reconciled == [True]
@@ -0,0 +1,66 @@
+# backend/tests/services/test_export_writers.py
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime, timezone
+
+import pyarrow.parquet as pq
+
+from app.services.export_writers import ExportColumn, encode_csv, encode_ndjson, encode_parquet
+
+COLUMNS = [
+    ExportColumn("name", "Test Case", None),
+    ExportColumn("passed", "Passed", None, "bool"),
+    ExportColumn("score", "Score", None, "float"),
+    ExportColumn("created_at", "Created At", None, "timestamp"),
+    ExportColumn("log", "Conversation Log", None, "json"),
+]
+CREATED = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+BATCHES = [
+    [("a", True, 1.0, CREATED, {"turns": 1}), ("b", False, None, CREATED, None)],
+    [("c, quoted", None, 0.25, None, [1, 2])],
+]
+
+
+async def fake_batches():
+    for batch in BATCHES:
+        yield batch
+
+
+def collect(encoder):
+    async def run():
+        return [chunk async for chunk in encoder(COLUMNS, fake_batches())]
+    return asyncio.run(run())
+
+
+def test_csv_header_is_sent_before_any_row():
+    chunks = collect(encode_csv)
+    assert chunks[0] == "Test Case,Passed,Score,Created At,Conversation Log\r\n"
+    assert len(chunks) == 1 + len(BATCHES)
+
+
+def test_csv_values():
+    rows = list(csv.reader(io.StringIO("".join(collect(encode_csv)))))
+    assert rows[1] == ["a", "Yes", "1.0", CREATED.isoformat(), '{"turns": 1}']
+    assert rows[2] == ["b", "No", "", CREATED.isoformat(), ""]
+    assert rows[3] == ["c, quoted", "", "0.25", "", "[1, 2]"]
+
+
+def test_ndjson_one_object_per_line():
+    lines = "".join(collect(encode_ndjson)).splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [r["name"] for r in records] == ["a", "b", "c, quoted"]
+    assert records[0]["created_at"] == CREATED.isoformat()
+    assert records[0]["log"] == {"turns": 1}
+
+
+def test_parquet_writes_one_row_group_per_batch():
+    data = b"".join(collect(encode_parquet))
+    parquet = pq.ParquetFile(io.BytesIO(data))
+    assert parquet.num_row_groups == len(BATCHES)
+    table = parquet.read().to_pydict()
+    assert table["name"] == ["a", "b", "c, quoted"]
+    assert table["passed"] == [True, False, None]
+    assert table["created_at"][0] == CREATED
+    assert table["log"] == ['{"turns": 1}', None, "[1, 2]"]
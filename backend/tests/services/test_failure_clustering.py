@@ -0,0 +1,94 @@
+# backend/tests/services/test_failure_clustering.py
+import asyncio
+
+from app.core.config import settings
+from app.services.gemini_service import GeminiService
+from app.services.failure_clustering import (
+    cluster_failures, summarize_for_analysis, tokenize, minhash_signatures
+)
+
+
+def _fail(reason, name=None, diagnostics=None):
+    return {"passed": False, "failure_reason": reason, "test_case_name": name,
+            "diagnostics": diagnostics, "score": 0.0}
+
+
+def test_tokenize_masks_numbers_and_ids():
+    tokens = tokenize("Timeout after 3021 ms in session 123e4567-e89b-12d3-a456-426614174000")
+    assert "timeout" in tokens
+    assert not any(ch.isdigit() for t in tokens for ch in t)
+
+
+def test_passed_results_are_ignored():
+    assert cluster_failures([{"passed": True, "failure_reason": None}]) == []
+
+
+def test_identical_failures_collapse():
+    results = [_fail("Tool get_balance was not called", f"tc{i}") for i in range(10)]
+    clusters = cluster_failures(results)
+    assert len(clusters) == 1
+    assert clusters[0].size == 10
+    assert len(clusters[0].sample_names) == 5
+
+
+def test_distinct_failure_modes_separate():
+    results = (
+        [_fail(f"Agent response timed out waiting for webhook after {i} ms") for i in range(20)]
+        + [_fail(f"Expected tool transfer_to_human but agent called end_session on turn {i}") for i in range(5)]
+    )
+    clusters = cluster_failures(results)
+    assert [c.size for c in clusters] == [20, 5]
+    assert "timed" in clusters[0].label
+
+
+def test_minhash_shape_is_stable():
+    sigs = minhash_signatures([["a", "b"], ["c"]], num_perm=32)
+    assert sigs.shape == (2, 32)
+    assert (sigs == minhash_signatures([["a", "b"], ["c"]], num_perm=32)).all()
+
+
+def test_summary_is_bounded_by_max_clusters():
+    results = [_fail(f"unique failure mode {chr(97 + i)}{chr(97 + i)}x") for i in range(10)]
+    results += [{"passed": True} for _ in range(5)]
+    summary = summarize_for_analysis(results, max_clusters=3)
+    assert summary["overview"]["total_results"] == 15
+    assert summary["overview"]["passed"] == 5
+    assert len(summary["clusters"]) <= 3
+    assert sum(c["count"] for c in summary["clusters"]) + summary["overview"].get(
+        "failures_in_smaller_clusters", 0
+    ) == 10
+
+
+def test_cluster_analysis_bounds_map_concurrency_and_notes(monkeypatch):
+    monkeypatch.setattr(settings, "GEMINI_ANALYSIS_CHUNK_CHARS", 1000)
+    monkeypatch.setattr(settings, "GEMINI_ANALYSIS_CONCURRENCY", 2)
+    state = {"in_flight": 0, "max_in_flight": 0, "prompts": []}
+
+    class Response:
+        text = "x" * 5000
+
+    class FakeService(GeminiService):
+        def __init__(self):
+            pass
+
+        def _get_model(self, response_schema=None):
+            return None
+
+        async def _generate(self, model, prompt, operation):
+            state["in_flight"] += 1
+            state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+            await asyncio.sleep(0.01)
+            state["in_flight"] -= 1
+            return Response()
+
+        async def _generate_stream(self, model, prompt, operation):
+            state["prompts"].append(prompt)
+            yield "done"
+
+    clusters = [{"size": 1, "example": "e" * 600} for _ in range(6)]
+    analysis = asyncio.run(FakeService().analyze_failure_clusters({"total": 6}, clusters))
+
+    assert analysis == "done"
+    assert state["max_in_flight"] == 2
+    # Six parts of notes share one chunk's worth of characters
+    assert state["prompts"][0].count("x") <= 1000
@@ -0,0 +1,80 @@
+# backend/tests/services/test_json_extraction.py
+import pytest
+from app.services.json_extraction import (
+    IncrementalJSONParser, JSONExtractionError, extract_json, strip_code_fence
+)
+
+
+def test_plain_json_not_repaired():
+    value, repaired = extract_json('{"displayName": "Test"}')
+    assert value == {"displayName": "Test"}
+    assert repaired is False
+
+
+def test_fenced_json():
+    value, repaired = extract_json('Here you go:\n```json\n[{"a": 1}]\n```')
+    assert value == [{"a": 1}]
+    assert repaired is False
+
+
+def test_prose_around_complete_json_not_repaired():
+    value, repaired = extract_json('Sure, here it is: {"a": [1, 2]} Let me know!')
+    assert value == {"a": [1, 2]}
+    assert repaired is False
+
+
+def test_strip_code_fence_plain_text():
+    assert strip_code_fence("  {}  ") == "{}"
+
+
+def test_truncated_string_value_is_closed():
+    value, repaired = extract_json('{"displayName": "Book a fli')
+    assert value == {"displayName": "Book a fli"}
+    assert repaired is True
+
+
+def test_truncated_after_key_drops_key():
+    value, _ = extract_json('{"a": "x", "b": ')
+    assert value == {"a": "x"}
+
+
+def test_truncated_number_in_array_dropped():
+    value, _ = extract_json('{"a": [1, 2, 3')
+    assert value == {"a": [1, 2]}
+
+
+def test_truncated_nested_object():
+    value, _ = extract_json('{"golden": {"turns": [{"userInput": {"text": "hi"}}, {"userIn')
+    assert value == {"golden": {"turns": [{"userInput": {"text": "hi"}}, {}]}}
+
+
+def test_truncated_escape_sequence_trimmed():
+    value, _ = extract_json('{"a": "line\\u00')
+    assert value == {"a": "line"}
+
+
+def test_braces_inside_strings_ignored():
+    value, _ = extract_json('{"a": "{[not a container", "b": [')
+    assert value == {"a": "{[not a container", "b": []}
+
+
+def test_trailing_text_after_root_ignored():
+    value, _ = extract_json('```json\n{"a": 1}\n``` trailing ```')
+    assert value == {"a": 1}
+
+
+def test_no_json_raises():
+    with pytest.raises(JSONExtractionError):
+        extract_json("I could not generate a test case.")
+
+
+def test_incremental_snapshots():
+    parser = IncrementalJSONParser()
+    parser.feed('{"task": "Che')
+    assert parser.snapshot() == {"task": "Che"}
+    parser.feed('ck balance", "rubrics": ["polite"')
+    assert parser.snapshot() == {"task": "Check balance", "rubrics": ["polite"]}
+    parser.feed("]}")
+    assert parser.done
+    assert parser.close() == {"task": "Check balance", "rubrics": ["polite"]}
+    assert parser.repaired is False
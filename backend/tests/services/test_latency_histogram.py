@@ -0,0 +1,72 @@
+# backend/tests/services/test_latency_histogram.py
+import random
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.latency_histogram import RELATIVE_ACCURACY, LatencyHistogram, LatencySketch
+from app.services.rollups import rollup_day
+
+
+def exact_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+@pytest.mark.parametrize("q", [0.5, 0.9, 0.95, 0.99])
+def test_quantiles_within_relative_accuracy(q):
+    rng = random.Random(7)
+    values = [rng.lognormvariate(5, 1) for _ in range(5000)]
+    histogram = LatencyHistogram().update(values)
+    expected = exact_quantile(values, q)
+    assert abs(histogram.quantile(q) - expected) <= expected * RELATIVE_ACCURACY * 1.01
+
+
+def test_merge_equals_histogram_of_all_values():
+    first, second = [float(v) for v in range(1, 500)], [float(v) for v in range(300, 2000)]
+    merged = LatencyHistogram().update(first).merge(LatencyHistogram().update(second))
+    combined = LatencyHistogram().update(first + second)
+    assert merged.to_dict() == combined.to_dict()
+    assert merged.count == len(first) + len(second)
+
+
+def test_round_trip_and_empty():
+    histogram = LatencyHistogram().update([0, 12.5, None, 300])
+    restored = LatencyHistogram.from_dict(histogram.to_dict())
+    assert restored.to_dict() == histogram.to_dict()
+    assert restored.count == 3
+    assert restored.quantile(0) == 0.0
+    assert LatencyHistogram.from_dict(None).quantile(0.5) is None
+
+
+def test_sketches_merge_per_category_and_endpoint():
+    first, second = LatencySketch(), LatencySketch()
+    for value in range(1, 101):
+        first.add(value, "jailbreaking", "detectIntent")
+        second.add(value * 10, "toxicity", "detectIntent")
+    second.add(5000, "toxicity", "runSession")
+    merged = LatencySketch.from_dict(first.to_dict()).merge(LatencySketch.from_dict(second.to_dict()))
+    summary = merged.summary()
+    assert summary["count"] == 201
+    assert sorted(summary["categories"]) == ["jailbreaking", "toxicity"]
+    assert summary["endpoints"]["detectIntent"]["count"] == 200
+    assert summary["endpoints"]["runSession"]["p50_ms"] == pytest.approx(5000, rel=RELATIVE_ACCURACY)
+    assert summary["categories"]["jailbreaking"]["p99_ms"] == pytest.approx(99, rel=RELATIVE_ACCURACY)
+    assert LatencySketch.from_dict(None).summary()["p95_ms"] is None
+
+
+def test_rollup_day_uses_utc_completion_time():
+    completed = datetime(2024, 3, 1, 23, 30, tzinfo=timezone(timedelta(hours=-5)))
+    run = SimpleNamespace(completed_at=completed, created_at=completed - timedelta(days=3))
+    assert str(rollup_day(run)) == "2024-03-02"
+    run = SimpleNamespace(completed_at=None, created_at=datetime(2024, 3, 1, 12))
+    assert str(rollup_day(run)) == "2024-03-01"
+
+
+def test_subtract_removes_merged_samples():
+    day = LatencyHistogram().update([100, 200, 0])
+    run = LatencyHistogram().update([300, 400, 0])
+    day.merge(run).subtract(run)
+    assert day.to_dict() == LatencyHistogram().update([100, 200, 0]).to_dict()
+    assert LatencyHistogram().subtract(run).count == 0
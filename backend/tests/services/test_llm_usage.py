@@ -0,0 +1,34 @@
+# backend/tests/services/test_llm_usage.py
+import pytest
+from types import SimpleNamespace
+from app.services.llm_usage import (
+    LLMCall, LLMBudgetExceeded, current_scope, llm_call_scope, usage_from_response
+)
+
+
+def test_usage_from_response_reads_metadata():
+    response = SimpleNamespace(usage_metadata=SimpleNamespace(
+        prompt_token_count=120, candidates_token_count=30,
+        cached_content_token_count=0, total_token_count=150,
+    ))
+    assert usage_from_response(response) == {
+        "prompt_tokens": 120, "response_tokens": 30, "cached_tokens": 0, "total_tokens": 150,
+    }
+
+
+def test_usage_from_response_without_metadata():
+    assert usage_from_response(SimpleNamespace())["total_tokens"] == 0
+
+
+def test_scope_is_reset_after_block():
+    assert current_scope() is None
+    with llm_call_scope("project-1", "test_cases.generate") as scope:
+        assert current_scope() is scope
+        scope.calls.append(LLMCall(operation="generate_test_case", model="m", prompt="p"))
+        assert scope.last_call.operation == "generate_test_case"
+    assert current_scope() is None
+
+
+def test_budget_exceeded_message():
+    exc = LLMBudgetExceeded("project-1", 1200, 1000)
+    assert "1200" in str(exc) and "1000" in str(exc)
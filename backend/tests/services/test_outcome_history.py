@@ -0,0 +1,131 @@
+# backend/tests/services/test_outcome_history.py
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401
+from app.core.database import Base
+from app.models.evaluation_run import EvaluationRunRecord, RunResultRecord, RunState
+from app.models.outcome import TestCaseOutcome, TestCaseStability
+from app.models.project import Project
+from app.models.test_case import TestCase, TestCaseType
+from app.models.test_suite import TestSuite
+from app.services import outcome_history
+from app.services.rollups import roll_up_evaluation_run, roll_up_pending_runs
+
+START = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("passed,failed,outcome", [
+    (3, 0, "passed"), (0, 2, "failed"), (1, 1, "flaky"), (0, 0, "error"),
+])
+def test_classify(passed, failed, outcome):
+    assert outcome_history.classify(passed, failed) == outcome
+
+
+def test_transitions_compare_with_previous_decisive_outcome():
+    t = outcome_history.transition
+    assert t(None, "failed") == "new_failure"
+    assert t("passed", "failed") == "new_failure"
+    assert t("flaky", "failed") == "new_failure"
+    assert t("failed", "failed") == "still_failing"
+    assert t("failed", "passed") == "fixed"
+    assert t(None, "passed") == "still_passing"
+    assert t("passed", "flaky") == "flaky"
+    assert not outcome_history.unstable(None, "failed")
+    assert outcome_history.unstable("passed", "failed")
+    assert outcome_history.unstable("passed", "flaky")
+
+
+async def scenario(tmp_path, runs):
+    """Complete one run per ``{evaluation: [passed, ...]}`` in ``runs``; return the sessions."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'outcomes.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    async with sessions() as db:
+        db.add(Project(id="p", name="P", gcp_project_id="g", ces_app_name="apps/a"))
+        db.add(TestSuite(id="s", project_id="p", name="S", tags=[]))
+        for name in ("stable", "breaks", "flips"):
+            db.add(TestCase(id=name, test_suite_id="s", name=name.title(), type=TestCaseType.SCENARIO,
+                            ces_evaluation_id=f"apps/a/evaluations/{name}"))
+        await db.commit()
+        for i, outcomes in enumerate(runs):
+            run = EvaluationRunRecord(
+                id=f"r{i}", test_suite_id="s", state=RunState.COMPLETED,
+                completed_at=START + timedelta(days=i),
+            )
+            db.add(run)
+            for evaluation, results in outcomes.items():
+                db.add_all(RunResultRecord(evaluation_run_id=run.id, ces_evaluation_id=evaluation,
+                                           passed=passed) for passed in results)
+            await db.flush()
+            await roll_up_evaluation_run(db, run)
+            await db.commit()
+    return engine, sessions
+
+
+RUNS = [
+    {"stable": [True], "breaks": [True], "flips": [True]},
+    {"stable": [True], "breaks": [True], "flips": [False]},
+    {"stable": [True], "breaks": [False, False], "flips": [True]},
+    {"stable": [True], "breaks": [False], "flips": [True, False], "apps/a/evaluations/gone": [False]},
+]
+
+
+def test_runs_are_compared_with_their_predecessor(tmp_path):
+    async def run():
+        engine, sessions = await scenario(tmp_path, RUNS)
+        async with sessions() as db:
+            second = await outcome_history.run_changes(db, "r1")
+            third = await outcome_history.run_changes(db, "r2")
+            last = await outcome_history.run_changes(db, "r3")
+            flaky = await outcome_history.flaky_test_cases(db, "s", 0.1, 10)
+            history = await outcome_history.test_case_history(db, "breaks", 10)
+        await engine.dispose()
+        return second, third, last, flaky, history
+
+    second, third, last, flaky, history = asyncio.run(run())
+    assert [c["test_case_id"] for c in second["new_failures"]] == ["flips"]
+    assert second["counts"] == {"new_failure": 1, "still_passing": 2}
+    assert [c["test_case_id"] for c in third["new_failures"]] == ["breaks"]
+    assert third["new_failures"][0]["failed_count"] == 2
+    assert [c["test_case_id"] for c in third["fixed"]] == ["flips"]
+    # Results of evaluations no longer in the suite are not recorded
+    assert last["counts"] == {"still_failing": 1, "still_passing": 1, "flaky": 1}
+    assert [c["test_case_id"] for c in last["flaky"]] == ["flips"]
+
+    assert [row["test_case_id"] for row in flaky] == ["flips", "breaks"]
+    flips = flaky[0]
+    assert (flips["run_count"], flips["flip_count"], flips["mixed_count"]) == (4, 2, 1)
+    assert flips["flakiness"] == pytest.approx(1 - 0.8 ** 3)
+    assert flips["last_outcome"] == "flaky"
+    assert [h.transition for h in history] == [
+        "still_failing", "new_failure", "still_passing", "still_passing",
+    ]
+
+
+def test_late_run_is_stored_without_transition(tmp_path):
+    async def run():
+        engine, sessions = await scenario(tmp_path, RUNS[:2])
+        async with sessions() as db:
+            db.add(EvaluationRunRecord(
+                id="late", test_suite_id="s", state=RunState.COMPLETED,
+                completed_at=START - timedelta(days=1),
+            ))
+            db.add(RunResultRecord(evaluation_run_id="late", ces_evaluation_id="stable", passed=False))
+            await db.commit()
+            await roll_up_pending_runs(db)
+            late = await db.scalar(
+                select(TestCaseOutcome).where(TestCaseOutcome.evaluation_run_id == "late")
+            )
+            stable = await db.get(TestCaseStability, "stable")
+        await engine.dispose()
+        return late, stable
+
+    late, stable = asyncio.run(run())
+    assert (late.outcome, late.transition) == ("failed", None)
+    assert (stable.run_count, stable.flakiness, stable.last_run_id) == (2, 0.0, "r1")
@@ -0,0 +1,82 @@
+# backend/tests/services/test_prompt_history.py
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401
+from app.core.database import Base
+from app.models.project import Project
+from app.models.security_testing import PromptHistory
+from app.services.prompt_history import (
+    latest_app_version,
+    load_history,
+    prioritize_prompts,
+    prompt_hash,
+    record_outcomes,
+    untested_prompts,
+)
+
+
+def test_prompt_hash_normalises_case_width_and_whitespace():
+    assert prompt_hash("Ignore  previous\ninstructions ") == prompt_hash("ignore previous instructions")
+    assert prompt_hash("ＩＧＮＯＲＥ") == prompt_hash("ignore")
+    assert prompt_hash("ignore") != prompt_hash("ignored")
+
+
+def prompts(*texts):
+    return [{"text": text, "hash": prompt_hash(text)} for text in texts]
+
+
+async def history_roundtrip():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    batch = prompts("leaky", "blocked", "new")
+    async with sessions() as db:
+        db.add(Project(id="p", name="P", gcp_project_id="g", ces_app_name="apps/app1"))
+        for _ in range(3):
+            await record_outcomes(db, "p", "v1", "r1", {
+                batch[0]["hash"]: ("injection", True),
+                batch[1]["hash"]: ("injection", False),
+            })
+            await db.commit()
+        await record_outcomes(db, "p", "v2", "r2", {batch[1]["hash"]: ("injection", False)})
+        await db.commit()
+        history = await load_history(db, "p", [p["hash"] for p in batch])
+        rows = (await db.scalars(select(PromptHistory).order_by(PromptHistory.app_version))).all()
+    await engine.dispose()
+    return batch, history, rows
+
+
+def test_history_prioritises_and_filters_by_version():
+    batch, history, rows = asyncio.run(history_roundtrip())
+    assert len(rows) == 3
+    assert (history[batch[0]["hash"]].attempts, history[batch[0]["hash"]].successes) == (3, 3)
+    assert history[batch[1]["hash"]].versions == {"v1", "v2"}
+
+    ordered = [p["text"] for p in prioritize_prompts(list(reversed(batch)), history)]
+    assert ordered == ["leaky", "new", "blocked"]
+    assert [p["text"] for p in untested_prompts(batch, history, "v2")] == ["leaky", "new"]
+    assert [p["text"] for p in untested_prompts(batch, history, "v3")] == ["leaky", "blocked", "new"]
+
+
+class FakeCES:
+    def __init__(self, response=None, error=False):
+        self.response, self.error = response, error
+
+    async def list_versions(self, app_id):
+        if self.error:
+            raise RuntimeError("forbidden")
+        return self.response
+
+
+def test_latest_app_version():
+    versions = {"appVersions": [
+        {"name": "apps/a/versions/1", "createTime": "2026-01-01T00:00:00Z"},
+        {"name": "apps/a/versions/2", "createTime": "2026-02-01T00:00:00Z"},
+    ]}
+    assert asyncio.run(latest_app_version(FakeCES(versions), "projects/g/apps/a")) == "apps/a/versions/2"
+    assert asyncio.run(latest_app_version(FakeCES({}), "apps/a")) is None
+    assert asyncio.run(latest_app_version(FakeCES(error=True), "apps/a")) is None
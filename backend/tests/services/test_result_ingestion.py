@@ -0,0 +1,93 @@
+# backend/tests/services/test_result_ingestion.py
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+import app.models  # noqa: F401
+from app.core.database import Base
+from app.models.evaluation_run import EvaluationRunRecord, RunResultRecord
+from app.models.project import Project
+from app.models.test_case import TestCase, TestCaseType
+from app.models.test_suite import TestSuite
+from app.services.result_ingestion import fetch_result_pages, ingest_run_results
+
+EVALUATION = "projects/g/locations/l/apps/a/evaluations/{}"
+
+
+class FakeCES:
+    def __init__(self, results, page_size):
+        self.pages = [results[i:i + page_size] for i in range(0, len(results), page_size)]
+        self.tokens = []
+
+    async def get_evaluation_run_results(self, app_id, run_id, page_size=100, page_token=None):
+        self.tokens.append(page_token)
+        number = int(page_token or 0)
+        page = {"results": self.pages[number]}
+        if number + 1 < len(self.pages):
+            page["nextPageToken"] = str(number + 1)
+        return page
+
+
+def make_results(n):
+    return [
+        {
+            "name": f"results/{i}",
+            "evaluation": EVALUATION.format(f"e{i % 5}"),
+            "passed": i % 3 != 0,
+            "score": i / n,
+        }
+        for i in range(n)
+    ]
+
+
+async def ingest(results, page_size, runs=1):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        db.add(Project(id="p", name="P", gcp_project_id="g", ces_app_name="a"))
+        db.add(TestSuite(id="s", project_id="p", name="S", tags=[]))
+        db.add_all([
+            TestCase(test_suite_id="s", name=f"case {k}", type=TestCaseType.GOLDEN,
+                     ces_evaluation_id=EVALUATION.format(f"e{k}"))
+            for k in range(4)
+        ])
+        run = EvaluationRunRecord(id="r", test_suite_id="s")
+        db.add(run)
+        await db.commit()
+
+        ces = FakeCES(results, page_size)
+        for _ in range(runs):
+            pages = await fetch_result_pages(ces, "a", "run", page_size)
+            counts = await ingest_run_results(db, run, pages)
+            await db.commit()
+        stored = (await db.execute(
+            select(RunResultRecord)
+            .where(RunResultRecord.evaluation_run_id == "r")
+            .order_by(RunResultRecord.created_at, RunResultRecord.id)
+        )).scalars().all()
+    await engine.dispose()
+    return counts, stored, ces, run.result_count
+
+
+def test_follows_every_page_and_keeps_order():
+    counts, stored, ces, _ = asyncio.run(ingest(make_results(250), page_size=100))
+    assert ces.tokens == [None, "1", "2"]
+    assert counts == {"total": 250, "passed": 166, "failed": 84}
+    assert [r.ces_result_id for r in stored] == [f"results/{i}" for i in range(250)]
+
+
+def test_maps_results_to_test_cases():
+    _, stored, _, _ = asyncio.run(ingest(make_results(10), page_size=100))
+    assert stored[1].ces_evaluation_id == EVALUATION.format("e1")
+    assert stored[1].test_case_name == "case 1"
+    # e4 has no test case in the suite
+    assert stored[4].test_case_name is None
+
+
+def test_reingesting_replaces_previous_results():
+    counts, stored, _, result_count = asyncio.run(ingest(make_results(30), page_size=7, runs=2))
+    assert counts["total"] == 30
+    assert len(stored) == 30
+    assert result_count == 30
@@ -0,0 +1,227 @@
+# backend/tests/services/test_rollups.py
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401
+from app.api.routes.trends import get_evaluation_trend
+from app.core.database import Base
+from app.models.evaluation_run import EvaluationRunRecord, RunState
+from app.models.project import Project
+from app.models.rollup import ALL_CATEGORIES, EvaluationRollup, SecurityRollup
+from app.models.security_testing import (
+    DatasetCategory,
+    SecurityTestResult,
+    SecurityTestRun,
+    SecurityTestState,
+)
+from app.models.test_suite import TestSuite
+from app.services.rollups import (
+    evaluation_trend,
+    remove_evaluation_run,
+    remove_security_run,
+    roll_up_evaluation_run,
+    roll_up_pending_runs,
+    roll_up_security_run,
+    security_categories,
+    security_trend,
+    since_day,
+)
+
+TODAY = datetime.now(timezone.utc).replace(hour=12, minute=0, second=0, microsecond=0)
+YESTERDAY = TODAY - timedelta(days=1)
+
+
+async def _database(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'rollups.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    async with sessions() as db:
+        db.add_all([
+            Project(id="p", name="P", gcp_project_id="g", ces_app_name="apps/a"),
+            Project(id="q", name="Q", gcp_project_id="g", ces_app_name="apps/b"),
+            TestSuite(id="s", project_id="p", name="S", tags=[]),
+            TestSuite(id="t", project_id="q", name="T", tags=[]),
+        ])
+        await db.commit()
+    return engine, sessions
+
+
+def _evaluation_run(id, suite="s", completed_at=TODAY, passed=8, failed=2, state=RunState.COMPLETED):
+    return EvaluationRunRecord(
+        id=id, test_suite_id=suite, state=state, completed_at=completed_at,
+        total_count=passed + failed + 1, passed_count=passed, failed_count=failed, error_count=1,
+    )
+
+
+def _security_run(id, outcomes, completed_at=TODAY, state=SecurityTestState.COMPLETED):
+    """``outcomes`` is a list of (prompt_category, attack_successful, latency_ms)."""
+    run = SecurityTestRun(
+        id=id, project_id="p", name=id, state=state, completed_at=completed_at,
+        dataset_category=DatasetCategory.JAILBREAKING,
+    )
+    results = [
+        SecurityTestResult(security_test_run_id=id, prompt_text=f"prompt {i}", prompt_category=category,
+                           is_attack_successful=successful, latency_ms=latency)
+        for i, (category, successful, latency) in enumerate(outcomes)
+    ]
+    return run, results
+
+
+def test_evaluation_run_is_claimed_and_counted_once(tmp_path):
+    async def run():
+        engine, sessions = await _database(tmp_path)
+        async with sessions() as db:
+            db.add_all([_evaluation_run("r1"), _evaluation_run("running", state=RunState.RUNNING)])
+            await db.commit()
+            r1 = await db.get(EvaluationRunRecord, "r1")
+            running = await db.get(EvaluationRunRecord, "running")
+            claimed = [
+                await roll_up_evaluation_run(db, r1),
+                await roll_up_evaluation_run(db, r1),
+                await roll_up_evaluation_run(db, running),
+            ]
+            await db.commit()
+            # The catch-up finds nothing left to do
+            caught_up = await roll_up_pending_runs(db)
+            rows = (await db.scalars(select(EvaluationRollup))).all()
+        await engine.dispose()
+        return claimed, caught_up, rows
+
+    claimed, caught_up, rows = asyncio.run(run())
+    assert claimed == [True, False, False]
+    assert caught_up == 0
+    assert len(rows) == 1
+    assert (rows[0].run_count, rows[0].total_count, rows[0].passed_count) == (1, 11, 8)
+    assert (rows[0].failed_count, rows[0].error_count) == (2, 1)
+
+
+def test_catch_up_rolls_up_missed_runs_and_trend_reads_them_back(tmp_path):
+    async def run():
+        engine, sessions = await _database(tmp_path)
+        async with sessions() as db:
+            db.add_all([
+                _evaluation_run("old", completed_at=YESTERDAY, passed=5, failed=5),
+                _evaluation_run("a", passed=9, failed=1),
+                _evaluation_run("b", passed=6, failed=4),
+                _evaluation_run("other", suite="t", passed=1, failed=0),
+                _evaluation_run("running", state=RunState.RUNNING),
+            ])
+            await db.commit()
+            # Trend reads never roll up themselves
+            before = await get_evaluation_trend(project_id="p", test_suite_id=None, days=7, points=None,
+                                                db=db, user={})
+            rolled = await roll_up_pending_runs(db, batch_size=2)
+            project_trend = await evaluation_trend(db, since_day(7), project_id="p")
+            suite_trend = await evaluation_trend(db, since_day(7), test_suite_id="t")
+            today_only = await evaluation_trend(db, since_day(1), project_id="p")
+            pending = (await db.scalars(
+                select(EvaluationRunRecord.id).where(EvaluationRunRecord.rolled_up_at.is_(None))
+            )).all()
+        await engine.dispose()
+        return before, rolled, project_trend, suite_trend, today_only, pending
+
+    before, rolled, project_trend, suite_trend, today_only, pending = asyncio.run(run())
+    assert before == []
+    assert rolled == 4
+    assert pending == ["running"]
+    assert [(p["day"], p["run_count"], p["passed_count"], p["failed_count"], p["pass_rate"])
+            for p in project_trend] == [
+        (YESTERDAY.date(), 1, 5, 5, 50.0),
+        (TODAY.date(), 2, 15, 5, 75.0),
+    ]
+    assert project_trend[1]["total_count"] == 22
+    assert [(p["run_count"], p["pass_rate"]) for p in suite_trend] == [(1, 100.0)]
+    assert [p["day"] for p in today_only] == [TODAY.date()]
+
+
+def test_security_rollup_counts_per_category_and_reads_back(tmp_path):
+    async def run():
+        engine, sessions = await _database(tmp_path)
+        async with sessions() as db:
+            first, first_results = _security_run("s1", [
+                ("toxicity", True, 100.0),
+                ("toxicity", False, 200.0),
+                (None, True, 300.0),  # counted under the run's dataset category
+                (None, False, None),
+            ])
+            second, second_results = _security_run("s2", [("toxicity", False, 400.0)])
+            db.add_all([first, second, *first_results, *second_results])
+            await db.commit()
+            assert await roll_up_security_run(db, first)
+            assert not await roll_up_security_run(db, first)
+            assert await roll_up_security_run(db, second)
+            await db.commit()
+            rows = {row.category: row for row in await db.scalars(select(SecurityRollup))}
+            trend = await security_trend(db, since_day(7), "p")
+            toxicity = await security_trend(db, since_day(7), "p", "toxicity")
+            categories = await security_categories(db, since_day(7), "p")
+            other_project = await security_trend(db, since_day(7), "q")
+        await engine.dispose()
+        return rows, trend, toxicity, categories, other_project
+
+    rows, trend, toxicity, categories, other_project = asyncio.run(run())
+    assert {c: (r.run_count, r.attempts, r.successes) for c, r in rows.items()} == {
+        ALL_CATEGORIES: (2, 5, 2),
+        "toxicity": (2, 3, 1),
+        "jailbreaking": (1, 2, 1),
+    }
+    assert len(trend) == 1
+    assert (trend[0]["run_count"], trend[0]["attempts"], trend[0]["successes"]) == (2, 5, 2)
+    assert trend[0]["attack_success_rate"] == 40.0
+    # Four timed results of 100, 200, 300 and 400 ms; ranks are q * (n - 1), within 1%
+    assert abs(trend[0]["latency_p50_ms"] - 200) <= 2
+    assert abs(trend[0]["latency_p99_ms"] - 300) <= 3
+    assert toxicity[0]["attack_success_rate"] == 33.33
+    assert sorted((c["category"], c["attempts"], c["successes"]) for c in categories) == [
+        ("jailbreaking", 2, 1), ("toxicity", 3, 1),
+    ]
+    assert other_project == []
+
+
+def test_deleted_runs_are_taken_out_of_rollups(tmp_path):
+    async def run():
+        engine, sessions = await _database(tmp_path)
+        async with sessions() as db:
+            first, first_results = _security_run("s1", [("toxicity", True, 100.0), (None, False, 200.0)])
+            second, second_results = _security_run("s2", [("toxicity", False, 400.0)])
+            never_rolled, _ = _security_run("s3", [], state=SecurityTestState.RUNNING)
+            db.add_all([
+                _evaluation_run("a", passed=9, failed=1),
+                _evaluation_run("b", passed=6, failed=4),
+                first, second, never_rolled, *first_results, *second_results,
+            ])
+            await db.commit()
+            await roll_up_pending_runs(db)
+
+            removed = [
+                await remove_evaluation_run(db, await db.get(EvaluationRunRecord, "a")),
+                # Reloaded as the delete route does; the claim does not update loaded runs
+                await remove_security_run(db, await db.get(SecurityTestRun, "s1", populate_existing=True)),
+                await remove_security_run(db, never_rolled),
+            ]
+            await db.commit()
+            evaluation_after = await evaluation_trend(db, since_day(1), project_id="p")
+            security_rows = {row.category: row for row in await db.scalars(select(SecurityRollup))}
+            security_after = await security_trend(db, since_day(1), "p")
+
+            await remove_evaluation_run(db, await db.get(EvaluationRunRecord, "b"))
+            await db.commit()
+            evaluation_empty = await evaluation_trend(db, since_day(1), project_id="p")
+        await engine.dispose()
+        return removed, evaluation_after, security_rows, security_after, evaluation_empty
+
+    removed, evaluation_after, security_rows, security_after, evaluation_empty = asyncio.run(run())
+    assert removed == [True, True, False]
+    assert [(p["run_count"], p["passed_count"], p["failed_count"]) for p in evaluation_after] == [(1, 6, 4)]
+    assert evaluation_empty == []
+    # Only s2 is left; the jailbreaking row held s1 alone
+    assert {c: (r.run_count, r.attempts, r.successes) for c, r in security_rows.items()} == {
+        ALL_CATEGORIES: (1, 1, 0),
+        "toxicity": (1, 1, 0),
+    }
+    assert abs(security_after[0]["latency_p50_ms"] - 400) <= 4
+    assert security_after[0]["attack_success_rate"] == 0.0
@@ -0,0 +1,109 @@
+# backend/tests/services/test_run_events.py
+import asyncio
+import json
+
+from app.services import run_events
+from app.services.run_events import RunEventBus
+
+
+def _frames(chunks):
+    """(event, data) of each SSE frame, with keep-alive comments as (None, None)."""
+    frames = []
+    for chunk in chunks:
+        if chunk.startswith(":"):
+            frames.append((None, None))
+            continue
+        event, data = chunk.strip().split("\n")
+        frames.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return frames
+
+
+def test_publish_fans_out_and_drops_oldest_when_full():
+    async def run():
+        bus = RunEventBus(queue_size=2)
+        first, second = bus.subscribe("t"), bus.subscribe("t")
+        for n in range(3):
+            bus.publish("t", "progress", {"n": n})
+        bus.publish("other", "progress", {"n": 99})
+        return [[queue.get_nowait()[1]["n"] for _ in range(queue.qsize())] for queue in (first, second)]
+
+    assert asyncio.run(run()) == [[1, 2], [1, 2]]
+
+
+def test_terminal_state_drops_topic():
+    async def run():
+        bus = RunEventBus()
+        queue = bus.subscribe("t")
+        bus.publish_state("t", "running")
+        running = bus.subscriber_count("t")
+        bus.publish_state("t", "completed", passed_count=3)
+        return running, bus.subscriber_count("t"), queue.qsize()
+
+    assert asyncio.run(run()) == (1, 0, 2)
+
+
+def test_stream_sends_snapshot_events_and_keepalive_until_final_state():
+    async def run():
+        bus = RunEventBus()
+        queue = bus.subscribe("t")
+
+        async def runner():
+            await asyncio.sleep(0.05)
+            bus.publish("t", "progress", {"completed_prompts": 1})
+            bus.publish_state("t", "completed")
+            bus.publish("t", "progress", {"completed_prompts": 2})
+
+        task = asyncio.create_task(runner())
+        chunks = [
+            chunk async for chunk in bus.stream("t", queue, {"state": "running"}, keepalive=0.01)
+        ]
+        await task
+        return chunks, bus.subscriber_count("t")
+
+    chunks, subscribers = asyncio.run(run())
+    frames = [frame for frame in _frames(chunks) if frame != (None, None)]
+    assert chunks[1] == ": keep-alive\n\n"
+    assert frames == [
+        ("snapshot", {"state": "running"}),
+        ("progress", {"completed_prompts": 1}),
+        ("state", {"state": "completed"}),
+    ]
+    assert subscribers == 0
+
+
+def test_stream_of_finished_run_is_only_its_snapshot():
+    async def run():
+        bus = RunEventBus()
+        queue = bus.subscribe("t")
+        chunks = [chunk async for chunk in bus.stream("t", queue, {"state": "cancelled"})]
+        return chunks, bus.subscriber_count("t")
+
+    chunks, subscribers = asyncio.run(run())
+    assert _frames(chunks) == [("snapshot", {"state": "cancelled"})]
+    assert subscribers == 0
+
+
+def test_quiet_stream_rereads_the_run_and_ends_on_its_stored_final_state(monkeypatch):
+    monkeypatch.setattr(run_events, "RELOAD_AFTER_KEEPALIVES", 2)
+    stored = iter([{"state": "running", "passed_count": 1}, {"state": "completed", "passed_count": 2}])
+
+    async def reload():
+        return next(stored)
+
+    async def run():
+        bus = RunEventBus()
+        queue = bus.subscribe("t")
+        chunks = [
+            chunk async for chunk in bus.stream("t", queue, {"state": "running"}, reload, keepalive=0.01)
+        ]
+        return chunks, bus.subscriber_count("t")
+
+    chunks, subscribers = asyncio.run(run())
+    assert _frames(chunks) == [
+        ("snapshot", {"state": "running"}),
+        (None, None),
+        ("progress", {"state": "running", "passed_count": 1}),
+        (None, None),
+        ("state", {"state": "completed", "passed_count": 2}),
+    ]
+    assert subscribers == 0
@@ -0,0 +1,153 @@
+# backend/tests/services/test_scheduler.py
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401
+from app.core.database import Base
+from app.models.evaluation_run import EvaluationRunRecord, RunState
+from app.models.project import Project
+from app.models.schedule import EvaluationSchedule, MissedRunPolicy
+from app.models.test_case import ApprovalStatus, TestCase, TestCaseType
+from app.models.test_suite import TestSuite
+from app.services import evaluation_runs
+from app.services.leases import acquire_lease
+from app.services.scheduler import (
+    as_utc,
+    dispatch_queued_runs,
+    fire_due_schedules,
+    jitter_offset,
+    next_fire_time,
+)
+
+NOW = datetime(2024, 5, 3, 2, 1, tzinfo=timezone.utc)
+
+
+class FakeCES:
+    def __init__(self):
+        self.started = []
+
+    async def run_evaluation(self, app_id, config):
+        self.started.append(config["evaluationIds"])
+        return {"name": f"operations/op{len(self.started)}"}
+
+    async def get_operation(self, operation_id):
+        await asyncio.Event().wait()
+
+
+def run(tmp_path, monkeypatch, scenario):
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'scheduler.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        ces = FakeCES()
+        monkeypatch.setattr(evaluation_runs, "get_ces_client", lambda: ces)
+        async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+            db.add(Project(id="p", name="P", gcp_project_id="g", ces_app_name="projects/g/locations/l/apps/app1"))
+            for k in range(4):
+                db.add(TestSuite(id=f"s{k}", project_id="p", name=f"S{k}", tags=[]))
+                if k < 3:
+                    db.add(TestCase(test_suite_id=f"s{k}", name="T", type=TestCaseType.GOLDEN,
+                                    status=ApprovalStatus.SUBMITTED, ces_evaluation_id=f"evaluations/e{k}"))
+            db.add_all([
+                EvaluationSchedule(id="nightly", project_id="p", display_name="Nightly",
+                                   cron_expression="0 2 * * *", jitter_seconds=0,
+                                   next_run_at=NOW - timedelta(minutes=1)),
+                EvaluationSchedule(id="late", project_id="p", display_name="Late",
+                                   cron_expression="0 0 * * *", jitter_seconds=0,
+                                   missed_run_policy=MissedRunPolicy.SKIP,
+                                   next_run_at=NOW - timedelta(hours=2)),
+            ])
+            await db.commit()
+            try:
+                return await scenario(db, ces)
+            finally:
+                await evaluation_runs.stop_polling()
+                await engine.dispose()
+    return asyncio.run(main())
+
+
+async def runs_by_state(db):
+    runs = (await db.scalars(select(EvaluationRunRecord).execution_options(populate_existing=True))).all()
+    states = {}
+    for r in runs:
+        states.setdefault(r.state, []).append(r)
+    return states
+
+
+def test_fire_queues_a_run_per_runnable_suite(tmp_path, monkeypatch):
+    async def scenario(db, ces):
+        fired = await fire_due_schedules(db, NOW)
+        again = await fire_due_schedules(db, NOW)
+        runs = (await db.scalars(select(EvaluationRunRecord))).all()
+        schedules = {s.id: s for s in (await db.scalars(
+            select(EvaluationSchedule).execution_options(populate_existing=True)
+        ))}
+        return fired, again, runs, schedules
+
+    fired, again, runs, schedules = run(tmp_path, monkeypatch, scenario)
+    assert (fired, again) == (1, 0)
+    assert sorted(r.test_suite_id for r in runs) == ["s0", "s1", "s2"]
+    assert {r.schedule_id for r in runs} == {"nightly"}
+    assert as_utc(schedules["nightly"].next_run_at) == datetime(2024, 5, 4, 2, 0, tzinfo=timezone.utc)
+    assert as_utc(schedules["nightly"].last_run_at) == NOW
+    # Missed beyond the grace period with SKIP: moved on without firing
+    assert as_utc(schedules["late"].next_run_at) == datetime(2024, 5, 4, 0, 0, tzinfo=timezone.utc)
+    assert schedules["late"].last_run_at is None
+
+
+def test_dispatch_respects_project_concurrency(tmp_path, monkeypatch):
+    async def scenario(db, ces):
+        await fire_due_schedules(db, NOW)
+        first = await dispatch_queued_runs(db, max_per_project=2)
+        second = await dispatch_queued_runs(db, max_per_project=2)
+        states = await runs_by_state(db)
+        running = states[RunState.RUNNING][0]
+        running.state = RunState.COMPLETED
+        await db.commit()
+        third = await dispatch_queued_runs(db, max_per_project=2)
+        return first, second, third, states, ces
+
+    first, second, third, states, ces = run(tmp_path, monkeypatch, scenario)
+    assert (first, second, third) == (2, 0, 1)
+    assert len(states[RunState.RUNNING]) == 2
+    assert len(states[RunState.PENDING]) == 1
+    assert all(r.ces_operation_id and r.started_at for r in states[RunState.RUNNING])
+    assert len(ces.started) == 3
+
+
+def test_lease_has_one_holder_until_it_expires(tmp_path, monkeypatch):
+    async def scenario(db, ces):
+        ttl = timedelta(minutes=1)
+        return [
+            await acquire_lease(db, "lease", "a", ttl),
+            await acquire_lease(db, "lease", "b", ttl),
+            await acquire_lease(db, "lease", "a", timedelta(minutes=-1)),
+            await acquire_lease(db, "lease", "b", ttl),
+            await acquire_lease(db, "lease", "a", ttl),
+        ]
+
+    assert run(tmp_path, monkeypatch, scenario) == [True, False, True, True, False]
+
+
+def test_jitter_is_stable_and_bounded():
+    offsets = {jitter_offset(f"schedule-{i}", 600) for i in range(50)}
+    assert all(timedelta(0) <= o <= timedelta(seconds=600) for o in offsets)
+    assert len(offsets) > 10
+    assert jitter_offset("schedule-1", 600) == jitter_offset("schedule-1", 600)
+    assert jitter_offset("schedule-1", 0) == timedelta(0)
+
+
+@pytest.mark.parametrize("jitter_seconds", [0, 90, 3600])
+def test_next_fire_time_is_after_and_keeps_offset(jitter_seconds):
+    schedule = EvaluationSchedule(id="s", cron_expression="*/30 * * * *", timezone="UTC",
+                                  jitter_seconds=jitter_seconds)
+    offset = jitter_offset("s", jitter_seconds)
+    fire = next_fire_time(schedule, NOW)
+    assert fire > NOW
+    assert (fire - offset).minute in (0, 30) and (fire - offset).second == 0
+    # Firing at the jittered time moves to the next occurrence, not the same one
+    assert next_fire_time(schedule, fire) == fire + timedelta(minutes=30)
@@ -0,0 +1,36 @@
+# backend/tests/services/test_sequential_sampling.py
+from app.services.sequential_sampling import UNCATEGORIZED, SequentialSampler
+
+
+def test_blocked_streak_settles_long_before_the_sample_ends():
+    sampler = SequentialSampler(precision=1.0, min_prompts=100)
+    prompts = 0
+    while not sampler.settled():
+        sampler.add("injection" if prompts % 2 else "jailbreak", False)
+        prompts += 1
+    # Roughly (1.96 / 0.02)^2 / 2 per category once the upper bound falls under 2%
+    assert 300 < prompts < 500
+    assert sampler.achieved_precision() <= 1.0
+
+
+def test_every_category_must_reach_the_precision():
+    sampler = SequentialSampler(precision=5.0, min_prompts=10)
+    for i in range(400):
+        sampler.add("common", i % 10 == 0)
+    sampler.add("rare", True)
+    assert not sampler.settled()
+    report = sampler.report()
+    assert report["overall"]["prompts"] == 401
+    assert report["categories"]["rare"]["half_width"] > 5.0
+    assert report["categories"]["common"]["successes"] == 40
+
+
+def test_min_prompts_and_uncategorized():
+    sampler = SequentialSampler(precision=50.0, min_prompts=5)
+    for _ in range(4):
+        sampler.add(None, False)
+    assert not sampler.settled()
+    sampler.add(None, False)
+    assert sampler.settled()
+    assert list(sampler.report()["categories"]) == [UNCATEGORIZED]
+    assert SequentialSampler(precision=1.0).achieved_precision() is None
@@ -0,0 +1,155 @@
+# backend/tests/services/test_sharding.py
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401
+from app.core.config import settings
+from app.core.database import Base
+from app.models.evaluation_run import EvaluationRunRecord, EvaluationRunShard, RunResultRecord, RunState
+from app.models.project import Project
+from app.models.test_suite import TestSuite
+from app.services import sharding
+from app.services.evaluation_runs import build_run_config
+
+
+def test_split_evaluation_ids_is_contiguous_and_balanced():
+    ids = [f"e{i}" for i in range(10)]
+    chunks = sharding.split_evaluation_ids(ids, 4)
+    assert [len(chunk) for chunk in chunks] == [3, 3, 2, 2]
+    assert sum(chunks, []) == ids
+    assert sharding.split_evaluation_ids(ids[:2], 5) == [["e0"], ["e1"]]
+
+
+class FakeCES:
+    """Passes even-numbered evaluations; operations for ``flaky`` ids fail once."""
+
+    def __init__(self, flaky=(), broken=()):
+        self.flaky = set(flaky)
+        self.broken = set(broken)
+        self.operations = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.submitted = 0
+
+    async def run_evaluation(self, app_id, run_config):
+        self.submitted += 1
+        name = f"op{self.submitted}"
+        self.operations[name] = run_config["evaluationIds"]
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        return {"name": f"operations/{name}"}
+
+    async def get_operation(self, operation_id):
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        ids = self.operations[operation_id]
+        if self.broken & set(ids) or self.flaky & set(ids):
+            self.flaky -= set(ids)
+            return {"done": True, "error": {"message": "backend unavailable"}}
+        return {"done": True, "result": {"evaluationRun": {"name": f"evaluationRuns/{operation_id}"}}}
+
+    async def get_evaluation_run(self, app_id, run_id):
+        return {}
+
+    async def get_evaluation_run_results(self, app_id, run_id, page_size=100, page_token=None):
+        return {"results": [
+            {"name": f"{run_id}/{e}", "evaluation": e, "passed": int(e[1:]) % 2 == 0}
+            for e in self.operations[run_id]
+        ]}
+
+
+async def run_sharded(monkeypatch, tmp_path, ces, evaluations=10, shard_count=5, drivers=1,
+                      claimed=()):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'shards.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    monkeypatch.setattr(sharding, "AsyncSessionLocal", sessions)
+    monkeypatch.setattr(sharding, "get_ces_client", lambda: ces)
+    monkeypatch.setattr(sharding, "RETRY_BACKOFF_SECONDS", 0)
+    monkeypatch.setattr(settings, "EVALUATION_SHARD_CONCURRENCY", 2)
+    monkeypatch.setattr(settings, "EVALUATION_SHARD_MAX_ATTEMPTS", 2)
+
+    ids = [f"e{i}" for i in range(evaluations)]
+    async with sessions() as db:
+        db.add(Project(id="p", name="P", gcp_project_id="g", ces_app_name="apps/app1"))
+        db.add(TestSuite(id="s", project_id="p", name="S", tags=[]))
+        db.add(EvaluationRunRecord(
+            id="run", test_suite_id="s", state=RunState.RUNNING, shard_count=shard_count,
+            total_count=len(ids), passed_count=0, failed_count=0, error_count=0,
+        ))
+        shards = sharding.build_shards(build_run_config(ids), shard_count)
+        for shard in shards:
+            shard.evaluation_run_id = "run"
+        # Shards claimed by a driver that never stored the CES operation
+        for index, age in claimed:
+            shards[index].state = RunState.RUNNING
+            shards[index].attempts = 1
+            shards[index].claimed_at = datetime.now(timezone.utc) - age
+        db.add_all(shards)
+        await db.commit()
+
+    await asyncio.gather(*(sharding.run_sharded("run", "app1") for _ in range(drivers)))
+
+    async with sessions() as db:
+        run = await db.get(EvaluationRunRecord, "run")
+        shards = (await db.scalars(
+            select(EvaluationRunShard).order_by(EvaluationRunShard.shard_index)
+        )).all()
+        results = await db.scalar(select(func.count()).select_from(RunResultRecord))
+    await engine.dispose()
+    return run, shards, results
+
+
+def test_shards_merge_into_parent_within_concurrency_cap(monkeypatch, tmp_path):
+    ces = FakeCES(flaky={"e4"})
+    run, shards, results = asyncio.run(run_sharded(monkeypatch, tmp_path, ces))
+
+    assert ces.max_in_flight == 2
+    assert [shard.attempts for shard in shards] == [1, 1, 2, 1, 1]
+    assert all(shard.state == RunState.COMPLETED for shard in shards)
+    assert run.state == RunState.COMPLETED
+    assert (run.total_count, run.passed_count, run.failed_count, run.error_count) == (10, 5, 5, 0)
+    assert run.pass_rate == 50
+    assert results == 10
+
+
+def test_exhausted_shard_counts_as_errors(monkeypatch, tmp_path):
+    ces = FakeCES(broken={"e0"})
+    run, shards, results = asyncio.run(run_sharded(monkeypatch, tmp_path, ces))
+
+    assert shards[0].state == RunState.ERROR
+    assert shards[0].attempts == 2
+    assert "backend unavailable" in shards[0].last_error
+    assert run.state == RunState.COMPLETED
+    assert (run.total_count, run.passed_count, run.failed_count, run.error_count) == (10, 4, 4, 2)
+    assert results == 8
+
+
+def test_concurrent_drivers_submit_each_shard_once(monkeypatch, tmp_path):
+    ces = FakeCES()
+    run, shards, results = asyncio.run(run_sharded(monkeypatch, tmp_path, ces, drivers=2))
+
+    assert ces.submitted == 5
+    assert [shard.attempts for shard in shards] == [1, 1, 1, 1, 1]
+    assert run.state == RunState.COMPLETED
+    assert results == 10
+
+
+def test_stale_claim_without_operation_is_claimed_again(monkeypatch, tmp_path):
+    ces = FakeCES()
+    run, shards, results = asyncio.run(run_sharded(
+        monkeypatch, tmp_path, ces,
+        claimed=[(0, sharding.STALE_CLAIM_AFTER * 2), (1, timedelta(seconds=1))],
+    ))
+
+    assert ces.submitted == 4
+    # The fresh claim is left to its driver
+    assert shards[1].state == RunState.RUNNING and shards[1].attempts == 1
+    assert all(shard.state == RunState.COMPLETED for shard in shards[:1] + shards[2:])
+    assert shards[0].attempts == 2
+    assert run.state == RunState.RUNNING
+    assert results == 8
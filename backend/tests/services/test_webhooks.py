@@ -0,0 +1,205 @@
+# backend/tests/services/test_webhooks.py
+import asyncio
+import hashlib
+import hmac
+import json
+from datetime import datetime, timedelta, timezone
+
+import httpcore
+import httpx
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401
+from app.core.config import settings
+from app.core.database import Base
+from app.core.encryption import encrypt_token
+from app.models.evaluation_run import EvaluationRunRecord, RunResultRecord, RunState
+from app.models.project import Project
+from app.models.test_case import TestCase, TestCaseType
+from app.models.test_suite import TestSuite
+from app.models.webhook import WebhookDeadLetter, WebhookDelivery, WebhookEvent, WebhookSubscription
+from app.services import webhook_dispatcher
+from app.services.rollups import roll_up_evaluation_run
+from app.services.webhooks import milestone, notify_evaluation_run, sign
+
+NOW = datetime(2026, 10, 1, 12, tzinfo=timezone.utc)
+ALL_EVENTS = [event.value for event in WebhookEvent]
+
+
+async def _database(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'webhooks.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    async with sessions() as db:
+        db.add_all([
+            Project(id="p", name="P", gcp_project_id="g", ces_app_name="apps/a"),
+            Project(id="q", name="Q", gcp_project_id="g", ces_app_name="apps/b"),
+            TestSuite(id="s", project_id="p", name="S", tags=[]),
+        ])
+        await db.commit()
+    return engine, sessions
+
+
+def _subscription(id, project_id="p", events=ALL_EVENTS, **fields):
+    return WebhookSubscription(
+        id=id, project_id=project_id, url=f"https://{id}.test/hook", events=events,
+        secret_encrypted=encrypt_token(f"secret-{id}"), **{"max_concurrency": 4, "enabled": True, **fields},
+    )
+
+
+def test_signature_and_milestones():
+    body = b'{"event":"run.completed"}'
+    expected = hmac.new(b"k", b"1700000000." + body, hashlib.sha256).hexdigest()
+    assert sign("k", "1700000000", body) == f"sha256={expected}"
+    assert milestone(0, 20) is None
+    assert milestone(20, 60) == 50
+    assert milestone(50, 50) is None
+    assert milestone(0, 100) == 75
+
+
+def test_retry_policy(monkeypatch):
+    monkeypatch.setattr(settings, "WEBHOOK_RETRY_BASE_SECONDS", 10)
+    monkeypatch.setattr(settings, "WEBHOOK_RETRY_MAX_SECONDS", 60)
+    assert timedelta(seconds=8) <= webhook_dispatcher.retry_delay(1) <= timedelta(seconds=12)
+    assert timedelta(seconds=32) <= webhook_dispatcher.retry_delay(3) <= timedelta(seconds=48)
+    assert webhook_dispatcher.retry_delay(10) <= timedelta(seconds=72)
+    assert webhook_dispatcher.retryable(None)
+    assert webhook_dispatcher.retryable(503)
+    assert webhook_dispatcher.retryable(429)
+    assert not webhook_dispatcher.retryable(404)
+
+
+def test_events_are_queued_for_interested_subscriptions(tmp_path):
+    async def run():
+        engine, sessions = await _database(tmp_path)
+        async with sessions() as db:
+            db.add_all([
+                _subscription("all"),
+                _subscription("done", events=["run.completed"]),
+                _subscription("off", enabled=False),
+                _subscription("other", project_id="q"),
+            ])
+            db.add_all(
+                TestCase(id=name, test_suite_id="s", name=name.title(), type=TestCaseType.SCENARIO,
+                         ces_evaluation_id=f"apps/a/evaluations/{name}")
+                for name in ("steady", "breaks")
+            )
+            for i, breaks in enumerate((True, False)):
+                run = EvaluationRunRecord(
+                    id=f"r{i}", test_suite_id="s", state=RunState.COMPLETED,
+                    completed_at=NOW + timedelta(days=i),
+                )
+                db.add(run)
+                db.add_all([
+                    RunResultRecord(evaluation_run_id=run.id, ces_evaluation_id="apps/a/evaluations/steady",
+                                    passed=True),
+                    RunResultRecord(evaluation_run_id=run.id, ces_evaluation_id="apps/a/evaluations/breaks",
+                                    passed=breaks),
+                ])
+                await db.flush()
+                await roll_up_evaluation_run(db, run)
+                await notify_evaluation_run(db, run, WebhookEvent.RUN_COMPLETED)
+                await db.commit()
+            deliveries = (await db.scalars(select(WebhookDelivery))).all()
+        await engine.dispose()
+        return deliveries
+
+    deliveries = asyncio.run(run())
+    sent = sorted((d.subscription_id, d.event, d.payload["run"]["id"]) for d in deliveries)
+    assert sent == [
+        ("all", "run.completed", "r0"),
+        ("all", "run.completed", "r1"),
+        ("all", "run.regression_detected", "r1"),
+        ("done", "run.completed", "r0"),
+        ("done", "run.completed", "r1"),
+    ]
+    regression = next(d for d in deliveries if d.event == "run.regression_detected")
+    assert regression.payload["project_id"] == "p"
+    assert regression.payload["new_failure_count"] == 1
+    assert regression.payload["new_failures"] == [{"test_case_id": "breaks", "test_case_name": "Breaks"}]
+
+
+def test_dispatch_round_signs_retries_and_dead_letters(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "WEBHOOK_MAX_ATTEMPTS", 3)
+    requests = []
+
+    def endpoint(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        host = request.url.host.split(".")[0]
+        signature = sign(f"secret-{host}", request.headers["X-Webhook-Timestamp"], request.content)
+        assert request.headers["X-Webhook-Signature"] == signature
+        assert json.loads(request.content)["id"] == request.headers["X-Webhook-Id"]
+        return httpx.Response({"ok": 204, "down": 503, "gone": 410}[host])
+
+    async def run():
+        engine, sessions = await _database(tmp_path)
+        async with sessions() as db:
+            db.add_all([
+                _subscription("ok", max_concurrency=2),
+                _subscription("down"),
+                _subscription("gone"),
+                _subscription("paused", enabled=False),
+            ])
+            due = [("ok", 0), ("ok", 0), ("ok", 0), ("down", 0), ("down", 2), ("gone", 0), ("paused", 0)]
+            db.add_all(
+                WebhookDelivery(id=f"d{i}", subscription_id=subscription_id, event="run.completed",
+                                payload={"project_id": "p", "run": {"id": "r"}}, attempts=attempts,
+                                next_attempt_at=NOW - timedelta(minutes=len(due) - i), created_at=NOW)
+                for i, (subscription_id, attempts) in enumerate(due)
+            )
+            await db.commit()
+            async with httpx.AsyncClient(transport=httpx.MockTransport(endpoint)) as client:
+                sent = await webhook_dispatcher.dispatch_round(db, client, NOW)
+            queued = {d.id: d for d in await db.scalars(select(WebhookDelivery))}
+            dead = {d.id: d for d in await db.scalars(select(WebhookDeadLetter))}
+        await engine.dispose()
+        return sent, queued, dead
+
+    sent, queued, dead = asyncio.run(run())
+    # Two of the three "ok" deliveries (its concurrency limit), nothing for the paused endpoint
+    assert sent == 5
+    assert sorted(r.url.host for r in requests).count("ok.test") == 2
+    assert sorted(queued) == ["d2", "d3", "d6"]
+    retried = queued["d3"]
+    assert retried.attempts == 1 and retried.last_status_code == 503
+    assert retried.next_attempt_at.replace(tzinfo=timezone.utc) > NOW
+    # Out of attempts, and rejected outright
+    assert sorted(dead) == ["d4", "d5"]
+    assert (dead["d4"].attempts, dead["d4"].last_status_code) == (3, 503)
+    assert (dead["d5"].attempts, dead["d5"].last_status_code) == (1, 410)
+    assert dead["d5"].payload == {"project_id": "p", "run": {"id": "r"}}
+
+
+def test_deliveries_connect_only_to_the_public_address_they_checked(monkeypatch):
+    answers = {"rebind.test": ["93.184.216.34", "127.0.0.1"], "mapped.test": ["::ffff:10.0.0.1"],
+               "ok.test": ["93.184.216.34"]}
+    connected = []
+
+    async def resolve(host, port):
+        return answers[host]
+
+    class Backend:
+        async def connect_tcp(self, host, port, *args):
+            connected.append(host)
+            raise httpcore.ConnectError("no network in tests")
+
+    monkeypatch.setattr(webhook_dispatcher, "resolve", resolve)
+    delivery = WebhookDelivery(id="d", event="run.completed", payload={},
+                               created_at=datetime.now(timezone.utc))
+
+    async def run():
+        transport = webhook_dispatcher.PublicAddressTransport()
+        transport._pool._network_backend._backend = Backend()
+        async with httpx.AsyncClient(transport=transport) as client:
+            return [
+                await webhook_dispatcher.send(client, f"https://{host}/hook", "secret", delivery)
+                for host in answers
+            ]
+
+    (rebind, mapped, ok) = asyncio.run(run())
+    assert rebind[0] is None and "private address" in rebind[1]
+    assert "private address" in mapped[1]
+    assert ok == (None, "ConnectError: no network in tests")
+    assert connected == ["93.184.216.34"]
@@ -0,0 +1,50 @@
+# backend/tests/utils/test_cron.py
+from datetime import datetime, timezone
+
+import pytest
+
+from app.utils.cron import CronSchedule, InvalidCronExpression
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("expression, after, expected", [
+    ("0 8 * * 1-5", utc(2024, 5, 3, 8, 0), utc(2024, 5, 6, 8, 0)),  # Friday -> Monday
+    ("*/15 * * * *", utc(2024, 5, 3, 8, 7), utc(2024, 5, 3, 8, 15)),
+    ("0 */6 * * *", utc(2024, 5, 3, 23, 0), utc(2024, 5, 4, 0, 0)),
+    ("0 0 1 * *", utc(2024, 12, 15), utc(2025, 1, 1)),
+    ("30 2 29 feb *", utc(2024, 3, 1), utc(2028, 2, 29, 2, 30)),
+    ("@daily", utc(2024, 5, 3, 0, 0, 30), utc(2024, 5, 4)),
+    ("0 9 * * MON", utc(2024, 5, 6, 9, 0), utc(2024, 5, 13, 9, 0)),
+    ("0 0 * * 7", utc(2024, 5, 6), utc(2024, 5, 12)),  # 7 is Sunday
+])
+def test_next_after(expression, after, expected):
+    assert CronSchedule(expression).next_after(after) == expected
+
+
+def test_restricted_day_of_month_and_weekday_match_either():
+    # The 13th or any Friday
+    schedule = CronSchedule("0 0 13 * 5")
+    assert schedule.next_after(utc(2024, 5, 1)) == utc(2024, 5, 3)
+    assert schedule.next_after(utc(2024, 5, 10)) == utc(2024, 5, 13)
+
+
+def test_time_zone():
+    schedule = CronSchedule("0 2 * * *", "America/New_York")
+    assert schedule.next_after(utc(2024, 1, 10, 12)) == utc(2024, 1, 11, 7)
+    assert schedule.next_after(utc(2024, 7, 10, 12)) == utc(2024, 7, 11, 6)
+
+
+@pytest.mark.parametrize("expression", [
+    "* * * *", "61 * * * *", "*/0 * * * *", "0 0 31 2 *", "a b c d e", "5-1 * * * *",
+])
+def test_invalid_expressions(expression):
+    with pytest.raises(InvalidCronExpression):
+        CronSchedule(expression).next_after(utc(2024, 1, 1))
+
+
+def test_unknown_time_zone():
+    with pytest.raises(InvalidCronExpression):
+        CronSchedule("0 0 * * *", "Mars/Olympus")
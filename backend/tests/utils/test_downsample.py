@@ -0,0 +1,29 @@
+# backend/tests/utils/test_downsample.py
+import math
+
+from app.utils.downsample import lttb
+
+
+def series(n):
+    return [(i, math.sin(i / 10)) for i in range(n)]
+
+
+def test_short_series_is_returned_unchanged():
+    points = series(10)
+    assert lttb(points, 20, x=lambda p: p[0], y=lambda p: p[1]) == points
+    assert lttb(points, 2, x=lambda p: p[0], y=lambda p: p[1]) == points
+
+
+def test_keeps_endpoints_and_threshold():
+    points = series(1000)
+    sampled = lttb(points, 100, x=lambda p: p[0], y=lambda p: p[1])
+    assert len(sampled) == 100
+    assert sampled[0] == points[0] and sampled[-1] == points[-1]
+    assert [p[0] for p in sampled] == sorted({p[0] for p in sampled})
+
+
+def test_keeps_a_single_spike():
+    points = [(i, 0.0) for i in range(1000)]
+    points[437] = (437, 50.0)
+    sampled = lttb(points, 30, x=lambda p: p[0], y=lambda p: p[1])
+    assert (437, 50.0) in sampled
@@ -0,0 +1,36 @@
+# backend/tests/utils/test_pagination.py
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import pytest
+
+from app.utils.pagination import InvalidCursor, decode_cursor, encode_cursor, split_page
+
+
+@dataclass
+class Row:
+    id: str
+    created_at: datetime
+
+
+def test_cursor_round_trip_keeps_timezone_and_microseconds():
+    created_at = datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    assert decode_cursor(encode_cursor(created_at, "abc")) == (created_at, "abc")
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "", "W10"])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+def test_split_page_returns_cursor_of_last_row_only_when_more_follow():
+    rows = [Row(str(i), datetime(2024, 1, 1, 0, 0, i)) for i in range(3)]
+
+    page, next_cursor = split_page(rows, 2)
+    assert [r.id for r in page] == ["0", "1"]
+    assert decode_cursor(next_cursor) == (rows[1].created_at, "1")
+
+    page, next_cursor = split_page(rows, 3)
+    assert len(page) == 3
+    assert next_cursor is None
@@ -0,0 +1,58 @@
+# backend/tests/utils/test_projection.py
+import pytest
+from sqlalchemy import select
+
+from app.models.evaluation_run import RunResultRecord
+from app.schemas.schemas import RunResultResponse, RunResultSummary
+from app.utils.projection import UnknownField, parse_fields, project, summary_columns
+
+OPTIONAL = {
+    "diagnostics": RunResultRecord.diagnostics,
+    "conversation_log": RunResultRecord.conversation_log,
+}
+
+
+@pytest.mark.parametrize("fields", [None, "", " , "])
+def test_no_fields_requested(fields):
+    assert parse_fields(fields, OPTIONAL) == set()
+
+
+def test_parse_fields_strips_whitespace():
+    assert parse_fields(" diagnostics ,conversation_log", OPTIONAL) == {
+        "diagnostics", "conversation_log"
+    }
+
+
+def test_unknown_field_is_rejected_with_the_available_ones():
+    with pytest.raises(UnknownField, match="Unknown fields: secret. Available: conversation_log, diagnostics"):
+        parse_fields("diagnostics,secret", OPTIONAL)
+
+
+def test_summary_projection_leaves_out_large_columns():
+    columns = project(summary_columns(RunResultRecord, RunResultSummary), OPTIONAL, None)
+    selected = {c.name for c in select(*columns).selected_columns}
+    assert selected == set(RunResultSummary.model_fields)
+    assert not selected & set(OPTIONAL)
+
+
+def test_requested_columns_are_added_under_their_field_names():
+    columns = project(summary_columns(RunResultRecord, RunResultSummary), OPTIONAL, "diagnostics")
+    selected = {c.name for c in select(*columns).selected_columns}
+    assert selected == set(RunResultSummary.model_fields) | {"diagnostics"}
+
+
+def test_fields_not_selected_are_unset_in_the_response():
+    class Row:
+        id = "00000000-0000-0000-0000-000000000001"
+        evaluation_run_id = "00000000-0000-0000-0000-000000000002"
+        ces_result_id = None
+        test_case_name = "t"
+        passed = True
+        score = 1.0
+        failure_reason = None
+        created_at = "2024-01-01T00:00:00Z"
+        diagnostics = {"x": 1}
+
+    dumped = RunResultResponse.model_validate(Row()).model_dump(exclude_unset=True)
+    assert dumped["diagnostics"] == {"x": 1}
+    assert "conversation_log" not in dumped
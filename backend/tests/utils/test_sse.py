@@ -0,0 +1,40 @@
+# backend/tests/utils/test_sse.py
+import asyncio
+import json
+from datetime import datetime, timezone
+from uuid import UUID
+
+from app.utils.sse import sse_event, sse_response
+
+
+def test_event_is_framed_with_a_json_payload():
+    frame = sse_event("result", {"id": UUID(int=1), "at": datetime(2026, 1, 1, tzinfo=timezone.utc)})
+    assert frame.endswith("\n\n")
+    lines = frame.rstrip("\n").split("\n")
+    assert lines[0] == "event: result"
+    assert lines[1].startswith("data: ")
+    assert json.loads(lines[1][len("data: "):]) == {
+        "id": "00000000-0000-0000-0000-000000000001",
+        "at": "2026-01-01T00:00:00+00:00",
+    }
+
+
+def test_multiline_text_stays_on_one_data_line():
+    frame = sse_event("token", {"text": "line one\nline two"})
+    assert frame.count("\n") == 3
+    assert json.loads(frame.split("data: ", 1)[1])["text"] == "line one\nline two"
+
+
+def test_response_is_an_unbuffered_event_stream():
+    async def events():
+        yield sse_event("stage", {"stage": "generating"})
+
+    response = sse_response(events())
+    assert response.media_type == "text/event-stream"
+    assert response.headers["cache-control"] == "no-cache"
+    assert response.headers["x-accel-buffering"] == "no"
+
+    async def body():
+        return [chunk async for chunk in response.body_iterator]
+
+    assert asyncio.run(body()) == ['event: stage\ndata: {"stage": "generating"}\n\n']
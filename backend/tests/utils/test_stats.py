@@ -0,0 +1,28 @@
+# backend/tests/utils/test_stats.py
+import pytest
+
+from app.utils.stats import interval_settled, wilson_interval, z_score
+
+
+def test_z_score():
+    assert z_score(0.95) == pytest.approx(1.96, abs=1e-3)
+
+
+def test_wilson_interval_known_values():
+    low, high = wilson_interval(10, 10)
+    assert low == pytest.approx(0.7225, abs=1e-4)
+    assert high == 1.0
+    low, high = wilson_interval(5, 10)
+    assert (low, high) == (pytest.approx(0.2366, abs=1e-4), pytest.approx(0.7634, abs=1e-4))
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+
+
+def test_interval_settled():
+    # 10/10 is not yet clearly above 80%, 20/20 is
+    assert not interval_settled(*wilson_interval(10, 10), target_width=0.1, threshold=0.8)
+    assert interval_settled(*wilson_interval(20, 20), target_width=0.1, threshold=0.8)
+    # Always failing settles on the first round
+    assert interval_settled(*wilson_interval(0, 5), target_width=0.1, threshold=0.8)
+    # Coin flips only settle on width
+    assert not interval_settled(*wilson_interval(50, 100), target_width=0.1, threshold=0.5)
+    assert interval_settled(*wilson_interval(500, 1000), target_width=0.1, threshold=0.5)
@@ -3,6 +3,7 @@ import { useNavigate } from 'react-router-dom'
 import { useQuery } from '@tanstack/react-query'
 import { Loader2, CheckCircle, XCircle, Clock, ArrowRight } from 'lucide-react'
 import { evaluationsApi } from '../services/api'
+import { useRunEvents } from '../hooks/useRunEvents'
 
 interface EvaluationProgressProps {
     runId: string
@@ -16,13 +17,9 @@ export default function EvaluationProgress({ runId, onDismiss }: EvaluationProgr
     const { data: run } = useQuery({
         queryKey: ['evaluation-run-poll', runId],
         queryFn: () => evaluationsApi.getRun(runId),
-        refetchInterval: (query) => {
-            const state = query.state.data?.state
-            if (state === 'completed' || state === 'error' || state === 'cancelled') return false
-            return 3000
-        },
         enabled: !!runId,
     })
+    useRunEvents(runId ? `/evaluations/runs/${runId}/events` : undefined, ['evaluation-run-poll', runId])
 
     useEffect(() => {
         const timer = setInterval(() => setElapsed(e => e + 1), 1000)
@@ -22,7 +22,11 @@ export default function SecurityTestModal({ projectId, onClose, onSuccess }: Sec
     batch_size: 10,
     timeout_per_prompt: 30,
     shuffle: true,
+    prioritize: false,
+    incremental: false,
   })
+  // Stop early at this attack-success-rate precision (± percentage points); blank runs every prompt
+  const [precision, setPrecision] = useState('')
 
   const createMutation = useMutation({
     mutationFn: () =>
@@ -31,7 +35,10 @@ export default function SecurityTestModal({ projectId, onClose, onSuccess }: Sec
         dataset_id: selectedDataset!,
         category: selectedCategory!,
         name: name || undefined,
-        config,
+        config: {
+          ...config,
+          sequential: parseFloat(precision) > 0 ? { precision: parseFloat(precision) } : undefined,
+        },
       }),
     onSuccess: (data) => {
       queryClient.invalidateQueries({ queryKey: ['security-runs'] })
@@ -153,6 +160,52 @@ export default function SecurityTestModal({ projectId, onClose, onSuccess }: Sec
                     <option value="false">No</option>
                   </select>
                 </div>
+                <div>
+                  <label className="block text-xs font-medium text-gray-600 mb-1">
+                    Stop at ± (%)
+                  </label>
+                  <input
+                    type="number"
+                    value={precision}
+                    onChange={(e) => setPrecision(e.target.value)}
+                    min={0.1}
+                    max={50}
+                    step={0.1}
+                    placeholder="Off"
+                    disabled={config.prioritize}
+                    className="input w-full text-sm"
+                  />
+                  <p className="text-xs text-gray-500 mt-1">
+                    {config.prioritize ? 'Not with riskiest first' : 'ASR precision'}
+                  </p>
+                </div>
+                <div>
+                  <label className="block text-xs font-medium text-gray-600 mb-1">
+                    Prompt Order
+                  </label>
+                  <select
+                    value={config.prioritize ? 'history' : 'dataset'}
+                    onChange={(e) => setConfig({ ...config, prioritize: e.target.value === 'history' })}
+                    className="input w-full text-sm"
+                  >
+                    <option value="dataset">Dataset</option>
+                    {/* Early stopping needs a random sample */}
+                    <option value="history" disabled={parseFloat(precision) > 0}>Riskiest first</option>
+                  </select>
+                </div>
+                <div>
+                  <label className="block text-xs font-medium text-gray-600 mb-1">
+                    Prompts
+                  </label>
+                  <select
+                    value={config.incremental ? 'untested' : 'all'}
+                    onChange={(e) => setConfig({ ...config, incremental: e.target.value === 'untested' })}
+                    className="input w-full text-sm"
+                  >
+                    <option value="all">All sampled</option>
+                    <option value="untested">Untested on this version</option>
+                  </select>
+                </div>
               </div>
             )}
           </div>
@@ -0,0 +1,82 @@
+import { useEffect, useRef } from 'react'
+import { QueryKey, useQueryClient } from '@tanstack/react-query'
+
+const FINAL_STATES = ['completed', 'error', 'cancelled']
+// Wait before reconnecting a stream that dropped while the run was still active
+const RETRY_MS = 5000
+
+export type RunEventHandler = (event: string, data: any) => void
+
+async function readEvents(response: Response, onEvent: RunEventHandler) {
+    const reader = response.body!.pipeThrough(new TextDecoderStream()).getReader()
+    let buffer = ''
+    for (;;) {
+        const { value, done } = await reader.read()
+        if (done) return
+        buffer += value
+        let end
+        while ((end = buffer.indexOf('\n\n')) >= 0) {
+            const frame = buffer.slice(0, end)
+            buffer = buffer.slice(end + 2)
+            let event = 'message'
+            const data: string[] = []
+            for (const line of frame.split('\n')) {
+                // Lines starting with ':' are keep-alive comments
+                if (line.startsWith('event:')) event = line.slice(6).trim()
+                else if (line.startsWith('data:')) data.push(line.slice(5).trim())
+            }
+            if (data.length) onEvent(event, JSON.parse(data.join('\n')))
+        }
+    }
+}
+
+/**
+ * Keeps a run's cached query data live from its `/events` stream instead of polling.
+ *
+ * The `snapshot`, `progress` and `state` events are merged into the data under
+ * `queryKey`; every event is also passed to `onEvent`. The stream is read with
+ * fetch because EventSource cannot send the Authorization header.
+ */
+export function useRunEvents(path: string | undefined, queryKey: QueryKey, onEvent?: RunEventHandler) {
+    const queryClient = useQueryClient()
+    const onEventRef = useRef(onEvent)
+    onEventRef.current = onEvent
+    const key = JSON.stringify(queryKey)
+
+    useEffect(() => {
+        if (!path) return
+        const controller = new AbortController()
+        let finished = false
+
+        const handle: RunEventHandler = (event, data) => {
+            if (event === 'snapshot' || event === 'progress' || event === 'state') {
+                queryClient.setQueryData(queryKey, (old: any) => ({ ...old, ...data }))
+            }
+            if ((event === 'snapshot' || event === 'state') && FINAL_STATES.includes(data.state)) {
+                finished = true
+            }
+            onEventRef.current?.(event, data)
+        }
+
+        const connect = async () => {
+            while (!finished && !controller.signal.aborted) {
+                try {
+                    const token = localStorage.getItem('auth_token')
+                    const response = await fetch(`/api${path}`, {
+                        headers: token ? { Authorization: `Bearer ${token}` } : {},
+                        signal: controller.signal,
+                    })
+                    if (!response.ok) return
+                    await readEvents(response, handle)
+                } catch {
+                    if (controller.signal.aborted) return
+                }
+                if (!finished) await new Promise((resolve) => setTimeout(resolve, RETRY_MS))
+            }
+        }
+
+        connect()
+        return () => controller.abort()
+        // eslint-disable-next-line react-hooks/exhaustive-deps
+    }, [path, key, queryClient])
+}
@@ -5,7 +5,7 @@ import {
   PieChart, Pie, Cell, ResponsiveContainer, LineChart, Line,
   XAxis, YAxis, Tooltip, CartesianGrid
 } from 'recharts'
-import { dashboardApi, evaluationsApi } from '../services/api'
+import { dashboardApi, evaluationsApi, trendsApi } from '../services/api'
 import ActivityFeed, { type ActivityItem } from '../components/ActivityFeed'
 
 const COLORS = ['#10B981', '#EF4444', '#F59E0B']
@@ -18,6 +18,11 @@ export default function Dashboard() {
     queryFn: () => dashboardApi.summary(),
   })
 
+  const { data: passRateTrend } = useQuery({
+    queryKey: ['pass-rate-trend'],
+    queryFn: () => trendsApi.evaluations({ days: 90, points: 60 }),
+  })
+
   const { data: recentRuns } = useQuery({
     queryKey: ['recent-runs'],
     queryFn: () => evaluationsApi.listRuns({ limit: 5 }),
@@ -151,9 +156,9 @@ export default function Dashboard() {
           <h3 className="text-lg font-semibold mb-4">Pass Rate Trend</h3>
           <div className="h-64">
             <ResponsiveContainer width="100%" height="100%">
-              <LineChart data={summary?.pass_rate_trend || []}>
+              <LineChart data={passRateTrend || []}>
                 <CartesianGrid strokeDasharray="3 3" stroke="#E5E7EB" />
-                <XAxis dataKey="date" tick={{ fontSize: 12 }} />
+                <XAxis dataKey="day" tick={{ fontSize: 12 }} />
                 <YAxis tick={{ fontSize: 12 }} domain={[0, 100]} />
                 <Tooltip
                   contentStyle={{ borderRadius: '8px', fontSize: '12px' }}
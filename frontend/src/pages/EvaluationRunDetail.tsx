@@ -1,6 +1,6 @@
 import { useState } from 'react'
 import { useParams, useNavigate } from 'react-router-dom'
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
+import { useQuery, useInfiniteQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import {
     ArrowLeft, CheckCircle, XCircle, AlertCircle, Download,
     ChevronDown, ChevronUp, Brain, Loader2, BarChart3
@@ -21,11 +21,20 @@ export default function EvaluationRunDetail() {
         enabled: !!runId,
     })
 
-    const { data: results, isLoading: resultsLoading } = useQuery({
+    const {
+        data: resultPages,
+        isLoading: resultsLoading,
+        hasNextPage,
+        fetchNextPage,
+        isFetchingNextPage,
+    } = useInfiniteQuery({
         queryKey: ['evaluation-run-results', runId],
-        queryFn: () => evaluationsApi.getRunResults(runId!),
+        queryFn: ({ pageParam }) => evaluationsApi.getRunResults(runId!, pageParam),
+        initialPageParam: undefined as string | undefined,
+        getNextPageParam: (lastPage) => lastPage.nextCursor,
         enabled: !!runId,
     })
+    const results = resultPages?.pages.flatMap((page) => page.results)
 
     const analyzeMutation = useMutation({
         mutationFn: (question?: string) => evaluationsApi.analyze(runId!, question),
@@ -201,22 +210,7 @@ export default function EvaluationRunDetail() {
                                                 <p className="text-sm text-red-800 bg-red-50 p-2 rounded">{result.failure_reason}</p>
                                             </div>
                                         )}
-                                        {result.diagnostics && (
-                                            <div>
-                                                <p className="text-xs font-medium text-gray-600 mb-1">Diagnostics</p>
-                                                <pre className="text-xs bg-gray-900 text-green-400 p-2 rounded overflow-x-auto max-h-40 overflow-y-auto">
-                                                    {JSON.stringify(result.diagnostics, null, 2)}
-                                                </pre>
-                                            </div>
-                                        )}
-                                        {result.conversation_log && (
-                                            <div>
-                                                <p className="text-xs font-medium text-gray-600 mb-1">Conversation Log</p>
-                                                <pre className="text-xs bg-gray-900 text-blue-400 p-2 rounded overflow-x-auto max-h-40 overflow-y-auto">
-                                                    {JSON.stringify(result.conversation_log, null, 2)}
-                                                </pre>
-                                            </div>
-                                        )}
+                                        <RunResultDetails runId={runId!} resultId={result.id} />
                                     </div>
                                 )}
                             </div>
@@ -224,9 +218,51 @@ export default function EvaluationRunDetail() {
                         {(!results || results.length === 0) && (
                             <p className="text-center text-gray-500 py-8">No individual results available</p>
                         )}
+                        {hasNextPage && (
+                            <button
+                                onClick={() => fetchNextPage()}
+                                disabled={isFetchingNextPage}
+                                className="btn btn-secondary w-full"
+                            >
+                                {isFetchingNextPage ? 'Loading...' : 'Load more results'}
+                            </button>
+                        )}
                     </div>
                 )}
             </div>
         </div>
     )
 }
+
+function RunResultDetails({ runId, resultId }: { runId: string; resultId: string }) {
+    // The results list omits diagnostics and conversation logs; load them on expand
+    const { data: detail, isLoading } = useQuery({
+        queryKey: ['evaluation-run-result', runId, resultId],
+        queryFn: () => evaluationsApi.getRunResult(runId, resultId),
+    })
+
+    if (isLoading) {
+        return <Loader2 className="h-4 w-4 animate-spin text-gray-400" />
+    }
+
+    return (
+        <>
+            {detail?.diagnostics && (
+                <div>
+                    <p className="text-xs font-medium text-gray-600 mb-1">Diagnostics</p>
+                    <pre className="text-xs bg-gray-900 text-green-400 p-2 rounded overflow-x-auto max-h-40 overflow-y-auto">
+                        {JSON.stringify(detail.diagnostics, null, 2)}
+                    </pre>
+                </div>
+            )}
+            {detail?.conversation_log && (
+                <div>
+                    <p className="text-xs font-medium text-gray-600 mb-1">Conversation Log</p>
+                    <pre className="text-xs bg-gray-900 text-blue-400 p-2 rounded overflow-x-auto max-h-40 overflow-y-auto">
+                        {JSON.stringify(detail.conversation_log, null, 2)}
+                    </pre>
+                </div>
+            )}
+        </>
+    )
+}
@@ -8,13 +8,15 @@ export default function ScheduledRuns() {
     const { activeProject } = useActiveProject()
     const queryClient = useQueryClient()
     const [showModal, setShowModal] = useState(false)
-    const [formData, setFormData] = useState({
-        displayName: '',
-        cronExpression: '0 8 * * 1-5',
+    const emptyForm = {
+        display_name: '',
+        cron_expression: '0 8 * * 1-5',
         description: '',
-        runCount: 1,
-        generateLatencyReport: true,
-    })
+        run_count: 1,
+        generate_latency_report: true,
+        missed_run_policy: 'run_once',
+    }
+    const [formData, setFormData] = useState(emptyForm)
 
     const { data: schedules, isLoading } = useQuery({
         queryKey: ['scheduled-runs', activeProject?.id],
@@ -28,7 +30,7 @@ export default function ScheduledRuns() {
         onSuccess: () => {
             queryClient.invalidateQueries({ queryKey: ['scheduled-runs'] })
             setShowModal(false)
-            setFormData({ displayName: '', cronExpression: '0 8 * * 1-5', description: '', runCount: 1, generateLatencyReport: true })
+            setFormData(emptyForm)
         },
     })
 
@@ -79,19 +81,22 @@ export default function ScheduledRuns() {
                 )}
 
                 {schedules?.map((schedule: any) => (
-                    <div key={schedule.id || schedule.name} className="card flex items-center justify-between">
+                    <div key={schedule.id} className="card flex items-center justify-between">
                         <div className="flex items-center gap-4">
                             <div className="p-2 bg-blue-50 rounded-lg">
                                 <Calendar className="h-5 w-5 text-blue-600" />
                             </div>
                             <div>
-                                <h3 className="font-semibold text-gray-900">{schedule.displayName || schedule.name}</h3>
+                                <h3 className="font-semibold text-gray-900">{schedule.display_name}</h3>
                                 <div className="flex items-center gap-3 text-sm text-gray-500 mt-0.5">
                                     <span className="font-mono bg-gray-100 px-2 py-0.5 rounded text-xs">
-                                        {schedule.cronExpression || schedule.schedule}
+                                        {schedule.cron_expression}
                                     </span>
-                                    {schedule.lastRunTime && (
-                                        <span>Last: {new Date(schedule.lastRunTime).toLocaleString()}</span>
+                                    {schedule.enabled && schedule.next_run_at && (
+                                        <span>Next: {new Date(schedule.next_run_at).toLocaleString()}</span>
+                                    )}
+                                    {schedule.last_run_at && (
+                                        <span>Last: {new Date(schedule.last_run_at).toLocaleString()}</span>
                                     )}
                                 </div>
                                 {schedule.description && (
@@ -101,7 +106,7 @@ export default function ScheduledRuns() {
                         </div>
                         <div className="flex gap-2">
                             <button
-                                onClick={() => deleteMutation.mutate(schedule.id || schedule.name)}
+                                onClick={() => deleteMutation.mutate(schedule.id)}
                                 disabled={deleteMutation.isPending}
                                 className="p-2 text-red-500 hover:bg-red-50 rounded-lg"
                                 title="Delete schedule"
@@ -136,8 +141,8 @@ export default function ScheduledRuns() {
                                 <label className="block text-sm font-medium text-gray-700 mb-1">Name</label>
                                 <input
                                     type="text"
-                                    value={formData.displayName}
-                                    onChange={(e) => setFormData({ ...formData, displayName: e.target.value })}
+                                    value={formData.display_name}
+                                    onChange={(e) => setFormData({ ...formData, display_name: e.target.value })}
                                     placeholder="e.g., Nightly Regression"
                                     className="input"
                                     required
@@ -157,8 +162,8 @@ export default function ScheduledRuns() {
                                 <label className="block text-sm font-medium text-gray-700 mb-1">Schedule (Cron Expression)</label>
                                 <input
                                     type="text"
-                                    value={formData.cronExpression}
-                                    onChange={(e) => setFormData({ ...formData, cronExpression: e.target.value })}
+                                    value={formData.cron_expression}
+                                    onChange={(e) => setFormData({ ...formData, cron_expression: e.target.value })}
                                     className="input font-mono text-sm"
                                 />
                                 <div className="flex flex-wrap gap-1.5 mt-2">
@@ -166,8 +171,8 @@ export default function ScheduledRuns() {
                                         <button
                                             key={preset.value}
                                             type="button"
-                                            onClick={() => setFormData({ ...formData, cronExpression: preset.value })}
-                                            className={`text-xs px-2 py-1 rounded-full border ${formData.cronExpression === preset.value
+                                            onClick={() => setFormData({ ...formData, cron_expression: preset.value })}
+                                            className={`text-xs px-2 py-1 rounded-full border ${formData.cron_expression === preset.value
                                                 ? 'bg-primary-50 border-primary-300 text-primary-700'
                                                 : 'bg-gray-50 border-gray-200 text-gray-600 hover:bg-gray-100'
                                                 }`}
@@ -184,8 +189,8 @@ export default function ScheduledRuns() {
                                         type="number"
                                         min={1}
                                         max={10}
-                                        value={formData.runCount}
-                                        onChange={(e) => setFormData({ ...formData, runCount: parseInt(e.target.value) })}
+                                        value={formData.run_count}
+                                        onChange={(e) => setFormData({ ...formData, run_count: parseInt(e.target.value) })}
                                         className="input"
                                     />
                                 </div>
@@ -193,19 +198,30 @@ export default function ScheduledRuns() {
                                     <label className="flex items-center gap-2 mb-2">
                                         <input
                                             type="checkbox"
-                                            checked={formData.generateLatencyReport}
-                                            onChange={(e) => setFormData({ ...formData, generateLatencyReport: e.target.checked })}
+                                            checked={formData.generate_latency_report}
+                                            onChange={(e) => setFormData({ ...formData, generate_latency_report: e.target.checked })}
                                             className="rounded border-gray-300 text-primary-600"
                                         />
                                         <span className="text-sm text-gray-700">Latency report</span>
                                     </label>
                                 </div>
                             </div>
+                            <div>
+                                <label className="block text-sm font-medium text-gray-700 mb-1">If a run is missed</label>
+                                <select
+                                    value={formData.missed_run_policy}
+                                    onChange={(e) => setFormData({ ...formData, missed_run_policy: e.target.value })}
+                                    className="input"
+                                >
+                                    <option value="run_once">Run once when the scheduler is back</option>
+                                    <option value="skip">Skip it and wait for the next time</option>
+                                </select>
+                            </div>
                             <div className="flex justify-end space-x-3 pt-4">
                                 <button onClick={() => setShowModal(false)} className="btn btn-secondary">Cancel</button>
                                 <button
                                     onClick={() => createMutation.mutate(formData)}
-                                    disabled={!formData.displayName || createMutation.isPending}
+                                    disabled={!formData.display_name || createMutation.isPending}
                                     className="btn btn-primary"
                                 >
                                     {createMutation.isPending ? 'Creating…' : 'Create Schedule'}
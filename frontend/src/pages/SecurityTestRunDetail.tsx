@@ -2,9 +2,10 @@
 import { useState } from 'react'
 import { useParams, useNavigate } from 'react-router-dom'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
-import { ArrowLeft, Shield, StopCircle, Trash2, Filter, CheckCircle, AlertTriangle } from 'lucide-react'
+import { ArrowLeft, Shield, StopCircle, Trash2, Filter, CheckCircle, AlertTriangle, Download } from 'lucide-react'
 import { securityTestingApi } from '../services/api'
 import SecurityProgress from '../components/SecurityProgress'
+import { useRunEvents } from '../hooks/useRunEvents'
 
 const FILTER_OPTIONS = [
   { value: 'all', label: 'All Results' },
@@ -18,20 +19,33 @@ export default function SecurityTestRunDetail() {
   const navigate = useNavigate()
   const queryClient = useQueryClient()
   const [filter, setFilter] = useState('all')
-  const [page, setPage] = useState(1)
+  // Cursor of each page visited so far; the last one is the current page
+  const [cursors, setCursors] = useState<(string | undefined)[]>([undefined])
+  const page = cursors.length
 
   const { data: run, isLoading: runLoading } = useQuery({
     queryKey: ['security-run', id],
     queryFn: () => securityTestingApi.getRun(id!),
-    refetchInterval: (query) => {
-      const data = query.state.data
-      return data?.state === 'running' || data?.state === 'pending' ? 2000 : false
-    },
+  })
+  useRunEvents(id ? `/security-testing/runs/${id}/events` : undefined, ['security-run', id], (event) => {
+    // The results table shows stored rows; reload it when the run changes state
+    if (event === 'state') queryClient.invalidateQueries({ queryKey: ['security-results', id] })
   })
 
   const { data: resultsData, isLoading: resultsLoading } = useQuery({
-    queryKey: ['security-results', id, filter, page],
-    queryFn: () => securityTestingApi.getResults(id!, { filter, page, per_page: 20 }),
+    queryKey: ['security-results', id, filter, cursors[cursors.length - 1]],
+    queryFn: () => securityTestingApi.getResults(id!, {
+      filter,
+      cursor: cursors[cursors.length - 1],
+      per_page: 20,
+    }),
+    enabled: !!run,
+  })
+
+  const { data: latency } = useQuery({
+    queryKey: ['security-latency', id, run?.state],
+    queryFn: () => securityTestingApi.getLatency(id!),
+    refetchInterval: run?.state === 'running' ? 10000 : false,
     enabled: !!run,
   })
 
@@ -89,6 +103,13 @@ export default function SecurityTestRunDetail() {
               Cancel
             </button>
           )}
+          <button
+            onClick={() => window.open(`/api/export/security-runs/${id}?format=csv`, '_blank')}
+            className="btn btn-secondary flex items-center"
+          >
+            <Download className="h-4 w-4 mr-2" />
+            Download CSV
+          </button>
           <button
             onClick={() => {
               if (confirm('Delete this security test run?')) {
@@ -111,6 +132,22 @@ export default function SecurityTestRunDetail() {
           attackSuccessCount={run.attack_success_count}
           attackSuccessRate={run.attack_success_rate}
         />
+        {run.achieved_precision !== null && run.achieved_precision !== undefined && (
+          <p className="text-xs text-gray-500 mt-3">
+            Stopped after {run.completed_prompts} of {run.total_prompts} prompts with the attack
+            success rate known to ±{run.achieved_precision.toFixed(2)} points
+          </p>
+        )}
+        {latency && latency.count > 0 && (
+          <p className="text-xs text-gray-500 mt-3">
+            Response latency p50 {latency.p50_ms} ms · p95 {latency.p95_ms} ms · p99 {latency.p99_ms} ms
+            {Object.entries(latency.endpoints).map(([endpoint, p]) => (
+              <span key={endpoint} className="ml-3">
+                {endpoint}: p95 {p.p95_ms} ms
+              </span>
+            ))}
+          </p>
+        )}
       </div>
 
       {/* Results */}
@@ -123,7 +160,7 @@ export default function SecurityTestRunDetail() {
               value={filter}
               onChange={(e) => {
                 setFilter(e.target.value)
-                setPage(1)
+                setCursors([undefined])
               }}
               className="input py-1 text-sm"
             >
@@ -211,15 +248,15 @@ export default function SecurityTestRunDetail() {
             </p>
             <div className="flex space-x-2">
               <button
-                onClick={() => setPage(page - 1)}
+                onClick={() => setCursors(cursors.slice(0, -1))}
                 disabled={page === 1}
                 className="btn btn-secondary text-sm"
               >
                 Previous
               </button>
               <button
-                onClick={() => setPage(page + 1)}
-                disabled={page === totalPages}
+                onClick={() => resultsData?.nextCursor && setCursors([...cursors, resultsData.nextCursor])}
+                disabled={!resultsData?.nextCursor}
                 className="btn btn-secondary text-sm"
               >
                 Next
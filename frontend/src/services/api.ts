@@ -57,7 +57,11 @@ export const evaluationsApi = {
   listRuns: (params?: { test_suite_id?: string; limit?: number }) =>
     api.get('/evaluations/runs', { params }).then(r => r.data),
   getRun: (id: string) => api.get(`/evaluations/runs/${id}`).then(r => r.data),
-  getRunResults: (id: string) => api.get(`/evaluations/runs/${id}/results`).then(r => r.data),
+  getRunResults: (id: string, cursor?: string) =>
+    api.get(`/evaluations/runs/${id}/results`, { params: { cursor } })
+      .then(r => ({ results: r.data, nextCursor: r.headers['x-next-cursor'] as string | undefined })),
+  getRunResult: (runId: string, resultId: string) =>
+    api.get(`/evaluations/runs/${runId}/results/${resultId}`).then(r => r.data),
   run: (suiteId: string, data: any) =>
     api.post(`/evaluations/run?test_suite_id=${suiteId}`, data).then(r => r.data),
   analyze: (id: string, question?: string) =>
@@ -77,6 +81,15 @@ export const dashboardApi = {
     api.get(projectId ? `/dashboard/${projectId}/summary` : '/dashboard/summary').then(r => r.data),
 }
 
+export const trendsApi = {
+  evaluations: (params?: { project_id?: string; test_suite_id?: string; days?: number; points?: number }) =>
+    api.get('/trends/evaluations', { params }).then(r => r.data),
+  security: (params?: { project_id?: string; category?: string; days?: number; points?: number }) =>
+    api.get('/trends/security', { params }).then(r => r.data),
+  securityCategories: (params?: { project_id?: string; days?: number }) =>
+    api.get('/trends/security/categories', { params }).then(r => r.data),
+}
+
 // ─── Health ─────────────────────────────────────────────────
 export const healthApi = {
   check: () => api.get('/health').then(r => r.data),
@@ -102,6 +115,10 @@ export interface SecurityTestRun {
   completed_prompts: number;
   attack_success_count: number;
   attack_success_rate: number | null;
+  achieved_precision: number | null;
+  precision_report: Record<string, unknown> | null;
+  app_version: string | null;
+  skipped_prompts: number;
   ces_session_id: string | null;
   started_at: string | null;
   completed_at: string | null;
@@ -121,6 +138,19 @@ export interface SecurityTestResult {
   created_at: string;
 }
 
+export interface LatencyPercentiles {
+  count: number;
+  p50_ms: number | null;
+  p95_ms: number | null;
+  p99_ms: number | null;
+}
+
+export interface LatencySummary extends LatencyPercentiles {
+  run_count: number;
+  categories: Record<string, LatencyPercentiles>;
+  endpoints: Record<string, LatencyPercentiles>;
+}
+
 export const securityTestingApi = {
   getDatasets: () => api.get<Record<string, Array<{ id: string; name: string; size: number; description: string }>>>('/security-testing/datasets').then(r => r.data),
   validateDataset: (datasetUrl: string) =>
@@ -130,13 +160,33 @@ export const securityTestingApi = {
     dataset_id: string;
     category: string;
     name?: string;
-    config?: { sample_size?: number; batch_size?: number; shuffle?: boolean };
+    config?: {
+      sample_size?: number;
+      batch_size?: number;
+      shuffle?: boolean;
+      sequential?: { precision: number; confidence?: number; min_prompts?: number };
+      prioritize?: boolean;
+      incremental?: boolean;
+      app_version?: string;
+    };
   }) => api.post<SecurityTestRun>('/security-testing/runs', data).then(r => r.data),
-  listRuns: (projectId: string, limit?: number) =>
-    api.get<{ runs: SecurityTestRun[]; total: number }>('/security-testing/runs', { params: { project_id: projectId, limit } }).then(r => r.data),
+  listRuns: (projectId: string, limit?: number, cursor?: string) =>
+    api.get<{ runs: SecurityTestRun[] }>('/security-testing/runs', { params: { project_id: projectId, limit, cursor } })
+      .then(r => ({ ...r.data, nextCursor: r.headers['x-next-cursor'] as string | undefined })),
   getRun: (runId: string) => api.get<SecurityTestRun>(`/security-testing/runs/${runId}`).then(r => r.data),
-  getResults: (runId: string, params?: { filter?: string; page?: number; per_page?: number }) =>
-    api.get<{ results: SecurityTestResult[]; total: number; page: number }>(`/security-testing/runs/${runId}/results`, { params }).then(r => r.data),
+  getResults: (runId: string, params?: { filter?: string; cursor?: string; per_page?: number }) =>
+    api.get<{
+      results: SecurityTestResult[];
+      total: number;
+      counts: Record<string, number>;
+    }>(`/security-testing/runs/${runId}/results`, { params })
+      .then(r => ({ ...r.data, nextCursor: r.headers['x-next-cursor'] as string | undefined })),
+  getLatency: (runId: string) => api.get<LatencySummary>(`/security-testing/runs/${runId}/latency`).then(r => r.data),
+  getCombinedLatency: (runIds: string[]) =>
+    api.get<LatencySummary>('/security-testing/latency', {
+      params: { run_ids: runIds },
+      paramsSerializer: { indexes: null },
+    }).then(r => r.data),
   cancelRun: (runId: string) => api.post<{ success: boolean; state: string }>(`/security-testing/runs/${runId}/cancel`).then(r => r.data),
   deleteRun: (runId: string) => api.delete(`/security-testing/runs/${runId}`).then(r => r.data),
 }